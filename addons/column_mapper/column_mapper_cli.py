@@ -6,12 +6,16 @@ Independent CLI for ML-enhanced column mapping and missing column detection
 Usage: python column_mapper_cli.py [folder_path]
 """
 
+import time
+_STARTED = time.perf_counter()  # เวลาเริ่มโปรแกรม (สำหรับรายงาน startup time)
+
 import argparse
 import json
 import os
 import sys
 import logging
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
@@ -21,7 +25,6 @@ import pandas as pd
 warnings.filterwarnings("ignore", "Workbook contains no default style", UserWarning)
 
 # Setup paths for imports
-import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 addon_dir = os.path.dirname(current_dir)  # addons/
 app_root_dir = os.path.dirname(addon_dir)  # app root
@@ -29,6 +32,7 @@ app_root_dir = os.path.dirname(addon_dir)  # app root
 # Import main program services first (before local services to avoid namespace conflict)
 sys.path.insert(0, app_root_dir)
 from services.file.file_reader_service import FileReaderService  
+from services.file.header_memo import header_signature
 from constants import PathConstants
 from config.json_manager import json_manager
 
@@ -39,6 +43,11 @@ ml_mapper_module = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(ml_mapper_module)
 MLColumnMapper = ml_mapper_module.MLColumnMapper
 
+# จำนวนไฟล์ที่อ่าน header พร้อมกันใน batch mode
+BATCH_HEADER_WORKERS = 8
+# confidence ขั้นต่ำของ mapping ที่ใช้อัตโนมัติใน auto mode
+AUTO_APPLY_CONFIDENCE = 70
+
 
 class ColumnMapperCLI:
     """
@@ -51,12 +60,14 @@ class ColumnMapperCLI:
     - Update column_settings.json
     """
     
-    def __init__(self):
+    def __init__(self, string_only: bool = False):
         # Setup logging
         self.setup_logging()
         
-        self.ml_mapper = MLColumnMapper(log_callback=self.log)
+        self.ml_mapper = MLColumnMapper(log_callback=self.log, string_only=string_only)
         self.file_reader = FileReaderService(log_callback=self.log)
+        # detect_file_type ใช้ column_settings ของ instance (ใช้ dict เดียวกับ ml_mapper ซึ่งอัปเดตตาม SettingsManager)
+        self.file_reader.column_settings = self.ml_mapper.column_settings
         
     def setup_logging(self):
         """Setup logging to both console and file"""
@@ -139,26 +150,28 @@ class ColumnMapperCLI:
             else:
                 df_peek = pd.read_excel(file_path, nrows=0, dtype=str)
 
-            actual_columns = list(df_peek.columns)
-            
-            # Get expected columns from settings
-            expected_mapping = self.ml_mapper.column_settings.get(file_type, {})
-            expected_columns = list(expected_mapping.keys())
-            
-            # Find differences
-            missing_columns = [col for col in expected_columns if col not in actual_columns]
-            extra_columns = [col for col in actual_columns if col not in expected_columns]
-            
-            return {
-                'missing': missing_columns,
-                'extra': extra_columns,
-                'actual': actual_columns,
-                'expected': expected_columns
-            }
+            return self.analyze_columns(list(df_peek.columns), file_type)
             
         except Exception as e:
             self.log(f"Error analyzing file {file_path}: {str(e)}", 'error')
             return {'missing': [], 'extra': [], 'actual': [], 'expected': []}
+
+    def analyze_columns(self, actual_columns: List[str], file_type: str) -> Dict[str, List[str]]:
+        """Compare header columns with the expected mapping of the file type"""
+        # Get expected columns from settings
+        expected_mapping = self.ml_mapper.column_settings.get(file_type, {})
+        expected_columns = list(expected_mapping.keys())
+
+        # Find differences
+        missing_columns = [col for col in expected_columns if col not in actual_columns]
+        extra_columns = [col for col in actual_columns if col not in expected_columns]
+
+        return {
+            'missing': missing_columns,
+            'extra': extra_columns,
+            'actual': actual_columns,
+            'expected': expected_columns
+        }
     
     def suggest_mappings_for_missing_columns(self, missing_columns: List[str], 
                                            extra_columns: List[str], 
@@ -174,18 +187,8 @@ class ColumnMapperCLI:
         Returns:
             Dictionary of suggestions
         """
-        suggestions = {}
-        
-        for missing_col in missing_columns:
-            # Find suggestions from extra columns
-            col_suggestions = self.ml_mapper._find_similar_columns(
-                missing_col, set(extra_columns), file_type
-            )
-            
-            if col_suggestions:
-                suggestions[missing_col] = col_suggestions
-        
-        return suggestions
+        # Find suggestions from extra columns (all missing columns in one batch)
+        return self.ml_mapper._find_similar_columns_batch(missing_columns, set(extra_columns), file_type)
     
     def interactive_mapping_selection(self, suggestions: Dict[str, List[Dict]]) -> Dict[str, str]:
         """
@@ -347,6 +350,9 @@ class ColumnMapperCLI:
             print("No Excel or CSV files found in the specified folder.")
             return
         
+        # โหลด ML model ระหว่างที่ตรวจประเภทไฟล์/อ่าน header (ไม่บล็อก)
+        self.ml_mapper.warm_up()
+        
         # Process each file
         all_files = files
         
@@ -405,7 +411,7 @@ class ColumnMapperCLI:
                 # Auto-apply high confidence suggestions (>70%)
                 selected_mappings = {}
                 for missing_col, sug_list in suggestions.items():
-                    if sug_list and sug_list[0]['confidence'] > 70:
+                    if sug_list and sug_list[0]['confidence'] > AUTO_APPLY_CONFIDENCE:
                         best_sug = sug_list[0]
                         selected_mappings[missing_col] = best_sug['target_column']
                         self.log(f"Auto-applied: '{missing_col}' → '{best_sug['target_column']}' ({best_sug['confidence']:.1f}%)")
@@ -446,6 +452,135 @@ class ColumnMapperCLI:
                     else:
                         print("Settings not updated.")
     
+    @staticmethod
+    def _header_columns(header_values) -> List[str]:
+        """ชื่อคอลัมน์จาก header row ดิบ แบบเดียวกับ pandas (ว่าง = 'Unnamed: i', ซ้ำ = 'name.1')"""
+        columns = []
+        seen: Dict[str, int] = {}
+        for i, value in enumerate(header_values):
+            name = f"Unnamed: {i}" if pd.isna(value) else str(value)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            seen.setdefault(name, 0)
+            columns.append(name)
+        return columns
+
+    def read_file_headers(self, files: List[str], workers: int = BATCH_HEADER_WORKERS) -> Dict[str, Optional[pd.DataFrame]]:
+        """อ่านเฉพาะส่วนหัว (2 แถวแรก) ของทุกไฟล์พร้อมกัน (None = อ่านไม่ได้)"""
+        def read(file_path):
+            try:
+                return self.file_reader._read_file_peek(file_path)
+            except Exception as e:
+                self.log(f"Error reading header of {os.path.basename(file_path)}: {str(e)}", 'error')
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='header') as pool:
+            return dict(zip(files, pool.map(read, files)))
+
+    def process_folder_batch(self, folder_path: str, workers: int = BATCH_HEADER_WORKERS,
+                             report_path: Optional[str] = None) -> Optional[str]:
+        """
+        Batch mode: analyse every distinct header layout in the folder once
+
+        Headers of all files are read concurrently, files with an identical header
+        signature share one analysis, all column names are embedded in one model call,
+        and the suggestions of every layout are written to one report. Auto mode also
+        applies high-confidence mappings (once per file type).
+
+        Returns:
+            Path of the report, or None when nothing was analysed
+        """
+        self.log(f"Processing folder (batch mode): {folder_path}")
+        self.file_reader.set_search_path(folder_path)
+        files = self.file_reader.find_data_files()
+        self.log(f"Found {len(files)} files to process")
+        if not files:
+            print("No Excel or CSV files found in the specified folder.")
+            return None
+
+        self.ml_mapper.warm_up()
+
+        started = time.perf_counter()
+        headers = self.read_file_headers(files, workers)
+
+        # header signature (ค่าดิบของ 2 แถวแรก) -> ไฟล์ที่มี layout เดียวกัน
+        layouts: Dict[Tuple, List[str]] = {}
+        peeks: Dict[Tuple, pd.DataFrame] = {}
+        for file_path, df_peek in headers.items():
+            if df_peek is None:
+                continue
+            signature = header_signature(df_peek)
+            layouts.setdefault(signature, []).append(file_path)
+            peeks.setdefault(signature, df_peek)
+        self.log(f"Read {len(headers)} headers in {time.perf_counter() - started:.2f}s: "
+                 f"{len(layouts)} distinct layout(s)")
+
+        analyses = []
+        for signature, layout_files in layouts.items():
+            df_peek = peeks[signature]
+            file_type = self.file_reader.detect_file_type_from_peek(df_peek)
+            if not file_type:
+                for file_path in layout_files:
+                    self.log(f"Could not detect file type for {os.path.basename(file_path)}", 'warning')
+                continue
+            columns = self._header_columns(df_peek.iloc[0].values) if df_peek.shape[0] else []
+            analysis = self.analyze_columns(columns, file_type)
+            if analysis['missing']:
+                analyses.append((file_type, layout_files, analysis))
+
+        if not analyses:
+            self.log("No missing columns found")
+            return None
+
+        # embed ชื่อคอลัมน์ของทุก layout ใน model call เดียว
+        if self.ml_mapper.ml_ready:
+            names = {col for _, _, analysis in analyses for col in analysis['missing'] + analysis['extra']}
+            try:
+                self.ml_mapper._encode_columns(sorted(names))
+            except Exception as e:
+                self.log(f"Warning: Could not precompute embeddings: {str(e)}", 'warning')
+
+        report = [f"Column Mapper batch report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                  f"Folder: {folder_path}",
+                  f"Files: {len(files)}, distinct layouts with missing columns: {len(analyses)}", ""]
+        auto_mappings: Dict[str, Dict[str, Dict]] = {}
+        for file_type, layout_files, analysis in analyses:
+            suggestions = self.suggest_mappings_for_missing_columns(analysis['missing'], analysis['extra'], file_type)
+            report.append(f"TYPE: {file_type}")
+            report.append(f"FILES ({len(layout_files)}): " + ", ".join(os.path.basename(f) for f in layout_files))
+            report.append(f"MISSING COLUMNS: {analysis['missing']}")
+            report.append(f"EXTRA COLUMNS: {analysis['extra']}")
+            report.append(self.ml_mapper.generate_mapping_report(suggestions))
+            report.append("")
+
+            if getattr(self, 'auto_mode', False):
+                # เลือก suggestion ที่ confidence สูงสุดเมื่อหลาย layout ของ file type เดียวกันเสนอต่างกัน
+                selected = auto_mappings.setdefault(file_type, {})
+                for missing_col, sug_list in suggestions.items():
+                    best = sug_list[0] if sug_list else None
+                    if best and best['confidence'] > AUTO_APPLY_CONFIDENCE and \
+                            best['confidence'] > selected.get(missing_col, {}).get('confidence', 0):
+                        selected[missing_col] = best
+
+        if report_path is None:
+            report_path = os.path.join(current_dir, "reports",
+                                       f"column_mapping_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(report))
+        self.log(f"Batch analysis finished in {time.perf_counter() - started:.2f}s - report saved: {report_path}")
+
+        for file_type, selected in auto_mappings.items():
+            if not selected:
+                continue
+            new_mappings = {col: sug['target_column'] for col, sug in selected.items()}
+            for old_key, sug in selected.items():
+                self.log(f"Auto-applied: '{old_key}' → '{sug['target_column']}' ({sug['confidence']:.1f}%)")
+            if not self.update_column_settings(file_type, new_mappings):
+                self.log("Error: Failed to update settings.", 'error')
+        return report_path
+
     def get_last_search_path(self):
         """Get last search path from main program settings (uses input_folder_config)"""
         try:
@@ -496,7 +631,10 @@ class ColumnMapperCLI:
         # Save the path for next time
         self.save_last_search_path(folder_path)
         
-        self.process_folder(folder_path)
+        if getattr(args, 'batch', False):
+            self.process_folder_batch(folder_path, args.workers, args.report)
+        else:
+            self.process_folder(folder_path)
         self.log("Processing complete!")
         self.log("="*50)
         self.log("Column Mapper CLI Session Ended")
@@ -518,13 +656,40 @@ def main():
         action='store_true', 
         help='Run in non-interactive mode with auto-mapping only (no user prompts)'
     )
+    parser.add_argument(
+        '--string-only',
+        action='store_true',
+        help='Use string/context similarity only (never loads the ML model or torch)'
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Read all headers concurrently, analyse each distinct layout once and write one report (no prompts)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=BATCH_HEADER_WORKERS,
+        help=f'Concurrent header reads in batch mode (default: {BATCH_HEADER_WORKERS})'
+    )
+    parser.add_argument(
+        '--report',
+        help='Batch report path (default: reports/column_mapping_report_<timestamp>.txt next to this tool)'
+    )
     
     args = parser.parse_args()
     
     # Import datetime here to avoid issues
     from datetime import datetime
     
-    cli = ColumnMapperCLI()
+    cli = ColumnMapperCLI(string_only=args.string_only)
+    if args.string_only:
+        model_state = "string-only"
+    elif cli.ml_mapper.ml_ready:
+        model_state = "ML model loads on first use"
+    else:
+        model_state = "ML model not available"
+    cli.log(f"Startup time: {(time.perf_counter() - _STARTED) * 1000:.0f} ms ({model_state})")
     cli.run(args)
 
 
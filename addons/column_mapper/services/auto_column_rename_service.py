@@ -226,16 +226,18 @@ class AutoColumnRenameService:
         direct_mappings = {}
         missing_columns = []
         
+        # Try to find similar columns using ML (all unmapped columns in one batch)
+        similar_columns = self.ml_mapper._find_similar_columns_batch(
+            [col for col in original_columns if col not in existing_mappings],
+            set(existing_mappings.keys()),
+            file_type
+        )
+        
         for source_col in original_columns:
             if source_col in existing_mappings:
                 direct_mappings[source_col] = existing_mappings[source_col]
             else:
-                # Try to find similar column using ML
-                suggestions = self.ml_mapper._find_similar_columns(
-                    source_col, 
-                    set(existing_mappings.keys()), 
-                    file_type
-                )
+                suggestions = similar_columns.get(source_col)
                 
                 if suggestions and suggestions[0]['confidence'] > 70:
                     # High confidence match found
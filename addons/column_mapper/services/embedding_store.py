@@ -0,0 +1,160 @@
+"""
+Persistent embedding store for the column mapper addon
+
+Embeddings of cleaned column names are kept on disk per model id:
+
+- `<model>.f32`: float32 rows (normalised vectors), read through np.memmap
+- `<model>.index.json`: {"dim": d, "rows": n, "names": {cleaned name: row}}
+
+New vectors are appended, so names embedded in earlier runs are never encoded again
+and a lookup of already-known names needs no model at all. Delete the directory to
+rebuild the cache.
+
+Appends hold `<model>.lock` (cross-process, the GUI and the CLI share the cache), re-read
+the index and cut `.f32` back to the rows the index knows before writing, so rows left
+by an interrupted write can never be mapped to a new name.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.file_lock import file_lock
+
+
+class EmbeddingStore:
+    """
+    Memory-mapped embedding cache ของชื่อคอลัมน์ (key = model id + cleaned text)
+
+    Args:
+        model_id: ชื่อ model ที่สร้าง embeddings (แยกไฟล์ต่อ model)
+        directory: โฟลเดอร์เก็บไฟล์ cache
+    """
+
+    def __init__(self, model_id: str, directory: str) -> None:
+        self.model_id = model_id
+        self.directory = directory
+        safe_id = re.sub(r'[^\w\-]+', '_', model_id)
+        self.data_path = os.path.join(directory, f"{safe_id}.f32")
+        self.index_path = os.path.join(directory, f"{safe_id}.index.json")
+        self.lock_path = os.path.join(directory, f"{safe_id}.lock")
+
+        self._lock = threading.Lock()
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._names: Dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._load_index()
+
+    # ===== Persistence =====
+    def _load_index(self) -> None:
+        """อ่าน index (ไฟล์เสียหรือขนาดไม่ตรงกับ index = เริ่ม cache ใหม่)"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            dim, rows = int(index['dim']), int(index['rows'])
+            if dim <= 0 or os.path.getsize(self.data_path) < dim * rows * 4:
+                raise ValueError("embedding data shorter than index")
+            self._dim = dim
+            self._rows = rows
+            self._names = {name: int(row) for name, row in index['names'].items() if 0 <= int(row) < rows}
+        except (OSError, ValueError, KeyError, TypeError):
+            self._dim = None
+            self._rows = 0
+            self._names = {}
+
+    def _open_matrix(self) -> Optional[np.memmap]:
+        if self._matrix is None and self._names:
+            rows = max(self._names.values()) + 1
+            self._matrix = np.memmap(self.data_path, dtype=np.float32, mode='r', shape=(rows, self._dim))
+        return self._matrix
+
+    def _close_matrix(self) -> None:
+        # ปิด mapping ก่อนเขียนไฟล์ (Windows เขียนไฟล์ที่ถูก map อยู่ไม่ได้)
+        if self._matrix is not None:
+            mmap = getattr(self._matrix, '_mmap', None)
+            self._matrix = None
+            if mmap is not None:
+                mmap.close()
+
+    def _write_index(self) -> None:
+        index = {'model_id': self.model_id, 'dim': self._dim, 'rows': self._rows, 'names': self._names}
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    # ===== Lookup / update =====
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._names
+
+    def missing(self, texts: List[str]) -> List[str]:
+        """ข้อความที่ยังไม่มี embedding (ไม่ซ้ำ เรียงตามลำดับที่พบ)"""
+        with self._lock:
+            return [text for text in dict.fromkeys(texts) if text not in self._names]
+
+    def get_many(self, texts: List[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """
+        Returns:
+            Tuple[Dict[str, np.ndarray], List[str]]: (vectors ที่มีใน cache, ข้อความที่ยังไม่มี)
+        """
+        with self._lock:
+            matrix = self._open_matrix()
+            found = {}
+            missing = []
+            for text in dict.fromkeys(texts):
+                row = self._names.get(text)
+                if row is None:
+                    missing.append(text)
+                else:
+                    found[text] = np.array(matrix[row])
+            return found, missing
+
+    def add(self, texts: List[str], vectors: np.ndarray) -> bool:
+        """ต่อท้าย embeddings ใหม่ลงไฟล์ (คืน False ถ้าเขียนไม่ได้)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            return True
+        with self._lock:
+            self._close_matrix()
+            try:
+                with file_lock(self.lock_path):
+                    # process อื่นอาจต่อท้ายไปแล้ว: อ่าน index ล่าสุดก่อนเลือก row
+                    self._load_index()
+                    if self._dim is not None and vectors.shape[1] != self._dim:
+                        # model เดิมแต่ขนาด vector เปลี่ยน: เริ่ม cache ใหม่
+                        self._names = {}
+                        self._rows = 0
+                        self._dim = None
+                    new = [(text, vector) for text, vector in zip(texts, vectors) if text not in self._names]
+                    if not new:
+                        return True
+
+                    row_bytes = vectors.shape[1] * 4
+                    first_row = self._rows
+                    mode = 'r+b' if first_row and os.path.exists(self.data_path) else 'wb'
+                    with open(self.data_path, mode) as f:
+                        # ตัด rows ที่ index ไม่รู้จัก (เขียนค้างจากรอบที่ล้ม) ก่อนต่อท้าย
+                        f.truncate(first_row * row_bytes)
+                        f.seek(first_row * row_bytes)
+                        for text, vector in new:
+                            f.write(vector.tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._dim = vectors.shape[1]
+                    for offset, (text, _) in enumerate(new):
+                        self._names[text] = first_row + offset
+                    self._rows = first_row + len(new)
+                    # index เขียนหลัง data: index ไม่เคยชี้ไปยัง row ที่ยังเขียนไม่เสร็จ
+                    self._write_index()
+                return True
+            except OSError:
+                self._load_index()
+                return False
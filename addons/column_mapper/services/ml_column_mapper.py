@@ -3,28 +3,28 @@ ML-Enhanced Column Mapping Service for PIPELINE_SQLSERVER
 
 This service uses machine learning to automatically suggest column mappings
 when file structures change or new file types are encountered.
+
+The sentence-transformers model (and torch) is only imported and loaded on the first
+semantic query that is not answered from the embedding cache, or in the background via
+`warm_up()`. `string_only=True` never imports it.
 """
 
+import importlib.util
 import json
 import os
 import re
 import logging
-from difflib import SequenceMatcher
-from typing import Dict, List, Tuple, Optional, Any
+import threading
+import time
+from typing import Dict, List, Tuple, Optional, Any, Iterable
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-try:
-    from sentence_transformers import SentenceTransformer
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
+# ตรวจแค่ว่าติดตั้งไว้ (import จริงตอนโหลด model ครั้งแรก เพราะ torch ใช้เวลาหลายวินาที)
+ML_AVAILABLE = importlib.util.find_spec('sentence_transformers') is not None
 
 import sys
-from pathlib import Path
 # Add app root to path (go up from services -> column_mapper -> addons -> app_root)
 app_root = Path(__file__).parent.parent.parent.parent
 sys.path.append(str(app_root))
@@ -32,6 +32,40 @@ sys.path.append(str(app_root))
 from constants import PathConstants
 from services.settings_manager import settings_manager
 
+try:
+    from .embedding_store import EmbeddingStore
+    from .string_index import StringSimilarityIndex, normalize_string, split_words, string_similarity_normalized
+except ImportError:
+    # column_mapper_cli.py โหลดไฟล์นี้เป็น module เดี่ยว (ไม่มี parent package)
+    sys.path.append(str(Path(__file__).parent))
+    from embedding_store import EmbeddingStore
+    from string_index import StringSimilarityIndex, normalize_string, split_words, string_similarity_normalized
+
+
+# Domain keywords: สองคอลัมน์ที่อยู่ domain เดียวกันได้ context score 0.5
+CONTEXT_DOMAINS = [
+    ['order', 'คำสั่ง', 'ออเดอร์', 'สั่งซื้อ', 'หมายเลข'],
+    ['product', 'สินค้า', 'ผลิตภัณฑ์', 'ชื่อ', 'รหัส'],
+    ['price', 'ราคา', 'ยอด', 'เงิน', 'cost'],
+    ['date', 'time', 'วันที่', 'เวลา', 'created', 'updated'],
+    ['user', 'buyer', 'customer', 'ผู้ใช้', 'ผู้ซื้อ', 'บัญชี', 'ลูกค้า'],
+]
+
+# Sentence-transformers model (และ key ของ embedding cache บนดิสก์)
+MODEL_ID = 'all-MiniLM-L6-v2'
+
+# น้ำหนักของแต่ละ score และเกณฑ์ขั้นต่ำของ suggestion
+SEMANTIC_WEIGHT = 0.5
+STRING_WEIGHT = 0.3
+CONTEXT_WEIGHT = 0.2
+MIN_COMBINED_SCORE = 0.2
+MAX_SUGGESTIONS = 5
+
+# string score ที่นับเป็นคอลัมน์ที่ตรงกันใน suggest_file_type_from_columns
+FILE_TYPE_MATCH_THRESHOLD = 0.6
+# จำนวน string index (ต่อชุดชื่อคอลัมน์) ที่เก็บไว้ใช้ซ้ำ
+STRING_INDEX_CACHE_SIZE = 4
+
 
 class MLColumnMapper:
     """
@@ -45,8 +79,19 @@ class MLColumnMapper:
     5. Auto-updating of column_settings.json
     """
     
-    def __init__(self, log_callback: Optional[callable] = None):
-        """Initialize the ML Column Mapper"""
+    def __init__(self, log_callback: Optional[callable] = None, encoder=None, use_embedding_cache: bool = True,
+                 string_only: bool = False):
+        """
+        Initialize the ML Column Mapper
+
+        Args:
+            log_callback: Logging function
+            encoder: Object with `encode(List[str]) -> array` used instead of the
+                sentence-transformers model (e.g. a deterministic stub); its embeddings are
+                only cached on disk when it has a `model_id` attribute
+            use_embedding_cache: Keep embeddings in the on-disk store across runs
+            string_only: Never load the semantic model (string and context scores only)
+        """
         self.log_callback = log_callback if log_callback else print
         
         # Setup file logging
@@ -56,23 +101,84 @@ class MLColumnMapper:
         self.column_settings = self._load_column_settings()
         self.dtype_settings = self._load_dtype_settings()
         
-        # Initialize ML models if available
+        # Semantic model: โหลดเมื่อใช้ครั้งแรก (_get_semantic_model) หรือใน warm_up()
         self.semantic_model = None
-        self.vectorizer = None
-        self.ml_ready = False
-        
-        if ML_AVAILABLE:
-            try:
-                self.semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
-                self.vectorizer = TfidfVectorizer()
-                self.ml_ready = True
-                self._log("ML models loaded successfully")
-            except Exception as e:
-                self._log(f"ML models not available: {str(e)}", 'warning')
-                self._log("Will use fallback string similarity methods", 'warning')
+        self.string_only = string_only
+        self._model_lock = threading.RLock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        # cleaned column name -> normalised embedding (encode ชื่อเดิมซ้ำไม่ได้ประโยชน์)
+        self._embeddings: Dict[str, np.ndarray] = {}
+        # cleaned names ของ file types ใหม่ที่จะ encode พร้อม batch ถัดไป
+        self._pending_names: set = set()
+        # tuple ของชื่อคอลัมน์ -> StringSimilarityIndex
+        self._string_indexes: Dict[Tuple[str, ...], StringSimilarityIndex] = {}
+        self.embedding_store = None
+        model_id = getattr(encoder, 'model_id', None) if encoder is not None else MODEL_ID
+        if use_embedding_cache and model_id:
+            self.embedding_store = EmbeddingStore(model_id, PathConstants.EMBEDDING_CACHE_DIR)
+        settings_manager.add_file_type_listener(self._on_file_type_changed)
+        
+        # ml_ready = semantic scoring ใช้ได้ (model อาจยังไม่ถูกโหลด)
+        if string_only:
+            self.ml_ready = False
+            self._log("String-only mode: semantic model disabled")
+        elif encoder is not None:
+            self.semantic_model = encoder
+            self.ml_ready = True
+        elif ML_AVAILABLE:
+            self.ml_ready = True
         else:
+            self.ml_ready = False
             self._log("ML dependencies not installed", 'warning')
             self._log("Run: pip install sentence-transformers scikit-learn", 'info')
+
+    def _get_semantic_model(self):
+        """Semantic model (โหลดครั้งแรกที่เรียก; None ถ้าโหลดไม่ได้)"""
+        if self.semantic_model is not None or not self.ml_ready:
+            return self.semantic_model
+        with self._model_lock:
+            if self.semantic_model is None and self.ml_ready:
+                started = time.perf_counter()
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self.semantic_model = SentenceTransformer(MODEL_ID)
+                    self._log(f"ML models loaded successfully ({time.perf_counter() - started:.1f}s)")
+                except Exception as e:
+                    self.ml_ready = False
+                    self._log(f"ML models not available: {str(e)}", 'warning')
+                    self._log("Will use fallback string similarity methods", 'warning')
+        return self.semantic_model
+
+    def warm_up(self, precompute: bool = True) -> Optional[threading.Thread]:
+        """
+        Load the semantic model in a background thread (e.g. while files are being scanned)
+
+        Args:
+            precompute: Also embed every known column name not yet in the embedding cache
+
+        Returns:
+            The warm-up thread, or None when semantic scoring is disabled
+        """
+        if not self.ml_ready:
+            return None
+        if self._warmup_thread is None:
+            def _warm():
+                try:
+                    if precompute:
+                        names = set()
+                        for mappings in self.column_settings.values():
+                            names.update(mappings.keys())
+                            names.update(mappings.values())
+                        if names:
+                            self._encode_columns(sorted(names))
+                    else:
+                        self._get_semantic_model()
+                except Exception as e:
+                    self._log(f"Background model warm-up failed: {str(e)}", 'warning')
+
+            self._warmup_thread = threading.Thread(target=_warm, name='column-mapper-warmup', daemon=True)
+            self._warmup_thread.start()
+        return self._warmup_thread
     
     def setup_logging(self):
         """Setup file logging for ML Column Mapper"""
@@ -120,24 +226,16 @@ class MLColumnMapper:
     def _load_column_settings(self) -> Dict[str, Dict[str, str]]:
         """Load column settings from settings manager"""
         try:
-            # Build legacy-style dictionary from all file types
-            column_settings = {}
-            file_types = settings_manager.list_file_types()
-            for file_type in file_types:
-                column_settings[file_type] = settings_manager.get_column_settings(file_type)
-            return column_settings
+            # Editable copy of all file types (mappings are updated in place)
+            return settings_manager.snapshot().editable_column_settings()
         except Exception:
             return {}
 
     def _load_dtype_settings(self) -> Dict[str, Dict[str, str]]:
         """Load data type settings from settings manager"""
         try:
-            # Build legacy-style dictionary from all file types
-            dtype_settings = {}
-            file_types = settings_manager.list_file_types()
-            for file_type in file_types:
-                dtype_settings[file_type] = settings_manager.get_dtype_settings(file_type)
-            return dtype_settings
+            # Editable copy of all file types (mappings are updated in place)
+            return settings_manager.snapshot().editable_dtype_settings()
         except Exception:
             return {}
 
@@ -166,61 +264,179 @@ class MLColumnMapper:
         Returns:
             Dict with suggestions for each column
         """
-        suggestions = {}
-        
         # Get all known target columns from existing mappings
         all_target_columns = set()
         for settings in self.column_settings.values():
             all_target_columns.update(settings.values())
         
-        for column in file_columns:
-            column_suggestions = self._find_similar_columns(column, all_target_columns, file_type)
-            if column_suggestions:
-                suggestions[column] = column_suggestions
-        
-        return suggestions
+        return self._find_similar_columns_batch(file_columns, all_target_columns, file_type)
     
     def _find_similar_columns(self, source_column: str, target_columns: set, file_type: str = None) -> List[Dict[str, Any]]:
         """Find similar columns using ML and string matching"""
-        similarities = []
-
-        self._log(f"Finding similar columns for '{source_column}' from {len(target_columns)} candidates", 'debug')
-
-        for target_column in target_columns:
-            # Calculate different types of similarity
-            semantic_score = self._calculate_semantic_similarity(source_column, target_column)
-            string_score = self._calculate_string_similarity(source_column, target_column)
-            context_score = self._calculate_context_similarity(source_column, target_column, file_type)
-
-            # Weighted combined score
-            combined_score = (
-                semantic_score * 0.5 +
-                string_score * 0.3 +
-                context_score * 0.2
-            )
-
-            self._log(
-                f"  '{target_column}': combined={combined_score:.3f} "
-                f"(semantic={semantic_score:.3f}, string={string_score:.3f}, context={context_score:.3f})",
-                'debug'
-            )
-
-            if combined_score > 0.2:  # Minimum threshold (lowered from 0.3 to catch more potential matches)
+        return self._find_similar_columns_batch([source_column], target_columns, file_type).get(source_column, [])
+
+    def _find_similar_columns_batch(self, source_columns: Iterable[str], target_columns: Iterable[str],
+                                    file_type: str = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find similar columns for many source columns at once
+
+        Semantic scores of all (source, target) pairs come from one matrix multiply of
+        normalised embeddings (each distinct name is encoded once), context scores from
+        keyword-domain matrices. String scores come from the target string index: exact
+        SequenceMatcher runs only for targets whose upper-bound score can still enter the
+        top suggestions of a source.
+
+        Returns:
+            Dict of {source_column: top suggestions (highest confidence first)}
+        """
+        sources = list(dict.fromkeys(source_columns))
+        targets = sorted(set(target_columns))
+        if not sources or not targets:
+            return {}
+
+        self._log(f"Finding similar columns for {len(sources)} column(s) from {len(targets)} candidates", 'debug')
+
+        semantic = self._semantic_similarity_matrix(sources, targets)
+        context = self._context_similarity_matrix(sources, targets, file_type)
+        index = self._get_string_index(targets)
+
+        results = {}
+        for i, source_column in enumerate(sources):
+            top = self._top_string_candidates(source_column, index, semantic[i], context[i])
+
+            similarities = []
+            for combined, j, string_score in top:
+                target_column = targets[j]
                 similarities.append({
                     'target_column': target_column,
-                    'confidence': round(combined_score * 100, 1),
-                    'semantic_score': round(semantic_score * 100, 1),
-                    'string_score': round(string_score * 100, 1),
-                    'context_score': round(context_score * 100, 1),
-                    'reasoning': self._generate_reasoning(source_column, target_column, semantic_score, string_score)
+                    'confidence': round(float(combined) * 100, 1),
+                    'semantic_score': round(float(semantic[i, j]) * 100, 1),
+                    'string_score': round(float(string_score) * 100, 1),
+                    'context_score': round(float(context[i, j]) * 100, 1),
+                    'reasoning': self._generate_reasoning(source_column, target_column, semantic[i, j], string_score)
                 })
+                self._log(
+                    f"  '{source_column}' -> '{target_column}': combined={combined:.3f} "
+                    f"(semantic={semantic[i, j]:.3f}, string={string_score:.3f}, context={context[i, j]:.3f})",
+                    'debug'
+                )
+            if similarities:
+                results[source_column] = similarities
+
+        return results
+
+    def _on_file_type_changed(self, file_type: str, config: Dict[str, Any]) -> None:
+        """SettingsManager listener: keep mappings current and queue new names for embedding"""
+        columns = config.get('columns', {})
+        self.column_settings[file_type] = dict(columns)
+        names = set(columns.keys()) | set(columns.values())
+        self._pending_names.update(self._clean_column_name(name) for name in names)
+
+    def _encode_columns(self, columns: List[str]) -> Optional[np.ndarray]:
+        """
+        Normalised embeddings (one row per column name) of the cleaned column names
+        (None when names need encoding and the model cannot be loaded)
+
+        Lookup order: this process, the on-disk embedding store, then the model. Names
+        not cached anywhere (plus names queued from new file types) are encoded in a
+        single batch call and appended to the store.
+        """
+        cleaned = [self._clean_column_name(col) for col in columns]
+        missing = [text for text in dict.fromkeys(cleaned) if text not in self._embeddings]
+        if missing and self.embedding_store is not None:
+            found, missing = self.embedding_store.get_many(missing)
+            self._embeddings.update(found)
+        if missing:
+            with self._model_lock:
+                # warm-up thread อาจ encode ชื่อเดียวกันไปแล้วระหว่างรอ lock
+                missing = [text for text in missing if text not in self._embeddings]
+                model = self._get_semantic_model() if missing else None
+                if missing and model is None:
+                    return None
+                if missing:
+                    pending = [text for text in self._pending_names if text not in self._embeddings]
+                    if self.embedding_store is not None:
+                        pending = self.embedding_store.missing(pending)
+                    to_encode = list(dict.fromkeys(missing + pending))
+                    vectors = np.asarray(model.encode(to_encode), dtype=np.float32)
+                    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                    vectors = vectors / np.where(norms == 0, 1, norms)
+                    self._embeddings.update(zip(to_encode, vectors))
+                    self._pending_names.clear()
+                    if self.embedding_store is not None and not self.embedding_store.add(to_encode, vectors):
+                        self._log("Could not write embedding cache", 'warning')
+        return np.vstack([self._embeddings[text] for text in cleaned])
+
+    def _semantic_similarity_matrix(self, sources: List[str], targets: List[str]) -> np.ndarray:
+        """Cosine similarity of every (source, target) pair, negative values clipped to 0"""
+        if not self.ml_ready:
+            return np.zeros((len(sources), len(targets)), dtype=np.float32)
+        try:
+            source_vectors = self._encode_columns(sources)
+            target_vectors = self._encode_columns(targets) if source_vectors is not None else None
+            if target_vectors is None:
+                # model โหลดไม่ได้ (log ไว้แล้วตอนโหลด)
+                return np.zeros((len(sources), len(targets)), dtype=np.float32)
+            return np.clip(source_vectors @ target_vectors.T, 0.0, None)
+        except Exception as e:
+            self._log(f"Semantic similarity failed, using string similarity only: {str(e)}", 'warning')
+            return np.zeros((len(sources), len(targets)), dtype=np.float32)
+
+    def _get_string_index(self, names: List[str]) -> StringSimilarityIndex:
+        """String index of these names (reused while the same name list is queried)"""
+        key = tuple(names)
+        index = self._string_indexes.get(key)
+        if index is None:
+            if len(self._string_indexes) >= STRING_INDEX_CACHE_SIZE:
+                self._string_indexes.pop(next(iter(self._string_indexes)))
+            index = StringSimilarityIndex(names)
+            self._string_indexes[key] = index
+        return index
+
+    def _top_string_candidates(self, source_column: str, index: StringSimilarityIndex,
+                               semantic_row: np.ndarray, context_row: np.ndarray) -> List[Tuple[float, int, float]]:
+        """
+        Top MAX_SUGGESTIONS targets of one source by combined score, as (combined, target id, string score)
+
+        Targets are visited in order of their upper-bound combined score; the scan stops once
+        the bound of the next target is below the current last suggestion.
+        """
+        bounds = (semantic_row * SEMANTIC_WEIGHT + context_row * CONTEXT_WEIGHT
+                  + index.upper_bounds(source_column) * STRING_WEIGHT)
+        candidates = np.flatnonzero(bounds > MIN_COMBINED_SCORE)
+        candidates = candidates[np.argsort(-bounds[candidates], kind='stable')]
+
+        top: List[Tuple[float, int, float]] = []
+        for j in candidates:
+            if len(top) == MAX_SUGGESTIONS and bounds[j] < top[-1][0]:
+                break
+            string_score = np.float32(index.exact(source_column, int(j)))
+            combined = semantic_row[j] * SEMANTIC_WEIGHT + string_score * STRING_WEIGHT + context_row[j] * CONTEXT_WEIGHT
+            if combined > MIN_COMBINED_SCORE:
+                top.append((combined, int(j), string_score))
+                top.sort(key=lambda item: (-item[0], index.names[item[1]]))
+                del top[MAX_SUGGESTIONS:]
+        return top
 
-        # Sort by confidence score
-        similarities.sort(key=lambda x: x['confidence'], reverse=True)
+    def _context_similarity_matrix(self, sources: List[str], targets: List[str], file_type: str = None) -> np.ndarray:
+        """Vectorised _calculate_context_similarity for every (source, target) pair"""
+        def domains(columns):
+            lowered = [col.lower() for col in columns]
+            return np.array([[any(k in col for k in keywords) for keywords in CONTEXT_DOMAINS] for col in lowered])
 
-        self._log(f"Found {len(similarities)} suggestions above threshold (>30%)", 'debug')
+        def contains(columns, keyword):
+            return np.array([keyword in col.lower() for col in columns])
 
-        return similarities[:5]  # Return top 5 suggestions
+        source_domains = domains(sources).astype(np.float32)
+        target_domains = domains(targets).astype(np.float32)
+        context = np.where(source_domains @ target_domains.T > 0, 0.5, 0.0)
+
+        if file_type:
+            if 'jst' in file_type.lower():
+                context += 0.3 * np.outer(contains(sources, 'หมายเลข'), contains(targets, 'หมายเลข'))
+            elif 'shopee' in file_type.lower():
+                context += 0.2 * np.logical_or.outer(contains(sources, 'shopee'), contains(targets, 'shopee'))
+        return np.minimum(context, 1.0)
     
     def _calculate_semantic_similarity(self, col1: str, col2: str) -> float:
         """Calculate semantic similarity using sentence transformers"""
@@ -228,53 +444,25 @@ class MLColumnMapper:
             return 0.0
         
         try:
-            # Clean column names for better semantic understanding
-            clean_col1 = self._clean_column_name(col1)
-            clean_col2 = self._clean_column_name(col2)
-            
-            embeddings = self.semantic_model.encode([clean_col1, clean_col2])
-            similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-            return max(0, similarity)
+            return float(self._semantic_similarity_matrix([col1], [col2])[0, 0])
         except Exception:
             return 0.0
     
     def _calculate_string_similarity(self, col1: str, col2: str) -> float:
-        """Calculate string similarity using fuzzy matching"""
-        # Normalize strings
+        """Calculate string similarity using fuzzy matching (SequenceMatcher 70% + common words 30%)"""
         norm_col1 = self._normalize_string(col1)
         norm_col2 = self._normalize_string(col2)
-        
-        # SequenceMatcher for overall similarity
-        seq_similarity = SequenceMatcher(None, norm_col1, norm_col2).ratio()
-        
-        # Check for common words/substrings
-        words1 = set(re.findall(r'\b\w+\b', norm_col1.lower()))
-        words2 = set(re.findall(r'\b\w+\b', norm_col2.lower()))
-        
-        if words1 and words2:
-            word_similarity = len(words1 & words2) / len(words1 | words2)
-        else:
-            word_similarity = 0.0
-        
-        # Combined string similarity
-        return (seq_similarity * 0.7 + word_similarity * 0.3)
+        return string_similarity_normalized(norm_col1, norm_col2, split_words(norm_col1), split_words(norm_col2))
     
     def _calculate_context_similarity(self, col1: str, col2: str, file_type: str = None) -> float:
         """Calculate context-based similarity"""
         context_score = 0.0
 
-        # Domain-specific keywords
-        order_keywords = ['order', 'คำสั่ง', 'ออเดอร์', 'สั่งซื้อ', 'หมายเลข']
-        product_keywords = ['product', 'สินค้า', 'ผลิตภัณฑ์', 'ชื่อ', 'รหัส']
-        price_keywords = ['price', 'ราคา', 'ยอด', 'เงิน', 'cost']
-        date_keywords = ['date', 'time', 'วันที่', 'เวลา', 'created', 'updated']
-        user_keywords = ['user', 'buyer', 'customer', 'ผู้ใช้', 'ผู้ซื้อ', 'บัญชี', 'ลูกค้า']  # New category
-
         col1_lower = col1.lower()
         col2_lower = col2.lower()
 
         # Check if both columns belong to the same domain
-        for keywords in [order_keywords, product_keywords, price_keywords, date_keywords, user_keywords]:
+        for keywords in CONTEXT_DOMAINS:
             if (any(k in col1_lower for k in keywords) and
                 any(k in col2_lower for k in keywords)):
                 context_score += 0.5
@@ -313,11 +501,7 @@ class MLColumnMapper:
     
     def _normalize_string(self, text: str) -> str:
         """Normalize string for comparison"""
-        # Remove special characters, convert to lowercase
-        normalized = re.sub(r'[^\w\s]', '', text.lower())
-        # Remove extra whitespace
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
-        return normalized
+        return normalize_string(text)
     
     def _generate_reasoning(self, source: str, target: str, semantic_score: float, string_score: float) -> str:
         """Generate human-readable reasoning for the suggestion"""
@@ -409,23 +593,27 @@ class MLColumnMapper:
             List of suggested file types with confidence scores
         """
         suggestions = []
-        
+
+        # index เดียวของ source columns ทุกประเภทไฟล์ (bounds ของแต่ละคอลัมน์คำนวณครั้งเดียว)
+        index = self._get_string_index(sorted({col for mappings in self.column_settings.values() for col in mappings}))
+        row_of = {name: row for row, name in enumerate(index.names)}
+        column_bounds: Dict[str, np.ndarray] = {}
+
         for file_type, mappings in self.column_settings.items():
             source_columns = set(mappings.keys())
-            target_columns = set(mappings.values())
-            
+            source_rows = np.array([row_of[col] for col in source_columns], dtype=np.int64)
+
             # Calculate how many columns match
             direct_matches = len(set(columns) & source_columns)
             semantic_matches = 0
-            
+
             # Calculate semantic matches
             for col in columns:
                 if col not in source_columns:
-                    for source_col in source_columns:
-                        similarity = self._calculate_string_similarity(col, source_col)
-                        if similarity > 0.6:
-                            semantic_matches += 1
-                            break
+                    if col not in column_bounds:
+                        column_bounds[col] = index.upper_bounds(col)
+                    if index.any_above(col, FILE_TYPE_MATCH_THRESHOLD, source_rows, column_bounds[col]):
+                        semantic_matches += 1
             
             total_matches = direct_matches + semantic_matches
             confidence = (total_matches / max(len(source_columns), len(columns))) * 100
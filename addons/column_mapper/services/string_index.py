@@ -0,0 +1,144 @@
+"""
+Vectorised string-similarity index for the column mapper addon
+
+The column mapper's string score is `0.7 * SequenceMatcher.ratio() + 0.3 * word Jaccard`
+on normalised names. Running SequenceMatcher for every (column, known column) pair is the
+slow part, so the index first computes, for all indexed names at once, an upper bound of
+that score:
+
+- character multiset overlap (SequenceMatcher.quick_ratio, never below ratio()) from a
+  names x characters count matrix
+- exact word Jaccard from word postings (sparse intersection counts via np.bincount)
+
+Exact SequenceMatcher only runs for candidates whose bound can still beat the current
+threshold / top-k, so results are identical to the pairwise loops.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SEQUENCE_WEIGHT = 0.7
+WORD_WEIGHT = 0.3
+BOUND_EPSILON = 1e-6
+
+
+def normalize_string(text: str) -> str:
+    """Normalize string for comparison (lowercase, no punctuation, single spaces)"""
+    normalized = re.sub(r'[^\w\s]', '', text.lower())
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+
+def split_words(normalized: str) -> frozenset:
+    return frozenset(re.findall(r'\b\w+\b', normalized.lower()))
+
+
+def string_similarity_normalized(norm1: str, norm2: str, words1: frozenset, words2: frozenset) -> float:
+    """String score of two already-normalised names"""
+    seq_similarity = SequenceMatcher(None, norm1, norm2).ratio()
+    if words1 and words2:
+        word_similarity = len(words1 & words2) / len(words1 | words2)
+    else:
+        word_similarity = 0.0
+    return seq_similarity * SEQUENCE_WEIGHT + word_similarity * WORD_WEIGHT
+
+
+class StringSimilarityIndex:
+    """
+    Index ของชื่อคอลัมน์ที่รู้จัก สำหรับหา string similarity แบบ vectorised
+
+    Args:
+        names: ชื่อคอลัมน์ที่จะ index (ลำดับเดิมคือ id ของแต่ละชื่อ)
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names: List[str] = list(names)
+        self.normalized = [normalize_string(name) for name in self.names]
+        self.words = [split_words(norm) for norm in self.normalized]
+        self.lengths = np.array([len(norm) for norm in self.normalized], dtype=np.int32)
+        self.word_counts = np.array([len(words) for words in self.words], dtype=np.int32)
+
+        # names x characters count matrix (สำหรับ quick_ratio ของทุกชื่อพร้อมกัน)
+        alphabet = sorted({ch for norm in self.normalized for ch in norm})
+        self._char_ids = {ch: i for i, ch in enumerate(alphabet)}
+        self._char_counts = np.zeros((len(self.names), len(alphabet)), dtype=np.int16)
+        for row, norm in enumerate(self.normalized):
+            for ch in norm:
+                self._char_counts[row, self._char_ids[ch]] += 1
+
+        # word -> ids ของชื่อที่มีคำนั้น
+        postings: Dict[str, List[int]] = {}
+        for row, words in enumerate(self.words):
+            for word in words:
+                postings.setdefault(word, []).append(row)
+        self._word_postings = {word: np.array(ids, dtype=np.int32) for word, ids in postings.items()}
+
+        self._exact_cache: Dict[Tuple[str, int], float] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ===== Bounds =====
+    def _word_jaccard(self, words: frozenset) -> np.ndarray:
+        """Word Jaccard ของ query กับทุกชื่อ (0 ถ้าฝั่งใดไม่มีคำ)"""
+        jaccard = np.zeros(len(self.names), dtype=np.float64)
+        lists = [self._word_postings[word] for word in words if word in self._word_postings]
+        if not words or not lists:
+            return jaccard
+        intersection = np.bincount(np.concatenate(lists), minlength=len(self.names))
+        union = len(words) + self.word_counts - intersection
+        has_words = self.word_counts > 0
+        jaccard[has_words] = intersection[has_words] / union[has_words]
+        return jaccard
+
+    def upper_bounds(self, query: str) -> np.ndarray:
+        """Upper bound ของ string score ระหว่าง query กับทุกชื่อใน index"""
+        norm = normalize_string(query)
+        counts: Dict[int, int] = {}
+        for ch in norm:
+            char_id = self._char_ids.get(ch)
+            if char_id is not None:
+                counts[char_id] = counts.get(char_id, 0) + 1
+        if counts:
+            ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            query_counts = np.fromiter(counts.values(), dtype=np.int16, count=len(counts))
+            overlap = np.minimum(self._char_counts[:, ids], query_counts).sum(axis=1)
+        else:
+            overlap = np.zeros(len(self.names), dtype=np.int64)
+
+        total = self.lengths + len(norm)
+        # SequenceMatcher: สตริงว่างทั้งคู่ = 1.0
+        quick = np.where(total > 0, 2.0 * overlap / np.maximum(total, 1), 1.0)
+        bounds = quick * SEQUENCE_WEIGHT + self._word_jaccard(split_words(norm)) * WORD_WEIGHT
+        # เผื่อ rounding (ผู้เรียกอาจเก็บ score เป็น float32)
+        return bounds + BOUND_EPSILON
+
+    # ===== Exact scores =====
+    def exact(self, query: str, row: int) -> float:
+        """String score จริง (SequenceMatcher) ของ query กับชื่อ row"""
+        key = (query, row)
+        score = self._exact_cache.get(key)
+        if score is None:
+            norm = normalize_string(query)
+            score = string_similarity_normalized(norm, self.normalized[row], split_words(norm), self.words[row])
+            self._exact_cache[key] = score
+        return score
+
+    def any_above(self, query: str, threshold: float, rows: Optional[np.ndarray] = None,
+                  bounds: Optional[np.ndarray] = None) -> bool:
+        """
+        มีชื่อใน rows (ค่าเริ่มต้น: ทุกชื่อ) ที่ string score > threshold หรือไม่
+
+        ตรวจจริงเฉพาะชื่อที่ bound เกิน threshold เรียงจาก bound สูงสุด (หยุดเมื่อเจอ)
+        """
+        if bounds is None:
+            bounds = self.upper_bounds(query)
+        if rows is None:
+            rows = np.arange(len(self.names))
+        candidates = rows[bounds[rows] > threshold]
+        for row in candidates[np.argsort(-bounds[candidates], kind='stable')]:
+            if self.exact(query, int(row)) > threshold:
+                return True
+        return False
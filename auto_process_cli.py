@@ -9,50 +9,22 @@ Usage: python auto_process_cli.py [source_folder]
 
 # Standard library imports
 import argparse
-import json
+import atexit
 import logging
 import os
 import sys
-import time
+from contextlib import nullcontext
 from datetime import datetime
 
-# Local imports
-from config.database import DatabaseConfig
-from config.json_manager import json_manager, get_output_folder
-from constants import PathConstants
-from services.file import FileManagementService
-from services.orchestrators.database_orchestrator import DatabaseOrchestrator
-from services.orchestrators.file_orchestrator import FileOrchestrator
-from services.utilities.preload_service import PreloadService
-from ui.handlers.file_handler import FileHandler
-from ui.handlers.settings_handler import SettingsHandler
+# Local imports (เบา: ไม่โหลด pandas / SQLAlchemy / tkinter)
+# service ที่หนักจะถูก import ตอนสร้าง AutoProcessCLI เพื่อให้ --help / --version ตอบทันที
+from config.json_manager import get_output_folder
+from utils.dialogs import use_console_dialogs
 from utils.logger import setup_logging
+from utils.startup_profiler import StartupProfiler
 
-# Override messagebox for CLI to prevent GUI popups
-class CLIMessageBox:
-    @staticmethod
-    def showinfo(title, message):
-        print(f"INFO: {message}")
-    
-    @staticmethod
-    def showerror(title, message):
-        print(f"ERROR: {message}")
-    
-    @staticmethod
-    def showwarning(title, message):
-        print(f"WARNING: {message}")
-    
-    @staticmethod
-    def askyesno(title, message):
-        # For CLI, always return True for auto processing
-        return True
-
-# Replace tkinter messagebox with CLI version
-import tkinter.messagebox
-tkinter.messagebox.showinfo = CLIMessageBox.showinfo
-tkinter.messagebox.showerror = CLIMessageBox.showerror
-tkinter.messagebox.showwarning = CLIMessageBox.showwarning
-tkinter.messagebox.askyesno = CLIMessageBox.askyesno
+# Route message boxes to the console for CLI to prevent GUI popups
+use_console_dialogs()
 
 
 class CLIProgressCallback:
@@ -114,6 +86,14 @@ class AutoProcessCLI:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
+        # Import service stack เมื่อใช้จริง (ส่วนที่ใช้เวลาเริ่มโปรแกรมมากที่สุด)
+        from services.file import FileManagementService
+        from services.orchestrators.database_orchestrator import DatabaseOrchestrator
+        from services.orchestrators.file_orchestrator import FileOrchestrator
+        from services.utilities.preload_service import PreloadService
+        from ui.handlers.file_handler import FileHandler
+        from ui.handlers.settings_handler import SettingsHandler
+
         self.settings_file = "config/column_settings.json"
         self.settings_handler = SettingsHandler(self.settings_file, self.log)
         
@@ -167,6 +147,7 @@ class AutoProcessCLI:
         
         # Load database configuration from environment variables
         try:
+            from config.database import DatabaseConfig
             db_config = DatabaseConfig()
             config = db_config.config
             if not config:
@@ -265,6 +246,7 @@ class AutoProcessCLI:
             if logic_type:
                 # Use None for checkbox since we don't have GUI widgets in CLI
                 selected_files.append(((file_path, logic_type), None))
+        self.file_service.flush_header_memo()
 
         if not selected_files:
             self.log("No matching files found")
@@ -316,8 +298,16 @@ class AutoProcessCLI:
         return True
     
 
-def main():
-    """Main function"""
+def _report_startup_profile(profiler, output_path):
+    """แสดงและบันทึกผล --profile-startup"""
+    profiler.report(logging.info)
+    if output_path:
+        if profiler.write_json(output_path):
+            logging.info(f"Startup profile saved to: {output_path}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command line arguments of the CLI"""
     parser = argparse.ArgumentParser(
         description='Automated File Processing CLI - Standalone program using GUI settings',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -350,8 +340,31 @@ Notes:
         action='store_true',
         help='Enable verbose logging'
     )
+
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Record import times and phase timings'
+    )
+
+    parser.add_argument(
+        '--profile-output',
+        metavar='JSON_PATH',
+        help='Save the --profile-startup result as JSON'
+    )
     
+    return parser
+
+
+def main():
+    """Main function"""
+    parser = build_parser()
     args = parser.parse_args()
+
+    profiler = None
+    if args.profile_startup:
+        profiler = StartupProfiler()
+        profiler.install_import_hook()
     
     # Setup logging with environment variable support
     log_level = logging.DEBUG if args.verbose else logging.INFO
@@ -371,7 +384,13 @@ Notes:
             logging.info(f"  {var}: (not set)")
     
     # Create CLI instance
-    cli = AutoProcessCLI()
+    with profiler.phase('init_services') if profiler else nullcontext():
+        cli = AutoProcessCLI()
+
+    if profiler:
+        profiler.remove_import_hook()
+        # รายงานตอนจบโปรแกรม (รวมกรณี sys.exit ก่อนเริ่มประมวลผล)
+        atexit.register(_report_startup_profile, profiler, args.profile_output)
     
     # Determine source folder
     folder_path = args.folder_path
@@ -393,7 +412,8 @@ Notes:
         sys.exit(1)
     
     # Start processing
-    success = cli.run_auto_process(folder_path)
+    with profiler.phase('run_auto_process') if profiler else nullcontext():
+        success = cli.run_auto_process(folder_path)
     
     # Exit with appropriate status
     sys.exit(0 if success else 1)
@@ -0,0 +1,7 @@
+"""
+Benchmarks for PIPELINE_SQLSERVER
+
+Reproducible timings of the ingest stages (read, rename, detect, profile, staging,
+validation SQL) on synthetic files, with SQLite / a recording engine standing in for
+SQL Server. Run with `python -m benchmarks.run_benchmarks` from the project root.
+"""
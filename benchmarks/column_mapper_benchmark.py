@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Column Mapper String-Matching Benchmark
+Times the column mapper's fuzzy matching against the pairwise SequenceMatcher loops
+
+Stages (synthetic configuration of `--file-types` file types, string-only mapper):
+- file_type_nested     suggest_file_type_from_columns with the pairwise loop (reference)
+- file_type_indexed    MLColumnMapper.suggest_file_type_from_columns (string index)
+- suggest_nested       every (column, known target) pair scored with _calculate_string_similarity
+- suggest_indexed      MLColumnMapper.suggest_mappings_for_new_file (string index)
+
+The indexed results are checked against the reference before timings are reported.
+
+Usage:
+    python -m benchmarks.column_mapper_benchmark --file-types 200 --columns 30 --repeat 3
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+app_root_dir = os.path.dirname(current_dir)
+if app_root_dir not in sys.path:
+    sys.path.insert(0, app_root_dir)
+
+from benchmarks.run_benchmarks import RESULTS_DIR, environment_info, sandbox_paths, time_stage, write_results
+
+# คำที่ใช้สร้างชื่อคอลัมน์สังเคราะห์ (ไทย/อังกฤษปนกันเหมือนไฟล์จริง)
+_WORDS = [
+    'order', 'id', 'date', 'price', 'total', 'customer', 'name', 'product', 'sku', 'qty', 'status',
+    'ship', 'fee', 'amount', 'tax', 'note', 'address', 'created', 'updated', 'shopee',
+    'หมายเลข', 'คำสั่งซื้อ', 'วันที่', 'ราคา', 'ชื่อ', 'สินค้า', 'ยอด', 'ลูกค้า', 'จำนวน', 'ส่วนลด',
+]
+_SUFFIXES = ['', ' (THB)', '_1', ' 2', '.', ' #']
+
+
+def _column_name(rng: random.Random) -> str:
+    return ' '.join(rng.sample(_WORDS, rng.randint(1, 3))) + rng.choice(_SUFFIXES)
+
+
+def make_column_settings(file_types: int, columns: int, rng: random.Random) -> Dict[str, Dict[str, str]]:
+    settings = {}
+    for i in range(file_types):
+        names = {_column_name(rng) for _ in range(columns)}
+        settings[f'file_type_{i:03d}'] = {name: name.lower().replace(' ', '_') for name in names}
+    return settings
+
+
+def nested_file_type_suggestions(mapper, columns: List[str]) -> List[Dict[str, Any]]:
+    """suggest_file_type_from_columns แบบเดิม (เทียบทุกคู่ด้วย SequenceMatcher)"""
+    suggestions = []
+    for file_type, mappings in mapper.column_settings.items():
+        source_columns = set(mappings.keys())
+        direct_matches = len(set(columns) & source_columns)
+        semantic_matches = 0
+        for col in columns:
+            if col not in source_columns:
+                for source_col in source_columns:
+                    if mapper._calculate_string_similarity(col, source_col) > 0.6:
+                        semantic_matches += 1
+                        break
+        confidence = ((direct_matches + semantic_matches) / max(len(source_columns), len(columns))) * 100
+        if confidence > 20:
+            suggestions.append({
+                'file_type': file_type,
+                'confidence': round(confidence, 1),
+                'direct_matches': direct_matches,
+                'semantic_matches': semantic_matches,
+                'total_columns': len(source_columns)
+            })
+    suggestions.sort(key=lambda x: x['confidence'], reverse=True)
+    return suggestions[:3]
+
+
+def nested_string_scores(mapper, columns: List[str]) -> int:
+    """string score ของทุกคู่ (column, target) แบบเดิม; คืนจำนวนคู่ที่คำนวณ"""
+    targets = sorted({target for mappings in mapper.column_settings.values() for target in mappings.values()})
+    for col in columns:
+        for target in targets:
+            mapper._calculate_string_similarity(col, target)
+    return len(columns) * len(targets)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the column mapper string matching")
+    parser.add_argument('--file-types', type=int, default=200, help="number of synthetic file types")
+    parser.add_argument('--columns', type=int, default=30, help="columns per file type and per query file")
+    parser.add_argument('--queries', type=int, default=3, help="query files per stage run")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per stage (median is reported)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed for the synthetic names")
+    parser.add_argument('--output', help="result JSON path (default: benchmarks/results/column_mapper_<timestamp>.json)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="pipeline_bench_")
+    sandbox_paths(workdir)
+    try:
+        from addons.column_mapper.services.ml_column_mapper import MLColumnMapper
+
+        rng = random.Random(args.seed)
+        mapper = MLColumnMapper(log_callback=lambda message: None, use_embedding_cache=False, string_only=True)
+        mapper.column_settings = make_column_settings(args.file_types, args.columns, rng)
+        queries = [[_column_name(rng) for _ in range(args.columns)] for _ in range(args.queries)]
+
+        for columns in queries:
+            if mapper.suggest_file_type_from_columns(columns) != nested_file_type_suggestions(mapper, columns):
+                print("Error: indexed file type suggestions differ from the pairwise loop")
+                return 1
+
+        stages = {
+            'file_type_nested': lambda: [nested_file_type_suggestions(mapper, q) for q in queries],
+            'file_type_indexed': lambda: [mapper.suggest_file_type_from_columns(q) for q in queries],
+            'suggest_nested': lambda: [nested_string_scores(mapper, q) for q in queries],
+            'suggest_indexed': lambda: [mapper.suggest_mappings_for_new_file(q) for q in queries],
+        }
+        results = []
+        for stage, func in stages.items():
+            # index ใหม่ทุกรอบ เพื่อให้เวลาสร้าง index รวมอยู่ในผล
+            timing = time_stage(func, args.repeat, setup=mapper._string_indexes.clear)
+            timing.pop('result')
+            results.append({'stage': stage, **{k: round(v, 6) for k, v in timing.items()}})
+            print(f"   {stage:<20}{timing['seconds']:>10.4f}s")
+
+        for name in ('file_type', 'suggest'):
+            nested = next(r['seconds'] for r in results if r['stage'] == f'{name}_nested')
+            indexed = next(r['seconds'] for r in results if r['stage'] == f'{name}_indexed')
+            print(f"{name}: x{nested / max(indexed, 1e-9):.1f} faster")
+
+        output = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': environment_info(),
+            'config': {
+                'file_types': args.file_types,
+                'columns': args.columns,
+                'queries': args.queries,
+                'repeat': args.repeat,
+                'seed': args.seed,
+            },
+            'results': results,
+        }
+        output_path = args.output or os.path.join(
+            RESULTS_DIR, f"column_mapper_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json"
+        )
+        print(f"Results saved: {write_results(output, output_path)}")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Synthetic input files for the benchmarks
+
+Each shape pairs a DataFrame (raw source headers, all values as text like a real
+export) with the file-type config that maps it (`columns` source -> target and
+`dtypes` per target). Generation is deterministic for a given seed and row count.
+
+Shapes:
+- tall:  12 mixed columns, the common case
+- wide:  120 columns cycling through every supported dtype
+- thai:  Thai headers and Thai free text
+- messy: numbers with separators/currency/parentheses and dates in mixed formats
+"""
+
+import importlib.util
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SIZES: Dict[str, int] = {
+    'small': 1_000,
+    'medium': 20_000,
+    'large': 200_000,
+}
+
+FORMATS = ('csv', 'xlsx', 'xls')
+
+_BASE_DATE = np.datetime64('2023-01-01')
+
+_THAI_FIRST_NAMES = ['สมชาย', 'สมหญิง', 'วิชัย', 'มาลี', 'ประเสริฐ', 'กาญจนา', 'ธนพล', 'ศิริพร']
+_THAI_LAST_NAMES = ['ใจดี', 'รักไทย', 'ศรีสุข', 'มั่นคง', 'วงศ์ใหญ่', 'บุญมา']
+_THAI_PROVINCES = ['กรุงเทพมหานคร', 'เชียงใหม่', 'ขอนแก่น', 'ภูเก็ต', 'ชลบุรี', 'นครราชสีมา', 'สงขลา']
+_THAI_PRODUCTS = ['เสื้อยืดคอกลม', 'กางเกงยีนส์', 'รองเท้าผ้าใบ', 'กระเป๋าสะพาย', 'หมวกแก๊ป', 'นาฬิกาข้อมือ']
+_THAI_NOTES = ['ส่งด่วน', 'ห่อของขวัญ', 'ลูกค้าขอใบกำกับภาษี', 'โทรก่อนส่ง', '', 'ฝากไว้ที่ป้อมยาม']
+_STATUSES = ['Delivered', 'Shipped', 'Pending', 'Cancelled', 'Returned']
+_REGIONS = ['North', 'South', 'East', 'West', 'Central']
+
+
+@dataclass
+class SyntheticDataset:
+    """DataFrame สังเคราะห์พร้อม config ของประเภทไฟล์"""
+    name: str
+    frame: pd.DataFrame
+    columns: Dict[str, str] = field(default_factory=dict)
+    dtypes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def logic_type(self) -> str:
+        return f"bench_{self.name}"
+
+
+def _dates(rng, rows: int) -> np.ndarray:
+    return _BASE_DATE + rng.integers(0, 730, rows).astype('timedelta64[D]')
+
+
+def _fmt_dates(values: np.ndarray, fmt: str) -> List[str]:
+    return list(pd.to_datetime(values).strftime(fmt))
+
+
+def _choice(rng, options: List[str], rows: int) -> List[str]:
+    return [options[i] for i in rng.integers(0, len(options), rows)]
+
+
+def _make_tall(rng, rows: int) -> SyntheticDataset:
+    dates = _dates(rng, rows)
+    frame = pd.DataFrame({
+        'Order ID': [str(100000 + i) for i in range(rows)],
+        'Order Date': _fmt_dates(dates, '%d/%m/%Y'),
+        'Created At': _fmt_dates(dates, '%d/%m/%Y %H:%M:%S'),
+        'SKU': [f"SKU-{v:06d}" for v in rng.integers(0, 50000, rows)],
+        'Customer Name': [f"Customer {v}" for v in rng.integers(0, 20000, rows)],
+        'Status': _choice(rng, _STATUSES, rows),
+        'Region': _choice(rng, _REGIONS, rows),
+        'Quantity': [str(v) for v in rng.integers(1, 20, rows)],
+        'Unit Price': [f"{v:.2f}" for v in rng.uniform(10, 5000, rows)],
+        'Discount': [f"{v:.2f}" for v in rng.uniform(0, 0.3, rows)],
+        'Is Gift': _choice(rng, ['true', 'false'], rows),
+        'Remark': [f"Remark text {v}" * (1 + v % 3) for v in rng.integers(0, 1000, rows)],
+    })
+    dtypes = {
+        'order_id': 'INT', 'order_date': 'DATE', 'created_at': 'DATETIME', 'sku': 'NVARCHAR(50)',
+        'customer_name': 'NVARCHAR(100)', 'status': 'NVARCHAR(50)', 'region': 'NVARCHAR(50)',
+        'quantity': 'INT', 'unit_price': 'FLOAT', 'discount': 'FLOAT', 'is_gift': 'NVARCHAR(50)',
+        'remark': 'NVARCHAR(255)',
+    }
+    columns = dict(zip(frame.columns, dtypes.keys()))
+    return SyntheticDataset('tall', frame, columns, dtypes)
+
+
+def _make_wide(rng, rows: int, width: int = 120) -> SyntheticDataset:
+    kinds = ['INT', 'FLOAT', 'DATE', 'NVARCHAR(100)', 'NVARCHAR(255)', 'DATETIME']
+    data = {}
+    columns = {}
+    dtypes = {}
+    for i in range(width):
+        kind = kinds[i % len(kinds)]
+        header = f"Metric {i:03d} ({kind.split('(')[0].title()})"
+        if kind == 'INT':
+            values = [str(v) for v in rng.integers(-1000, 100000, rows)]
+        elif kind == 'FLOAT':
+            values = [f"{v:.4f}" for v in rng.normal(1000, 250, rows)]
+        elif kind == 'DATE':
+            values = _fmt_dates(_dates(rng, rows), '%Y-%m-%d')
+        elif kind == 'DATETIME':
+            values = _fmt_dates(_dates(rng, rows), '%Y-%m-%d %H:%M:%S')
+        else:
+            values = [f"value-{i}-{v}" for v in rng.integers(0, 5000, rows)]
+        data[header] = values
+        target = f"metric_{i:03d}"
+        columns[header] = target
+        dtypes[target] = kind
+    return SyntheticDataset('wide', pd.DataFrame(data), columns, dtypes)
+
+
+def _make_thai(rng, rows: int) -> SyntheticDataset:
+    first = _choice(rng, _THAI_FIRST_NAMES, rows)
+    last = _choice(rng, _THAI_LAST_NAMES, rows)
+    frame = pd.DataFrame({
+        'เลขที่คำสั่งซื้อ': [f"TH{200000 + i}" for i in range(rows)],
+        'วันที่สั่งซื้อ': _fmt_dates(_dates(rng, rows), '%d/%m/%Y'),
+        'ชื่อลูกค้า': [f"{a} {b}" for a, b in zip(first, last)],
+        'จังหวัด': _choice(rng, _THAI_PROVINCES, rows),
+        'ชื่อสินค้า': _choice(rng, _THAI_PRODUCTS, rows),
+        'จำนวน': [str(v) for v in rng.integers(1, 10, rows)],
+        'ราคารวม': [f"{v:.2f}" for v in rng.uniform(99, 9999, rows)],
+        'หมายเหตุ': _choice(rng, _THAI_NOTES, rows),
+        'ที่อยู่จัดส่ง': [f"{v} หมู่ {v % 12 + 1} ถนนสุขุมวิท แขวงคลองเตย" for v in rng.integers(1, 999, rows)],
+    })
+    dtypes = {
+        'order_no': 'NVARCHAR(50)', 'order_date': 'DATE', 'customer_name': 'NVARCHAR(100)',
+        'province': 'NVARCHAR(100)', 'product_name': 'NVARCHAR(255)', 'quantity': 'INT',
+        'total_price': 'FLOAT', 'note': 'NVARCHAR(255)', 'shipping_address': 'NVARCHAR(MAX)',
+    }
+    columns = dict(zip(frame.columns, dtypes.keys()))
+    return SyntheticDataset('thai', frame, columns, dtypes)
+
+
+def _messy(rng, clean: List[str], junk: List[str], rate: float) -> List[str]:
+    mask = rng.random(len(clean)) < rate
+    picks = rng.integers(0, len(junk), len(clean))
+    return [junk[p] if m else v for v, m, p in zip(clean, mask, picks)]
+
+
+def _make_messy(rng, rows: int) -> SyntheticDataset:
+    dates = _dates(rng, rows)
+    amounts = rng.uniform(-5000, 250000, rows)
+    mixed_dates = []
+    date_formats = ['%d/%m/%Y', '%Y-%m-%d', '%d-%b-%Y', '%d.%m.%Y', '%Y%m%d']
+    for value, fmt_index in zip(pd.to_datetime(dates), rng.integers(0, len(date_formats), rows)):
+        mixed_dates.append(value.strftime(date_formats[fmt_index]))
+    amount_text = []
+    for value, style in zip(amounts, rng.integers(0, 4, rows)):
+        if style == 0:
+            amount_text.append(f"{value:,.2f}")
+        elif style == 1:
+            amount_text.append(f"฿{value:,.2f}")
+        elif style == 2 and value < 0:
+            amount_text.append(f"({abs(value):,.2f})")
+        else:
+            amount_text.append(f"{value:.2f}")
+    frame = pd.DataFrame({
+        'Doc No': [f"{i}.0" if i % 7 == 0 else str(i) for i in range(rows)],
+        'Doc Date': _messy(rng, mixed_dates, ['', 'N/A', '31/02/2024', 'not a date', '00/00/0000'], 0.05),
+        'Amount': _messy(rng, amount_text, ['', '-', 'N/A', '#REF!', '1.2.3'], 0.05),
+        'Qty': _messy(rng, [str(v) for v in rng.integers(0, 500, rows)], ['', ' 12 ', '3 pcs', '1e3'], 0.05),
+        'Rate %': _messy(rng, [f"{v:.1f}%" for v in rng.uniform(0, 100, rows)], ['', 'n/a'], 0.03),
+        'Free Text': _messy(rng, [f"  padded  {v}  " for v in rng.integers(0, 100, rows)], ['', 'x' * 400], 0.02),
+    })
+    dtypes = {
+        'doc_no': 'INT', 'doc_date': 'DATE', 'amount': 'FLOAT', 'qty': 'INT',
+        'rate_pct': 'FLOAT', 'free_text': 'NVARCHAR(255)',
+    }
+    columns = dict(zip(frame.columns, dtypes.keys()))
+    return SyntheticDataset('messy', frame, columns, dtypes)
+
+
+SHAPES: Dict[str, Callable] = {
+    'tall': _make_tall,
+    'wide': _make_wide,
+    'thai': _make_thai,
+    'messy': _make_messy,
+}
+
+
+def make_dataset(shape: str, rows: int, seed: int = 42) -> SyntheticDataset:
+    """สร้าง dataset ของ shape ที่ระบุ (ค่าเหมือนเดิมทุกครั้งสำหรับ seed เดิม)"""
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown shape '{shape}' (choose from {', '.join(SHAPES)})")
+    return SHAPES[shape](np.random.default_rng(seed), rows)
+
+
+def format_available(fmt: str) -> bool:
+    """ตรวจว่ามี writer ของรูปแบบไฟล์นี้ติดตั้งอยู่หรือไม่"""
+    if fmt == 'csv':
+        return True
+    if fmt == 'xlsx':
+        return importlib.util.find_spec('openpyxl') is not None
+    if fmt == 'xls':
+        # pandas >= 2.0 เขียน .xls ไม่ได้แล้ว แม้มี xlwt
+        return importlib.util.find_spec('xlwt') is not None and int(pd.__version__.split('.')[0]) < 2
+    return False
+
+
+def write_dataset(dataset: SyntheticDataset, directory: str, fmt: str, size: str) -> Optional[str]:
+    """
+    เขียน dataset เป็นไฟล์ (คืน path หรือ None ถ้าไม่มี writer ของรูปแบบนี้)
+    """
+    if not format_available(fmt):
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{dataset.logic_type}_{size}.{fmt}")
+    if fmt == 'csv':
+        dataset.frame.to_csv(path, index=False, encoding='utf-8')
+    elif fmt == 'xlsx':
+        dataset.frame.to_excel(path, index=False, engine='openpyxl')
+    else:
+        dataset.frame.to_excel(path, index=False, engine='xlwt')
+    return path
@@ -0,0 +1,113 @@
+"""
+Recording stand-in for a SQL Server engine
+
+`RecordingEngine` accepts the calls the staging/validation code makes
+(`connect()`, `begin()`, `conn.execute(text(...))`, `.scalar()`, `.fetchone()`,
+`.fetchall()`, `conn.commit()`) without a database. Every statement is recorded so
+benchmarks can time SQL generation and count the statements a stage would issue.
+
+Results are neutral: `SELECT COUNT(*)` without a WHERE clause returns the configured
+row count (staging table size), every other scalar is 0 and row fetches are empty,
+i.e. the data looks valid and no catalog objects exist yet.
+"""
+
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from utils.query_profiler import categorize_statement
+
+_PLAIN_COUNT = re.compile(r'^\s*SELECT\s+COUNT\(\*\)\s+FROM\s+[\w\.\[\]]+\s*$', re.I)
+
+
+class RecordingResult:
+    """ผลลัพธ์ว่างที่ตอบได้ทุก method ที่ validators เรียก"""
+
+    def __init__(self, scalar_value: Any = 0) -> None:
+        self._scalar = scalar_value
+
+    def scalar(self) -> Any:
+        return self._scalar
+
+    def fetchone(self) -> None:
+        return None
+
+    def fetchall(self) -> List:
+        return []
+
+    def first(self) -> None:
+        return None
+
+    def mappings(self) -> 'RecordingResult':
+        return self
+
+    def __iter__(self):
+        return iter(())
+
+
+class RecordingConnection:
+    """Connection ที่บันทึก SQL แทนการส่งไป server"""
+
+    def __init__(self, engine: 'RecordingEngine') -> None:
+        self.engine = engine
+
+    def execute(self, statement, parameters: Optional[Dict] = None) -> RecordingResult:
+        sql = str(statement)
+        self.engine.record(sql)
+        if _PLAIN_COUNT.match(sql):
+            return RecordingResult(self.engine.row_count)
+        return RecordingResult(0)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingEngine:
+    """
+    Engine ปลอมสำหรับ benchmark (ไม่มี database จริง)
+
+    Args:
+        row_count: จำนวนแถวที่ `SELECT COUNT(*) FROM <table>` จะคืน
+    """
+
+    def __init__(self, row_count: int = 0) -> None:
+        self.url = 'recording://benchmark'
+        self.row_count = row_count
+        self._lock = threading.Lock()
+        self.statements: List[str] = []
+
+    def record(self, sql: str) -> None:
+        with self._lock:
+            self.statements.append(sql)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements = []
+
+    def summary(self) -> Dict[str, int]:
+        """จำนวน statements แยกตามประเภท และความยาว SQL รวม (ตัวอักษร)"""
+        with self._lock:
+            statements = list(self.statements)
+        counts: Dict[str, int] = {'statements': len(statements), 'sql_chars': sum(len(s) for s in statements)}
+        for sql in statements:
+            category = categorize_statement(sql)
+            counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    @contextmanager
+    def connect(self):
+        yield RecordingConnection(self)
+
+    @contextmanager
+    def begin(self):
+        yield RecordingConnection(self)
+
+    def dispose(self) -> None:
+        pass
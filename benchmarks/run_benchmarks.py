@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Ingest Benchmark Runner
+Times each pipeline stage on synthetic files and writes comparable JSON results
+
+Stages (per shape and size):
+- read_<fmt>     PerformanceOptimizer.read_large_file_chunked (csv / xlsx / xls)
+- detect_<fmt>   FileReaderService.detect_file_type
+- rename         FileReaderService.build_rename_mapping_for_dataframe
+- profile        DataProcessorService.profile_dataframe
+- stage_sizing   DataUploadService column sizing + staging DDL (recording engine)
+- stage_write    DataUploadService._upload_to_staging into SQLite (`bronze` attached)
+- validate_sql   MainValidator.validate_data_in_staging SQL generation (recording engine)
+
+SQL Server is not needed: stage_write uses SQLite (measures the pandas/SQLAlchemy
+side of the insert path) and the SQL-generating stages use `RecordingEngine`.
+All configuration is written to a temporary sandbox, never to the real config folder.
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes small,medium --repeat 3
+    python -m benchmarks.run_benchmarks --baseline benchmarks/results/base.json --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+app_root_dir = os.path.dirname(current_dir)
+if app_root_dir not in sys.path:
+    sys.path.insert(0, app_root_dir)
+
+from constants import PathConstants
+
+from benchmarks.data_generator import FORMATS, SHAPES, SIZES, format_available, make_dataset, write_dataset
+
+RESULTS_DIR = os.path.join(current_dir, "results")
+RESULT_SCHEMA_VERSION = 1
+
+# ชนิดไฟล์ที่ PerformanceOptimizer / FileReaderService ใช้
+_READER_FILE_TYPES = {'csv': 'csv', 'xlsx': 'excel', 'xls': 'excel_xls'}
+
+
+def _quiet(message: str) -> None:
+    pass
+
+
+def sandbox_paths(root: str) -> None:
+    """
+    ชี้ config / file_types / profiles ไปที่โฟลเดอร์ชั่วคราว
+
+    ต้องเรียกก่อน import config.json_manager (สร้างไฟล์ config ตอน import)
+    """
+    PathConstants.CONFIG_DIR = os.path.join(root, "config")
+    PathConstants.FILE_TYPES_DIR = os.path.join(PathConstants.CONFIG_DIR, "file_types")
+    PathConstants.PROFILES_DIR = os.path.join(root, "profiles")
+    PathConstants.QUERY_PROFILES_DIR = os.path.join(PathConstants.PROFILES_DIR, "queries")
+    os.makedirs(PathConstants.FILE_TYPES_DIR, exist_ok=True)
+
+
+def time_stage(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """รัน func `repeat` ครั้ง (setup ไม่ถูกจับเวลา) คืน median/min/max วินาที และผลลัพธ์ล่าสุด"""
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'max_seconds': max(timings),
+        'result': result,
+    }
+
+
+def environment_info() -> Dict[str, Any]:
+    import numpy
+    import pandas
+    import sqlalchemy
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'sqlalchemy': sqlalchemy.__version__,
+    }
+
+
+class BenchmarkRunner:
+    """รัน benchmark ทุก stage ของทุก shape/size แล้วรวมผลเป็น dict เดียว"""
+
+    def __init__(self, workdir: str, shapes: List[str], sizes: List[str], formats: List[str],
+                 repeat: int = 3, seed: int = 42, log_callback: Optional[Callable[[str], None]] = None) -> None:
+        self.workdir = workdir
+        self.shapes = shapes
+        self.sizes = sizes
+        self.formats = formats
+        self.repeat = repeat
+        self.seed = seed
+        self.log = log_callback or print
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.skipped: List[str] = []
+
+        # import หลัง sandbox_paths() แล้วเท่านั้น
+        from performance_optimizations import PerformanceOptimizer
+        from services.file.data_processor_service import DataProcessorService
+        from services.file.file_reader_service import FileReaderService
+
+        self.optimizer = PerformanceOptimizer(log_callback=_quiet)
+        self.reader = FileReaderService(search_path=workdir, log_callback=_quiet)
+        self.processor = DataProcessorService(log_callback=_quiet)
+        self.sqlite_engine = self._create_sqlite_engine()
+
+    def _create_sqlite_engine(self):
+        """SQLite engine ที่มี database `bronze` แนบไว้ (แทน schema ของ SQL Server)"""
+        from sqlalchemy import create_engine, event
+
+        main_db = os.path.join(self.workdir, "main.db")
+        bronze_db = os.path.join(self.workdir, "bronze.db")
+        engine = create_engine(f"sqlite:///{main_db}")
+
+        @event.listens_for(engine, 'connect')
+        def _attach_bronze(dbapi_connection, connection_record):
+            dbapi_connection.execute(f"ATTACH DATABASE '{bronze_db}' AS bronze")
+
+        return engine
+
+    def _record(self, shape: str, size: str, stage: str, timing: Dict[str, Any], rows: int = 0,
+                nbytes: int = 0, extra: Optional[Dict[str, Any]] = None) -> None:
+        seconds = timing['seconds']
+        entry = {
+            'seconds': round(seconds, 6),
+            'min_seconds': round(timing['min_seconds'], 6),
+            'max_seconds': round(timing['max_seconds'], 6),
+            'rows': rows,
+            'bytes': nbytes,
+            'rows_per_sec': round(rows / seconds, 1) if rows and seconds > 0 else None,
+            'mb_per_sec': round(nbytes / (1024 * 1024) / seconds, 2) if nbytes and seconds > 0 else None,
+        }
+        if extra:
+            entry.update(extra)
+        key = f"{shape}/{size}/{stage}"
+        self.results[key] = entry
+        self.log(f"   {key:<34}{seconds:>10.4f}s" + (f"  {entry['rows_per_sec']:>12,.0f} rows/s" if entry['rows_per_sec'] else ""))
+
+    def _register_file_types(self, datasets) -> None:
+        """ให้ reader/processor รู้จักทุก shape (detect_file_type ต้องเลือกจากหลายประเภท)"""
+        self.reader.column_settings = {d.logic_type: d.columns for d in datasets}
+        self.processor.column_settings = {d.logic_type: d.columns for d in datasets}
+        self.processor.dtype_settings = {d.logic_type: d.dtypes for d in datasets}
+
+    def run(self) -> Dict[str, Any]:
+        for size in self.sizes:
+            rows = SIZES[size]
+            datasets = [make_dataset(shape, rows, self.seed) for shape in self.shapes]
+            self._register_file_types(datasets)
+            for dataset in datasets:
+                self.log(f"{dataset.name} / {size} ({rows:,} rows x {len(dataset.frame.columns)} columns)")
+                self._run_dataset(dataset, size)
+        return self.results
+
+    def _run_dataset(self, dataset, size: str) -> None:
+        shape = dataset.name
+        rows = len(dataset.frame)
+        files_dir = os.path.join(self.workdir, "files")
+
+        # Read + detect per file format
+        for fmt in self.formats:
+            path = write_dataset(dataset, files_dir, fmt, size)
+            if path is None:
+                label = f"{shape}/{size}/read_{fmt}"
+                if label not in self.skipped:
+                    self.skipped.append(label)
+                continue
+            nbytes = os.path.getsize(path)
+            file_type = _READER_FILE_TYPES[fmt]
+            timing = time_stage(lambda: self.optimizer.read_large_file_chunked(path, file_type), self.repeat)
+            success, df_read = timing['result']
+            if not success or len(df_read) != rows:
+                raise RuntimeError(f"Reading {path} returned {len(df_read)} rows (expected {rows})")
+            self._record(shape, size, f"read_{fmt}", timing, rows, nbytes)
+
+            timing = time_stage(lambda: self.reader.detect_file_type(path), self.repeat)
+            if timing['result'] != dataset.logic_type:
+                raise RuntimeError(f"detect_file_type({os.path.basename(path)}) = {timing['result']!r}")
+            self._record(shape, size, f"detect_{fmt}", timing)
+
+        # Rename
+        df = dataset.frame
+        timing = time_stage(
+            lambda: self.reader.build_rename_mapping_for_dataframe(df.columns, dataset.logic_type), self.repeat
+        )
+        rename_mapping = timing['result']
+        self._record(shape, size, "rename", timing, extra={'columns': len(df.columns), 'renamed': len(rename_mapping)})
+        df_renamed = df.rename(columns=rename_mapping)
+
+        # Client-side profile
+        timing = time_stage(lambda: self.processor.profile_dataframe(df_renamed, dataset.logic_type), self.repeat)
+        self._record(shape, size, "profile", timing, rows)
+
+        required_cols = dict(self.processor.get_required_dtypes(dataset.logic_type))
+        self._run_staging(dataset, size, df_renamed, required_cols)
+        self._run_validation(dataset, size, rows, required_cols)
+
+    def _run_staging(self, dataset, size: str, df_renamed, required_cols: Dict) -> None:
+        from sqlalchemy import text
+
+        from benchmarks.fake_engine import RecordingEngine
+        from services.database.catalog_snapshot import get_staging_table_name
+        from services.database.data_upload_service import DataUploadService
+
+        shape = dataset.name
+        rows = len(df_renamed)
+        staging_table = get_staging_table_name(dataset.logic_type)
+        staging_cols = list(required_cols.keys())
+
+        df_meta = df_renamed.copy()
+        now = datetime.now()
+        df_meta['_loaded_at'] = now
+        df_meta['_created_at'] = now
+        df_meta['_source_file'] = f"{dataset.logic_type}_{size}.csv"
+        df_meta['_batch_id'] = 'benchmark'
+        df_meta['_upsert_hash'] = None
+
+        # Column sizing + staging DDL (SQL text only)
+        recording = RecordingEngine()
+        ddl_service = DataUploadService(recording, None)
+
+        def _sizing():
+            lengths = ddl_service._measure_column_lengths(df_meta, staging_cols + ['_source_file'])
+            ddl_service._create_staging_table(staging_table, staging_cols, 'bronze', None, lengths)
+            return lengths
+
+        timing = time_stage(_sizing, self.repeat, setup=recording.reset)
+        self._record(shape, size, "stage_sizing", timing, rows, extra={'sql': recording.summary()})
+
+        # Staging insert into SQLite
+        upload_service = DataUploadService(self.sqlite_engine, None)
+
+        def _drop_staging():
+            with self.sqlite_engine.begin() as conn:
+                conn.execute(text(f'DROP TABLE IF EXISTS bronze."{staging_table}"'))
+
+        timing = time_stage(
+            lambda: upload_service._upload_to_staging(df_meta, staging_table, staging_cols, 'bronze'),
+            self.repeat, setup=_drop_staging
+        )
+        with self.sqlite_engine.connect() as conn:
+            written = conn.execute(text(f'SELECT COUNT(*) FROM bronze."{staging_table}"')).scalar()
+        if written != rows:
+            raise RuntimeError(f"Staging write stored {written} rows (expected {rows})")
+        self._record(shape, size, "stage_write", timing, rows)
+        _drop_staging()
+
+    def _run_validation(self, dataset, size: str, rows: int, required_cols: Dict) -> None:
+        from benchmarks.fake_engine import RecordingEngine
+        from services.database.catalog_snapshot import CatalogSnapshot, get_staging_table_name
+        from services.database.validation.main_validator import MainValidator
+
+        recording = RecordingEngine(row_count=rows)
+        validator = MainValidator(recording)
+        staging_table = get_staging_table_name(dataset.logic_type)
+
+        def _reset():
+            recording.reset()
+            CatalogSnapshot.invalidate(recording)
+
+        timing = time_stage(
+            lambda: validator.validate_data_in_staging(
+                staging_table, dataset.logic_type, dict(required_cols), 'bronze', date_format='UK'
+            ),
+            self.repeat, setup=_reset
+        )
+        if not timing['result'].get('is_valid'):
+            raise RuntimeError(f"Validation against the recording engine failed: {timing['result'].get('summary')}")
+        self._record(dataset.name, size, "validate_sql", timing, extra={'sql': recording.summary()})
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+                    min_seconds: float = 0.005) -> List[Dict[str, Any]]:
+    """
+    เทียบผลกับ baseline คืนรายการ stage ที่ช้าลงเกิน threshold
+
+    stage ที่ใช้เวลาน้อยกว่า `min_seconds` ทั้งสองฝั่งไม่นับ (noise ของ timer)
+    """
+    regressions = []
+    base_results = baseline.get('results', {})
+    for key, entry in current.get('results', {}).items():
+        base = base_results.get(key)
+        if not base:
+            continue
+        now_s, base_s = entry['seconds'], base['seconds']
+        if max(now_s, base_s) < min_seconds or base_s <= 0:
+            continue
+        ratio = now_s / base_s
+        if ratio > 1 + threshold:
+            regressions.append({
+                'stage': key,
+                'baseline_seconds': base_s,
+                'seconds': now_s,
+                'ratio': round(ratio, 3),
+            })
+    regressions.sort(key=lambda r: -r['ratio'])
+    return regressions
+
+
+def write_results(results: Dict[str, Any], output_path: Optional[str] = None) -> str:
+    if not output_path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output_path = os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json")
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return output_path
+
+
+def _csv_list(value: str, allowed) -> List[str]:
+    items = [v.strip() for v in value.split(',') if v.strip()]
+    unknown = [v for v in items if v not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown value(s): {', '.join(unknown)} (choose from {', '.join(allowed)})")
+    return items
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark PIPELINE_SQLSERVER ingest stages on synthetic files")
+    parser.add_argument('--shapes', type=lambda v: _csv_list(v, SHAPES), default=list(SHAPES),
+                        help=f"comma-separated shapes ({', '.join(SHAPES)})")
+    parser.add_argument('--sizes', type=lambda v: _csv_list(v, SIZES), default=['small', 'medium'],
+                        help=f"comma-separated sizes ({', '.join(f'{k}={v:,}' for k, v in SIZES.items())})")
+    parser.add_argument('--formats', type=lambda v: _csv_list(v, FORMATS), default=list(FORMATS),
+                        help="comma-separated file formats (csv, xlsx, xls); missing writers are skipped")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per stage (median is reported)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed for the synthetic data")
+    parser.add_argument('--output', help="result JSON path (default: benchmarks/results/bench_<timestamp>.json)")
+    parser.add_argument('--baseline', help="previous result JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown vs baseline before failing (0.25 = 25%%)")
+    parser.add_argument('--min-seconds', type=float, default=0.005,
+                        help="ignore stages faster than this in both runs")
+    parser.add_argument('--keep-files', action='store_true', help="keep the generated files and sandbox")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="pipeline_bench_")
+    sandbox_paths(workdir)
+    try:
+        print(f"Benchmark workdir: {workdir}")
+        for fmt in args.formats:
+            if not format_available(fmt):
+                print(f"Warning: no writer installed for .{fmt} files - skipping read_{fmt}/detect_{fmt}")
+
+        runner = BenchmarkRunner(workdir, args.shapes, args.sizes, args.formats, args.repeat, args.seed)
+        results = runner.run()
+
+        output = {
+            'schema_version': RESULT_SCHEMA_VERSION,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': environment_info(),
+            'config': {
+                'shapes': args.shapes,
+                'sizes': {size: SIZES[size] for size in args.sizes},
+                'formats': args.formats,
+                'repeat': args.repeat,
+                'seed': args.seed,
+            },
+            'skipped': runner.skipped,
+            'results': results,
+        }
+        output_path = write_results(output, args.output)
+        print(f"Results saved: {output_path}")
+
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('environment', {}).get('platform') != output['environment']['platform']:
+                print("Warning: baseline was recorded on a different platform - timings may not be comparable")
+            regressions = compare_results(output, baseline, args.threshold, args.min_seconds)
+            if regressions:
+                print(f"Error: {len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}")
+                for r in regressions:
+                    print(f"   {r['stage']:<34}{r['baseline_seconds']:>10.4f}s -> {r['seconds']:.4f}s (x{r['ratio']})")
+                return 1
+            print(f"No regressions vs baseline (threshold {args.threshold:.0%})")
+        return 0
+    finally:
+        if args.keep_files:
+            print(f"Kept benchmark files in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
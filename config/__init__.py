@@ -4,8 +4,15 @@ Configuration module สำหรับ PIPELINE_SQLSERVER
 ประกอบด้วย:
 - DatabaseConfig: การจัดการการตั้งค่าฐานข้อมูล
 - การโหลดและบันทึกการตั้งค่าต่างๆ
+
+DatabaseConfig ถูก import แบบ lazy เพื่อให้ `config.json_manager` โหลดได้โดยไม่ต้องโหลด SQLAlchemy
 """
 
-from .database import DatabaseConfig
+__all__ = ['DatabaseConfig']
+
 
-__all__ = ['DatabaseConfig']
\ No newline at end of file
+def __getattr__(name):
+    if name == 'DatabaseConfig':
+        from .database import DatabaseConfig
+        return DatabaseConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
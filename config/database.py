@@ -13,6 +13,7 @@ from typing import Dict, Any, Optional
 from sqlalchemy import create_engine, Engine
 
 from constants import DatabaseConstants
+from utils.query_profiler import query_profiler
 from utils.validators import validate_database_config
 
 
@@ -168,6 +169,9 @@ class DatabaseConfig:
         except TypeError:
             # เผื่อกรณี SQLAlchemy รุ่นเก่า ไม่รองรับ keyword นี้
             self.engine = create_engine(connection_string)
+
+        # จับเวลาทุก statement ของ engine นี้ (รายงานต่อ batch ใน DataUploadService)
+        query_profiler.instrument(self.engine)
     
     def get_engine(self) -> Optional[Engine]:
         """
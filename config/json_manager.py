@@ -71,11 +71,35 @@ class JSONManager:
                     },
                     "file_management": {
                         "auto_move_enabled": True,
-                        "organize_by_date": False
-                    }
+                        "organize_by_date": False,
+                        "compress_moved_files": False,
+                        "archive_mode": "folder",
+                        "archive_compression": "deflate"
+                    },
+                    "validation_mode": "two_stage",
+                    "validation_parallelism": "auto",
+                    "staging_clean_columns": "inline"
                 },
                 required_keys=[],
                 validation_func=self._validate_app_settings
+            ),
+            'permission_cache': JSONFileConfig(
+                filename='permission_cache.json',
+                default_content={"entries": {}},
+                required_keys=[],
+                backup_enabled=False
+            ),
+            'date_styles': JSONFileConfig(
+                filename='date_styles.json',
+                default_content={"types": {}},
+                required_keys=[],
+                backup_enabled=False
+            ),
+            'header_memo': JSONFileConfig(
+                filename='header_memo.json',
+                default_content={"entries": {}},
+                required_keys=[],
+                backup_enabled=False
             )
         }
     
@@ -571,10 +595,14 @@ def load_file_management_settings() -> Dict[str, Any]:
         settings = json_manager.load('app_settings')
         return settings.get('file_management', {
             'auto_move_enabled': True,
-            'organize_by_date': False
+            'organize_by_date': False,
+            'compress_moved_files': False,
+            'archive_mode': 'folder',
+            'archive_compression': 'deflate'
         })
     except Exception:
-        return {'auto_move_enabled': True, 'organize_by_date': False}
+        return {'auto_move_enabled': True, 'organize_by_date': False, 'compress_moved_files': False,
+                'archive_mode': 'folder', 'archive_compression': 'deflate'}
 
 def save_file_management_settings(settings: Dict[str, Any]) -> bool:
     """Save file management settings to app_settings.json"""
@@ -23,12 +23,42 @@ class DatabaseConstants:
     # Supported SQL Server data types
     SUPPORTED_DTYPES: List[str] = [
         "NVARCHAR(MAX)",
+        "NVARCHAR(50)",
+        "NVARCHAR(100)",
+        "NVARCHAR(255)",
+        "NVARCHAR(500)",
+        "NVARCHAR(1000)",
+        "NVARCHAR(4000)",
         "INT",
         "FLOAT",
         "DATE",
         "DATETIME"
     ]
 
+    # Typed NVARCHAR sizing (longer values need NVARCHAR(MAX) / LOB storage)
+    NVARCHAR_MAX_INLINE_LENGTH = 4000
+    STAGING_LENGTH_MARGIN = 1.25           # Headroom over the observed max length
+    STAGING_MIN_LENGTH = 50                # Floor (covers numbers/dates converted to text)
+    STAGING_LENGTH_BUCKETS = (50, 100, 255, 500, 1000, 2000, 4000)
+    INDEX_KEY_MAX_BYTES = 1700             # Nonclustered index key size limit
+
+    # Staging tables and the shared catalog snapshot (services/database/catalog_snapshot.py)
+    STAGING_TABLE_SUFFIX = "__stg"
+    CATALOG_SNAPSHOT_TTL_SECONDS = 10 * 60     # Re-read INFORMATION_SCHEMA after 10 minutes
+
+    # Conversion plans (services/database/conversion_plan.py, app_settings `staging_clean_columns`)
+    CLEAN_COLUMNS_INLINE = 'inline'            # Cleaning expressions inlined into every predicate (default)
+    CLEAN_COLUMNS_PERSISTED = 'persisted'      # Staging gets PERSISTED `<col>__clean` computed columns
+    CLEAN_COLUMN_SUFFIX = "__clean"
+    CONVERSION_PLAN_CACHE_SIZE = 64            # Compiled plans kept per process
+
+    # Learned date style per column (services/database/date_styles.py, config/date_styles.json)
+    DATE_STYLE_MIN_SHARE = 0.9                 # Share of non-blank values one style must match
+
+    # Permission check cache (per server/database/login/schema)
+    PERMISSION_CACHE_TTL_SECONDS = 8 * 60 * 60  # Re-verify after 8 hours
+    PERMISSION_PROBE_WORKERS = 4                # Concurrent DDL probes for ambiguous results
+
 
 # === FILE PROCESSING CONSTANTS ===
 class FileConstants:
@@ -50,6 +80,22 @@ class FileConstants:
     INVALID_COLUMN_CHARS = r'[\s\W]+'
     REPLACEMENT_CHAR = '_'
 
+    # Header-signature memo of detection / rename results (services/file/header_memo.py)
+    HEADER_MEMO_MAX_ENTRIES = 1000     # Least recently used layouts are evicted beyond this
+
+    # Settings snapshot (services/settings_manager.py): files rewritten in place do not change
+    # the file_types directory mtime, so every config is re-stat'ed at most this often
+    SETTINGS_RECHECK_SECONDS = 2.0
+
+    # Compiled per-file-type settings (services/file_type_plan.py) kept per process
+    FILE_TYPE_PLAN_CACHE_SIZE = 1024
+
+    # Moving uploaded files (services/file/file_management_service.py)
+    MOVE_COMPRESS_EXTENSIONS = ['.csv', '.xls']   # .xlsx is already a zip container
+    MOVE_COMPRESS_LEVEL = 6                       # gzip level when compress_moved_files is on
+    MOVE_COPY_BUFFER_SIZE = 1024 * 1024           # Copy chunk when source and output are on different volumes
+    ARCHIVE_FLUSH_FILES = 50                      # archive_mode zip: queued files that trigger a flush before the batch ends
+
 
 # === PROCESSING CONSTANTS ===
 class ProcessingConstants:
@@ -58,6 +104,25 @@ class ProcessingConstants:
     # Null value thresholds (percentage)
     NULL_WARNING_THRESHOLD = 50  # Warn if more than 50% nulls
 
+    # Staging validation thresholds (percentage of invalid rows per column)
+    VALIDATION_ERROR_THRESHOLD = 10    # Above this the load is rejected
+    VALIDATION_WARNING_THRESHOLD = 1   # Above this the column is reported as a warning
+    # Checks where a single invalid row rejects the load (no thresholds, never skipped by sampling):
+    # values longer than NVARCHAR(n) would otherwise be truncated by the transfer
+    STRICT_VALIDATION_TYPES = ('string_length_validation',)
+
+    # Validation modes (app_settings `validation_mode`)
+    VALIDATION_MODE_FULL = 'full'            # Full scan of every column
+    VALIDATION_MODE_TWO_STAGE = 'two_stage'  # Sampled pre-check, then full scan only where undecided
+    VALIDATION_SAMPLE_ROWS = 20000           # Rows read by the sampled pre-check
+    VALIDATION_SAMPLE_MIN_TABLE_ROWS = 100000  # Smaller staging tables are always fully scanned
+    VALIDATION_SAMPLE_Z = 3.29               # z-score for the error-rate bounds (99.9% two-sided)
+
+    # Validation scheduler (app_settings `validation_parallelism`: 'auto' or a number of workers)
+    VALIDATION_PARALLELISM_AUTO = 'auto'     # Derived from the server's CPU count
+    VALIDATION_DEFAULT_WORKERS = 3           # Used when the server capacity cannot be read
+    VALIDATION_MAX_WORKERS = 8               # Upper bound (size of the shared validation pool)
+
     # Chunk sizes for batch processing
     CHUNK_SIZE_LARGE = 10000      # Large file processing
     CHUNK_SIZE_PROCESSING = 5000  # General processing
@@ -68,6 +133,15 @@ class ProcessingConstants:
     MATCH_THRESHOLD_MEDIUM = 0.6     # 60% match
     MATCH_THRESHOLD_LOW = 0.3        # 30% match
 
+    # In-batch deduplication modes for Replace uploads (stored as `_dedup_mode`)
+    DEDUP_MODE_OFF = 'off'             # Keep every row (default)
+    DEDUP_MODE_FULL_ROW = 'full_row'   # Drop rows whose business columns are identical
+    DEDUP_MODE_KEYS = 'keys'           # Drop rows sharing the same `_upsert_keys`
+
+    # Client-side column profiler (services/file/column_profiler.py)
+    PROFILE_SKETCH_SIZE = 256          # KMV sketch size for distinct-count estimates
+    PROFILE_MAX_FILES = 200            # Keep only the newest saved batch profiles
+
 
 # === UI CONSTANTS ===
 class UIConstants:
@@ -96,6 +170,12 @@ class AppConstants:
     # Logging settings
     LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 
+    # GUI log sink (batched flush from the Tk main loop)
+    LOG_FLUSH_INTERVAL_MS = 100        # Flush queued messages every 100ms
+    LOG_MAX_PENDING_MESSAGES = 20000   # Drop oldest queued messages beyond this
+    LOG_MAX_VISIBLE_LINES = 5000       # Ring cap for the Log tab textbox
+    LOG_MAX_SUMMARY_LINES = 1000       # Ring cap for the Main tab textbox
+
 
 # === PATH CONSTANTS ===
 class PathConstants:
@@ -116,6 +196,18 @@ class PathConstants:
     # File types configuration directory
     FILE_TYPES_DIR = os.path.join(CONFIG_DIR, "file_types")
 
+    # Saved column profiles (one JSON per upload batch and file type)
+    PROFILES_DIR = os.path.join(_BASE_DIR, "profiles")
+
+    # Saved SQL query profiles (one JSON per upload batch, utils/query_profiler.py)
+    QUERY_PROFILES_DIR = os.path.join(PROFILES_DIR, "queries")
+
+    # Rebuildable caches (safe to delete)
+    CACHE_DIR = os.path.join(_BASE_DIR, "cache")
+
+    # Column-name embeddings of the column mapper addon (one memmap + index per model)
+    EMBEDDING_CACHE_DIR = os.path.join(CACHE_DIR, "embeddings")
+
     # Default search path
     DEFAULT_SEARCH_PATH = os.path.join(os.path.expanduser("~"), "Downloads")
     
@@ -1,24 +1,65 @@
 # Standard library imports
+import argparse
 import logging
 import os
+from contextlib import nullcontext
 
-# Third-party imports
-try:
-    import customtkinter as ctk
-except ImportError as e:
-    raise SystemExit(
-        "The 'customtkinter' library is required for the UI.\n"
-        "Install with: pip install customtkinter"
-    ) from e
+# Local imports (เบา) - customtkinter และหน้าต่างต่างๆ ถูก import ใน main()
+from utils.startup_profiler import StartupProfiler
+
+
+def _import_customtkinter():
+    try:
+        import customtkinter as ctk
+    except ImportError as e:
+        raise SystemExit(
+            "The 'customtkinter' library is required for the UI.\n"
+            "Install with: pip install customtkinter"
+        ) from e
+    return ctk
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='PIPELINE SQL SERVER')
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Record import times and phase timings until the login window is shown'
+    )
+    parser.add_argument(
+        '--profile-output',
+        metavar='JSON_PATH',
+        help='Save the --profile-startup result as JSON'
+    )
+    args, _unknown = parser.parse_known_args()
+    return args
+
+
+def _finish_startup_profile(profiler, output_path):
+    """หยุดจับเวลาเมื่อหน้าต่าง login แสดงแล้ว และแสดง/บันทึกผล"""
+    profiler.remove_import_hook()
+    profiler.report(logging.info)
+    if output_path and profiler.write_json(output_path):
+        logging.info(f"Startup profile saved to: {output_path}")
 
-# Local imports
-from ui.login_window import LoginWindow
-from utils.logger import setup_logging
 
 def main():
+    args = _parse_args()
+    profile_output = os.path.abspath(args.profile_output) if args.profile_output else ''
+
+    profiler = None
+    if args.profile_startup:
+        profiler = StartupProfiler()
+        profiler.install_import_hook()
+
     # Set working directory to the location of this file
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
+    with profiler.phase('import_ui') if profiler else nullcontext():
+        ctk = _import_customtkinter()
+        from ui.login_window import LoginWindow
+        from utils.logger import setup_logging
+
     # Set appearance mode and theme (minimal tone)
     ctk.set_appearance_mode("System")
     ctk.set_default_color_theme("dark-blue")
@@ -33,9 +74,13 @@ def main():
     setup_logging(level=logging.INFO)
     
     # Create login window
-    login_window = LoginWindow()
+    with profiler.phase('create_login_window') if profiler else nullcontext():
+        login_window = LoginWindow()
+
+    if profiler:
+        login_window.after_idle(lambda: _finish_startup_profile(profiler, profile_output))
     
     login_window.mainloop()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
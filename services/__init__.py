@@ -6,11 +6,22 @@ Services module สำหรับ PIPELINE_SQLSERVER (Clean Structure)
 - Database services: การจัดการฐานข้อมูล
 - File services: การจัดการไฟล์
 - Utility services: บริการสนับสนุน
+
+Service classes ถูก import แบบ lazy เพื่อให้ `services.settings_manager` และ
+module เล็กๆ โหลดได้โดยไม่ต้องโหลด pandas / SQLAlchemy
 """
 
-# Import modular services only
-from .file import FileReaderService, DataProcessorService, FileManagementService
-from .database import ConnectionService, SchemaService, DataValidationService, DataUploadService
+import importlib
+
+_LAZY_EXPORTS = {
+    'FileReaderService': '.file',
+    'DataProcessorService': '.file',
+    'FileManagementService': '.file',
+    'ConnectionService': '.database',
+    'SchemaService': '.database',
+    'DataValidationService': '.database',
+    'DataUploadService': '.database',
+}
 
 __all__ = [
     'FileReaderService',
@@ -20,4 +31,11 @@ __all__ = [
     'SchemaService',
     'DataValidationService',
     'DataUploadService'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
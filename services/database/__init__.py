@@ -4,13 +4,19 @@ Database Services Package for PIPELINE_SQLSERVER
 Provides modular database services for connection, schema, validation, and data upload
 """
 
+from .catalog_snapshot import CatalogSnapshot
 from .connection_service import ConnectionService
+from .conversion_plan import ConversionPlan
+from .date_styles import DateStyleStore
 from .schema_service import SchemaService
 from .data_validation_service import DataValidationService
 from .data_upload_service import DataUploadService
 
 __all__ = [
+    'CatalogSnapshot',
     'ConnectionService',
+    'ConversionPlan',
+    'DateStyleStore',
     'SchemaService', 
     'DataValidationService',
     'DataUploadService'
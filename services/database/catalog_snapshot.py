@@ -0,0 +1,116 @@
+"""
+Catalog Snapshot for PIPELINE_SQLSERVER
+
+Caches INFORMATION_SCHEMA.COLUMNS for every table of a schema in one query, shared by
+all validators and services in the process. The snapshot is refreshed after
+`DatabaseConstants.CATALOG_SNAPSHOT_TTL_SECONDS` or when invalidated after DDL.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from constants import DatabaseConstants
+
+
+def get_staging_table_name(table_name: str) -> str:
+    """ชื่อ staging table ของ final table"""
+    return f"{table_name}{DatabaseConstants.STAGING_TABLE_SUFFIX}"
+
+
+def get_final_table_name(staging_table: str) -> str:
+    """ชื่อ final table ของ staging table (ตัด suffix `__stg` ออก)"""
+    suffix = DatabaseConstants.STAGING_TABLE_SUFFIX
+    if staging_table.endswith(suffix):
+        return staging_table[:-len(suffix)]
+    return staging_table
+
+
+class CatalogSnapshot:
+    """
+    Snapshot ของ column metadata ทุก table ใน schema (ใช้ร่วมกันทั้ง process)
+
+    key ของ cache คือ (engine url, schema) ดังนั้นหลาย engine/หลาย database ไม่ปนกัน
+    staging tables (`__stg`) ไม่ถูกเก็บใน snapshot เพราะถูกสร้างใหม่ทุกครั้งที่ upload
+    """
+
+    _COLUMNS_QUERY = """
+        SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH,
+               NUMERIC_PRECISION, NUMERIC_SCALE, COLLATION_NAME, IS_NULLABLE, COLUMN_DEFAULT
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = :schema_name
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """
+
+    _snapshots: Dict[tuple, tuple] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(engine, schema_name: str) -> tuple:
+        # str(engine.url) ซ่อน password ให้อยู่แล้ว
+        return (str(engine.url), schema_name)
+
+    @classmethod
+    def _fetch(cls, engine, schema_name: str) -> Dict[str, Dict[str, Dict]]:
+        """ดึง columns ของทุก table ใน schema ด้วย query เดียว"""
+        suffix = DatabaseConstants.STAGING_TABLE_SUFFIX
+        tables: Dict[str, Dict[str, Dict]] = {}
+        with engine.connect() as conn:
+            rows = conn.execute(text(cls._COLUMNS_QUERY), {'schema_name': schema_name}).fetchall()
+        for row in rows:
+            if row.TABLE_NAME.endswith(suffix):
+                continue
+            tables.setdefault(row.TABLE_NAME, {})[row.COLUMN_NAME] = {
+                'data_type': row.DATA_TYPE,
+                'max_length': row.CHARACTER_MAXIMUM_LENGTH,
+                'precision': row.NUMERIC_PRECISION,
+                'scale': row.NUMERIC_SCALE,
+                'collation': row.COLLATION_NAME,
+                'is_nullable': row.IS_NULLABLE,
+                'default_value': row.COLUMN_DEFAULT
+            }
+        return tables
+
+    @classmethod
+    def get_schema(cls, engine, schema_name: str = 'bronze',
+                   max_age: Optional[float] = None) -> Dict[str, Dict[str, Dict]]:
+        """
+        คืน {table_name: {column_name: column_info}} ของ schema (โหลดใหม่เมื่อหมดอายุ)
+
+        Raises:
+            Exception: เมื่อ query catalog ไม่สำเร็จ (ไม่ cache ผลที่ล้มเหลว)
+        """
+        if max_age is None:
+            max_age = DatabaseConstants.CATALOG_SNAPSHOT_TTL_SECONDS
+        key = cls._cache_key(engine, schema_name)
+
+        with cls._lock:
+            cached = cls._snapshots.get(key)
+            if cached and time.monotonic() - cached[0] < max_age:
+                return cached[1]
+
+            # โหลดใต้ lock เพื่อให้ threads ที่เรียกพร้อมกันรอผลเดียวกันแทนที่จะ query ซ้ำ
+            tables = cls._fetch(engine, schema_name)
+            cls._snapshots[key] = (time.monotonic(), tables)
+            return tables
+
+    @classmethod
+    def get_table_columns(cls, engine, schema_name: str, table_name: str) -> Optional[Dict[str, Dict]]:
+        """คืน column info ของ table หรือ None ถ้าไม่มี table นี้"""
+        return cls.get_schema(engine, schema_name).get(table_name)
+
+    @classmethod
+    def invalidate(cls, engine=None, schema_name: Optional[str] = None) -> None:
+        """ล้าง snapshot (เรียกหลัง DDL ที่เปลี่ยนโครงสร้าง table)"""
+        with cls._lock:
+            if engine is None and schema_name is None:
+                cls._snapshots.clear()
+                return
+            for key in list(cls._snapshots):
+                if engine is not None and key[0] != str(engine.url):
+                    continue
+                if schema_name is not None and key[1] != schema_name:
+                    continue
+                del cls._snapshots[key]
@@ -5,7 +5,6 @@ Manages database connections and configuration updates
 """
 
 import logging
-from tkinter import messagebox
 from typing import Any, Dict, Tuple
 
 from sqlalchemy import create_engine, text
@@ -13,6 +12,7 @@ from sqlalchemy.exc import DBAPIError, ProgrammingError
 
 from config.database import DatabaseConfig
 from constants import DatabaseConstants, ErrorMessages, SuccessMessages
+from utils.dialogs import messagebox
 
 
 class ConnectionService:
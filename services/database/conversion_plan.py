@@ -0,0 +1,248 @@
+"""
+Conversion Plan for PIPELINE_SQLSERVER
+
+Compiles the SQL an upload needs for one file type from the shared builders in
+utils/sql_utils.py: the cleaned value of each column, the TRY_CONVERT used by the
+staging -> final transfer, the validation predicate and the upsert hash. Transfer and
+validation therefore always accept exactly the same values.
+
+Plans are cached per (logic type, dtype config version). The version is a fingerprint
+of the column types, date format, learned date styles, upsert keys and clean-column
+mode, so saving a new dtype config simply produces a new plan.
+
+Date columns with a learned style (services/database/date_styles.py) try that style
+first and fall back to the rest of the date format's style chain for residual rows.
+
+With app_settings `staging_clean_columns = persisted` the staging table also gets
+`[<col>__clean] AS (<cleaning expression>) PERSISTED` for numeric and date columns:
+SQL Server cleans each value once when the row is inserted, and predicates / transfer
+read the stored value instead of re-running REPLACE/TRANSLATE inside every TRY_CONVERT.
+Only the cleaned text is persisted; TRY_CONVERT with 2-digit-year styles (3, 4, 5) is
+non-deterministic and cannot be part of a persisted column.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from sqlalchemy.types import (
+    DATE as SA_DATE,
+    DateTime as SA_DateTime,
+    Float as SA_Float,
+    Integer as SA_Integer,
+    LargeBinary,
+    NVARCHAR as SA_NVARCHAR,
+    Text as SA_Text,
+)
+
+from constants import DatabaseConstants
+from services.file_type_plan import group_columns
+from utils.sql_utils import (
+    get_basic_cleaning_expression,
+    get_date_cleaning_expression,
+    get_date_conversion_expression,
+    get_date_error_condition,
+    get_numeric_cleaning_expression,
+    get_numeric_conversion_expression,
+    get_numeric_error_condition,
+)
+
+METADATA_COLUMNS = ('_loaded_at', '_created_at', '_source_file', '_batch_id', '_upsert_hash')
+
+KIND_NUMERIC = 'numeric'
+KIND_DATE = 'date'
+KIND_TEXT = 'text'
+KIND_METADATA = 'metadata'
+
+
+def get_sql_server_type(sa_type) -> str:
+    """Convert SQLAlchemy type to SQL Server type string"""
+    if isinstance(sa_type, SA_NVARCHAR):
+        # NVARCHAR(n) ตามที่ตั้งค่าใน dtype config, ที่เหลือใช้ NVARCHAR(MAX)
+        length = getattr(sa_type, 'length', None)
+        if isinstance(length, int) and 0 < length <= DatabaseConstants.NVARCHAR_MAX_INLINE_LENGTH:
+            return f"NVARCHAR({length})"
+        return "NVARCHAR(MAX)"
+    elif isinstance(sa_type, SA_Text):
+        return "NVARCHAR(MAX)"
+    elif isinstance(sa_type, SA_Integer):
+        return "INT"
+    elif isinstance(sa_type, SA_Float):
+        return "FLOAT"
+    elif isinstance(sa_type, SA_DATE):
+        return "DATE"
+    elif isinstance(sa_type, SA_DateTime):
+        return "DATETIME2"
+    elif isinstance(sa_type, LargeBinary):
+        return "VARBINARY(16)"  # For _upsert_hash
+    else:
+        return "NVARCHAR(MAX)"  # Default fallback
+
+
+class ColumnPlan:
+    """Expressions ที่ compile แล้วของคอลัมน์เดียว"""
+
+    __slots__ = ('name', 'kind', 'clean_sql', 'clean_ref', 'convert_sql', 'error_condition')
+
+    def __init__(self, name: str, kind: str, clean_sql: Optional[str], clean_ref: Optional[str],
+                 convert_sql: str, error_condition: Optional[str]) -> None:
+        self.name = name
+        self.kind = kind
+        self.clean_sql = clean_sql              # expression ทำความสะอาด (None = ไม่ทำ)
+        self.clean_ref = clean_ref              # ที่ predicates/transfer อ้างถึง: `[col__clean]` หรือ clean_sql
+        self.convert_sql = convert_sql          # expression ใน SELECT ของ transfer
+        self.error_condition = error_condition  # WHERE ของแถวที่แปลงไม่ได้ (None = ไม่มีการตรวจ)
+
+
+class ConversionPlan:
+    """
+    SQL ที่ compile แล้วสำหรับ upload หนึ่งประเภทไฟล์ (immutable, ใช้ร่วมกันข้าม threads)
+
+    ใช้ `ConversionPlan.get(...)` เพื่อรับ plan จาก cache แทนการสร้างใหม่
+    """
+
+    _plans: "OrderedDict[tuple, ConversionPlan]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, logic_type: str, required_cols: Dict, date_format: str = 'UK',
+                 upsert_keys: Optional[List[str]] = None, persisted_clean: bool = False,
+                 date_styles: Optional[Dict[str, int]] = None) -> None:
+        self.logic_type = logic_type
+        self.date_format = date_format
+        self.upsert_keys = list(upsert_keys or [])
+        self.persisted_clean = persisted_clean
+        self.date_styles = dict(date_styles or {})
+        self.version = self.fingerprint(required_cols, date_format, self.upsert_keys, persisted_clean,
+                                        self.date_styles)
+
+        self.columns: Dict[str, ColumnPlan] = OrderedDict(
+            (col, self._compile_column(col, sa_type)) for col, sa_type in required_cols.items()
+        )
+        self.insert_columns_sql = ", ".join(f"[{col}]" for col in self.columns)
+        self.select_sql = ", ".join(
+            cp.convert_sql if cp.kind == KIND_METADATA else f"{cp.convert_sql} AS [{cp.name}]"
+            for cp in self.columns.values()
+        )
+        self.hash_sql = self.build_hash_expression(self.upsert_keys) if self.upsert_keys else None
+        # คอลัมน์ที่ validation ต้องตรวจ แยกตามชนิด (ไม่รวม metadata)
+        self.groups = group_columns(required_cols)
+
+    # ===== Cache =====
+    @staticmethod
+    def fingerprint(required_cols: Dict, date_format: str, upsert_keys: List[str], persisted_clean: bool,
+                    date_styles: Optional[Dict[str, int]] = None) -> str:
+        """Version ของ dtype config (เปลี่ยนเมื่อคอลัมน์/ชนิด/date format/styles/keys/mode เปลี่ยน)"""
+        parts = [f"{col}={type(t).__name__}:{get_sql_server_type(t)}" for col, t in required_cols.items()]
+        parts += [f"date_format={date_format}", f"keys={','.join(upsert_keys)}", f"persisted={persisted_clean}"]
+        parts += [f"style:{col}={style}" for col, style in sorted((date_styles or {}).items())]
+        return hashlib.md5("|".join(parts).encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def persisted_clean_enabled() -> bool:
+        """อ่าน app_settings `staging_clean_columns` (ค่าเริ่มต้น inline)"""
+        try:
+            from config.json_manager import json_manager
+            mode = json_manager.load('app_settings').get(
+                'staging_clean_columns', DatabaseConstants.CLEAN_COLUMNS_INLINE
+            )
+        except Exception:
+            mode = DatabaseConstants.CLEAN_COLUMNS_INLINE
+        return mode == DatabaseConstants.CLEAN_COLUMNS_PERSISTED
+
+    @classmethod
+    def get(cls, logic_type: str, required_cols: Dict, date_format: str = 'UK',
+            upsert_keys: Optional[List[str]] = None, persisted_clean: Optional[bool] = None,
+            date_styles: Optional[Dict[str, int]] = None) -> 'ConversionPlan':
+        """คืน plan จาก cache (compile ใหม่เมื่อ dtype config version เปลี่ยน)"""
+        if persisted_clean is None:
+            persisted_clean = cls.persisted_clean_enabled()
+        keys = list(upsert_keys or [])
+        key = (logic_type, cls.fingerprint(required_cols, date_format, keys, persisted_clean, date_styles))
+
+        with cls._lock:
+            plan = cls._plans.get(key)
+            if plan is not None:
+                cls._plans.move_to_end(key)
+                return plan
+
+        plan = cls(logic_type, required_cols, date_format, keys, persisted_clean, date_styles)
+        with cls._lock:
+            cls._plans[key] = plan
+            while len(cls._plans) > DatabaseConstants.CONVERSION_PLAN_CACHE_SIZE:
+                cls._plans.popitem(last=False)
+        return plan
+
+    # ===== Compilation =====
+    def _clean_ref(self, col: str, clean_sql: str) -> str:
+        if self.persisted_clean:
+            return f"[{col}{DatabaseConstants.CLEAN_COLUMN_SUFFIX}]"
+        return clean_sql
+
+    def _compile_column(self, col: str, sa_type) -> ColumnPlan:
+        if col in METADATA_COLUMNS:
+            # Metadata columns: เอาจาก staging table โดยตรง (สร้างไว้แล้วตอน upload)
+            return ColumnPlan(col, KIND_METADATA, None, None, f"[{col}]", None)
+
+        if isinstance(sa_type, (SA_Integer, SA_Float)):
+            clean_sql = get_numeric_cleaning_expression(col)
+            ref = self._clean_ref(col, clean_sql)
+            target = "INT" if isinstance(sa_type, SA_Integer) else "FLOAT"
+            return ColumnPlan(col, KIND_NUMERIC, clean_sql, ref, get_numeric_conversion_expression(ref, target),
+                              get_numeric_error_condition(ref, target))
+
+        if isinstance(sa_type, (SA_DATE, SA_DateTime)):
+            clean_sql = get_date_cleaning_expression(col)
+            ref = self._clean_ref(col, clean_sql)
+            style = self.date_styles.get(col)
+            return ColumnPlan(col, KIND_DATE, clean_sql, ref,
+                              get_date_conversion_expression(ref, self.date_format, style),
+                              get_date_error_condition(ref, self.date_format, style))
+
+        if isinstance(sa_type, (SA_Text, SA_NVARCHAR)):
+            target = get_sql_server_type(sa_type)
+        else:
+            target = str(sa_type).upper()
+        return ColumnPlan(col, KIND_TEXT, None, None, f"TRY_CONVERT({target}, [{col}])", None)
+
+    @staticmethod
+    def build_hash_expression(upsert_keys: List[str]) -> str:
+        """HASHBYTES('MD5') ของค่า upsert keys ที่ trim แล้ว คั่นด้วย '|'"""
+        cleaned_keys = [f"COALESCE({get_basic_cleaning_expression(key)}, '')" for key in upsert_keys]
+        concat_expr = " + '|' + ".join(cleaned_keys)
+        return f"HASHBYTES('MD5', {concat_expr})"
+
+    # ===== Accessors =====
+    def has_clean(self, col: str) -> bool:
+        cp = self.columns.get(col)
+        return cp is not None and cp.clean_ref is not None
+
+    def clean_expression(self, col: str) -> str:
+        return self.columns[col].clean_ref
+
+    def has_check(self, col: str, date_format: Optional[str] = None) -> bool:
+        """plan มี validation predicate ของคอลัมน์นี้ (และ date format ตรงกัน) หรือไม่"""
+        cp = self.columns.get(col)
+        if cp is None or cp.error_condition is None:
+            return False
+        return cp.kind != KIND_DATE or date_format is None or date_format == self.date_format
+
+    def error_condition(self, col: str) -> str:
+        return self.columns[col].error_condition
+
+    def computed_columns_sql(self) -> List[str]:
+        """คอลัมน์ `__clean` แบบ PERSISTED สำหรับ CREATE TABLE ของ staging (ว่างถ้าโหมด inline)"""
+        if not self.persisted_clean:
+            return []
+        suffix = DatabaseConstants.CLEAN_COLUMN_SUFFIX
+        return [
+            f"[{cp.name}{suffix}] AS ({cp.clean_sql}) PERSISTED"
+            for cp in self.columns.values() if cp.clean_sql is not None
+        ]
+
+    def transfer_sql(self, schema_name: str, staging_table: str, table_name: str) -> str:
+        """INSERT ... SELECT จาก staging ไป final table พร้อมแปลงชนิดข้อมูล"""
+        return (
+            f"INSERT INTO {schema_name}.{table_name} ({self.insert_columns_sql}) "
+            f"SELECT {self.select_sql} FROM {schema_name}.{staging_table}"
+        )
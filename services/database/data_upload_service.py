@@ -14,6 +14,7 @@ import pandas as pd
 from sqlalchemy import inspect, text
 from sqlalchemy.exc import DBAPIError
 
+from constants import DatabaseConstants
 from services.settings_manager import settings_manager
 from sqlalchemy.types import (
     DateTime,
@@ -26,8 +27,13 @@ from sqlalchemy.types import (
     LargeBinary,
 )
 
+from .catalog_snapshot import CatalogSnapshot, get_staging_table_name
+from .conversion_plan import ConversionPlan, get_sql_server_type
+from .date_styles import DateStyleStore
 from .data_validation_service import DataValidationService
-from utils.sql_utils import get_numeric_cleaning_expression, get_basic_cleaning_expression
+from utils.helpers import nvarchar_lengths
+from utils.phase_timer import timed_phase
+from utils.query_profiler import query_profiler
 
 
 class DataUploadService:
@@ -53,22 +59,24 @@ class DataUploadService:
 
         # โหลดการตั้งค่าประเภทข้อมูล
         self.dtype_settings = {}
+        self._settings_version = None
         self._load_dtype_settings()
 
     def _load_dtype_settings(self):
-        """Load data type settings from settings_manager"""
+        """Load data type settings from settings_manager (only when the settings version changed)"""
         try:
-            # Load all file types from settings_manager
-            self.dtype_settings = {}
-            file_types = settings_manager.list_file_types()
-            for file_type in file_types:
-                self.dtype_settings[file_type] = settings_manager.get_dtype_settings(file_type)
+            snapshot = settings_manager.snapshot()
+            if snapshot.version != self._settings_version:
+                self.dtype_settings = dict(snapshot.dtype_settings)
+                self._settings_version = snapshot.version
         except Exception as e:
             self.logger.warning(f"ไม่สามารถโหลด dtype_settings ได้: {e}")
             self.dtype_settings = {}
+            self._settings_version = None
 
     def upload_data(self, df, logic_type: str, required_cols: Dict, schema_name: str = 'bronze',
-                   log_func=None, force_recreate: bool = False, clear_existing: bool = True, source_file: str = None, batch_id: str = None):
+                   log_func=None, force_recreate: bool = False, clear_existing: bool = True, source_file: str = None, batch_id: str = None,
+                   profile=None):
         """
         Upload data to database with support for Replace or Upsert strategies
 
@@ -81,25 +89,36 @@ class DataUploadService:
             force_recreate: Force table recreation (used when auto-updating data types)
             clear_existing: Whether to clear existing data (ignored if update_strategy='upsert')
             source_file: Source filename for metadata tracking
+            batch_id: Batch ID for this upload (generated if not given)
+            profile: Client-side DataProfile of `df` (services/file/column_profiler.py); when given
+                it sizes the staging columns, is saved next to the batch and lets validation skip
+                checks whose answer is already known
         """
-
-        # โหลด dtype_settings ใหม่ทุกครั้งเพื่อให้ได้ค่าล่าสุดหลัง Save
-        self._load_dtype_settings()
-
         # สร้าง batch_id สำหรับการ upload ครั้งนี้ (หรือใช้ที่ส่งมา)
         batch_id = batch_id or str(uuid.uuid4())
 
-        # อ่าน update strategy และ upsert keys
-        update_strategy = "replace"  # default
-        upsert_keys = []
+        # ทุก SQL statement ภายใน batch นี้ถูกจับเวลาแยกตาม phase แล้วสรุปเมื่อจบ
+        with query_profiler.batch(batch_id):
+            try:
+                return self._upload_batch(
+                    df, logic_type, required_cols, schema_name, log_func, force_recreate,
+                    clear_existing, source_file, batch_id, profile
+                )
+            finally:
+                query_profiler.report_batch(batch_id, log_func, logic_type)
 
-        if logic_type in self.dtype_settings:
-            update_strategy = self.dtype_settings[logic_type].get(
-                '_update_strategy', 'replace'
-            )
-            upsert_keys = self.dtype_settings[logic_type].get(
-                '_upsert_keys', []
-            )
+    def _upload_batch(self, df, logic_type: str, required_cols: Dict, schema_name: str,
+                      log_func, force_recreate: bool, clear_existing: bool, source_file: str,
+                      batch_id: str, profile):
+        """Body of upload_data (runs inside the batch's query profiling scope)"""
+
+        # ตรวจ settings ทุกครั้งเพื่อให้ได้ค่าล่าสุดหลัง Save (โหลดใหม่เมื่อ version เปลี่ยนเท่านั้น)
+        self._load_dtype_settings()
+
+        # update strategy, upsert keys, date format และชื่อตาราง (compile ไว้ต่อ settings version)
+        type_plan = settings_manager.snapshot().plan(logic_type)
+        update_strategy = type_plan.update_strategy
+        upsert_keys = list(type_plan.upsert_keys)
 
         if log_func:
             log_func("Database access permissions are correct")
@@ -118,22 +137,12 @@ class DataUploadService:
             # เพิ่ม metadata columns ที่จะถูกเพิ่มโดย SQL ในขั้นตอนสุดท้าย
             required_cols['_loaded_at'] = DateTime()
             required_cols['_created_at'] = DateTime()
-            required_cols['_source_file'] = SA_NVARCHAR(max)
+            required_cols['_source_file'] = SA_Text()
             required_cols['_batch_id'] = SA_NVARCHAR(50)
             required_cols['_upsert_hash'] = LargeBinary(16)
             
-            table_name = None
-            try:
-                # Load column settings from settings_manager for this specific file type
-                col_config = settings_manager.get_column_settings(logic_type)
-                # Check if there's a custom table name mapping in the settings
-                # Note: Using logic_type as table name if not specified
-                if isinstance(col_config, dict):
-                    table_name = col_config.get("__table_name__")
-            except Exception:
-                table_name = None
-            if not table_name:
-                table_name = logic_type
+            # `__table_name__` ใน column settings (ค่าเริ่มต้น: logic_type)
+            table_name = type_plan.table_name
 
             schema_result = self.schema_service.ensure_schemas_exist([schema_name])
             if not schema_result[0]:
@@ -153,15 +162,11 @@ class DataUploadService:
                 else:
                     needs_recreate = self._check_type_compatibility(db_col_types, required_cols, log_func)
             
-            staging_table = f"{table_name}__stg"
+            staging_table = get_staging_table_name(table_name)
             # staging table ไม่รวม metadata columns เพราะจะเพิ่มใน SQL ตอน transfer
             metadata_cols = {'_loaded_at', '_created_at', '_source_file', '_batch_id', '_upsert_hash'}
             staging_cols = [col for col in required_cols.keys() if col not in metadata_cols]
             
-            if log_func:
-                log_func(f"Creating staging table {schema_name}.{staging_table}")
-            self._create_staging_table(staging_table, staging_cols, schema_name, log_func)
-
             # เพิ่ม metadata columns ลง DataFrame ก่อน upload เข้า staging
             df_with_metadata = df.copy()
             df_with_metadata['_loaded_at'] = datetime.now()
@@ -172,27 +177,47 @@ class DataUploadService:
             df_with_metadata['_batch_id'] = batch_id
             df_with_metadata['_upsert_hash'] = None  # จะคำนวณทีหลังถ้าเป็น upsert mode
 
-            if log_func:
-                log_func(f"Uploading {len(df):,} rows to staging table (with metadata)")
-            self._upload_to_staging(df_with_metadata, staging_table, staging_cols, schema_name, log_func)
+            # วัดความยาวสูงสุดของแต่ละคอลัมน์เพื่อกำหนดขนาด NVARCHAR ของ staging
+            # (ใช้ค่าจาก profile ถ้ามี วัดเองเฉพาะคอลัมน์ที่ profile ไม่มี)
+            column_lengths = profile.max_lengths() if profile is not None else {}
+            column_lengths.update(self._measure_column_lengths(
+                df_with_metadata, [c for c in staging_cols + ['_source_file'] if c not in column_lengths]
+            ))
+            if profile is not None:
+                profile_path = profile.save(batch_id)
+                if log_func and profile_path:
+                    log_func(f"Column profile: {profile.summary()} (saved to {profile_path})")
+            # การตั้งค่า date format
+            date_format = type_plan.date_format
+            if log_func and type_plan.dtypes:
+                log_func(f"Using Date Format: {date_format}")
             
-            # โหลดการตั้งค่า date format
-            date_format = 'UK'  # default
-            try:
-                if logic_type in self.dtype_settings:
-                    date_format = self.dtype_settings[logic_type].get('_date_format', 'UK')
-                    if log_func:
-                        log_func(f"Using Date Format: {date_format}")
-            except Exception as e:
+            # Style วันที่ของแต่ละคอลัมน์ (จาก profile ของ batch นี้ หรือที่เรียนรู้ไว้จากการโหลดก่อนหน้า)
+            date_styles = DateStyleStore.resolve(logic_type, required_cols, date_format, profile, log_func)
+
+            # SQL ของ cleaning/conversion/validation/hash ทั้งหมด compile จากที่เดียว (cache ตาม dtype config version)
+            plan = ConversionPlan.get(logic_type, required_cols, date_format, upsert_keys, date_styles=date_styles)
+            if log_func and plan.persisted_clean:
+                log_func(f"Conversion plan {plan.version}: cleaned values persisted in staging")
+
+            with query_profiler.phase('stage'), timed_phase('stage', rows=len(df)):
+                if log_func:
+                    log_func(f"Creating staging table {schema_name}.{staging_table}")
+                self._create_staging_table(
+                    staging_table, staging_cols, schema_name, log_func, column_lengths=column_lengths, plan=plan
+                )
+
                 if log_func:
-                    log_func(f"Warning: Could not load date format: {e}")
+                    log_func(f"Uploading {len(df):,} rows to staging table (with metadata)")
+                self._upload_to_staging(df_with_metadata, staging_table, staging_cols, schema_name, log_func)
             
             if log_func:
                 log_func(f"Validating data in staging table")
-            validation_results = self.validation_service.validate_data_in_staging(
-                staging_table, logic_type, required_cols, schema_name, log_func, 
-                progress_callback=None, date_format=date_format
-            )
+            with query_profiler.phase('validate'), timed_phase('validate', rows=len(df)):
+                validation_results = self.validation_service.validate_data_in_staging(
+                    staging_table, logic_type, required_cols, schema_name, log_func, 
+                    progress_callback=None, date_format=date_format, profile=profile, plan=plan
+                )
             
             if not validation_results['is_valid']:
                 with self.engine.begin() as conn:
@@ -204,18 +229,19 @@ class DataUploadService:
                     'warnings': validation_results.get('warnings', [])
                 }
             
-            self._create_or_recreate_final_table(
-                table_name, required_cols, schema_name, needs_recreate, log_func, df,
-                clear_existing, update_strategy, upsert_keys
-            )
-            
-            if log_func:
-                log_func(f"Transferring data from staging to main table {schema_name}.{table_name}")
-            self._transfer_data_from_staging(
-                staging_table, table_name, required_cols, schema_name, log_func, date_format,
-                batch_id=batch_id, source_file=source_file, upsert_keys=upsert_keys,
-                update_strategy=update_strategy
-            )
+            with query_profiler.phase('transfer'), timed_phase('transfer', rows=len(df)):
+                self._create_or_recreate_final_table(
+                    table_name, required_cols, schema_name, needs_recreate, log_func, df,
+                    clear_existing, update_strategy, upsert_keys, plan=plan
+                )
+                
+                if log_func:
+                    log_func(f"Transferring data from staging to main table {schema_name}.{table_name}")
+                self._transfer_data_from_staging(
+                    staging_table, table_name, required_cols, schema_name, log_func, date_format,
+                    batch_id=batch_id, source_file=source_file, upsert_keys=upsert_keys,
+                    update_strategy=update_strategy, plan=plan
+                )
 
             # Keep staging table for debugging - it will be cleaned up when new data comes
             if log_func:
@@ -224,18 +250,19 @@ class DataUploadService:
             # Create indexes after successful upload
             if log_func:
                 log_func(f"Creating indexes on final table")
-            self._create_indexes_after_upload(
-                table_name, schema_name, upsert_keys, log_func
-            )
+            with query_profiler.phase('index'), timed_phase('index'):
+                self._create_indexes_after_upload(
+                    table_name, schema_name, upsert_keys, log_func, required_cols=required_cols
+                )
 
             # Build summary message
-            summary_message = f"Upload successful → {schema_name}.{table_name} (ingested NVARCHAR(MAX) then converted by dtype for {len(df):,} rows)"
+            summary_message = f"Upload successful → {schema_name}.{table_name} (ingested into sized staging then converted by dtype for {len(df):,} rows)"
 
             return True, summary_message
         
         except Exception as e:
             short_msg = self._short_exception_message(e)
-            problem_hints = self._detect_problem_columns(df, required_cols)
+            problem_hints = self._detect_problem_columns(df, required_cols, profile=profile)
 
             if problem_hints:
                 lines = [
@@ -256,6 +283,7 @@ class DataUploadService:
     def _fix_column_types(self, table_name: str, required_cols: Dict, 
                          schema_name: str = 'bronze', log_func=None):
         """Fix column types to match required types for all data types"""
+        altered = False
         try:
             with self.engine.begin() as conn:
                 # ตรวจสอบชนิดข้อมูลปัจจุบันในฐานข้อมูล
@@ -290,28 +318,18 @@ class DataUploadService:
                     if log_func:
                         log_func(f"ALTER column '{col_name}': {current_type_str} → {target_sql_type}")
                     conn.execute(text(alter_sql))
+                    altered = True
 
         except Exception as e:
             if log_func:
                 log_func(f"Warning: Unable to alter column types: {e}")
+        finally:
+            if altered:
+                CatalogSnapshot.invalidate(self.engine, schema_name)
     
     def _get_sql_server_type(self, sa_type) -> str:
         """Convert SQLAlchemy type to SQL Server type string"""
-        if isinstance(sa_type, (SA_Text, SA_NVARCHAR)):
-            # Always use NVARCHAR(MAX) for all string types
-            return "NVARCHAR(MAX)"
-        elif isinstance(sa_type, SA_Integer):
-            return "INT"
-        elif isinstance(sa_type, SA_Float):
-            return "FLOAT"
-        elif isinstance(sa_type, SA_DATE):
-            return "DATE"
-        elif isinstance(sa_type, SA_DateTime):
-            return "DATETIME2"
-        elif isinstance(sa_type, LargeBinary):
-            return "VARBINARY(16)"  # For _upsert_hash
-        else:
-            return "NVARCHAR(MAX)"  # Default fallback
+        return get_sql_server_type(sa_type)
     
     def _format_current_type(self, col_info: Dict) -> str:
         """Format current column info to readable type string"""
@@ -373,10 +391,9 @@ class DataUploadService:
             return 'OTHER'
 
         def _expected_type_str(sa_type_obj) -> str:
-            s = str(sa_type_obj).upper()
-            if isinstance(sa_type_obj, SA_Text):
-                return 'NVARCHAR(MAX)'
-            return s
+            if isinstance(sa_type_obj, (SA_Text, SA_NVARCHAR)):
+                return self._get_sql_server_type(sa_type_obj)
+            return str(sa_type_obj).upper()
 
         def _can_alter_type(from_cat: str, to_cat: str) -> bool:
             """Check if type can be ALTERed instead of requiring table recreation"""
@@ -405,31 +422,86 @@ class DataUploadService:
                     
         return needs_recreate
 
-    def _create_staging_table(self, staging_table: str, staging_cols: list, schema_name: str, log_func=None):
-        """Create staging table with NVARCHAR(MAX) for business columns and metadata columns"""
+    def _measure_column_lengths(self, df, columns: list) -> Dict[str, int]:
+        """
+        Measure the longest text value per column (as it will be written to staging)
+
+        Only object/string columns are measured; numeric and datetime columns are
+        converted to text by the server and always fit in the minimum staging size.
+        """
+        lengths = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+                lengths[col] = 0
+                continue
+            try:
+                values = series.dropna()
+                max_len = nvarchar_lengths(values.astype(str)).max() if len(values) else 0
+                lengths[col] = int(max_len) if pd.notna(max_len) else 0
+            except Exception:
+                # วัดไม่ได้ ใช้ NVARCHAR(MAX) ไปก่อน
+                lengths[col] = None
+        return lengths
+
+    def _get_staging_column_type(self, max_length) -> str:
+        """Pick staging NVARCHAR size from observed max length (safety margin, bucketed, MAX fallback)"""
+        if max_length is None:
+            return "NVARCHAR(MAX)"
+        needed = max(
+            int(max_length * DatabaseConstants.STAGING_LENGTH_MARGIN) + 1,
+            DatabaseConstants.STAGING_MIN_LENGTH
+        )
+        for bucket in DatabaseConstants.STAGING_LENGTH_BUCKETS:
+            if needed <= bucket:
+                return f"NVARCHAR({bucket})"
+        return "NVARCHAR(MAX)"
+
+    def _create_staging_table(self, staging_table: str, staging_cols: list, schema_name: str, log_func=None,
+                              column_lengths: Dict[str, int] = None, plan: ConversionPlan = None):
+        """
+        Create staging table for business columns and metadata columns
+
+        Business columns are NVARCHAR sized from `column_lengths` (observed max length
+        per column) so rows stay in-row; columns without a measurement use NVARCHAR(MAX).
+        When the conversion plan persists cleaned values, its `__clean` computed
+        columns are added as well.
+        """
+        column_lengths = column_lengths or {}
         with self.engine.begin() as conn:
             conn.execute(text(f"""
                 IF OBJECT_ID('{schema_name}.{staging_table}', 'U') IS NOT NULL
                     DROP TABLE {schema_name}.{staging_table};
             """))
-            # Business columns: NVARCHAR(MAX)
-            cols_sql = ", ".join([f"[{c}] NVARCHAR(MAX) NULL" for c in staging_cols])
+            # Business columns: NVARCHAR(n) ตามความยาวที่วัดได้
+            col_types = {c: self._get_staging_column_type(column_lengths.get(c)) for c in staging_cols}
+            cols_sql = ", ".join([f"[{c}] {col_types[c]} NULL" for c in staging_cols])
+            source_file_type = self._get_staging_column_type(column_lengths.get('_source_file'))
 
             # Add metadata columns with proper data types
-            metadata_cols_sql = """
+            metadata_cols_sql = f"""
                 [_loaded_at] DATETIME2 NULL,
                 [_created_at] DATETIME2 NULL,
-                [_source_file] NVARCHAR(MAX) NULL,
+                [_source_file] {source_file_type} NULL,
                 [_batch_id] NVARCHAR(50) NULL,
                 [_upsert_hash] VARBINARY(16) NULL
             """
 
             # Combine all columns
             all_cols_sql = cols_sql + ", " + metadata_cols_sql
+            computed_cols = plan.computed_columns_sql() if plan is not None else []
+            if computed_cols:
+                all_cols_sql += ", " + ", ".join(computed_cols)
 
             conn.execute(text(f"CREATE TABLE {schema_name}.{staging_table} ({all_cols_sql})"))
             if log_func:
-                log_func(f"Created staging table: {schema_name}.{staging_table} (business cols + metadata cols)")
+                lob_count = sum(1 for t in col_types.values() if t == "NVARCHAR(MAX)")
+                log_func(
+                    f"Created staging table: {schema_name}.{staging_table} (business cols + metadata cols, "
+                    f"{len(staging_cols) - lob_count} sized / {lob_count} NVARCHAR(MAX))"
+                )
 
     def _upload_to_staging(self, df, staging_table: str, staging_cols: list, schema_name: str, log_func=None):
         """Upload data to staging table (including metadata columns)"""
@@ -466,7 +538,7 @@ class DataUploadService:
             )
 
     def _calculate_upsert_hash_in_staging(self, staging_table: str, upsert_keys: list, 
-                                          schema_name: str, log_func=None):
+                                          schema_name: str, log_func=None, plan: ConversionPlan = None):
         """
         Calculate MD5 hash of upsert keys in staging table
         
@@ -478,6 +550,7 @@ class DataUploadService:
             upsert_keys: List of column names to hash
             schema_name: Database schema
             log_func: Logging function
+            plan: Conversion plan (hash expression is compiled from its upsert keys)
         """
         if not upsert_keys:
             return
@@ -485,13 +558,10 @@ class DataUploadService:
         with self.engine.begin() as conn:
             try:
                 # Build hash expression using cleaned key values
-                cleaned_keys = []
-                for key in upsert_keys:
-                    cleaned = get_basic_cleaning_expression(key)
-                    cleaned_keys.append(f"COALESCE({cleaned}, '')")
-
-                concat_expr = " + '|' + ".join(cleaned_keys)
-                hash_expr = f"HASHBYTES('MD5', {concat_expr})"
+                if plan is not None and plan.upsert_keys == list(upsert_keys):
+                    hash_expr = plan.hash_sql
+                else:
+                    hash_expr = ConversionPlan.build_hash_expression(list(upsert_keys))
 
                 update_sql = f"""
                     UPDATE {schema_name}.{staging_table}
@@ -598,7 +668,8 @@ class DataUploadService:
 
     def _create_or_recreate_final_table(self, table_name: str, required_cols: Dict, schema_name: str,
                                       needs_recreate: bool, log_func, df, clear_existing: bool = True,
-                                      update_strategy: str = "replace", upsert_keys: list = None):
+                                      update_strategy: str = "replace", upsert_keys: list = None,
+                                      plan: ConversionPlan = None):
         """
         Create or recreate final table based on dtype config
 
@@ -616,15 +687,16 @@ class DataUploadService:
             clear_existing: Whether to clear existing data (ignored if update_strategy='upsert')
             update_strategy: 'replace' or 'upsert'
             upsert_keys: List of columns to use as keys for upsert (required if update_strategy='upsert')
+            plan: Conversion plan of this upload (upsert hash expression)
         """
         upsert_keys = upsert_keys or []
         insp = inspect(self.engine)
-        staging_table = f"{table_name}__stg"
+        staging_table = get_staging_table_name(table_name)
 
         # คำนวณ _upsert_hash ใน staging table ถ้ามี upsert_keys (ทำเสมอไม่ว่าจะ replace หรือ upsert)
         # เพื่อให้ final table มี hash พร้อมใช้งานสำหรับ upsert ในอนาคต
         if upsert_keys:
-            self._calculate_upsert_hash_in_staging(staging_table, upsert_keys, schema_name, log_func)
+            self._calculate_upsert_hash_in_staging(staging_table, upsert_keys, schema_name, log_func, plan=plan)
 
         if needs_recreate or not insp.has_table(table_name, schema=schema_name):
             if needs_recreate and log_func:
@@ -650,6 +722,7 @@ class DataUploadService:
                 conn.execute(text(f"ALTER TABLE {schema_name}.{table_name} ADD [_source_file] NVARCHAR(MAX) NULL"))
                 conn.execute(text(f"ALTER TABLE {schema_name}.{table_name} ADD [_batch_id] NVARCHAR(50) NULL"))
                 conn.execute(text(f"ALTER TABLE {schema_name}.{table_name} ADD [_upsert_hash] VARBINARY(16) NULL"))
+            CatalogSnapshot.invalidate(self.engine, schema_name)
         else:
             # แก้ไขชนิดข้อมูลสำหรับตารางที่มีอยู่แล้ว
             self._fix_column_types(table_name, required_cols, schema_name, log_func)
@@ -674,7 +747,7 @@ class DataUploadService:
     def _transfer_data_from_staging(self, staging_table: str, table_name: str, required_cols: Dict,
                                   schema_name: str, log_func=None, date_format: str = 'UK',
                                   batch_id: str = None, source_file: str = None, upsert_keys: list = None,
-                                  update_strategy: str = 'replace'):
+                                  update_strategy: str = 'replace', plan: ConversionPlan = None):
         """Transfer data from staging to final table with type conversion and metadata
 
         Args:
@@ -688,6 +761,7 @@ class DataUploadService:
             source_file: Source filename
             upsert_keys: List of upsert key columns
             update_strategy: 'replace' or 'upsert'
+            plan: Conversion plan (SELECT expressions); inline plan is compiled if not given
 
         Returns:
             None
@@ -704,49 +778,13 @@ class DataUploadService:
             if log_func:
                 log_func(f"Warning: Could not get row count: {e}")
             total_rows = "unknown"
-        def _sql_type_and_expr(col_name: str, sa_type_obj) -> str:
-            col_ref = f"[{col_name}]"
-            # Basic cleaning for most data types
-            base = f"NULLIF(LTRIM(RTRIM({col_ref})), '')"
-
-            if isinstance(sa_type_obj, SA_Integer):
-                # Use shared numeric cleaning function for consistency
-                cleaned = get_numeric_cleaning_expression(col_name)
-                return f"TRY_CONVERT(INT, {cleaned})"
-            if isinstance(sa_type_obj, SA_Float):
-                # Use shared numeric cleaning function for consistency
-                cleaned = get_numeric_cleaning_expression(col_name)
-                return f"TRY_CONVERT(FLOAT, {cleaned})"
-            if isinstance(sa_type_obj, (SA_DATE, SA_DateTime)):
-                # Enhanced date cleaning to handle tab characters and special characters
-                date_cleaned = f"NULLIF(LTRIM(RTRIM(REPLACE(REPLACE(REPLACE({col_ref}, CHAR(9), ''), CHAR(10), ''), CHAR(13), ''))), '')"
-
-                if date_format == 'UK':  # DD-MM format priority
-                    return f"COALESCE(TRY_CONVERT(DATETIME, {date_cleaned}, 103), TRY_CONVERT(DATETIME, {date_cleaned}, 121), TRY_CONVERT(DATETIME, {date_cleaned}, 101))"
-                else:  # US format - MM-DD priority
-                    return f"COALESCE(TRY_CONVERT(DATETIME, {date_cleaned}, 101), TRY_CONVERT(DATETIME, {date_cleaned}, 121), TRY_CONVERT(DATETIME, {date_cleaned}, 103))"
-            target = 'NVARCHAR(MAX)' if isinstance(sa_type_obj, SA_Text) else str(sa_type_obj).upper()
-            return f"TRY_CONVERT({target}, {col_ref})"
-
-        # Build SELECT expressions
-        # Metadata columns: เอาจาก staging table โดยตรง (สร้างไว้แล้วตอน upload)
-        # Business columns: แปลง data type ด้วย TRY_CONVERT
-        metadata_cols = {'_loaded_at', '_created_at', '_source_file', '_batch_id', '_upsert_hash'}
-        select_exprs = []
-        for col_name, sa_type in required_cols.items():
-            if col_name in metadata_cols:
-                # Metadata columns: เอาจาก staging table โดยตรง (ไม่ต้องคำนวณใหม่)
-                select_exprs.append(f"[{col_name}]")
-            else:
-                # Business columns: แปลง data type
-                select_exprs.append(f"{_sql_type_and_expr(col_name, sa_type)} AS [{col_name}]")
-        select_sql = ", ".join(select_exprs)
+
+        # Business columns: แปลง data type ด้วย TRY_CONVERT, metadata columns: เอาจาก staging โดยตรง
+        if plan is None:
+            plan = ConversionPlan(table_name, required_cols, date_format, upsert_keys, persisted_clean=False)
 
         with self.engine.begin() as conn:
-            insert_sql = (
-                f"INSERT INTO {schema_name}.{table_name} (" + ", ".join([f"[{c}]" for c in required_cols.keys()]) + ") "
-                f"SELECT {select_sql} FROM {schema_name}.{staging_table}"
-            )
+            insert_sql = plan.transfer_sql(schema_name, staging_table, table_name)
             if log_func:
                 log_func(f"Executing data transfer with type conversion...")
                 log_func(f"This may take a while for large datasets, please wait...")
@@ -774,22 +812,41 @@ class DataUploadService:
                     log_func(f"Error: Data transfer failed after {execution_time:.1f} seconds: {str(e)[:100]}...")
                 raise
 
+    def _get_index_key_bytes(self, sa_type):
+        """Return index key size in bytes for a column type, or None if it cannot be indexed"""
+        if isinstance(sa_type, SA_NVARCHAR):
+            sql_type = self._get_sql_server_type(sa_type)
+            if sql_type == "NVARCHAR(MAX)":
+                return None
+            return sa_type.length * 2
+        if isinstance(sa_type, SA_Text):
+            return None
+        if isinstance(sa_type, SA_Integer):
+            return 4
+        if isinstance(sa_type, (SA_Float, SA_DateTime)):
+            return 8
+        if isinstance(sa_type, SA_DATE):
+            return 3
+        return None
+
     def _create_indexes_after_upload(self, table_name: str, schema_name: str,
-                                    upsert_keys: list = None, log_func=None):
+                                    upsert_keys: list = None, log_func=None, required_cols: Dict = None):
         """Create indexes on final table after upload
 
         Creates indexes on:
         - _upsert_hash (for fast upsert operations)
         - _loaded_at (for querying by load date)
-        - Individual upsert key columns (if specified)
+        - Upsert key columns (composite, only when every key has a typed, indexable column)
 
         Args:
             table_name: Final table name
             schema_name: Database schema
             upsert_keys: List of upsert key columns
             log_func: Logging function
+            required_cols: Required columns and data types (used to check key column types)
         """
         upsert_keys = upsert_keys or []
+        required_cols = required_cols or {}
 
         try:
             with self.engine.begin() as conn:
@@ -823,10 +880,33 @@ class DataUploadService:
                 if log_func:
                     log_func(f"Created index on _loaded_at")
 
-                # Note: We don't create indexes on individual upsert key columns because:
-                # - We use _upsert_hash for matching (which already has an index)
-                # - Most upsert keys are NVARCHAR(MAX) which cannot be indexed
-                # - Query performance relies on _upsert_hash, not individual columns
+                # Index 3: upsert key columns - เฉพาะเมื่อทุก key เป็นชนิดที่ index ได้
+                # (NVARCHAR(MAX) index ไม่ได้ จึงต้องตั้ง NVARCHAR(n) ใน dtype config)
+                if upsert_keys:
+                    key_bytes = [self._get_index_key_bytes(required_cols.get(key)) for key in upsert_keys]
+                    if any(b is None for b in key_bytes):
+                        if log_func:
+                            log_func("Skipped index on upsert keys (NVARCHAR(MAX) key columns cannot be indexed)")
+                    elif sum(key_bytes) > DatabaseConstants.INDEX_KEY_MAX_BYTES:
+                        if log_func:
+                            log_func(
+                                f"Skipped index on upsert keys (key size {sum(key_bytes)} bytes exceeds "
+                                f"{DatabaseConstants.INDEX_KEY_MAX_BYTES} bytes)"
+                            )
+                    else:
+                        idx_keys = f"IX_{table_name}_upsert_keys"
+                        key_cols_sql = ", ".join(f"[{key}]" for key in upsert_keys)
+                        conn.execute(text(f"""
+                        IF NOT EXISTS (SELECT * FROM sys.indexes
+                                      WHERE name = '{idx_keys}'
+                                      AND object_id = OBJECT_ID('{schema_name}.{table_name}'))
+                        BEGIN
+                            CREATE NONCLUSTERED INDEX [{idx_keys}]
+                            ON {schema_name}.{table_name} ({key_cols_sql})
+                        END
+                        """))
+                        if log_func:
+                            log_func(f"Created index on upsert keys: {', '.join(upsert_keys)}")
 
         except Exception as e:
             if log_func:
@@ -851,13 +931,26 @@ class DataUploadService:
         except Exception:
             return str(exc)
 
-    def _detect_problem_columns(self, df_local, required_map, max_cols: int = 5, max_examples: int = 3):
-        """Detect problematic columns in data"""
+    def _profile_says_clean(self, profile, col: str, dtype) -> bool:
+        """Whether the client-side profile already proves this column has no conversion problems"""
+        if isinstance(dtype, (SA_Integer, SA_Float)):
+            return profile.is_numeric_clean(col)
+        if isinstance(dtype, (SA_DATE, SA_DateTime)):
+            return any(profile.is_date_clean(col, fmt) for fmt in ('UK', 'US'))
+        if isinstance(dtype, SA_NVARCHAR) and isinstance(getattr(dtype, "length", None), int):
+            return profile.fits_length(col, dtype.length)
+        return False
+
+    def _detect_problem_columns(self, df_local, required_map, max_cols: int = 5, max_examples: int = 3,
+                                profile=None):
+        """Detect problematic columns in data (columns the profile proves clean are skipped)"""
         problems = []
         try:
             for col, dtype in required_map.items():
                 if col not in df_local.columns:
                     continue
+                if profile is not None and self._profile_says_clean(profile, col, dtype):
+                    continue
                 
                 if isinstance(dtype, (SA_Integer, SA_Float)):
                     numeric_series = pd.to_numeric(df_local[col], errors="coerce")
@@ -888,7 +981,7 @@ class DataUploadService:
                 elif isinstance(dtype, SA_NVARCHAR) and getattr(dtype, "length", None):
                     max_len = int(dtype.length)
                     str_series = df_local[col].astype(str)
-                    mask = str_series.str.len() > max_len
+                    mask = nvarchar_lengths(str_series) > max_len
                     bad_count = int(mask.sum())
                     if bad_count > 0:
                         examples = str_series.loc[mask].str[:50].head(max_examples).tolist()
@@ -32,7 +32,7 @@ class DataValidationService:
 
     def validate_data_in_staging(self, staging_table: str, logic_type: str, required_cols: Dict, 
                                 schema_name: str = 'bronze', log_func=None, progress_callback=None, 
-                                date_format: str = 'UK') -> Dict:
+                                date_format: str = 'UK', profile=None, plan=None) -> Dict:
         """
         Validate data correctness in staging table using modular validation approach
         
@@ -44,6 +44,8 @@ class DataValidationService:
             log_func: Function for logging
             progress_callback: Function to call with progress updates (progress, phase, details)
             date_format: Date format preference ('UK' for DD-MM or 'US' for MM-DD)
+            profile: Client-side DataProfile; checks it already answers are skipped
+            plan: ConversionPlan of this upload (compiled cleaning expressions / predicates)
             
         Returns:
             Dict: Validation results {'is_valid': bool, 'issues': [...], 'summary': str}
@@ -55,7 +57,9 @@ class DataValidationService:
             schema_name=schema_name,
             log_func=log_func,
             progress_callback=progress_callback,
-            date_format=date_format
+            date_format=date_format,
+            profile=profile,
+            plan=plan
         )
     
     def get_validation_statistics(self, staging_table: str, schema_name: str = 'bronze') -> Dict:
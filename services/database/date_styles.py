@@ -0,0 +1,120 @@
+"""
+Learned Date Styles for PIPELINE_SQLSERVER
+
+Each source date column almost always uses one format. The style is inferred from
+the client-side column profile (`date_format_matches`) and remembered per logic type
+and column in config/date_styles.json, so later loads use it even without a profile.
+
+The conversion plan tries the learned style first (one TRY_CONVERT for the bulk of the
+rows) and keeps the full style chain of the date format preference for residual rows,
+so the set of accepted values does not change. Only styles of the preference's own
+family are learned (LEARNABLE_DATE_STYLES): promoting the fallback MM/DD style of a UK
+type would flip how ambiguous values such as 01/02/2024 are read.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.types import DATE, DateTime
+
+from constants import DatabaseConstants
+from utils.sql_utils import DATE_FORMAT_STYLES, LEARNABLE_DATE_STYLES
+
+
+def infer_date_style(column_profile, date_format: str = 'UK') -> Optional[int]:
+    """
+    เลือก TRY_CONVERT style เดียวที่ตรงกับค่าส่วนใหญ่ของคอลัมน์จาก ColumnProfile
+
+    นับเฉพาะ LEARNABLE_DATE_STYLES ของ date format preference; style ต้องตรงอย่างน้อย
+    DATE_STYLE_MIN_SHARE ของค่าที่ไม่ว่าง (เสมอกันเลือกตามลำดับของ preference)
+    """
+    if column_profile is None or not column_profile.date_format_matches:
+        return None
+    non_blank = column_profile.rows - column_profile.null_count
+    if non_blank <= 0:
+        return None
+
+    styles = LEARNABLE_DATE_STYLES['UK' if date_format == 'UK' else 'US']
+    matches: Dict[int, int] = {}
+    for fmt, count in column_profile.date_format_matches.items():
+        style = DATE_FORMAT_STYLES.get(fmt)
+        if style in styles:
+            matches[style] = matches.get(style, 0) + count
+    if not matches:
+        return None
+
+    best = max(matches, key=lambda style: (matches[style], -styles.index(style)))
+    if matches[best] < non_blank * DatabaseConstants.DATE_STYLE_MIN_SHARE:
+        return None
+    return best
+
+
+class DateStyleStore:
+    """Learned date style ต่อ (logic type, column) ที่บันทึกไว้ใน config/date_styles.json"""
+
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls, logic_type: str, date_format: str = 'UK') -> Dict[str, int]:
+        """Styles ที่เรียนรู้ไว้ของประเภทไฟล์นี้ (เฉพาะที่เรียนรู้ภายใต้ date format เดียวกัน)"""
+        try:
+            from config.json_manager import json_manager
+            with cls._lock:
+                entries = json_manager.load('date_styles').get('types', {}).get(logic_type, {})
+        except Exception:
+            return {}
+        # styles นอก family (เช่น 101 ที่เคยเรียนรู้ไว้ให้ประเภทไฟล์ UK) ถูกข้าม
+        learnable = LEARNABLE_DATE_STYLES['UK' if date_format == 'UK' else 'US']
+        return {
+            col: entry['style'] for col, entry in entries.items()
+            if entry.get('date_format') == date_format and entry.get('style') in learnable
+        }
+
+    @classmethod
+    def save(cls, logic_type: str, styles: Dict[str, int], date_format: str = 'UK') -> bool:
+        """บันทึก styles ที่เรียนรู้ใหม่ (คอลัมน์อื่นของประเภทไฟล์นี้คงเดิม)"""
+        try:
+            from config.json_manager import json_manager
+            with cls._lock:
+                content = json_manager.load('date_styles')
+                types = dict(content.get('types', {}))
+                entries = dict(types.get(logic_type, {}))
+                now = time.time()
+                for col, style in styles.items():
+                    entries[col] = {'style': style, 'date_format': date_format, 'learned_at': now}
+                types[logic_type] = entries
+                return json_manager.save('date_styles', {'types': types})
+        except Exception:
+            return False
+
+    @classmethod
+    def resolve(cls, logic_type: str, required_cols: Dict, date_format: str = 'UK',
+                profile=None, log_func=None) -> Dict[str, int]:
+        """
+        Style ของทุกคอลัมน์วันที่: ใช้ผลจาก profile ของ batch นี้ก่อน แล้วจึงค่าที่บันทึกไว้
+
+        Styles ที่ profile ยืนยันและต่างจากค่าที่บันทึกไว้จะถูกบันทึกสำหรับการโหลดครั้งถัดไป
+        """
+        date_cols = [
+            col for col, sa_type in required_cols.items()
+            if not col.startswith('_') and isinstance(sa_type, (DATE, DateTime))
+        ]
+        if not date_cols:
+            return {}
+
+        stored = cls.load(logic_type, date_format)
+        styles = {col: stored[col] for col in date_cols if col in stored}
+
+        learned = {}
+        if profile is not None:
+            for col in date_cols:
+                style = infer_date_style(profile.get(col), date_format)
+                if style is not None and styles.get(col) != style:
+                    learned[col] = style
+        if learned:
+            styles.update(learned)
+            if cls.save(logic_type, learned, date_format) and log_func:
+                summary = ", ".join(f"{col}={style}" for col, style in learned.items())
+                log_func(f"Learned date styles: {summary}")
+        return styles
@@ -5,11 +5,12 @@ Manages database schema operations
 """
 
 import logging
-from tkinter import messagebox
 from typing import List, Tuple
 
 from sqlalchemy import text
 
+from utils.dialogs import messagebox
+
 
 class SchemaService:
     """
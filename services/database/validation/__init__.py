@@ -9,6 +9,7 @@ from .string_validator import StringValidator
 from .boolean_validator import BooleanValidator
 from .schema_validator import SchemaValidator
 from .index_manager import IndexManager
+from .validation_scheduler import ValidationScheduler
 from .main_validator import MainValidator
 
 __all__ = [
@@ -19,5 +20,6 @@ __all__ = [
     'BooleanValidator',
     'SchemaValidator',
     'IndexManager',
+    'ValidationScheduler',
     'MainValidator'
 ]
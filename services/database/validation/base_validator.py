@@ -59,7 +59,7 @@ class BaseValidator(ABC):
         """
         return f"[{col_name}]"
     
-    def get_cleaned_column_expression(self, col_name: str, cleaning_type: str = 'basic') -> str:
+    def get_cleaned_column_expression(self, col_name: str, cleaning_type: str = 'basic', plan=None) -> str:
         """
         สร้าง SQL expression สำหรับทำความสะอาดข้อมูล
         แปลงเครื่องหมาย '-' เดี่ยวๆ ให้เป็นค่าว่างเฉพาะชนิดตัวเลขและวันที่
@@ -67,10 +67,13 @@ class BaseValidator(ABC):
         Args:
             col_name: Column name
             cleaning_type: Type of cleaning ('basic', 'numeric', 'date')
+            plan: ConversionPlan (ถ้ามี ใช้ expression/คอลัมน์ `__clean` ที่ compile ไว้แล้ว)
             
         Returns:
             str: SQL expression for cleaning
         """
+        if plan is not None and plan.has_clean(col_name):
+            return plan.clean_expression(col_name)
         # Use shared utility function to ensure consistency
         return get_cleaning_expression(col_name, cleaning_type)
     
@@ -6,6 +6,7 @@ from typing import List, Dict
 from sqlalchemy import text
 from sqlalchemy.types import DATE, DateTime
 
+from utils.sql_utils import get_date_error_condition, get_date_styles
 from .base_validator import BaseValidator
 
 
@@ -37,11 +38,12 @@ class DateValidator(BaseValidator):
         """
         issues = []
         date_format = kwargs.get('date_format', 'UK')
+        plan = kwargs.get('plan')
         
         for col in columns:
             try:
                 issue = self._validate_single_date_column(
-                    conn, staging_table, schema_name, col, total_rows, date_format, log_func
+                    conn, staging_table, schema_name, col, total_rows, date_format, log_func, plan
                 )
                 if issue:
                     issues.append(issue)
@@ -52,7 +54,7 @@ class DateValidator(BaseValidator):
         return issues
     
     def _validate_single_date_column(self, conn, staging_table: str, schema_name: str, 
-                                    col: str, total_rows: int, date_format: str, log_func) -> Dict:
+                                    col: str, total_rows: int, date_format: str, log_func, plan=None) -> Dict:
         """
         ตรวจสอบคอลัมน์วันที่เดียว
         
@@ -64,17 +66,21 @@ class DateValidator(BaseValidator):
             total_rows: Total number of rows
             date_format: Date format preference ('UK' or 'US')
             log_func: Logging function
+            plan: ConversionPlan ของ upload นี้ (ใช้ expression ที่ compile ไว้แล้ว)
             
         Returns:
             Dict: Validation issue หรือ None ถ้าไม่มีปัญหา
         """
         # สร้าง expression สำหรับทำความสะอาดข้อมูล
-        cleaned_col_expression = self.get_cleaned_column_expression(col, 'date')
+        cleaned_col_expression = self.get_cleaned_column_expression(col, 'date', plan)
+        where_condition = self.get_error_condition(col, date_format, plan=plan)
         
         # สร้าง query สำหรับตรวจสอบรูปแบบวันที่
-        error_query = self._build_date_validation_query(
-            staging_table, schema_name, cleaned_col_expression, date_format
-        )
+        error_query = f"""
+            SELECT COUNT(*) as error_count
+            FROM {schema_name}.{staging_table}
+            WHERE {where_condition}
+        """
         
         result = self.execute_query_safely(
             conn, error_query, f"Error checking date column {col}", log_func
@@ -88,11 +94,10 @@ class DateValidator(BaseValidator):
         if error_count > 0:
             # ดึงข้อมูล debug เพิ่มเติม
             debug_info = self._get_date_debug_info(
-                conn, staging_table, schema_name, cleaned_col_expression, col
+                conn, staging_table, schema_name, cleaned_col_expression, col, date_format
             )
             
             # ดึงตัวอย่างข้อมูลที่มีปัญหา
-            where_condition = self._build_date_error_condition(cleaned_col_expression, date_format)
             examples = self.get_sample_examples(
                 conn, staging_table, schema_name, where_condition, col
             )
@@ -123,43 +128,15 @@ class DateValidator(BaseValidator):
         Returns:
             str: SQL query
         """
-        if date_format == 'UK':  # DD-MM format
-            query = f"""
-                SELECT COUNT(*) as error_count
-                FROM {schema_name}.{staging_table}
-                WHERE {cleaned_col_expression} IS NOT NULL
-                AND CASE 
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 103) IS NOT NULL THEN 1  -- DD/MM/YYYY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 104) IS NOT NULL THEN 1  -- DD.MM.YYYY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 105) IS NOT NULL THEN 1  -- DD-MM-YYYY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 5) IS NOT NULL THEN 1   -- DD-MM-YY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 3) IS NOT NULL THEN 1   -- DD/MM/YY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 4) IS NOT NULL THEN 1   -- DD.MM.YY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 121) IS NOT NULL THEN 1  -- YYYY-MM-DD HH:MI:SS
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 101) IS NOT NULL THEN 1  -- MM/DD/YYYY (fallback)
-                    ELSE 0
-                END = 0
-            """
-        else:  # US format - MM-DD
-            query = f"""
-                SELECT COUNT(*) as error_count
-                FROM {schema_name}.{staging_table}
-                WHERE {cleaned_col_expression} IS NOT NULL
-                AND CASE 
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 101) IS NOT NULL THEN 1  -- MM/DD/YYYY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 102) IS NOT NULL THEN 1  -- MM.DD.YYYY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 110) IS NOT NULL THEN 1  -- MM-DD-YYYY
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 121) IS NOT NULL THEN 1  -- YYYY-MM-DD HH:MI:SS
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 103) IS NOT NULL THEN 1  -- DD/MM/YYYY (fallback)
-                    ELSE 0
-                END = 0
-            """
-        
-        return query
+        return f"""
+            SELECT COUNT(*) as error_count
+            FROM {schema_name}.{staging_table}
+            WHERE {self._build_date_error_condition(cleaned_col_expression, date_format)}
+        """
     
     def _build_date_error_condition(self, cleaned_col_expression: str, date_format: str) -> str:
         """
-        สร้าง WHERE condition สำหรับหาข้อมูลที่มีปัญหา
+        สร้าง WHERE condition สำหรับหาข้อมูลที่มีปัญหา (styles ตาม utils.sql_utils.DATE_STYLES)
         
         Args:
             cleaned_col_expression: Cleaned column expression
@@ -168,36 +145,10 @@ class DateValidator(BaseValidator):
         Returns:
             str: WHERE condition
         """
-        if date_format == 'UK':
-            return f"""
-                {cleaned_col_expression} IS NOT NULL
-                AND CASE 
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 103) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 104) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 105) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 5) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 3) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 4) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 121) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 101) IS NOT NULL THEN 1
-                    ELSE 0
-                END = 0
-            """
-        else:
-            return f"""
-                {cleaned_col_expression} IS NOT NULL
-                AND CASE 
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 101) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 102) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 110) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 121) IS NOT NULL THEN 1
-                    WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 103) IS NOT NULL THEN 1
-                    ELSE 0
-                END = 0
-            """
+        return get_date_error_condition(cleaned_col_expression, date_format)
     
     def _get_date_debug_info(self, conn, staging_table: str, schema_name: str, 
-                           cleaned_col_expression: str, col: str) -> List[str]:
+                           cleaned_col_expression: str, col: str, date_format: str = 'UK') -> List[str]:
         """
         ดึงข้อมูล debug สำหรับการแสดงรายละเอียดปัญหา
         
@@ -207,35 +158,22 @@ class DateValidator(BaseValidator):
             schema_name: Schema name
             cleaned_col_expression: Cleaned column expression
             col: Column name
+            date_format: Date format preference ('UK' or 'US')
             
         Returns:
             List[str]: Debug information
         """
         safe_col = self.safe_column_name(col)
+        style_columns = ",\n".join(
+            f"                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, {style}) as style_{style}"
+            for style in get_date_styles(date_format)
+        )
         debug_query = f"""
             SELECT TOP 5 {safe_col} as raw_value, 
                            {cleaned_col_expression} as cleaned_value,
-                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, 103) as uk_103,
-                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, 104) as uk_104,
-                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, 105) as uk_105,
-                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, 5) as uk_5,
-                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, 3) as uk_3,
-                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, 4) as uk_4,
-                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, 121) as iso_121,
-                           TRY_CONVERT(DATETIME, {cleaned_col_expression}, 101) as us_101
+{style_columns}
             FROM {schema_name}.{staging_table}
-            WHERE {cleaned_col_expression} IS NOT NULL
-            AND CASE 
-                WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 103) IS NOT NULL THEN 1
-                WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 104) IS NOT NULL THEN 1
-                WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 105) IS NOT NULL THEN 1
-                WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 5) IS NOT NULL THEN 1
-                WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 3) IS NOT NULL THEN 1
-                WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 4) IS NOT NULL THEN 1
-                WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 121) IS NOT NULL THEN 1
-                WHEN TRY_CONVERT(DATETIME, {cleaned_col_expression}, 101) IS NOT NULL THEN 1
-                ELSE 0
-            END = 0
+            WHERE {self._build_date_error_condition(cleaned_col_expression, date_format)}
             ORDER BY {safe_col}
         """
         
@@ -251,6 +189,23 @@ class DateValidator(BaseValidator):
         except Exception:
             return []
     
+    def get_error_condition(self, col: str, date_format: str = 'UK', plan=None, **kwargs) -> str:
+        """
+        สร้าง WHERE condition สำหรับแถวที่แปลงเป็นวันที่ไม่ได้
+
+        Args:
+            col: Column name
+            date_format: Date format preference ('UK' or 'US')
+            plan: ConversionPlan (ถ้ามี ใช้ condition ที่ compile ไว้แล้ว)
+
+        Returns:
+            str: WHERE condition
+        """
+        if plan is not None and plan.has_check(col, date_format):
+            return plan.error_condition(col)
+        cleaned_col_expression = self.get_cleaned_column_expression(col, 'date')
+        return self._build_date_error_condition(cleaned_col_expression, date_format)
+
     def get_date_columns(self, required_cols: Dict) -> List[str]:
         """
         ดึงรายชื่อคอลัมน์ที่เป็นประเภทวันที่
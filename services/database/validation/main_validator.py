@@ -3,10 +3,12 @@ Main validation orchestrator that coordinates all validation modules
 """
 
 import logging
-from typing import Dict, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+from typing import Dict, List, Tuple
 from sqlalchemy import text
 
+from constants import ProcessingConstants
+from services.file_type_plan import ColumnGroups
 from .base_validator import BaseValidator
 from .numeric_validator import NumericValidator
 from .date_validator import DateValidator
@@ -14,6 +16,7 @@ from .string_validator import StringValidator
 from .boolean_validator import BooleanValidator
 from .schema_validator import SchemaValidator
 from .index_manager import IndexManager
+from .validation_scheduler import ValidationScheduler
 
 
 class MainValidator(BaseValidator):
@@ -39,6 +42,7 @@ class MainValidator(BaseValidator):
         self.boolean_validator = BooleanValidator(engine)
         self.schema_validator = SchemaValidator(engine)
         self.index_manager = IndexManager(engine)
+        self.scheduler = ValidationScheduler(engine)
     
     def validate(self, conn, staging_table: str, schema_name: str, columns: List, 
                 total_rows: int, chunk_size: int, log_func=None, **kwargs) -> List[Dict]:
@@ -67,7 +71,7 @@ class MainValidator(BaseValidator):
     
     def validate_data_in_staging(self, staging_table: str, logic_type: str, required_cols: Dict, 
                                 schema_name: str = 'bronze', log_func=None, progress_callback=None, 
-                                date_format: str = 'UK') -> Dict:
+                                date_format: str = 'UK', profile=None, plan=None) -> Dict:
         """
         Main method for validating data in staging table
         
@@ -79,6 +83,10 @@ class MainValidator(BaseValidator):
             log_func: Function for logging
             progress_callback: Function to call with progress updates (progress, phase, details)
             date_format: Date format preference ('UK' for DD-MM or 'US' for MM-DD)
+            profile: Client-side DataProfile (services/file/column_profiler.py); column
+                checks it has already proven clean are skipped
+            plan: ConversionPlan (services/database/conversion_plan.py); predicates and
+                cleaned-value expressions are taken from it instead of being rebuilt
             
         Returns:
             Dict: Validation results {'is_valid': bool, 'issues': [...], 'summary': str}
@@ -105,14 +113,38 @@ class MainValidator(BaseValidator):
             if log_func:
                 log_func(f"Validating {total_rows:,} rows in staging table")
             
+            # สร้าง validation phases ก่อน เพื่อรู้ว่าคอลัมน์ไหนยังต้องตรวจใน SQL
+            validation_phases, skipped_checks = self._build_validation_phases(required_cols, date_format, profile, plan)
+            if log_func and skipped_checks:
+                log_func(f"   Skipped {len(skipped_checks)} column check(s) already verified by client-side profile: "
+                         f"{', '.join(skipped_checks)}")
+
+            # Sampled pre-check (two-stage mode, large tables only) ก่อนสร้าง index
+            if validation_phases and self._use_sampled_precheck(total_rows):
+                if progress_callback:
+                    progress_callback(0.12, "Sampled Pre-check", "Estimating error rates from a sample...")
+                failing_issues, validation_phases = self._run_sampled_precheck(
+                    staging_table, schema_name, validation_phases, total_rows, date_format, log_func, plan
+                )
+                if failing_issues:
+                    validation_results['is_valid'] = False
+                    validation_results['issues'].extend(failing_issues)
+                    validation_phases = {}
+                    if log_func:
+                        log_func(f"   Early abort: {len(failing_issues)} column(s) clearly exceed "
+                                 f"{ProcessingConstants.VALIDATION_ERROR_THRESHOLD}% invalid rows - skipping full scan")
+            
+            index_cols = self._get_phase_columns(validation_phases)
+            index_required_cols = {col: dtype for col, dtype in required_cols.items() if col in index_cols}
+
             # Phase 2: Create temporary indexes for performance
             if progress_callback:
                 progress_callback(0.15, "Index Creation", "Creating temporary indexes for faster validation...")
             
-            if log_func:
+            if log_func and index_required_cols:
                 log_func(f"   Creating temporary indexes for better performance...")
             
-            index_count = self.index_manager.create_temp_indexes(staging_table, required_cols, schema_name, log_func)
+            index_count = self.index_manager.create_temp_indexes(staging_table, index_required_cols, schema_name, log_func)
             
             # Phase 3: Schema compatibility check
             if progress_callback:
@@ -126,38 +158,25 @@ class MainValidator(BaseValidator):
             )
             if schema_issues:
                 validation_results['warnings'].extend(schema_issues)
-            
-            # Phase 4: Build and run validation phases
-            validation_phases = self._build_validation_phases(required_cols, date_format)
-            
-            if log_func and validation_phases:
-                log_func(f"   Running {len(validation_phases)} validation phases...")
-            
-            # Phase 5-8: Run validation phases
-            phase_progress_step = 0.6 / len(validation_phases) if validation_phases else 0
-            base_progress = 0.3
-            
-            for i, (phase_name, phase_data) in enumerate(validation_phases.items(), 1):
-                current_progress = base_progress + (i * phase_progress_step)
-                
-                if progress_callback:
-                    progress_callback(current_progress, f"Validation Phase {i}", f"Running {phase_name}...")
-                
-                if log_func:
-                    log_func(f"   Phase {i}/{len(validation_phases)}: {phase_name}...")
-                
-                phase_issues = self._run_validation_phase(
-                    phase_name, phase_data, schema_name, staging_table, 
-                    total_rows, log_func, progress_callback, current_progress, date_format
+
+            # Phase 4: Run all column checks of all phases as one task list (most expensive first)
+            if validation_phases:
+                phase_issues = self._run_validation_tasks(
+                    validation_phases, schema_name, staging_table, total_rows,
+                    log_func, progress_callback, date_format, plan, profile
                 )
-                
-                # Process phase results
-                for issue in phase_issues:
-                    if issue['percentage'] > 10:
-                        validation_results['is_valid'] = False
-                        validation_results['issues'].append(issue)
-                    elif issue['percentage'] > 1:
-                        validation_results['warnings'].append(issue)
+                for phase_name in validation_phases:
+                    issues = phase_issues.get(phase_name, [])
+                    self._log_phase_issues(phase_name, issues, log_func)
+
+                    # Process phase results
+                    for issue in issues:
+                        if (issue['validation_type'] in ProcessingConstants.STRICT_VALIDATION_TYPES
+                                or issue['percentage'] > ProcessingConstants.VALIDATION_ERROR_THRESHOLD):
+                            validation_results['is_valid'] = False
+                            validation_results['issues'].append(issue)
+                        elif issue['percentage'] > ProcessingConstants.VALIDATION_WARNING_THRESHOLD:
+                            validation_results['warnings'].append(issue)
             
             # Phase 9: Final summary
             if progress_callback:
@@ -169,7 +188,7 @@ class MainValidator(BaseValidator):
             if log_func:
                 log_func(f"   Cleaning up temporary indexes...")
             
-            self.index_manager.drop_temp_indexes(staging_table, required_cols, schema_name, log_func)
+            self.index_manager.drop_temp_indexes(staging_table, index_required_cols, schema_name, log_func)
             
             if progress_callback:
                 progress_callback(1.0, "Completed", validation_results['summary'])
@@ -202,25 +221,40 @@ class MainValidator(BaseValidator):
             result = conn.execute(text(f"SELECT COUNT(*) FROM {schema_name}.{staging_table}"))
             return result.scalar()
     
-    def _build_validation_phases(self, required_cols: Dict, date_format: str) -> Dict:
+    def _build_validation_phases(self, required_cols: Dict, date_format: str, profile=None, plan=None):
         """
         Build validation phases for chunked processing
 
         Args:
             required_cols: Required columns and data types
             date_format: Date format preference
+            profile: Client-side DataProfile (optional)
+            plan: ConversionPlan (optional); its pre-computed column groups replace the
+                per-column type checks
 
         Returns:
-            Dict: Validation phases configuration
+            Tuple[Dict, List[str]]: (validation phases configuration, skipped "column (check)" labels)
         """
         phases = {}
+        skipped = []
 
         # กรองออก metadata columns (ไม่ต้อง validate เพราะสร้างโดยระบบ)
         metadata_cols = {'_loaded_at', '_created_at', '_source_file', '_batch_id', '_upsert_hash', 'updated_at'}
         staging_cols = {col: dtype for col, dtype in required_cols.items() if col not in metadata_cols}
-        
+        if plan is not None:
+            groups = plan.groups
+        else:
+            groups = ColumnGroups(
+                tuple(self.numeric_validator.get_numeric_columns(staging_cols)),
+                tuple(self.date_validator.get_date_columns(staging_cols)),
+                tuple(self.string_validator.get_sized_string_columns(staging_cols)),
+            )
+
         # Phase 1: Numeric validation
-        numeric_columns = self.numeric_validator.get_numeric_columns(staging_cols)
+        numeric_columns = [col for col in groups.numeric if col in staging_cols]
+        if profile is not None:
+            skipped += [f"{col} (numeric)" for col in numeric_columns if profile.is_numeric_clean(col)]
+            numeric_columns = [col for col in numeric_columns if not profile.is_numeric_clean(col)]
         if numeric_columns:
             phases['Numeric Data Types'] = {
                 'type': 'numeric_validation',
@@ -230,7 +264,10 @@ class MainValidator(BaseValidator):
             }
         
         # Phase 2: Date validation
-        date_columns = self.date_validator.get_date_columns(staging_cols)
+        date_columns = [col for col in groups.date if col in staging_cols]
+        if profile is not None:
+            skipped += [f"{col} (date)" for col in date_columns if profile.is_date_clean(col, date_format)]
+            date_columns = [col for col in date_columns if not profile.is_date_clean(col, date_format)]
         if date_columns:
             phases['Date/DateTime Formats'] = {
                 'type': 'date_validation',
@@ -248,139 +285,255 @@ class MainValidator(BaseValidator):
                 'columns': boolean_columns,
                 'chunk_size': 20000
             }
+
+        # Phase 4: String length validation (เฉพาะคอลัมน์ NVARCHAR(n))
+        sized_string_columns = [(col, length) for col, length in groups.sized_string if col in staging_cols]
+        if profile is not None:
+            skipped += [f"{col} (length)" for col, length in sized_string_columns if profile.fits_length(col, length)]
+            sized_string_columns = [
+                (col, length) for col, length in sized_string_columns if not profile.fits_length(col, length)
+            ]
+        if sized_string_columns:
+            phases['String Lengths'] = {
+                'type': 'string_length_validation',
+                'validator': self.string_validator,
+                'columns': sized_string_columns,
+                'chunk_size': 20000
+            }
         
-        return phases
-    
-    def _run_validation_phase(self, phase_name: str, phase_data: Dict, schema_name: str, 
-                             staging_table: str, total_rows: int, log_func, progress_callback, 
-                             base_progress: float, date_format: str) -> List[Dict]:
+        return phases, skipped
+
+    def _use_sampled_precheck(self, total_rows: int) -> bool:
+        """Two-stage validation is used for large staging tables unless app_settings says 'full'"""
+        if total_rows < ProcessingConstants.VALIDATION_SAMPLE_MIN_TABLE_ROWS:
+            return False
+        try:
+            from config.json_manager import json_manager
+            mode = json_manager.load('app_settings').get(
+                'validation_mode', ProcessingConstants.VALIDATION_MODE_TWO_STAGE
+            )
+        except Exception:
+            mode = ProcessingConstants.VALIDATION_MODE_TWO_STAGE
+        return mode == ProcessingConstants.VALIDATION_MODE_TWO_STAGE
+
+    @staticmethod
+    def _wilson_bounds(errors: int, sample_rows: int, z: float = ProcessingConstants.VALIDATION_SAMPLE_Z) -> Tuple[float, float]:
         """
-        Run a single validation phase
-        
+        Wilson score interval of the error rate (0-1) from a sample
+
+        Args:
+            errors: Invalid rows in the sample
+            sample_rows: Sample size
+            z: z-score of the confidence level
+
+        Returns:
+            Tuple[float, float]: (lower bound, upper bound)
+        """
+        if sample_rows <= 0:
+            return 0.0, 1.0
+        p = errors / sample_rows
+        denom = 1 + z * z / sample_rows
+        centre = (p + z * z / (2 * sample_rows)) / denom
+        margin = z * math.sqrt(p * (1 - p) / sample_rows + z * z / (4 * sample_rows * sample_rows)) / denom
+        return max(0.0, centre - margin), min(1.0, centre + margin)
+
+    def _query_sample_errors(self, conn, staging_table: str, schema_name: str, conditions: List[str],
+                             total_rows: int) -> Tuple[int, List[int]]:
+        """
+        Count invalid rows per condition in a random row sample of the staging table
+
+        Every row is kept independently with probability 1/k (CHECKSUM(NEWID()) per row), so
+        the sample is iid as the Wilson bounds assume. TABLESAMPLE (whole pages) and TOP N
+        without ORDER BY (first rows in heap order) are biased by the position of rows in
+        the source file and are not used.
+
+        Returns:
+            Tuple[int, List[int]]: (sample rows, invalid rows per condition)
+        """
+        sample_rows = ProcessingConstants.VALIDATION_SAMPLE_ROWS
+        sums_sql = ", ".join(
+            f"SUM(CASE WHEN {cond} THEN 1 ELSE 0 END) AS e{i}" for i, cond in enumerate(conditions)
+        )
+        # ขนาด sample คาดหมาย = total_rows / k >= sample_rows (ไม่ตัดด้วย TOP เพราะจะเอียงไปทางแถวต้นตาราง)
+        # modulo ก่อน ABS เพื่อไม่ให้ ABS(-2147483648) overflow
+        k = max(1, total_rows // sample_rows)
+        row = conn.execute(text(
+            f"SELECT COUNT(*) AS sample_rows, {sums_sql} FROM {schema_name}.{staging_table} "
+            f"WHERE ABS(CHECKSUM(NEWID()) % {k}) = 0"
+        )).fetchone()
+        if not row or (row[0] or 0) < sample_rows // 2:
+            return 0, [0] * len(conditions)
+        return int(row[0] or 0), [int(v or 0) for v in row[1:]]
+
+    def _run_sampled_precheck(self, staging_table: str, schema_name: str, validation_phases: Dict,
+                              total_rows: int, date_format: str, log_func=None, plan=None) -> Tuple[List[Dict], Dict]:
+        """
+        Stage 1 of two-stage validation: estimate each column's error rate from a sample
+
+        Decision per column (bounds at VALIDATION_SAMPLE_Z):
+        - lower bound above the error threshold  -> clearly failing, abort the load
+        - upper bound at/below the warning threshold -> clearly fine, no full scan
+        - otherwise (near a threshold) -> full scan in stage 2
+
+        Strict checks (STRICT_VALIDATION_TYPES, e.g. string lengths) are not sampled: any
+        invalid row rejects the load, so they always get the full scan.
+
         Args:
-            phase_name: Name of the validation phase
-            phase_data: Phase configuration data
-            schema_name: Schema name
             staging_table: Staging table name
-            total_rows: Total number of rows
-            log_func: Logging function
-            progress_callback: Progress callback function
-            base_progress: Base progress value
+            schema_name: Schema name
+            validation_phases: Phases from _build_validation_phases
+            total_rows: Total rows in staging table
             date_format: Date format preference
-            
+            log_func: Logging function
+            plan: ConversionPlan (optional)
+
         Returns:
-            List[Dict]: List of validation issues
+            Tuple[List[Dict], Dict]: (issues of clearly failing columns, phases still needing a full scan)
         """
-        issues = []
-        validator = phase_data['validator']
-        columns = phase_data['columns']
-        chunk_size = phase_data.get('chunk_size', 10000)
-        
+        checks = []  # (phase_name, column entry, column name, condition)
+        for phase_name, phase_data in validation_phases.items():
+            validator = phase_data['validator']
+            if not self._is_sampled_phase(phase_data):
+                continue
+            for entry in phase_data['columns']:
+                if isinstance(entry, tuple):
+                    col, max_length = entry
+                    cond = validator.get_error_condition(col, max_length=max_length)
+                else:
+                    col = entry
+                    cond = validator.get_error_condition(col, date_format=date_format, plan=plan)
+                checks.append((phase_name, entry, col, cond))
+
+        if not checks:
+            return [], validation_phases
+
         try:
-            # สำหรับคอลัมน์หลายตัว ใช้ parallel processing
-            if len(columns) > 1 and phase_data['type'] in ['numeric_validation', 'date_validation']:
-                issues = self._validate_columns_parallel(
-                    validator, staging_table, schema_name, columns, 
-                    total_rows, chunk_size, log_func, date_format=date_format
+            with self.engine.connect() as conn:
+                sample_rows, error_counts = self._query_sample_errors(
+                    conn, staging_table, schema_name, [c[3] for c in checks], total_rows
                 )
-            else:
-                # สำหรับคอลัมน์เดียวหรือ validation ประเภทอื่น ใช้แบบปกติ
-                with self.engine.connect() as conn:
-                    issues = validator.validate(
-                        conn, staging_table, schema_name, columns, 
-                        total_rows, chunk_size, log_func, date_format=date_format
-                    )
-            
-            # Log results
-            if issues:
-                if log_func:
-                    log_func(f"      Error: Found {len(issues)} issue type(s) in {phase_name}")
-                
-                for issue in issues:
-                    if log_func and issue['error_count'] > 0:
-                        status = "Error: " if issue['percentage'] > 10 else "Warning: "
-                        column_name = issue['column'] if isinstance(issue['column'], str) else str(issue['column'])
-                        examples = issue['examples'][:100] if isinstance(issue['examples'], str) else str(issue['examples'])[:100]
-                        log_func(f"      {status} {column_name}: {issue['error_count']:,} invalid rows ({issue['percentage']}%) Examples: {examples}")
-            else:
+                if sample_rows == 0:
+                    return [], validation_phases
+
                 if log_func:
-                    log_func(f"      {phase_name} - No issues found")
-                    
-        except Exception as phase_error:
+                    log_func(f"   Sampled pre-check on {sample_rows:,} of {total_rows:,} rows:")
+
+                error_limit = ProcessingConstants.VALIDATION_ERROR_THRESHOLD / 100
+                warning_limit = ProcessingConstants.VALIDATION_WARNING_THRESHOLD / 100
+                failing_issues = []
+                full_scan_entries = set()
+
+                for (phase_name, entry, col, cond), errors in zip(checks, error_counts):
+                    lower, upper = self._wilson_bounds(errors, sample_rows)
+                    if lower > error_limit:
+                        decision = "clearly failing"
+                        examples = self.get_sample_examples(conn, staging_table, schema_name, cond, col)
+                        failing_issues.append(self.create_issue_dict(
+                            validation_type=validation_phases[phase_name]['type'],
+                            column=col,
+                            error_count=int(round(errors / sample_rows * total_rows)),
+                            total_rows=total_rows,
+                            examples=[str(ex)[:50] for ex in examples],
+                            sampled=True,
+                            sample_rows=sample_rows,
+                            sample_errors=errors,
+                            error_rate_bounds=(round(lower * 100, 2), round(upper * 100, 2))
+                        ))
+                    elif upper <= warning_limit:
+                        decision = "clearly valid, full scan skipped"
+                    else:
+                        decision = "near threshold, full scan"
+                        full_scan_entries.add((phase_name, entry))
+
+                    if log_func:
+                        log_func(f"      {col}: {errors:,}/{sample_rows:,} invalid "
+                                 f"(est. {lower * 100:.2f}%-{upper * 100:.2f}%) -> {decision}")
+
+        except Exception as e:
             if log_func:
-                log_func(f"      Warning: Could not run {phase_name}: {phase_error}")
-        
-        return issues
+                log_func(f"   Warning: Sampled pre-check failed, running full validation: {e}")
+            return [], validation_phases
+
+        remaining_phases = {}
+        for phase_name, phase_data in validation_phases.items():
+            if not self._is_sampled_phase(phase_data):
+                remaining_phases[phase_name] = phase_data
+                continue
+            columns = [entry for entry in phase_data['columns'] if (phase_name, entry) in full_scan_entries]
+            if columns:
+                remaining_phases[phase_name] = {**phase_data, 'columns': columns}
+
+        return failing_issues, remaining_phases
+
+    @staticmethod
+    def _is_sampled_phase(phase_data: Dict) -> bool:
+        """Phase ที่ sampled pre-check ตัดสินแทน full scan ได้ (ไม่รวม strict checks)"""
+        return (hasattr(phase_data['validator'], 'get_error_condition')
+                and phase_data['type'] not in ProcessingConstants.STRICT_VALIDATION_TYPES)
+
+    def _get_phase_columns(self, validation_phases: Dict) -> set:
+        """Collect column names that still need server-side validation"""
+        columns = set()
+        for phase_data in validation_phases.values():
+            for col in phase_data['columns']:
+                columns.add(col[0] if isinstance(col, tuple) else col)
+        return columns
     
-    def _validate_columns_parallel(self, validator, staging_table: str, schema_name: str, 
-                                 columns: List, total_rows: int, chunk_size: int, 
-                                 log_func, **kwargs) -> List[Dict]:
+    def _run_validation_tasks(self, validation_phases: Dict, schema_name: str, staging_table: str,
+                              total_rows: int, log_func, progress_callback, date_format: str,
+                              plan=None, profile=None) -> Dict[str, List[Dict]]:
         """
-        Validate multiple columns in parallel for improved performance
-        
+        Run every column check of every phase through the validation scheduler
+
         Args:
-            validator: Validator instance
-            staging_table: Staging table name
+            validation_phases: Phases from _build_validation_phases
             schema_name: Schema name
-            columns: List of columns
+            staging_table: Staging table name
             total_rows: Total number of rows
-            chunk_size: Chunk size
             log_func: Logging function
-            **kwargs: Additional parameters
-            
+            progress_callback: Progress callback function
+            date_format: Date format preference
+            plan: ConversionPlan (optional)
+            profile: Client-side DataProfile (optional, used for cost estimates)
+
         Returns:
-            List[Dict]: All validation issues
+            Dict[str, List[Dict]]: Validation issues per phase name
         """
-        all_issues = []
-        
-        def validate_single_column(col):
-            """ตรวจสอบคอลัมน์เดียวในแต่ละ thread"""
-            try:
-                with self.engine.connect() as conn:
-                    return validator.validate(
-                        conn, staging_table, schema_name, [col], 
-                        total_rows, chunk_size, None, **kwargs  # ไม่ส่ง log_func เพื่อป้องกัน race condition
-                    )
-            except Exception as e:
-                return []
-        
-        try:
-            # ใช้ ThreadPoolExecutor สำหรับ parallel processing
-            max_workers = min(len(columns), 3)  # จำกัดจำนวน threads ไม่เกิน 3
-            
-            if log_func:
-                log_func(f"      Processing {len(columns)} columns in parallel ({max_workers} threads)...")
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # ส่งงานแต่ละคอลัมน์ไปยัง thread แยกกัน
-                future_to_column = {executor.submit(validate_single_column, col): col for col in columns}
-                
-                # รวบรวมผลลัพธ์
-                for future in as_completed(future_to_column):
-                    col = future_to_column[future]
-                    try:
-                        issues = future.result()
-                        all_issues.extend(issues)
-                        if log_func and issues:
-                            log_func(f"        ✓ Column '{col}': {len(issues)} issue(s)")
-                    except Exception as e:
-                        if log_func:
-                            log_func(f"        Error: Error validating column '{col}': {e}")
-            
-            if log_func:
-                log_func(f"      Parallel validation completed: {len(all_issues)} total issue(s)")
-                
-        except Exception as e:
-            if log_func:
-                log_func(f"      Warning: Parallel validation failed, falling back to sequential: {e}")
-            # Fallback เป็นแบบปกติ
-            with self.engine.connect() as conn:
-                all_issues = validator.validate(
-                    conn, staging_table, schema_name, columns, 
-                    total_rows, chunk_size, log_func, **kwargs
-                )
-        
-        return all_issues
+        tasks = self.scheduler.build_tasks(validation_phases, date_format, plan, profile)
+        parallelism = self.scheduler.resolve_parallelism()
+
+        if log_func:
+            log_func(f"   Running {len(tasks)} column check(s) across {len(validation_phases)} "
+                     f"validation phases ({min(parallelism, len(tasks))} parallel)...")
+
+        progress = {'done': 0}
+
+        def on_task_done(task, issues):
+            progress['done'] += 1
+            if progress_callback:
+                progress_callback(0.3 + 0.6 * progress['done'] / len(tasks), task.phase_name,
+                                  f"Checked {task.column} ({progress['done']}/{len(tasks)})")
+
+        return self.scheduler.run(
+            tasks, staging_table, schema_name, total_rows, date_format, plan,
+            parallelism=parallelism, log_func=log_func, on_task_done=on_task_done
+        )
+
+    def _log_phase_issues(self, phase_name: str, issues: List[Dict], log_func) -> None:
+        """Log the results of one validation phase"""
+        if not log_func:
+            return
+        if not issues:
+            log_func(f"      {phase_name} - No issues found")
+            return
+
+        log_func(f"      Error: Found {len(issues)} issue type(s) in {phase_name}")
+        for issue in issues:
+            if issue['error_count'] > 0:
+                status = "Error: " if issue['percentage'] > 10 else "Warning: "
+                column_name = issue['column'] if isinstance(issue['column'], str) else str(issue['column'])
+                examples = issue['examples'][:100] if isinstance(issue['examples'], str) else str(issue['examples'])[:100]
+                log_func(f"      {status} {column_name}: {issue['error_count']:,} invalid rows ({issue['percentage']}%) Examples: {examples}")
     
     def _generate_summary(self, validation_results: Dict, log_func) -> str:
         """
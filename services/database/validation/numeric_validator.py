@@ -6,6 +6,7 @@ from typing import List, Dict
 from sqlalchemy import text
 from sqlalchemy.types import Integer as SA_Integer, Float as SA_Float
 
+from utils.sql_utils import get_numeric_error_condition
 from .base_validator import BaseValidator
 
 
@@ -35,11 +36,12 @@ class NumericValidator(BaseValidator):
             List[Dict]: List of validation issues
         """
         issues = []
+        plan = kwargs.get('plan')
         
         for col in columns:
             try:
                 issue = self._validate_single_numeric_column(
-                    conn, staging_table, schema_name, col, total_rows, log_func
+                    conn, staging_table, schema_name, col, total_rows, log_func, plan
                 )
                 if issue:
                     issues.append(issue)
@@ -50,7 +52,7 @@ class NumericValidator(BaseValidator):
         return issues
     
     def _validate_single_numeric_column(self, conn, staging_table: str, schema_name: str, 
-                                       col: str, total_rows: int, log_func) -> Dict:
+                                       col: str, total_rows: int, log_func, plan=None) -> Dict:
         """
         ตรวจสอบคอลัมน์ตัวเลขเดียว
         
@@ -61,19 +63,18 @@ class NumericValidator(BaseValidator):
             col: Column name
             total_rows: Total number of rows
             log_func: Logging function
+            plan: ConversionPlan ของ upload นี้ (ใช้ condition ที่ compile ไว้แล้ว)
             
         Returns:
             Dict: Validation issue หรือ None ถ้าไม่มีปัญหา
         """
-        # สร้าง expression สำหรับทำความสะอาดข้อมูล
-        cleaned_col_expression = self.get_cleaned_column_expression(col, 'numeric')
+        where_condition = self.get_error_condition(col, plan=plan)
         
         # นับจำนวน error
         error_query = f"""
             SELECT COUNT(*) as error_count
             FROM {schema_name}.{staging_table}
-            WHERE TRY_CAST({cleaned_col_expression} AS FLOAT) IS NULL 
-              AND NULLIF({cleaned_col_expression}, '') IS NOT NULL
+            WHERE {where_condition}
         """
         
         result = self.execute_query_safely(
@@ -87,11 +88,6 @@ class NumericValidator(BaseValidator):
         
         if error_count > 0:
             # ดึงตัวอย่างข้อมูลที่มีปัญหา
-            where_condition = f"""
-                TRY_CAST({cleaned_col_expression} AS FLOAT) IS NULL 
-                AND NULLIF({cleaned_col_expression}, '') IS NOT NULL
-            """
-            
             examples = self.get_sample_examples(
                 conn, staging_table, schema_name, where_condition, col
             )
@@ -106,6 +102,21 @@ class NumericValidator(BaseValidator):
         
         return None
     
+    def get_error_condition(self, col: str, plan=None, **kwargs) -> str:
+        """
+        สร้าง WHERE condition สำหรับแถวที่แปลงเป็นตัวเลขไม่ได้
+
+        Args:
+            col: Column name
+            plan: ConversionPlan (ถ้ามี ใช้ condition ที่ compile ไว้แล้ว)
+
+        Returns:
+            str: WHERE condition
+        """
+        if plan is not None and plan.has_check(col):
+            return plan.error_condition(col)
+        return get_numeric_error_condition(self.get_cleaned_column_expression(col, 'numeric'))
+
     def get_numeric_columns(self, required_cols: Dict) -> List[str]:
         """
         ดึงรายชื่อคอลัมน์ที่เป็นประเภทตัวเลข
@@ -4,8 +4,9 @@ Schema compatibility validation module
 
 from typing import List, Dict
 from sqlalchemy import text
-from sqlalchemy.types import Text as SA_Text
+from sqlalchemy.types import NVARCHAR as SA_NVARCHAR, Text as SA_Text
 
+from ..catalog_snapshot import CatalogSnapshot, get_final_table_name
 from .base_validator import BaseValidator
 
 
@@ -56,58 +57,57 @@ class SchemaValidator(BaseValidator):
         schema_issues = []
         
         try:
-            with self.engine.connect() as conn:
-                final_table = staging_table.replace('_staging', '')
-                
-                # ดึงข้อมูล schema ของ final table
-                db_columns = self._get_table_schema_info(conn, final_table, schema_name)
-                
-                if not db_columns:
-                    if log_func:
-                        log_func(f"   ℹ️  Final table {final_table} not found - skipping schema validation")
-                    return schema_issues
-                
-                # ตรวจสอบแต่ละคอลัมน์ (ข้ามคอลัมน์ระบบ และ metadata columns)
-                # Metadata columns ถูกสร้างอัตโนมัติโดยระบบ ไม่ต้อง validate
-                system_columns = {
-                    '_loaded_at', '_created_at', '_source_file', '_batch_id', '_upsert_hash'  # Metadata columns 
-                }
-
-                for col_name, expected_dtype in required_cols.items():
-                    # ข้ามคอลัมน์ระบบและ metadata columns
-                    if col_name in system_columns:
-                        continue
+            final_table = get_final_table_name(staging_table)
+            
+            # ดึงข้อมูล schema ของ final table จาก catalog snapshot (query เดียวต่อ schema)
+            db_columns = CatalogSnapshot.get_table_columns(self.engine, schema_name, final_table)
+            
+            if not db_columns:
+                if log_func:
+                    log_func(f"   ℹ️  Final table {final_table} not found - skipping schema validation")
+                return schema_issues
+            
+            # ตรวจสอบแต่ละคอลัมน์ (ข้ามคอลัมน์ระบบ และ metadata columns)
+            # Metadata columns ถูกสร้างอัตโนมัติโดยระบบ ไม่ต้อง validate
+            system_columns = {
+                '_loaded_at', '_created_at', '_source_file', '_batch_id', '_upsert_hash'  # Metadata columns 
+            }
 
-                    if col_name in db_columns:
-                        db_info = db_columns[col_name]
+            for col_name, expected_dtype in required_cols.items():
+                # ข้ามคอลัมน์ระบบและ metadata columns
+                if col_name in system_columns:
+                    continue
 
-                        # ตรวจสอบ Text fields ที่อาจมีปัญหา
-                        issue = self._check_text_field_compatibility(
-                            col_name, expected_dtype, db_info, log_func
-                        )
-                        if issue:
-                            schema_issues.append(issue)
+                if col_name in db_columns:
+                    db_info = db_columns[col_name]
 
-                        # ตรวจสอบ data type compatibility อื่นๆ
-                        other_issues = self._check_data_type_compatibility(
-                            col_name, expected_dtype, db_info, log_func
-                        )
-                        schema_issues.extend(other_issues)
-                    else:
-                        # คอลัมน์ไม่มีใน final table
-                        issue = {
-                            'validation_type': 'schema_missing_column',
-                            'column': col_name,
-                            'error_count': 0,
-                            'percentage': 0,
-                            'message': f"Column not found in final table {final_table}",
-                            'recommendation': "Column will be ignored during final import",
-                            'severity': 'warning'
-                        }
+                    # ตรวจสอบ Text fields ที่อาจมีปัญหา
+                    issue = self._check_text_field_compatibility(
+                        col_name, expected_dtype, db_info, log_func
+                    )
+                    if issue:
                         schema_issues.append(issue)
 
-                        if log_func:
-                            log_func(f"   ⚠️  {col_name}: Column not found in final table")
+                    # ตรวจสอบ data type compatibility อื่นๆ
+                    other_issues = self._check_data_type_compatibility(
+                        col_name, expected_dtype, db_info, log_func
+                    )
+                    schema_issues.extend(other_issues)
+                else:
+                    # คอลัมน์ไม่มีใน final table
+                    issue = {
+                        'validation_type': 'schema_missing_column',
+                        'column': col_name,
+                        'error_count': 0,
+                        'percentage': 0,
+                        'message': f"Column not found in final table {final_table}",
+                        'recommendation': "Column will be ignored during final import",
+                        'severity': 'warning'
+                    }
+                    schema_issues.append(issue)
+
+                    if log_func:
+                        log_func(f"   ⚠️  {col_name}: Column not found in final table")
         
         except Exception as e:
             if log_func:
@@ -115,45 +115,6 @@ class SchemaValidator(BaseValidator):
         
         return schema_issues
     
-    def _get_table_schema_info(self, conn, table_name: str, schema_name: str) -> Dict:
-        """
-        ดึงข้อมูล schema ของ table
-        
-        Args:
-            conn: Database connection
-            table_name: Table name
-            schema_name: Schema name
-            
-        Returns:
-            Dict: Table schema information
-        """
-        table_info_query = f"""
-            SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, 
-                   COLLATION_NAME, IS_NULLABLE, COLUMN_DEFAULT
-            FROM INFORMATION_SCHEMA.COLUMNS 
-            WHERE TABLE_SCHEMA = '{schema_name}' 
-            AND TABLE_NAME = '{table_name}'
-        """
-        
-        result = self.execute_query_safely(
-            conn, table_info_query, f"Error getting schema info for {table_name}"
-        )
-        
-        if result is None:
-            return {}
-        
-        db_columns = {}
-        for row in result.fetchall():
-            db_columns[row.COLUMN_NAME] = {
-                'data_type': row.DATA_TYPE,
-                'max_length': row.CHARACTER_MAXIMUM_LENGTH,
-                'collation': row.COLLATION_NAME,
-                'is_nullable': row.IS_NULLABLE,
-                'default_value': row.COLUMN_DEFAULT
-            }
-        
-        return db_columns
-    
     def _check_text_field_compatibility(self, col_name: str, expected_dtype, 
                                       db_info: Dict, log_func) -> Dict:
         """
@@ -187,6 +148,26 @@ class SchemaValidator(BaseValidator):
                     log_func(f"      ℹ️  {issue['recommendation']}")
                 
                 return issue
+        elif isinstance(expected_dtype, SA_NVARCHAR) and expected_dtype.length:
+            # NVARCHAR(n): เตือนเมื่อคอลัมน์ในฐานข้อมูลสั้นกว่า n (ALTER จะขยายให้ตอน upload)
+            db_length = db_info['max_length']
+            if db_info['data_type'] == 'nvarchar' and db_length not in (None, -1) and db_length < expected_dtype.length:
+                issue = {
+                    'validation_type': 'schema_mismatch',
+                    'column': col_name,
+                    'error_count': 0,
+                    'percentage': 0,
+                    'message': f"Configured as NVARCHAR({expected_dtype.length}) but database column is NVARCHAR({db_length})",
+                    'recommendation': "Column will be widened before the final import",
+                    'severity': 'info',
+                    'expected_type': f"NVARCHAR({expected_dtype.length})",
+                    'actual_type': f"NVARCHAR({db_length})"
+                }
+                
+                if log_func:
+                    log_func(f"   ⚠️  {col_name}: {issue['message']}")
+                
+                return issue
         
         return None
     
@@ -4,6 +4,9 @@ String validation module
 
 from typing import List, Dict
 from sqlalchemy import text
+from sqlalchemy.types import NVARCHAR as SA_NVARCHAR
+
+from constants import DatabaseConstants
 
 from .base_validator import BaseValidator
 
@@ -12,32 +15,117 @@ class StringValidator(BaseValidator):
     """
     Validator สำหรับตรวจสอบ string data
 
-    เนื่องจากระบบใช้ NVARCHAR(MAX) เท่านั้น จึงไม่ต้องตรวจสอบความยาว
-    Class นี้เก็บ utility methods สำหรับ string validation อื่นๆ
+    ตรวจสอบความยาวของคอลัมน์ที่ตั้งค่าเป็น NVARCHAR(n) (NVARCHAR(MAX) ไม่มีข้อจำกัด)
+    และมี utility methods สำหรับ string validation อื่นๆ
     """
 
     def validate(self, conn, staging_table: str, schema_name: str, columns: List,
                 total_rows: int, chunk_size: int, log_func=None, **kwargs) -> List[Dict]:
         """
-        Implementation ของ abstract method จาก BaseValidator
-
-        ไม่ได้ใช้งานสำหรับ StringValidator เนื่องจากระบบใช้ NVARCHAR(MAX)
-        ซึ่งไม่มีข้อจำกัดความยาว
+        ตรวจสอบว่าข้อมูลไม่ยาวเกินขนาดของคอลัมน์ NVARCHAR(n) ในตารางปลายทาง
 
         Args:
             conn: Database connection
             staging_table: Staging table name
             schema_name: Schema name
-            columns: List of columns (ไม่ใช้)
-            total_rows: Total number of rows (ไม่ใช้)
+            columns: List of (column name, max length) tuples from get_sized_string_columns()
+            total_rows: Total number of rows
             chunk_size: Chunk size for processing (ไม่ใช้)
-            log_func: Logging function (ไม่ใช้)
+            log_func: Logging function
             **kwargs: Additional parameters (ไม่ใช้)
 
         Returns:
-            List[Dict]: Empty list
+            List[Dict]: List of validation issues
+        """
+        issues = []
+
+        for col, max_length in columns:
+            try:
+                issue = self._validate_string_length(
+                    conn, staging_table, schema_name, col, max_length, total_rows, log_func
+                )
+                if issue:
+                    issues.append(issue)
+            except Exception as e:
+                if log_func:
+                    log_func(f"        Warning: Error checking column {col}: {e}")
+
+        return issues
+
+    def get_sized_string_columns(self, required_cols: Dict) -> List:
+        """
+        ดึงคอลัมน์ NVARCHAR(n) ที่ต้องตรวจสอบความยาว
+
+        Args:
+            required_cols: Required columns and data types
+
+        Returns:
+            List: List of (column name, max length) tuples
+        """
+        sized_columns = []
+        for col, dtype in required_cols.items():
+            if not isinstance(dtype, SA_NVARCHAR):
+                continue
+            length = getattr(dtype, 'length', None)
+            if isinstance(length, int) and 0 < length <= DatabaseConstants.NVARCHAR_MAX_INLINE_LENGTH:
+                sized_columns.append((col, length))
+        return sized_columns
+
+    def get_error_condition(self, col: str, max_length: int = 0, **kwargs) -> str:
+        """
+        สร้าง WHERE condition สำหรับแถวที่ยาวเกิน max_length
+
+        Args:
+            col: Column name
+            max_length: Maximum allowed length
+
+        Returns:
+            str: WHERE condition
+        """
+        return f"LEN({self.safe_column_name(col)}) > {max_length}"
+
+    def _validate_string_length(self, conn, staging_table: str, schema_name: str,
+                                col: str, max_length: int, total_rows: int, log_func) -> Dict:
+        """
+        ตรวจสอบคอลัมน์ string เดียวว่ามีค่ายาวเกิน max_length หรือไม่
+
+        Returns:
+            Dict: Validation issue หรือ None ถ้าไม่มีปัญหา
         """
-        return []
+        safe_col = self.safe_column_name(col)
+        where_condition = self.get_error_condition(col, max_length=max_length)
+
+        error_query = f"""
+            SELECT COUNT(*) as error_count, MAX(LEN({safe_col})) as max_actual_length
+            FROM {schema_name}.{staging_table}
+            WHERE {where_condition}
+        """
+
+        result = self.execute_query_safely(
+            conn, error_query, f"Error checking string length for column {col}", log_func
+        )
+
+        if result is None:
+            return None
+
+        row = result.fetchone()
+        error_count = row.error_count if row else 0
+
+        if error_count > 0:
+            examples = self.get_sample_examples(
+                conn, staging_table, schema_name, where_condition, col
+            )
+            return self.create_issue_dict(
+                validation_type='string_length_validation',
+                column=col,
+                error_count=error_count,
+                total_rows=total_rows,
+                examples=[ex[:50] for ex in examples],
+                expected_type=f"NVARCHAR({max_length})",
+                max_actual_length=row.max_actual_length
+            )
+
+        return None
     
     def validate_string_pattern(self, conn, staging_table: str, schema_name: str, 
                               col: str, pattern: str, pattern_name: str = "pattern",
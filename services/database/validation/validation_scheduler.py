@@ -0,0 +1,222 @@
+"""
+Validation scheduler: runs every column check of every validation phase as one task list
+
+Each (phase, column) pair is a task with an estimated cost. Tasks are started most
+expensive first (longest-processing-time order) on a process-wide pool, with at most
+`parallelism` of one upload running at once, so the slowest column no longer ends up
+alone at the tail of its phase while the other phases wait.
+
+Parallelism comes from app_settings `validation_parallelism`: a number of workers, or
+'auto' to derive it from the server's CPU count (sys.dm_os_sys_info, read once per
+server), bounded by the engine's connection pool.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from constants import ProcessingConstants
+
+# งาน validation ของทุก upload ในโปรเซสใช้ pool เดียวกัน
+_shared_pool: Optional[ThreadPoolExecutor] = None
+_shared_pool_lock = threading.Lock()
+
+# ต้นทุนคงที่ของ validator ที่ไม่มี get_error_condition (เช่น boolean)
+_DEFAULT_TASK_COST = 200
+
+
+def get_shared_pool() -> ThreadPoolExecutor:
+    """Thread pool ที่ใช้ร่วมกันของ validation (สร้างเมื่อใช้ครั้งแรก)"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ThreadPoolExecutor(
+                max_workers=ProcessingConstants.VALIDATION_MAX_WORKERS, thread_name_prefix='validation'
+            )
+        return _shared_pool
+
+
+class ValidationTask:
+    """การตรวจคอลัมน์เดียวของ validation phase หนึ่ง"""
+
+    __slots__ = ('phase_name', 'validation_type', 'validator', 'entry', 'column', 'chunk_size', 'cost')
+
+    def __init__(self, phase_name: str, phase_data: Dict, entry, cost: float) -> None:
+        self.phase_name = phase_name
+        self.validation_type = phase_data['type']
+        self.validator = phase_data['validator']
+        self.entry = entry  # ชื่อคอลัมน์ หรือ (ชื่อคอลัมน์, max length) ของ string length phase
+        self.column = entry[0] if isinstance(entry, tuple) else entry
+        self.chunk_size = phase_data.get('chunk_size', 10000)
+        self.cost = cost
+
+
+class ValidationScheduler:
+    """
+    สร้าง task list จาก validation phases แล้วรันแบบขนานโดยเริ่มจากคอลัมน์ที่แพงที่สุด
+
+    Args:
+        engine: SQLAlchemy engine (แต่ละ task เปิด connection ของตัวเอง)
+    """
+
+    _server_cpus: Dict[str, Optional[int]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+
+    # ===== Degree of parallelism =====
+    def _read_server_cpus(self) -> Optional[int]:
+        """จำนวน CPU ของ SQL Server (None ถ้าไม่มีสิทธิ์ VIEW SERVER STATE)"""
+        key = str(self.engine.url)
+        with self._lock:
+            if key in self._server_cpus:
+                return self._server_cpus[key]
+        try:
+            with self.engine.connect() as conn:
+                cpus = conn.execute(text("SELECT cpu_count FROM sys.dm_os_sys_info")).scalar()
+            cpus = int(cpus) if cpus else None
+        except Exception:
+            cpus = None
+        with self._lock:
+            self._server_cpus[key] = cpus
+        return cpus
+
+    def _pool_capacity(self) -> Optional[int]:
+        """จำนวน connection สูงสุดของ engine pool (None ถ้าไม่จำกัด/ไม่ทราบ)"""
+        pool = getattr(self.engine, 'pool', None)
+        try:
+            size = pool.size()
+            overflow = getattr(pool, '_max_overflow', 0)
+            return size + overflow if overflow >= 0 else None
+        except Exception:
+            return None
+
+    def resolve_parallelism(self) -> int:
+        """Workers ต่อ upload จาก app_settings `validation_parallelism`"""
+        try:
+            from config.json_manager import json_manager
+            setting = json_manager.load('app_settings').get(
+                'validation_parallelism', ProcessingConstants.VALIDATION_PARALLELISM_AUTO
+            )
+        except Exception:
+            setting = ProcessingConstants.VALIDATION_PARALLELISM_AUTO
+
+        if setting == ProcessingConstants.VALIDATION_PARALLELISM_AUTO:
+            cpus = self._read_server_cpus()
+            # ครึ่งหนึ่งของ CPU ของ server เหลือไว้ให้งานอื่น
+            workers = max(1, cpus // 2) if cpus else ProcessingConstants.VALIDATION_DEFAULT_WORKERS
+        else:
+            try:
+                workers = int(setting)
+            except (TypeError, ValueError):
+                workers = ProcessingConstants.VALIDATION_DEFAULT_WORKERS
+
+        capacity = self._pool_capacity()
+        if capacity:
+            workers = min(workers, capacity)
+        return max(1, min(workers, ProcessingConstants.VALIDATION_MAX_WORKERS))
+
+    # ===== Task graph =====
+    @staticmethod
+    def estimate_cost(phase_data: Dict, entry, date_format: str, plan=None, profile=None) -> float:
+        """
+        ต้นทุนโดยประมาณของการตรวจคอลัมน์: ความยาวของ predicate (จำนวน REPLACE/TRY_CONVERT
+        ที่ต้องประเมินต่อแถว) คูณสัดส่วนค่าที่ไม่ว่างจาก profile
+        """
+        validator = phase_data['validator']
+        col = entry[0] if isinstance(entry, tuple) else entry
+        try:
+            if isinstance(entry, tuple):
+                cost = len(validator.get_error_condition(col, max_length=entry[1]))
+            elif hasattr(validator, 'get_error_condition'):
+                cost = len(validator.get_error_condition(col, date_format=date_format, plan=plan))
+            else:
+                cost = _DEFAULT_TASK_COST
+        except Exception:
+            cost = _DEFAULT_TASK_COST
+
+        column_profile = profile.get(col) if profile is not None else None
+        if column_profile is not None and column_profile.rows:
+            non_blank_share = (column_profile.rows - column_profile.null_count) / column_profile.rows
+            cost *= max(non_blank_share, 0.05)
+        return float(cost)
+
+    def build_tasks(self, validation_phases: Dict, date_format: str, plan=None, profile=None) -> List[ValidationTask]:
+        """Task ของทุกคอลัมน์ในทุก phase เรียงจากแพงไปถูก"""
+        tasks = [
+            ValidationTask(phase_name, phase_data, entry,
+                           self.estimate_cost(phase_data, entry, date_format, plan, profile))
+            for phase_name, phase_data in validation_phases.items()
+            for entry in phase_data['columns']
+        ]
+        tasks.sort(key=lambda task: task.cost, reverse=True)
+        return tasks
+
+    # ===== Execution =====
+    def _run_task(self, task: ValidationTask, staging_table: str, schema_name: str, total_rows: int,
+                  date_format: str, plan=None) -> List[Dict]:
+        with self.engine.connect() as conn:
+            # ไม่ส่ง log_func เข้า thread เพื่อป้องกัน log สลับกัน
+            return task.validator.validate(
+                conn, staging_table, schema_name, [task.entry],
+                total_rows, task.chunk_size, None, date_format=date_format, plan=plan
+            )
+
+    def run(self, tasks: List[ValidationTask], staging_table: str, schema_name: str, total_rows: int,
+            date_format: str = 'UK', plan=None, parallelism: int = 1, log_func=None,
+            on_task_done: Callable[[ValidationTask, List[Dict]], None] = None) -> Dict[str, List[Dict]]:
+        """
+        รัน tasks ตามลำดับที่ให้มา (แพงสุดก่อน) โดยมีงานพร้อมกันไม่เกิน parallelism
+
+        Returns:
+            Dict[str, List[Dict]]: issues แยกตามชื่อ phase
+        """
+        issues_by_phase: Dict[str, List[Dict]] = {}
+
+        def finish(task: ValidationTask, issues: List[Dict]) -> None:
+            issues_by_phase.setdefault(task.phase_name, []).extend(issues)
+            if on_task_done:
+                on_task_done(task, issues)
+
+        if parallelism <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                try:
+                    issues = self._run_task(task, staging_table, schema_name, total_rows, date_format, plan)
+                except Exception as e:
+                    if log_func:
+                        log_func(f"      Warning: Could not validate column '{task.column}' ({task.phase_name}): {e}")
+                    issues = []
+                finish(task, issues)
+            return issues_by_phase
+
+        pool = get_shared_pool()
+        pending = list(reversed(tasks))  # pop() จากท้าย = งานที่แพงที่สุดก่อน
+        running = {}
+
+        def submit_next() -> None:
+            task = pending.pop()
+            # copy_context ให้ query profiler เห็น batch/phase เดียวกับ thread ที่เรียก
+            future = pool.submit(contextvars.copy_context().run, self._run_task, task,
+                                 staging_table, schema_name, total_rows, date_format, plan)
+            running[future] = task
+
+        while pending and len(running) < parallelism:
+            submit_next()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                try:
+                    issues = future.result()
+                except Exception as e:
+                    if log_func:
+                        log_func(f"      Warning: Could not validate column '{task.column}' ({task.phase_name}): {e}")
+                    issues = []
+                finish(task, issues)
+                if pending:
+                    submit_next()
+        return issues_by_phase
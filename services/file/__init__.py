@@ -4,6 +4,7 @@ File Services Package for PIPELINE_SQLSERVER
 Provides modular file services for reading, processing, and managing files
 """
 
+from .column_profiler import ColumnProfile, DataProfile
 from .file_reader_service import FileReaderService
 from .data_processor_service import DataProcessorService
 from .file_management_service import FileManagementService
@@ -11,5 +12,7 @@ from .file_management_service import FileManagementService
 __all__ = [
     'FileReaderService',
     'DataProcessorService',
-    'FileManagementService'
+    'FileManagementService',
+    'ColumnProfile',
+    'DataProfile'
 ]
\ No newline at end of file
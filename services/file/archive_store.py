@@ -0,0 +1,291 @@
+"""
+Compressed archive store for PIPELINE_SQLSERVER
+
+In archive mode (`file_management.archive_mode: "zip"`) processed source files are packed
+into one zip per day instead of being moved into date folders:
+
+    <output>/archive/processed_<YYYY-MM-DD>.zip
+    <output>/archive/processed_<YYYY-MM-DD>.index.jsonl
+
+Every archived file appends one line to the day's index: original name, zip and member
+name, sha256, logic type, batch id, offset of the member's local header and sizes. Files
+are streamed into the zip in chunks (never loaded whole), and a single file can be
+streamed back out for reprocessing without extracting the rest of the day.
+
+The day's zip is never modified in place. `add_files` copies it to `.part`, appends the
+new members there, fsyncs, reads the new members back against the sha256 of their
+sources and only then swaps the copy in with `os.replace`; index lines follow, and the
+caller deletes the sources last. The whole update holds a cross-process lock
+(`archive/.lock`) because the GUI and the CLI may archive at the same time. A crash
+therefore leaves at worst a stray `.part` file, never a damaged day or a source deleted
+before its copy was durable. Callers pass many files per call (see
+FileManagementService.queue_uploaded_files) so the copy happens once per batch.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from constants import FileConstants
+from utils.file_lock import file_lock
+
+ARCHIVE_FOLDER = 'archive'
+
+# zipfile รองรับ zstd ตั้งแต่ Python 3.14 (ZIP_ZSTANDARD) รุ่นก่อนหน้าใช้ deflate แทน
+ZIP_ZSTANDARD = getattr(zipfile, 'ZIP_ZSTANDARD', None)
+
+
+class ArchiveStore:
+    """Zip รายวันของไฟล์ที่ประมวลผลแล้ว พร้อม index (JSON lines) ต่อวัน"""
+
+    def __init__(self, base_folder: str, compression: str = 'deflate') -> None:
+        self.folder = os.path.join(base_folder, ARCHIVE_FOLDER)
+        self.compression = compression
+
+    # ========================
+    # Paths
+    # ========================
+
+    def archive_path(self, day: str) -> str:
+        return os.path.join(self.folder, f"processed_{day}.zip")
+
+    def entry_archive_path(self, entry: Dict[str, Any]) -> str:
+        if entry.get('archive'):
+            return os.path.join(self.folder, entry['archive'])
+        return self.archive_path(entry['day'])
+
+    def index_path(self, day: str) -> str:
+        return os.path.join(self.folder, f"processed_{day}.index.jsonl")
+
+    @property
+    def lock_path(self) -> str:
+        return os.path.join(self.folder, '.lock')
+
+    def list_days(self) -> List[str]:
+        """วันที่ที่มี archive (เรียงจากเก่าไปใหม่)"""
+        if not os.path.isdir(self.folder):
+            return []
+        days = [
+            name[len('processed_'):-len('.index.jsonl')]
+            for name in os.listdir(self.folder)
+            if name.startswith('processed_') and name.endswith('.index.jsonl')
+        ]
+        return sorted(days)
+
+    # ========================
+    # Write
+    # ========================
+
+    def _compress_type(self, file_name: str) -> int:
+        ext = os.path.splitext(file_name)[1].lower()
+        if ext not in FileConstants.MOVE_COMPRESS_EXTENSIONS:
+            return zipfile.ZIP_STORED  # .xlsx บีบอัดอยู่แล้ว
+        if self.compression == 'zstd' and ZIP_ZSTANDARD is not None:
+            return ZIP_ZSTANDARD
+        return zipfile.ZIP_DEFLATED
+
+    def add_files(self, file_paths: List[str], logic_types: Optional[List[str]] = None,
+                  batch_ids: Optional[List[str]] = None, day: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        เพิ่มไฟล์ทั้งชุดเข้า zip ของวัน (ผ่านสำเนา .part) แล้วต่อท้าย index (ไม่ลบไฟล์ต้นฉบับ)
+
+        ไฟล์ที่เปิดอ่านไม่ได้จะถูกข้าม; ถ้าเขียน/ตรวจ zip ไม่สำเร็จจะ raise และ zip เดิมไม่ถูกแตะ
+
+        Args:
+            logic_types / batch_ids: ค่าต่อไฟล์ (ลำดับเดียวกับ file_paths)
+
+        Returns:
+            List[Tuple[str, Dict]]: (path ต้นฉบับ, index entry) ของไฟล์ที่อยู่ใน zip แล้วอย่างถาวร
+        """
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        os.makedirs(self.folder, exist_ok=True)
+        archive_path = self.archive_path(day)
+        partial = archive_path + '.part'
+
+        with file_lock(self.lock_path):
+            try:
+                existing = os.path.exists(archive_path)
+                if existing:
+                    shutil.copyfile(archive_path, partial)
+                written = self._write_zip(partial, file_paths, logic_types, append=existing)
+                if not written:
+                    os.remove(partial)
+                    return []
+                self._verify_zip(partial, written)
+                os.replace(partial, archive_path)
+                _fsync_directory(self.folder)
+            except Exception:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+
+            archived_at = datetime.now().isoformat(timespec='seconds')
+            results = []
+            for idx, file_path, entry in written:
+                entry.update({
+                    'archive': os.path.basename(archive_path),
+                    'batch_id': batch_ids[idx] if batch_ids and idx < len(batch_ids) else None,
+                    'archived_at': archived_at,
+                    'day': day,
+                })
+                results.append((file_path, entry))
+
+            # index เขียนหลัง zip อยู่บนดิสก์แล้ว: ทุกบรรทัดใน index จึงมีไฟล์อยู่ใน zip จริง
+            with open(self.index_path(day), 'a', encoding='utf-8') as index_file:
+                for _, entry in results:
+                    index_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                index_file.flush()
+                os.fsync(index_file.fileno())
+        return results
+
+    def _write_zip(self, partial: str, file_paths: List[str], logic_types: Optional[List[str]],
+                   append: bool = False) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """
+        เขียนไฟล์ลง zip `.part` แบบ stream (append = ต่อท้ายสำเนาของ zip เดิม) แล้ว fsync
+
+        Returns:
+            List[Tuple[int, str, Dict]]: (ลำดับใน file_paths, path, entry ที่ยังไม่มี archive/day)
+        """
+        written = []
+        with open(partial, 'r+b' if append else 'wb') as raw:
+            with zipfile.ZipFile(raw, 'a' if append else 'w', allowZip64=True,
+                                 compresslevel=FileConstants.MOVE_COMPRESS_LEVEL) as archive:
+                members = set(archive.NameToInfo)
+                for idx, file_path in enumerate(file_paths):
+                    file_name = os.path.basename(file_path)
+                    try:
+                        source = open(file_path, 'rb')
+                    except OSError as e:
+                        logging.error(f"Error: Cannot read {file_path} for archive: {e}")
+                        continue
+
+                    # ชื่อซ้ำในวันเดียวกัน ให้เพิ่มลำดับท้ายชื่อไฟล์
+                    member = file_name
+                    name, ext = os.path.splitext(file_name)
+                    counter = 1
+                    while member in members:
+                        member = f"{name}_{counter}{ext}"
+                        counter += 1
+                    members.add(member)
+
+                    digest = hashlib.sha256()
+                    archive.compression = self._compress_type(file_name)
+                    with source, archive.open(member, 'w', force_zip64=True) as target:
+                        while True:
+                            chunk = source.read(FileConstants.MOVE_COPY_BUFFER_SIZE)
+                            if not chunk:
+                                break
+                            digest.update(chunk)
+                            target.write(chunk)
+                    info = archive.getinfo(member)
+                    written.append((idx, file_path, {
+                        'name': file_name,
+                        'member': member,
+                        'sha256': digest.hexdigest(),
+                        'logic_type': logic_types[idx] if logic_types and idx < len(logic_types) else None,
+                        'offset': info.header_offset,
+                        'size': info.file_size,
+                        'compressed_size': info.compress_size,
+                        'modified_at': datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(timespec='seconds'),
+                    }))
+            raw.flush()
+            os.fsync(raw.fileno())
+        return written
+
+    def _verify_zip(self, path: str, written: List[Tuple[int, str, Dict[str, Any]]]) -> None:
+        """อ่านไฟล์ที่เพิ่งเพิ่มใน zip กลับมาทั้งหมด และเทียบ sha256 กับไฟล์ต้นฉบับ (CRC ตรวจระหว่างอ่าน)"""
+        with zipfile.ZipFile(path, 'r') as archive:
+            for _, _, entry in written:
+                digest = hashlib.sha256()
+                with archive.open(entry['member'], 'r') as source:
+                    while True:
+                        chunk = source.read(FileConstants.MOVE_COPY_BUFFER_SIZE)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                if digest.hexdigest() != entry['sha256']:
+                    raise ValueError(f"Archive verification failed for {entry['member']}")
+
+    # ========================
+    # Read
+    # ========================
+
+    def read_index(self, day: str) -> List[Dict[str, Any]]:
+        """index entries ของวัน (ข้ามบรรทัดที่เสีย)"""
+        entries = []
+        try:
+            with open(self.index_path(day), 'r', encoding='utf-8') as index_file:
+                for line in index_file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def find(self, name: Optional[str] = None, day: Optional[str] = None,
+             logic_type: Optional[str] = None, batch_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """ค้นหาไฟล์ใน archive ตามชื่อไฟล์เดิม / วัน / logic type / batch id"""
+        days = [day] if day else self.list_days()
+        return [
+            entry
+            for d in days
+            for entry in self.read_index(d)
+            if (name is None or entry.get('name') == name)
+            and (logic_type is None or entry.get('logic_type') == logic_type)
+            and (batch_id is None or entry.get('batch_id') == batch_id)
+        ]
+
+    def iter_file(self, entry: Dict[str, Any]) -> Iterator[bytes]:
+        """อ่านไฟล์หนึ่งไฟล์จาก zip เป็น chunks และตรวจ sha256 เมื่ออ่านครบ"""
+        digest = hashlib.sha256()
+        # zip ถูกแทนที่ทั้งไฟล์ด้วย os.replace (ไม่เขียนทับในที่) จึงอ่านได้โดยไม่ต้องรอ lock
+        with zipfile.ZipFile(self.entry_archive_path(entry), 'r') as archive:
+            info = archive.getinfo(entry['member'])
+            if info.header_offset != entry.get('offset', info.header_offset):
+                raise ValueError(f"Archive index does not match {entry['member']} (offset {entry.get('offset')})")
+            with archive.open(info, 'r') as source:
+                while True:
+                    chunk = source.read(FileConstants.MOVE_COPY_BUFFER_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    yield chunk
+        if entry.get('sha256') and digest.hexdigest() != entry['sha256']:
+            raise ValueError(f"Checksum mismatch for {entry['member']}")
+
+    def extract_file(self, entry: Dict[str, Any], destination_folder: str) -> str:
+        """แตกไฟล์หนึ่งไฟล์ไปยังโฟลเดอร์ปลายทาง (ชื่อไฟล์เดิม) และคืน path ที่ได้"""
+        os.makedirs(destination_folder, exist_ok=True)
+        destination = os.path.join(destination_folder, entry['name'])
+        partial = destination + '.part'
+        try:
+            with open(partial, 'wb') as target:
+                for chunk in self.iter_file(entry):
+                    target.write(chunk)
+            os.replace(partial, destination)
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return destination
+
+
+def _fsync_directory(path: str) -> None:
+    """fsync โฟลเดอร์หลัง os.replace (Windows เปิดโฟลเดอร์ไม่ได้ ข้ามไป)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
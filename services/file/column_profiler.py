@@ -0,0 +1,357 @@
+"""
+Column Profiler for PIPELINE_SQLSERVER
+
+Collects per-column facts on the client while files are read so the same facts
+do not have to be recomputed in SQL by every validator:
+
+- max string length, null/blank count
+- numeric parse failures (numeric columns)
+- date parse failures per date format preference and matched formats (date columns)
+- distinct-count estimate (KMV sketch)
+
+Profiles are vectorised per chunk, mergeable across chunks and files, and can be
+saved to / loaded from JSON. Client-side checks are deliberately stricter than the
+SQL checks in services/database/validation, so "no failures" on the client means
+the matching server-side check can be skipped; a non-zero count is only an upper
+bound and the server-side check still runs.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.types import DATE, DateTime, Float, Integer
+
+from constants import PathConstants, ProcessingConstants
+from utils.helpers import nvarchar_lengths
+
+
+# ตัวเลขที่ TRY_CAST(... AS FLOAT) รับแน่นอน (หลังทำความสะอาดแบบเดียวกับ get_numeric_cleaning_expression)
+# ใช้ [0-9] ไม่ใช่ \d: \d ของ Python รับเลขไทย/Unicode (เช่น ๑๒๓) ซึ่ง TRY_CAST แปลงเป็น NULL
+_NUMERIC_PATTERN = r'^[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]{1,2})?$'
+
+# รูปแบบวันที่ที่ SQL (DateValidator) รับแน่นอน แยกตาม date format preference
+_DATE_FORMATS = {
+    'UK': ['%d/%m/%Y', '%d.%m.%Y', '%d-%m-%Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S'],
+    'US': ['%m/%d/%Y', '%m-%d-%Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S'],
+}
+
+# SQL Server DATETIME เริ่มที่ปี 1753
+_SQL_DATETIME_MIN = pd.Timestamp('1753-01-01')
+
+# ช่วงของ SQL Server INT (คอลัมน์ INT แปลงผ่าน FLOAT: ต้องเป็นจำนวนเต็มและอยู่ในช่วงนี้)
+_SQL_INT_MIN = -2 ** 31
+_SQL_INT_MAX = 2 ** 31 - 1
+
+# อักขระที่ get_date_cleaning_expression แปลงเป็นช่องว่าง / ลบทิ้ง
+_DATE_TO_SPACE = re.compile('[\t\n\r\xa0,]')
+_DATE_REMOVE = re.compile('[\ufeff\u200b\u2060]')
+
+KIND_STRING = 'string'
+KIND_NUMERIC = 'numeric'
+KIND_DATE = 'date'
+
+
+def _column_kind(sa_type) -> str:
+    """Map SQLAlchemy type from dtype config to the profile kind"""
+    if isinstance(sa_type, (Integer, Float)):
+        return KIND_NUMERIC
+    if isinstance(sa_type, (DATE, DateTime)):
+        return KIND_DATE
+    return KIND_STRING
+
+
+class ColumnProfile:
+    """Mergeable statistics for a single column"""
+
+    def __init__(self, name: str, kind: str = KIND_STRING,
+                 sketch_size: int = ProcessingConstants.PROFILE_SKETCH_SIZE, integer: bool = False) -> None:
+        self.name = name
+        self.kind = kind
+        self.integer = integer  # คอลัมน์ INT (ค่าต้องเป็นจำนวนเต็มในช่วง INT ด้วย)
+        self.sketch_size = sketch_size
+        self.rows = 0
+        self.null_count = 0
+        self.max_length = 0
+        self.numeric_fail_count = 0
+        self.date_fail_count: Dict[str, int] = {}
+        self.date_format_matches: Dict[str, int] = {}
+        self._sketch = np.empty(0, dtype=np.uint64)
+
+    # ===== Accumulation =====
+    def update(self, series: pd.Series) -> None:
+        """Accumulate one chunk of values"""
+        self.rows += len(series)
+        values = series.dropna()
+        if len(values) == 0:
+            self.null_count += len(series)
+            return
+
+        text = values.astype(str)
+        # ความยาวแบบ NVARCHAR/LEN (UTF-16): emoji นับเป็น 2 เหมือนฝั่ง SQL
+        lengths = nvarchar_lengths(text)
+        if len(lengths):
+            self.max_length = max(self.max_length, int(lengths.max()))
+
+        stripped = text.str.strip()
+        non_blank = stripped[stripped != '']
+        self.null_count += len(series) - len(non_blank)
+        if len(non_blank) == 0:
+            return
+
+        self._update_sketch(non_blank)
+
+        if self.kind == KIND_NUMERIC:
+            self._update_numeric(text)
+        elif self.kind == KIND_DATE:
+            self._update_date(text)
+
+    def _update_numeric(self, text: pd.Series) -> None:
+        # เลียนแบบ get_numeric_cleaning_expression: ตัด " , และช่องว่าง, '-' เดี่ยวๆ = NULL
+        cleaned = text.str.replace('"', '', regex=False).str.replace(',', '', regex=False)
+        cleaned = cleaned.str.replace(' ', '', regex=False)
+        cleaned = cleaned[(cleaned != '') & (cleaned != '-')]
+        if len(cleaned) == 0:
+            return
+        matched = cleaned.str.match(_NUMERIC_PATTERN)
+        self.numeric_fail_count += int((~matched).sum())
+        if self.integer and matched.any():
+            # เลียนแบบ get_numeric_conversion_expression(..., 'INT'): ผ่าน FLOAT แล้วต้องไม่มีเศษและไม่เกินช่วง
+            values = pd.to_numeric(cleaned[matched], errors='coerce')
+            whole = (values == np.floor(values)) & (values >= _SQL_INT_MIN) & (values <= _SQL_INT_MAX)
+            self.numeric_fail_count += int((~whole).sum())
+
+    def _update_date(self, text: pd.Series) -> None:
+        # เลียนแบบ get_date_cleaning_expression
+        cleaned = text.str.replace(_DATE_TO_SPACE, ' ', regex=True)
+        cleaned = cleaned.str.replace(_DATE_REMOVE, '', regex=True).str.strip(' ')
+        cleaned = cleaned[(cleaned != '') & (cleaned != '-')]
+        if len(cleaned) == 0:
+            return
+
+        parsed_by_format = {}
+        for fmt in {f for formats in _DATE_FORMATS.values() for f in formats}:
+            parsed = pd.to_datetime(cleaned, format=fmt, errors='coerce')
+            ok = parsed.notna() & (parsed >= _SQL_DATETIME_MIN)
+            parsed_by_format[fmt] = ok
+            matched = int(ok.sum())
+            if matched:
+                self.date_format_matches[fmt] = self.date_format_matches.get(fmt, 0) + matched
+
+        for preference, formats in _DATE_FORMATS.items():
+            any_ok = np.zeros(len(cleaned), dtype=bool)
+            for fmt in formats:
+                any_ok |= parsed_by_format[fmt].to_numpy()
+            failed = int((~any_ok).sum())
+            self.date_fail_count[preference] = self.date_fail_count.get(preference, 0) + failed
+
+    def _update_sketch(self, values: pd.Series) -> None:
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        self._merge_sketch(hashes)
+
+    def _merge_sketch(self, hashes: np.ndarray) -> None:
+        # KMV sketch: เก็บเฉพาะ hash ที่เล็กที่สุด k ค่า
+        combined = np.unique(np.concatenate([self._sketch, hashes]))
+        self._sketch = combined[:self.sketch_size]
+
+    # ===== Merge =====
+    def merge(self, other: 'ColumnProfile') -> None:
+        """Merge another profile of the same column into this one"""
+        self.rows += other.rows
+        self.null_count += other.null_count
+        self.max_length = max(self.max_length, other.max_length)
+        self.numeric_fail_count += other.numeric_fail_count
+        for key, count in other.date_fail_count.items():
+            self.date_fail_count[key] = self.date_fail_count.get(key, 0) + count
+        for key, count in other.date_format_matches.items():
+            self.date_format_matches[key] = self.date_format_matches.get(key, 0) + count
+        self._merge_sketch(other._sketch)
+
+    # ===== Facts =====
+    @property
+    def distinct_estimate(self) -> int:
+        """Estimated number of distinct non-blank values"""
+        if len(self._sketch) < self.sketch_size:
+            return int(len(self._sketch))
+        kth = float(self._sketch[-1]) / float(2 ** 64)
+        return int((self.sketch_size - 1) / kth) if kth > 0 else int(len(self._sketch))
+
+    def date_failures(self, date_format: str) -> Optional[int]:
+        """Upper bound of date parse failures for a date format preference"""
+        if self.kind != KIND_DATE or date_format not in _DATE_FORMATS:
+            return None
+        return self.date_fail_count.get(date_format, 0)
+
+    def best_date_format(self) -> Optional[str]:
+        """Most frequently matched strptime format (if any)"""
+        if not self.date_format_matches:
+            return None
+        return max(self.date_format_matches.items(), key=lambda item: item[1])[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'integer': self.integer,
+            'rows': self.rows,
+            'null_count': self.null_count,
+            'max_length': self.max_length,
+            'numeric_fail_count': self.numeric_fail_count,
+            'date_fail_count': dict(self.date_fail_count),
+            'date_format_matches': dict(self.date_format_matches),
+            'distinct_estimate': self.distinct_estimate,
+            'sketch_size': self.sketch_size,
+            'sketch': [int(h) for h in self._sketch],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnProfile':
+        profile = cls(data['name'], data.get('kind', KIND_STRING),
+                      data.get('sketch_size', ProcessingConstants.PROFILE_SKETCH_SIZE),
+                      data.get('integer', False))
+        profile.rows = data.get('rows', 0)
+        profile.null_count = data.get('null_count', 0)
+        profile.max_length = data.get('max_length', 0)
+        profile.numeric_fail_count = data.get('numeric_fail_count', 0)
+        profile.date_fail_count = dict(data.get('date_fail_count', {}))
+        profile.date_format_matches = dict(data.get('date_format_matches', {}))
+        profile._sketch = np.array(data.get('sketch', []), dtype=np.uint64)
+        return profile
+
+
+class DataProfile:
+    """Profile of every configured column of one file or one upload batch"""
+
+    def __init__(self, logic_type: str = '', required_cols: Optional[Dict] = None) -> None:
+        self.logic_type = logic_type
+        self.rows = 0
+        self.sources: List[str] = []
+        self.columns: Dict[str, ColumnProfile] = {}
+        for col, sa_type in (required_cols or {}).items():
+            if not col.startswith('_'):
+                self.columns[col] = ColumnProfile(col, _column_kind(sa_type), integer=isinstance(sa_type, Integer))
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Accumulate one chunk (columns missing from the chunk are skipped)"""
+        self.rows += len(chunk)
+        for col, profile in self.columns.items():
+            if col in chunk.columns:
+                profile.update(chunk[col])
+
+    def profile_dataframe(self, df: pd.DataFrame, source: str = None,
+                          chunk_size: int = ProcessingConstants.CHUNK_SIZE_LARGE) -> 'DataProfile':
+        """Profile a whole DataFrame chunk by chunk"""
+        for start in range(0, len(df), chunk_size):
+            self.update(df.iloc[start:start + chunk_size])
+        if source:
+            self.sources.append(source)
+        return self
+
+    def merge(self, other: 'DataProfile') -> 'DataProfile':
+        """Merge another profile (e.g. another file of the same type) into this one"""
+        self.rows += other.rows
+        self.sources.extend(other.sources)
+        for col, profile in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(profile)
+            else:
+                self.columns[col] = ColumnProfile.from_dict(profile.to_dict())
+        return self
+
+    @classmethod
+    def merge_all(cls, profiles: Iterable['DataProfile']) -> Optional['DataProfile']:
+        """Merge several profiles into a new one (None if nothing to merge)"""
+        merged = None
+        for profile in profiles:
+            if profile is None:
+                continue
+            if merged is None:
+                merged = cls(profile.logic_type)
+            merged.merge(profile)
+        return merged
+
+    def get(self, col: str) -> Optional[ColumnProfile]:
+        return self.columns.get(col)
+
+    # ===== Known answers for validators =====
+    def is_numeric_clean(self, col: str) -> bool:
+        profile = self.get(col)
+        return bool(profile and profile.kind == KIND_NUMERIC and profile.rows and profile.numeric_fail_count == 0)
+
+    def is_date_clean(self, col: str, date_format: str) -> bool:
+        profile = self.get(col)
+        return bool(profile and profile.rows and profile.date_failures(date_format) == 0)
+
+    def fits_length(self, col: str, max_length: int) -> bool:
+        profile = self.get(col)
+        return bool(profile and profile.rows and profile.max_length <= max_length)
+
+    def max_lengths(self) -> Dict[str, int]:
+        return {col: profile.max_length for col, profile in self.columns.items() if profile.rows}
+
+    # ===== Persistence =====
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'logic_type': self.logic_type,
+            'rows': self.rows,
+            'sources': list(self.sources),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'columns': {col: profile.to_dict() for col, profile in self.columns.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DataProfile':
+        profile = cls(data.get('logic_type', ''))
+        profile.rows = data.get('rows', 0)
+        profile.sources = list(data.get('sources', []))
+        profile.columns = {
+            col: ColumnProfile.from_dict(col_data) for col, col_data in data.get('columns', {}).items()
+        }
+        return profile
+
+    def save(self, batch_id: str, directory: str = None) -> Optional[str]:
+        """Save profile next to the batch as <logic_type>_<batch_id>.json"""
+        directory = directory or PathConstants.PROFILES_DIR
+        try:
+            os.makedirs(directory, exist_ok=True)
+            safe_type = re.sub(r'[^\w\-]+', '_', self.logic_type or 'unknown')
+            path = os.path.join(directory, f"{safe_type}_{batch_id}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            self._cleanup_old_profiles(directory)
+            return path
+        except OSError:
+            return None
+
+    @classmethod
+    def load(cls, path: str) -> Optional['DataProfile']:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @staticmethod
+    def _cleanup_old_profiles(directory: str) -> None:
+        files = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json')]
+        if len(files) <= ProcessingConstants.PROFILE_MAX_FILES:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - ProcessingConstants.PROFILE_MAX_FILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def summary(self) -> str:
+        known_clean = sum(
+            1 for col, p in self.columns.items()
+            if (p.kind == KIND_NUMERIC and p.numeric_fail_count == 0)
+            or (p.kind == KIND_DATE and 0 in p.date_fail_count.values())
+        )
+        return (f"{self.rows:,} rows, {len(self.columns)} columns profiled, "
+                f"{known_clean} typed columns clean on client")
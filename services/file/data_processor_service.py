@@ -7,9 +7,8 @@ Separated from FileService to provide clear responsibilities for each service
 
 import json
 import os
-import threading
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 from dateutil import parser
@@ -20,6 +19,10 @@ from sqlalchemy.types import (
 
 from constants import PathConstants, ProcessingConstants
 from services.settings_manager import settings_manager
+from services.file.column_profiler import DataProfile
+from services.file_type_plan import EMPTY_SETTINGS, FileTypePlan, sqlalchemy_type, varchar_length
+from utils.helpers import nvarchar_lengths
+from utils.phase_timer import timed_phase
 
 
 class DataProcessorService:
@@ -45,10 +48,6 @@ class DataProcessorService:
         # ใช้ SettingsManager singleton แทน local cache
         self._settings_manager = settings_manager
 
-        # Cache สำหรับ dtype conversion (เก็บเฉพาะ conversion results)
-        self._settings_cache: Dict[str, Any] = {}
-        self._cache_lock = threading.Lock()
-
         # Instance variables for settings (loaded from settings_manager by FileOrchestrator)
         self._column_settings: Dict[str, Any] = {}
         self._dtype_settings: Dict[str, Any] = {}
@@ -98,70 +97,27 @@ class DataProcessorService:
         """
         if force_reload:
             self._settings_manager.reload_all(force=True)
-            # Clear dtype conversion cache เมื่อ force reload
-            with self._cache_lock:
-                self._settings_cache = {k: v for k, v in self._settings_cache.items() if not k.startswith('dtypes_')}
 
     def _convert_dtype_to_sqlalchemy(self, dtype_str):
         """Convert string dtype to SQLAlchemy type object (cached)"""
-        if not isinstance(dtype_str, str):
-            return Text()
-            
-        # Use cache for converted dtypes
-        cache_key = str(dtype_str).upper()
-        if cache_key in self._settings_cache:
-            return self._settings_cache[cache_key]
-            
-        dtype_str = cache_key
-        
-        try:
-            result = None
-            if dtype_str.startswith('NVARCHAR'):
-                # Always use Text() for NVARCHAR (maps to NVARCHAR(MAX) in SQL Server)
-                result = Text()
-            elif dtype_str == 'INT':
-                result = Integer()
-            elif dtype_str == 'FLOAT':
-                result = Float()
-            elif dtype_str == 'DATE':
-                result = DATE()
-            elif dtype_str == 'DATETIME':
-                result = DateTime()
-            else:
-                result = Text()
-                
-            # Store in cache
-            with self._cache_lock:
-                self._settings_cache[cache_key] = result
-            return result
-            
-        except Exception:
-            result = Text()
-            with self._cache_lock:
-                self._settings_cache[cache_key] = result
-            return result
+        return sqlalchemy_type(dtype_str)
+
+    def get_file_type_plan(self, file_type: str) -> Optional[FileTypePlan]:
+        """FileTypePlan ของ file_type จาก column/dtype settings ปัจจุบัน (None ถ้าไม่มี)"""
+        mapping = self.column_settings.get(file_type) if file_type else None
+        if mapping is None:
+            return None
+        return FileTypePlan.get(file_type, mapping, self.dtype_settings.get(file_type, EMPTY_SETTINGS))
 
     def get_required_dtypes(self, file_type):
-        """Get column dtypes {new_col: dtype} by file type (cached)"""
+        """Get column dtypes {new_col: dtype} by file type (new dict; caller may add columns)"""
         # โหลด settings ล่าสุดก่อนใช้งาน
         self.load_settings()
 
-        if not file_type or file_type not in self.column_settings:
+        plan = self.get_file_type_plan(file_type)
+        if plan is None:
             return {}
-
-        cache_key = f"dtypes_{file_type}"
-        if cache_key in self._settings_cache:
-            return self._settings_cache[cache_key]
-            
-        dtypes = {}
-        for orig_col, new_col in self.column_settings[file_type].items():
-            dtype_str = self.dtype_settings.get(file_type, {}).get(new_col, 'NVARCHAR(255)')
-            dtype = self._convert_dtype_to_sqlalchemy(dtype_str)
-            dtypes[new_col] = dtype
-        # เก็บใน cache
-        with self._cache_lock:
-            self._settings_cache[cache_key] = dtypes
-        return dtypes
+        return dict(plan.required_dtypes)
 
     def apply_dtypes(self, df, file_type):
         """
@@ -312,6 +268,102 @@ class DataProcessorService:
             pass
         return date_format
 
+    def _get_dedup_settings(self, logic_type: str = None) -> Tuple[str, List[str]]:
+        """Get in-batch deduplication mode and key columns from dtype_settings
+
+        Args:
+            logic_type: File type to get the dedup settings for
+
+        Returns:
+            Tuple[str, List[str]]: (dedup_mode, key_columns)
+        """
+        dedup_mode = ProcessingConstants.DEDUP_MODE_OFF
+        keys: List[str] = []
+        try:
+            if logic_type and logic_type in self.dtype_settings:
+                type_settings = self.dtype_settings[logic_type]
+                dedup_mode = type_settings.get('_dedup_mode', ProcessingConstants.DEDUP_MODE_OFF)
+                keys = list(type_settings.get('_upsert_keys', []) or [])
+        except Exception:
+            pass
+        return dedup_mode, keys
+
+    def deduplicate_batch(self, df: pd.DataFrame, logic_type: str) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        ตัดแถวซ้ำในข้อมูลที่รวมจากหลายไฟล์ (Replace batch) ก่อนส่งขึ้น staging
+
+        แถวที่อยู่ท้ายสุดจะถูกเก็บไว้ (keep='last') ดังนั้นผู้เรียกควรเรียง DataFrame
+        ตามไฟล์เก่า -> ใหม่ เพื่อให้ข้อมูลจากไฟล์ล่าสุดชนะ
+
+        Args:
+            df: Combined DataFrame (มีคอลัมน์ `_source_file` ถ้ารวมจากหลายไฟล์)
+            logic_type: File type (ใช้อ่าน `_dedup_mode` และ `_upsert_keys`)
+
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, int]]: (DataFrame ที่ตัดแถวซ้ำแล้ว, {source_file: rows_dropped})
+        """
+        dedup_mode, keys = self._get_dedup_settings(logic_type)
+        if dedup_mode == ProcessingConstants.DEDUP_MODE_OFF or df is None or df.empty:
+            return df, {}
+
+        # คอลัมน์ metadata (ขึ้นต้นด้วย _) ไม่นับเป็นข้อมูลธุรกิจ
+        business_cols = [col for col in df.columns if not str(col).startswith('_')]
+
+        if dedup_mode == ProcessingConstants.DEDUP_MODE_KEYS:
+            missing_keys = [k for k in keys if k not in df.columns]
+            if not keys or missing_keys:
+                self.log_with_time(
+                    f"Warning: Dedup keys not usable for {logic_type} "
+                    f"(missing: {', '.join(missing_keys) or 'no keys configured'}), using full-row dedup"
+                )
+                dedup_mode = ProcessingConstants.DEDUP_MODE_FULL_ROW
+
+        if dedup_mode == ProcessingConstants.DEDUP_MODE_KEYS:
+            duplicate_mask = df.duplicated(subset=keys, keep='last')
+        else:
+            if not business_cols:
+                return df, {}
+            # hash ทั้งแถวเป็น uint64 ก่อน เร็วกว่าและใช้ memory น้อยกว่าการเทียบทุกคอลัมน์
+            row_hashes = pd.util.hash_pandas_object(df[business_cols], index=False)
+            duplicate_mask = row_hashes.duplicated(keep='last')
+
+        dropped_total = int(duplicate_mask.sum())
+        if dropped_total == 0:
+            return df, {}
+
+        if '_source_file' in df.columns:
+            dropped_by_file = {
+                str(source): int(count)
+                for source, count in df.loc[duplicate_mask, '_source_file'].value_counts().items()
+            }
+        else:
+            dropped_by_file = {'(combined)': dropped_total}
+
+        deduped_df = df.loc[~duplicate_mask.values].reset_index(drop=True)
+        return deduped_df, dropped_by_file
+
+    def profile_dataframe(self, df: pd.DataFrame, logic_type: str, source: str = None) -> Optional[DataProfile]:
+        """
+        สร้าง column profile ฝั่ง client (ทีละ chunk) สำหรับคอลัมน์ที่ตั้งค่าไว้ของประเภทไฟล์นี้
+
+        Args:
+            df: DataFrame ที่ rename คอลัมน์ตาม mapping แล้ว
+            logic_type: File type
+            source: ชื่อไฟล์ต้นทาง (เก็บไว้ใน profile)
+
+        Returns:
+            Optional[DataProfile]: profile หรือ None ถ้าไม่มี dtype config / profile ไม่สำเร็จ
+        """
+        required_cols = self.get_required_dtypes(logic_type)
+        if df is None or not required_cols:
+            return None
+        try:
+            with timed_phase('profile', rows=len(df)):
+                return DataProfile(logic_type, required_cols).profile_dataframe(df, source)
+        except Exception as e:
+            self.log_with_time(f"Warning: Could not profile columns for {logic_type}: {e}")
+            return None
+
     def _validate_date_column(self, series, expected_dtype, total_rows, logic_type: str = None) -> dict:
         """Validate date/datetime column data"""
         date_format = self._get_date_format_setting(logic_type)
@@ -355,15 +407,16 @@ class DataProcessorService:
 
         # หาข้อมูลที่ยาวเกินกำหนด
         string_series = series.astype(str)
-        too_long_mask = string_series.str.len() > max_length
+        lengths = nvarchar_lengths(string_series)
+        too_long_mask = lengths > max_length
         too_long_count = too_long_mask.sum()
 
         if too_long_count == 0:
             return {}
 
         too_long_examples = string_series.loc[too_long_mask].str[:50].unique()[:3]  # แสดงแค่ 50 ตัวอักษรแรก
-        actual_lengths = string_series.loc[too_long_mask].str.len().unique()[:5]
-        max_actual_length = string_series.str.len().max()
+        actual_lengths = lengths.loc[too_long_mask].unique()[:5]
+        max_actual_length = lengths.max()
         problem_rows = series.index[too_long_mask].tolist()[:5]
 
         return {
@@ -556,13 +609,7 @@ class DataProcessorService:
 
     def _extract_varchar_length(self, dtype_str):
         """Extract length from NVARCHAR(n)"""
-        try:
-            if 'MAX' in dtype_str:
-                return 999999
-            length = int(dtype_str.split('(')[1].split(')')[0])
-            return length
-        except:
-            return 255
+        return varchar_length(dtype_str)
 
 
     # ฟังก์ชัน auto-fix ถูกยกเลิก
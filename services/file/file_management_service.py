@@ -7,15 +7,22 @@ Responsible for file management:
 - Managing settings
 """
 
+import atexit
 import os
 import json
+import gzip
 import shutil
+import threading
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict, Any
-from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional, Dict, Any, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 import logging
 
 from config.json_manager import load_file_management_settings, save_file_management_settings
+from constants import FileConstants
+from services.file.archive_store import ArchiveStore
+from services.file.file_mover import get_file_mover
+from utils.phase_timer import timed_phase
 
 
 class FileManagementService:
@@ -55,35 +62,93 @@ class FileManagementService:
     # File Movement Functions
     # ========================
     
-    def move_uploaded_files(self, file_paths, logic_types=None, search_path=None):
-        """Move uploaded files to date-organized folders with original filenames"""
+    def move_uploaded_files(self, file_paths, logic_types=None, search_path=None, batch_id=None):
+        """Move uploaded files to date-organized folders (or the zip archive in archive mode)"""
+        with timed_phase('move', nbytes=self._total_file_size(file_paths)):
+            settings = self.load_settings()
+            if settings.get('archive_mode') == 'zip':
+                return self._archive_uploaded_files(file_paths, logic_types, search_path, batch_id, settings)
+            return self._move_uploaded_files(file_paths, search_path, settings)
+
+    def queue_uploaded_files(self, file_paths, logic_types=None, search_path=None,
+                             callback: Optional[Callable[[bool, Any], None]] = None,
+                             batch_id=None) -> Optional[Future]:
+        """
+        Queue uploaded files for the background mover and return immediately
+
+        The move runs while the next file uploads; `timed_phase('move')` is recorded in the
+        PhaseTimer active when the files were queued. Call `wait_for_moves()` before reporting.
+
+        In archive mode the files are held back and packed together, so the day's zip is
+        rewritten once per FileConstants.ARCHIVE_FLUSH_FILES files (and once more by
+        `wait_for_moves()`) instead of once per uploaded file.
+
+        Args:
+            callback: Called with (success, result) of move_uploaded_files when the move finishes
+
+        Returns:
+            Optional[Future]: (success, result) of the move job (None while archive files are held back)
+        """
+        if self.load_settings().get('archive_mode') == 'zip':
+            with _archive_queue_lock:
+                _archive_queue.append((self, list(file_paths), logic_types, search_path, batch_id, callback))
+                queued_files = sum(len(item[1]) for item in _archive_queue)
+            if queued_files >= FileConstants.ARCHIVE_FLUSH_FILES:
+                return _submit_archive_queue()
+            return None
+        return get_file_mover().submit(
+            self.move_uploaded_files, list(file_paths), logic_types, search_path, batch_id, callback=callback
+        )
+
+    def wait_for_moves(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Archive held-back files, wait for queued moves and return their latency stats (jobs, queue/move/wait seconds)"""
+        _submit_archive_queue()
+        return get_file_mover().drain(timeout)
+
+    def _total_file_size(self, file_paths) -> int:
+        total = 0
+        for file_path in file_paths:
+            try:
+                total += os.path.getsize(file_path)
+            except OSError:
+                pass
+        return total
+
+    def _output_base_folder(self, search_path=None) -> str:
+        # Use custom output folder if set, otherwise use search_path
+        return self.output_folder if self.output_folder else (search_path or self.base_path)
+
+    def _move_uploaded_files(self, file_paths, search_path=None, settings: Optional[Dict[str, Any]] = None):
         try:
-            # Use custom output folder if set, otherwise use search_path
-            base_folder = self.output_folder if self.output_folder else (search_path or self.base_path)
+            base_folder = self._output_base_folder(search_path)
 
             # สร้างโฟลเดอร์ย่อยตามวันที่ (YYYY-MM-DD)
             current_date = datetime.now().strftime("%Y-%m-%d")
             date_folder = os.path.join(base_folder, current_date)
             os.makedirs(date_folder, exist_ok=True)
 
+            settings = settings if settings is not None else self.load_settings()
+            compress = bool(settings.get('compress_moved_files', False))
             moved_files = []
 
             # ใช้ ThreadPoolExecutor สำหรับการย้ายไฟล์หลายไฟล์
             def move_single_file(args):
                 idx, file_path = args
                 try:
-                    # ใช้ชื่อไฟล์เดิม (ไม่เปลี่ยนชื่อ)
+                    # ใช้ชื่อไฟล์เดิม (ไม่เปลี่ยนชื่อ) และต่อ .gz เมื่อบีบอัด
                     file_name = os.path.basename(file_path)
-                    destination = os.path.join(date_folder, file_name)
+                    name, ext = os.path.splitext(file_name)
+                    gzip_file = compress and ext.lower() in FileConstants.MOVE_COMPRESS_EXTENSIONS
+                    suffix = '.gz' if gzip_file else ''
+                    destination = os.path.join(date_folder, file_name + suffix)
 
                     # ถ้าไฟล์มีชื่อซ้ำ ให้เพิ่ม timestamp ท้ายชื่อไฟล์
                     if os.path.exists(destination):
-                        name, ext = os.path.splitext(file_name)
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        new_name = f"{name}_{timestamp}{ext}"
+                        new_name = f"{name}_{timestamp}{ext}{suffix}"
                         destination = os.path.join(date_folder, new_name)
 
-                    shutil.move(file_path, destination)
+                    self._archive_file(file_path, destination, gzip_file)
                     return (file_path, destination)
                 except Exception as e:
                     logging.error(f"ไม่สามารถย้ายไฟล์ {file_path}: {str(e)}")
@@ -106,6 +171,89 @@ class FileManagementService:
         except Exception as e:
             return False, str(e)
     
+    # ========================
+    # Archive Mode
+    # ========================
+
+    def get_archive_store(self, search_path=None, settings: Optional[Dict[str, Any]] = None) -> ArchiveStore:
+        """Zip archive (one zip and one index per day) under the output folder (archive_mode: "zip")"""
+        settings = settings if settings is not None else self.load_settings()
+        return ArchiveStore(self._output_base_folder(search_path), settings.get('archive_compression', 'deflate'))
+
+    def _archive_uploaded_files(self, file_paths, logic_types=None, search_path=None, batch_id=None,
+                                settings: Optional[Dict[str, Any]] = None):
+        """Pack uploaded files into today's zip archive, then delete the originals
+
+        batch_id may be one id for all files or a list with one id per file.
+        """
+        try:
+            store = self.get_archive_store(search_path, settings)
+            batch_ids = batch_id if isinstance(batch_id, list) else [batch_id] * len(file_paths)
+            # zip ถูก fsync และตรวจ sha256 แล้วก่อน add_files คืนค่า: ลบต้นฉบับได้อย่างปลอดภัย
+            archived = store.add_files(list(file_paths), logic_types, batch_ids)
+            archived_files = []
+            for file_path, entry in archived:
+                try:
+                    os.remove(file_path)
+                except OSError as e:
+                    logging.warning(f"Warning: เก็บไฟล์ {file_path} เข้า archive แล้วแต่ลบต้นฉบับไม่ได้: {e}")
+                archived_files.append((file_path, os.path.join(store.entry_archive_path(entry), entry['member'])))
+            archived_paths = {file_path for file_path, _ in archived}
+            for file_path in file_paths:
+                if file_path not in archived_paths:
+                    logging.error(f"ไม่สามารถเก็บไฟล์ {file_path} เข้า archive")
+            return True, archived_files
+        except Exception as e:
+            return False, str(e)
+
+    def find_archived_files(self, name: Optional[str] = None, day: Optional[str] = None,
+                            logic_type: Optional[str] = None, batch_id: Optional[str] = None,
+                            search_path=None) -> List[Dict[str, Any]]:
+        """Search the archive index by original file name, day (YYYY-MM-DD), logic type or batch id"""
+        try:
+            return self.get_archive_store(search_path).find(name, day, logic_type, batch_id)
+        except Exception as e:
+            logging.error(f"ไม่สามารถอ่าน archive index: {e}")
+            return []
+
+    def extract_archived_file(self, entry: Dict[str, Any], destination_folder: str,
+                              search_path=None) -> Tuple[bool, str]:
+        """Stream one archived file back out (e.g. into the input folder for reprocessing)"""
+        try:
+            return True, self.get_archive_store(search_path).extract_file(entry, destination_folder)
+        except Exception as e:
+            return False, str(e)
+
+    def _archive_file(self, file_path: str, destination: str, compress: bool = False) -> None:
+        """ย้ายไฟล์ไป destination: rename เมื่ออยู่ volume เดียวกัน, นอกนั้น copy (หรือ gzip) แล้วลบต้นฉบับ"""
+        if not compress and self._same_volume(file_path, os.path.dirname(destination)):
+            os.rename(file_path, destination)
+            return
+
+        # เขียนลงไฟล์ชั่วคราวก่อน แล้วค่อยเปลี่ยนชื่อ เพื่อไม่ให้เหลือไฟล์ครึ่งๆ ในโฟลเดอร์ปลายทาง
+        partial = destination + '.part'
+        try:
+            if compress:
+                with open(file_path, 'rb') as source, \
+                        gzip.open(partial, 'wb', compresslevel=FileConstants.MOVE_COMPRESS_LEVEL) as target:
+                    shutil.copyfileobj(source, target, FileConstants.MOVE_COPY_BUFFER_SIZE)
+                shutil.copystat(file_path, partial)
+            else:
+                shutil.copy2(file_path, partial)
+            os.replace(partial, destination)
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        os.remove(file_path)
+
+    @staticmethod
+    def _same_volume(file_path: str, folder: str) -> bool:
+        try:
+            return os.stat(file_path).st_dev == os.stat(folder).st_dev
+        except OSError:
+            return False
+
     def create_organized_folder_structure(self, base_folder: str, file_type: str) -> str:
         """Create folder structure in format file_type/year-month-day"""
         current_date = datetime.now()
@@ -199,4 +347,78 @@ class FileManagementService:
             }
         except Exception as e:
             logging.error(f"ไม่สามารถตรวจสอบการใช้งานดิสก์: {e}")
-            return {'total': 0, 'used': 0, 'free': 0, 'percent_used': 0}
\ No newline at end of file
+            return {'total': 0, 'used': 0, 'free': 0, 'percent_used': 0}
+
+
+# ========================
+# Archive Queue
+# ========================
+
+# ไฟล์ที่รอเข้า zip รายวัน (ใช้ร่วมกันทั้ง process เหมือน file mover เพราะคนละ handler
+# อาจ queue และ wait ผ่านคนละ instance)
+_archive_queue: List[Tuple[FileManagementService, List[str], Optional[List[str]], Optional[str], Any,
+                           Optional[Callable[[bool, Any], None]]]] = []
+_archive_queue_lock = threading.Lock()
+
+
+def _submit_archive_queue() -> Optional[Future]:
+    """ส่งไฟล์ที่รออยู่ทั้งหมดเข้า file mover เป็นงานเดียว (None ถ้าไม่มีไฟล์รอ)"""
+    with _archive_queue_lock:
+        items = list(_archive_queue)
+        _archive_queue.clear()
+    if not items:
+        return None
+    return get_file_mover().submit(_archive_queued_files, items)
+
+
+def _archive_queued_files(items) -> Tuple[bool, Any]:
+    """เก็บไฟล์ที่ queue ไว้เข้า zip ครั้งเดียวต่อ output folder แล้วเรียก callback ของแต่ละงาน"""
+    groups: Dict[Tuple[str, Optional[str]], List[Any]] = {}
+    for item in items:
+        service, _, _, search_path, _, _ = item
+        groups.setdefault((service._output_base_folder(search_path), search_path), []).append(item)
+
+    success, archived_files, errors = True, [], []
+    for (_, search_path), group in groups.items():
+        service = group[0][0]
+        file_paths, logic_types, batch_ids = [], [], []
+        for _, paths, types, _, batch_id, _ in group:
+            file_paths.extend(paths)
+            logic_types.extend(types if types else [None] * len(paths))
+            batch_ids.extend([batch_id] * len(paths))
+
+        with timed_phase('move', nbytes=service._total_file_size(file_paths)):
+            group_success, result = service._archive_uploaded_files(
+                file_paths, logic_types, search_path, batch_ids, service.load_settings()
+            )
+        if group_success:
+            archived_files.extend(result)
+        else:
+            success = False
+            errors.append(result)
+
+        archived_by_path = dict(result) if group_success else {}
+        for _, paths, _, _, _, callback in group:
+            if callback is None:
+                continue
+            try:
+                if group_success:
+                    callback(True, [(path, archived_by_path[path]) for path in paths if path in archived_by_path])
+                else:
+                    callback(False, result)
+            except Exception as e:
+                logging.error(f"Error: File move callback failed: {e}")
+
+    return (True, archived_files) if success else (False, '; '.join(errors))
+
+
+def _archive_queue_at_exit() -> None:
+    # worker ของ file mover ปิดไปแล้วตอน exit จึงเก็บไฟล์ที่ยังรอใน thread นี้เลย
+    with _archive_queue_lock:
+        items = list(_archive_queue)
+        _archive_queue.clear()
+    if items:
+        _archive_queued_files(items)
+
+
+atexit.register(_archive_queue_at_exit)
@@ -0,0 +1,120 @@
+"""
+Background file mover for PIPELINE_SQLSERVER
+
+Uploaded files are archived by a single worker thread so the move of one file overlaps
+with the upload of the next. Jobs run in a copy of the submitter's context, so
+`timed_phase('move')` inside a job is recorded in the PhaseTimer that was active when the
+job was queued. `drain()` waits for pending jobs and returns the move latency of the
+session: time spent queued, time spent moving, and time the caller blocked waiting.
+
+One mover is shared per process (`get_file_mover()`), which also keeps archive I/O
+serialised instead of competing with the next file's read.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class BackgroundFileMover:
+    """คิวย้ายไฟล์แบบ background (worker เดียว, สถิติแยกจากเวลาอัปโหลด)"""
+
+    def __init__(self) -> None:
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending: List[Future] = []
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {'jobs': 0, 'moved_files': 0, 'failed_jobs': 0,
+                'queue_seconds': 0.0, 'move_seconds': 0.0, 'wait_seconds': 0.0}
+
+    def submit(self, func: Callable[..., Tuple[bool, Any]], *args,
+               callback: Optional[Callable[[bool, Any], None]] = None) -> Future:
+        """
+        เพิ่มงานย้ายไฟล์เข้าคิว
+
+        Args:
+            func: งานที่คืน (success, result) เช่น FileManagementService.move_uploaded_files
+            callback: เรียกด้วย (success, result) เมื่องานเสร็จ (จาก worker thread)
+
+        Returns:
+            Future: ผลลัพธ์ (success, result) ของงาน
+        """
+        queued_at = time.perf_counter()
+        context = contextvars.copy_context()
+
+        def job():
+            started = time.perf_counter()
+            try:
+                success, result = context.run(func, *args)
+            except Exception as e:
+                success, result = False, str(e)
+            finished = time.perf_counter()
+            with self._lock:
+                self._stats['jobs'] += 1
+                self._stats['queue_seconds'] += started - queued_at
+                self._stats['move_seconds'] += finished - started
+                if success:
+                    self._stats['moved_files'] += len(result)
+                else:
+                    self._stats['failed_jobs'] += 1
+            if callback is not None:
+                try:
+                    callback(success, result)
+                except Exception as e:
+                    logging.error(f"Error: File move callback failed: {e}")
+            return success, result
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='file_mover')
+            future = self._executor.submit(job)
+            self._pending.append(future)
+        return future
+
+    def pending_count(self) -> int:
+        """จำนวนงานที่ยังไม่เสร็จ"""
+        with self._lock:
+            return sum(1 for future in self._pending if not future.done())
+
+    def drain(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """รองานที่ค้างทั้งหมด แล้วคืนสถิติตั้งแต่การ drain ครั้งก่อน (และเริ่มนับใหม่)"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        started = time.perf_counter()
+        _, not_done = wait(pending, timeout=timeout)
+        waited = time.perf_counter() - started
+
+        with self._lock:
+            # งานที่ยังไม่เสร็จ (timeout) ยังนับอยู่ใน drain ครั้งถัดไป
+            self._pending.extend(not_done)
+            stats, self._stats = self._stats, self._empty_stats()
+        stats['wait_seconds'] = waited
+        stats['pending_jobs'] = len(not_done)
+        return stats
+
+    def shutdown(self) -> None:
+        """รองานที่ค้างแล้วปิด worker thread"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_file_mover: Optional[BackgroundFileMover] = None
+_file_mover_lock = threading.Lock()
+
+
+def get_file_mover() -> BackgroundFileMover:
+    """BackgroundFileMover ที่ใช้ร่วมกันทั้ง process"""
+    global _file_mover
+    with _file_mover_lock:
+        if _file_mover is None:
+            _file_mover = BackgroundFileMover()
+        return _file_mover
@@ -16,6 +16,8 @@ import pandas as pd
 from constants import PathConstants
 from utils.file_helpers import detect_file_extension_type, read_csv_with_encoding_fallback
 from services.settings_manager import settings_manager
+from services.file.header_memo import HeaderMemo, header_signature, settings_version
+from services.file_type_plan import EMPTY_SETTINGS, FileTypePlan, normalize_column_name
 
 
 class FileReaderService:
@@ -52,6 +54,8 @@ class FileReaderService:
         # Instance variables for settings (loaded from settings_manager by FileOrchestrator)
         self._column_settings: Dict[str, Any] = {}
         self._dtype_settings: Dict[str, Any] = {}
+        # digest ของ column settings เมื่อมาจาก SettingsSnapshot (None = คำนวณจาก dict ทุกครั้ง)
+        self._settings_digest: Optional[str] = None
 
     @property
     def column_settings(self) -> Dict[str, Any]:
@@ -62,6 +66,13 @@ class FileReaderService:
     def column_settings(self, value: Dict[str, Any]) -> None:
         """Set column settings"""
         self._column_settings = value
+        self._settings_digest = None
+
+    def apply_settings_snapshot(self, snapshot) -> None:
+        """ใช้ settings จาก SettingsSnapshot (header memo ใช้ digest ของ snapshot แทนการคำนวณทุกไฟล์)"""
+        self._column_settings = dict(snapshot.column_settings)
+        self._dtype_settings = dict(snapshot.dtype_settings)
+        self._settings_digest = snapshot.column_digest
 
     @property
     def dtype_settings(self) -> Dict[str, Any]:
@@ -129,25 +140,14 @@ class FileReaderService:
 
     def normalize_col(self, col):
         """ปรับปรุงการ normalize column (แม่นยำกับข้อมูลจริง)"""
-        if pd.isna(col):
-            return ""
-        
-        # แปลงเป็น string และทำความสะอาดขั้นพื้นฐาน
-        normalized = str(col).strip()
-        
-        # ลบ zero-width characters และ invisible characters
-        normalized = normalized.replace('\u200b', '')  # Zero Width Space
-        normalized = normalized.replace('\u200c', '')  # Zero Width Non-Joiner
-        normalized = normalized.replace('\u200d', '')  # Zero Width Joiner
-        normalized = normalized.replace('\ufeff', '')  # Byte Order Mark
-        
-        # แปลงเป็น lowercase สำหรับการเปรียบเทียบ
-        normalized = normalized.lower()
-        
-        # ปรับปรุงการจัดการช่องว่าง - ลบช่องว่างซ้ำซ้อนแต่เก็บช่องว่างเดี่ยว
-        normalized = ' '.join(normalized.split())
-        
-        return normalized
+        return normalize_column_name(col)
+
+    def get_file_type_plan(self, logic_type: str) -> Optional[FileTypePlan]:
+        """FileTypePlan ของ logic_type จาก column/dtype settings ปัจจุบัน (None ถ้าไม่มี)"""
+        mapping = self.column_settings.get(logic_type) if logic_type else None
+        if mapping is None:
+            return None
+        return FileTypePlan.get(logic_type, mapping, self.dtype_settings.get(logic_type, EMPTY_SETTINGS))
 
     def _read_file_peek(self, file_path: str, nrows: int = 2) -> Optional[pd.DataFrame]:
         """อ่านส่วนบนของไฟล์เพื่อดูหัวตาราง"""
@@ -159,10 +159,6 @@ class FileReaderService:
         else:
             return pd.read_excel(file_path, header=None, nrows=nrows, dtype=str)
 
-    def _extract_normalized_headers(self, df_peek: pd.DataFrame, row: int) -> set:
-        """แปลง header row ให้เป็น normalized set"""
-        return set(self.normalize_col(col) for col in df_peek.iloc[row].values if not pd.isna(col))
-
     def _calculate_match_threshold(self, total_columns: int) -> float:
         """คำนวณ threshold สำหรับการจับคู่ตามจำนวนคอลัมน์"""
         if total_columns >= 50:
@@ -172,64 +168,13 @@ class FileReaderService:
         else:
             return 0.3
 
-    def _calculate_match_score_for_mapping(
-        self,
-        header_row: set,
-        mapping: dict
-    ) -> Tuple[float, Optional[str]]:
-        """
-        คำนวณ score สำหรับ mapping หนึ่งตัว
-
-        Returns:
-            Tuple of (score, logic_type or None)
-        """
-        if not mapping:
-            return 0.0, None
-
-        required_keys = set(self.normalize_col(c) for c in mapping.keys() if c)
-        required_vals = set(self.normalize_col(c) for c in mapping.values() if c)
-
-        # ตรวจสอบว่าเป็น identity mapping หรือไม่
-        is_identity_mapping = (required_keys == required_vals)
-
-        if is_identity_mapping:
-            # สำหรับ identity mapping ใช้การจับคู่แบบตรง
-            match_count = len(header_row & required_keys)
-            total_required = len(required_keys)
-
-            if total_required > 0:
-                score = match_count / total_required
-                min_threshold = self._calculate_match_threshold(total_required)
-
-                if score >= min_threshold:
-                    return score, None
-        else:
-            # สำหรับ mapping ปกติ ตรวจสอบทั้ง keys และ values
-            keys_match = len(header_row & required_keys)
-            vals_match = len(header_row & required_vals)
-
-            # เลือกทิศทางที่มี match มากกว่า
-            if keys_match > vals_match:
-                score = keys_match / len(required_keys) if required_keys else 0
-                total_keys = len(required_keys)
-            else:
-                score = vals_match / len(required_vals) if required_vals else 0
-                total_keys = len(required_vals)
-
-            min_threshold = self._calculate_match_threshold(total_keys)
-
-            if score >= min_threshold:
-                return score, None
-
-        return 0.0, None
-
     def _find_best_matching_type(self, header_row: set) -> Optional[str]:
         """หา logic_type ที่ตรงกันมากที่สุดจาก header row"""
         best_match = None
         best_score = 0.0
 
-        for logic_type, mapping in self.column_settings.items():
-            score, _ = self._calculate_match_score_for_mapping(header_row, mapping)
+        for logic_type in self.column_settings:
+            score = self.get_file_type_plan(logic_type).match_score(header_row, self._calculate_match_threshold)
 
             if score > best_score:
                 best_match = logic_type
@@ -255,23 +200,49 @@ class FileReaderService:
             if df_peek is None:
                 return None
 
-            # ตรวจสอบทุก header row ที่เป็นไปได้
-            for row in range(min(2, df_peek.shape[0])):
-                header_row = self._extract_normalized_headers(df_peek, row)
+            return self.detect_file_type_from_peek(df_peek)
+        except Exception:
+            return None
 
-                # ถ้าไม่มี header ใน row นี้ ข้าม
-                if not header_row:
-                    continue
+    def flush_header_memo(self) -> bool:
+        """เขียนผล detection / rename ที่จำไว้ระหว่าง scan หรือ batch ลงไฟล์ (ครั้งเดียวต่อรอบ)"""
+        return HeaderMemo.flush()
 
-                # หา logic_type ที่ตรงกันมากที่สุด
-                best_match = self._find_best_matching_type(header_row)
+    def detect_file_type_from_peek(self, df_peek: pd.DataFrame) -> Optional[str]:
+        """ตรวจสอบประเภทไฟล์จากส่วนหัวที่อ่านไว้แล้ว (ผลของ _read_file_peek)"""
+        # header เดิม + settings เดิม = ผลเดิม (HeaderMemo)
+        signature = header_signature(df_peek)
+        memo_key = HeaderMemo.make_key('detect', signature, self._column_settings_version())
+        cached = HeaderMemo.get(memo_key)
+        if cached is not None:
+            return cached['logic_type']
 
-                if best_match:
-                    return best_match
+        logic_type = self._detect_file_type_uncached(signature)
+        HeaderMemo.put(memo_key, {'logic_type': logic_type})
+        return logic_type
 
-            return None
-        except Exception:
-            return None
+    def _column_settings_version(self) -> str:
+        # column settings จาก snapshot เปลี่ยนได้ทางเดียวคือ snapshot ใหม่ (ไม่ถูกแก้ในที่เดิม)
+        if self._settings_digest is not None:
+            return self._settings_digest
+        return settings_version(self.column_settings)
+
+    def _detect_file_type_uncached(self, signature: Tuple) -> Optional[str]:
+        # ตรวจสอบทุก header row ที่เป็นไปได้ (signature: ค่าดิบของแต่ละแถว, ช่องว่าง = None)
+        for row in signature[:2]:
+            header_row = set(self.normalize_col(col) for col in row if col is not None)
+
+            # ถ้าไม่มี header ใน row นี้ ข้าม
+            if not header_row:
+                continue
+
+            # หา logic_type ที่ตรงกันมากที่สุด
+            best_match = self._find_best_matching_type(header_row)
+
+            if best_match:
+                return best_match
+
+        return None
 
     def build_rename_mapping_for_dataframe(self, df_columns, logic_type):
         """
@@ -279,64 +250,25 @@ class FileReaderService:
         - รองรับ identity mapping และ mapping ปกติ
         - จับคู่คอลัมน์แบบ fuzzy matching สำหรับความแม่นยำ
         """
-        mapping = self.get_column_name_mapping(logic_type)
-        if not mapping:
+        # โหลด settings ล่าสุดก่อนใช้งาน
+        self.load_settings()
+        plan = self.get_file_type_plan(logic_type)
+        if plan is None or not plan.columns:
             return {}
 
-        # สร้าง normalized mapping สำหรับเปรียบเทียบ
-        df_cols_normalized = {self.normalize_col(c): c for c in df_columns}
-        
-        # สร้าง mapping dictionaries
-        keys_to_original = {self.normalize_col(k): k for k in mapping.keys() if k}
-        vals_to_original = {self.normalize_col(v): v for v in mapping.values() if v}
-        
-        # ตรวจสอบว่าเป็น identity mapping หรือไม่
-        normalized_keys = set(keys_to_original.keys())
-        normalized_vals = set(vals_to_original.keys())
-        is_identity_mapping = (normalized_keys == normalized_vals)
-        
-        if is_identity_mapping:
-            # สำหรับ identity mapping ไม่ต้อง rename
-            # แต่ให้จับคู่กับชื่อคอลัมน์ที่ตรงกันเพื่อ standardize
-            result_mapping = {}
-            
-            for norm_col, original_df_col in df_cols_normalized.items():
-                if norm_col in normalized_keys:
-                    # หาคอลัมน์ที่ตรงกันใน mapping
-                    for orig_key, orig_val in mapping.items():
-                        if self.normalize_col(orig_key) == norm_col:
-                            # ใช้ชื่อจาก mapping เป็นชื่อใหม่
-                            if original_df_col != orig_key:
-                                result_mapping[original_df_col] = orig_key
-                            break
-            
-            return result_mapping
-        else:
-            # สำหรับ mapping ปกติ ตรวจสอบทิศทาง
-            keys_matches = set(df_cols_normalized.keys()) & normalized_keys
-            vals_matches = set(df_cols_normalized.keys()) & normalized_vals
-            
-            result_mapping = {}
-            
-            if len(keys_matches) >= len(vals_matches):
-                # DataFrame columns ตรงกับ keys มากกว่า -> mapping คือ old->new
-                for norm_col, original_df_col in df_cols_normalized.items():
-                    if norm_col in keys_to_original:
-                        original_key = keys_to_original[norm_col]
-                        new_value = mapping.get(original_key)
-                        if new_value and original_df_col != new_value:
-                            result_mapping[original_df_col] = new_value
-            else:
-                # DataFrame columns ตรงกับ values มากกว่า -> mapping ถูกใส่กลับด้าน
-                inverted_mapping = {v: k for k, v in mapping.items() if k and v}
-                for norm_col, original_df_col in df_cols_normalized.items():
-                    if norm_col in vals_to_original:
-                        original_val = vals_to_original[norm_col]
-                        new_value = inverted_mapping.get(original_val)
-                        if new_value and original_df_col != new_value:
-                            result_mapping[original_df_col] = new_value
-            
-            return result_mapping
+        # memo ใช้ได้เฉพาะชื่อคอลัมน์ที่เป็น string (key ของ JSON)
+        columns = list(df_columns)
+        memo_key = None
+        if all(isinstance(col, str) for col in columns):
+            memo_key = HeaderMemo.make_key('rename', tuple(columns), plan.mapping_digest, logic_type)
+            cached = HeaderMemo.get(memo_key)
+            if cached is not None:
+                return dict(cached['mapping'])
+
+        result_mapping = plan.rename_mapping(columns)
+        if memo_key is not None:
+            HeaderMemo.put(memo_key, {'mapping': dict(result_mapping)})
+        return result_mapping
 
     def debug_column_mapping(self, file_path, logic_type=None):
         """
@@ -0,0 +1,120 @@
+"""
+Header-signature memo for PIPELINE_SQLSERVER
+
+Most incoming files of a logic type share an identical header row. File type detection
+and the rename mapping depend only on that header and the column settings, so their
+results are remembered per (raw header, settings version) in config/header_memo.json
+and repeat layouts skip the normalisation and set matching entirely.
+
+The memo holds at most FileConstants.HEADER_MEMO_MAX_ENTRIES entries; the least
+recently used ones are evicted when a new entry is added. New entries only mark the memo
+dirty: the file is written once per scan / upload batch by `HeaderMemo.flush()` (and at
+interpreter exit), so a folder of new layouts costs one write instead of one per file.
+"""
+
+import atexit
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from constants import FileConstants
+
+
+def header_signature(df_peek: pd.DataFrame) -> Tuple:
+    """ค่าดิบของแถวหัวตาราง (ผลของ _read_file_peek) เป็น tuple ที่ hash ได้ (ช่องว่าง = None)"""
+    # iloc ทีละแถวเร็วกว่า to_numpy/itertuples เมื่อแต่ละคอลัมน์เป็น block แยก (dtype=str)
+    return tuple(
+        tuple(None if pd.isna(value) else str(value) for value in df_peek.iloc[row].tolist())
+        for row in range(df_peek.shape[0])
+    )
+
+
+def settings_version(settings: Any) -> str:
+    """Digest ของ settings (เปลี่ยนเมื่อเนื้อหาเปลี่ยน แม้ dict ถูกแก้ในที่เดิม)"""
+    payload = json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class HeaderMemo:
+    """ผลของ detection / rename mapping ต่อ header signature (LRU, บันทึกใน config/header_memo.json)"""
+
+    _lock = threading.Lock()
+    _entries: Optional["OrderedDict[str, Any]"] = None
+    _dirty = False
+
+    @staticmethod
+    def make_key(kind: str, signature: Tuple, version: str, *extra: Any) -> str:
+        payload = json.dumps([kind, signature, version, *extra], ensure_ascii=False, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+    @classmethod
+    def _load(cls) -> "OrderedDict[str, Any]":
+        # เรียกขณะถือ _lock: โหลดจากดิสก์ครั้งแรกเท่านั้น (เรียงจากใช้ล่าสุดน้อยไปมาก)
+        if cls._entries is None:
+            try:
+                from config.json_manager import json_manager
+                entries = json_manager.load('header_memo').get('entries', {})
+            except Exception:
+                entries = {}
+            ordered = sorted(entries.items(), key=lambda item: item[1].get('used_at', 0))
+            cls._entries = OrderedDict(ordered)
+        return cls._entries
+
+    @classmethod
+    def get(cls, key: str) -> Optional[Dict[str, Any]]:
+        """ผลที่บันทึกไว้ของ key (None ถ้าไม่มี)"""
+        with cls._lock:
+            entries = cls._load()
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            entries.move_to_end(key)
+            entry['used_at'] = time.time()
+            return entry['value']
+
+    @classmethod
+    def put(cls, key: str, value: Dict[str, Any]) -> None:
+        """เพิ่มผลใหม่ในหน่วยความจำ (ตัดรายการที่ไม่ได้ใช้นานที่สุดออกเมื่อเกินขนาด) เขียนลงไฟล์ตอน flush()"""
+        with cls._lock:
+            entries = cls._load()
+            entries[key] = {'value': value, 'used_at': time.time()}
+            entries.move_to_end(key)
+            while len(entries) > FileConstants.HEADER_MEMO_MAX_ENTRIES:
+                entries.popitem(last=False)
+            cls._dirty = True
+
+    @classmethod
+    def flush(cls) -> bool:
+        """เขียน memo ลง config/header_memo.json ถ้ามีรายการใหม่ตั้งแต่ครั้งก่อน (เรียกหลังจบ scan / batch)"""
+        with cls._lock:
+            if not cls._dirty or cls._entries is None:
+                return True
+            try:
+                from config.json_manager import json_manager
+                saved = json_manager.save('header_memo', {'entries': dict(cls._entries)})
+            except Exception:
+                saved = False
+            if saved:
+                cls._dirty = False
+            return saved
+
+    @classmethod
+    def clear(cls) -> None:
+        """ล้าง memo ทั้งหมด"""
+        with cls._lock:
+            cls._entries = OrderedDict()
+            cls._dirty = False
+            try:
+                from config.json_manager import json_manager
+                json_manager.save('header_memo', {'entries': {}})
+            except Exception:
+                pass
+
+
+# รายการที่ยังไม่ได้ flush (เช่นโปรแกรมปิดกลาง scan) ถูกเขียนตอนจบ process
+atexit.register(HeaderMemo.flush)
@@ -0,0 +1,254 @@
+"""
+File Type Plan for PIPELINE_SQLSERVER
+
+Everything the pipeline derives from one file type's settings, compiled once:
+
+- the normalised column mapping and rename lookups (FileReaderService detection / rename)
+- the SQLAlchemy type of each target column and the typed column groups
+  (DataProcessorService, validators)
+- the upload strategy: `_update_strategy`, `_upsert_keys`, `_date_format`, `_dedup_mode`
+  and `__table_name__` (DataUploadService)
+
+Plans are immutable and cached per (logic type, settings dicts). Settings dicts come from
+a SettingsSnapshot and are replaced, never edited in place, when settings change, so a
+new settings version simply produces a new plan.
+"""
+
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Tuple
+
+import pandas as pd
+from sqlalchemy.types import DATE, DateTime, Float, Integer, NVARCHAR, Text
+
+from constants import DatabaseConstants, FileConstants, ProcessingConstants
+
+METADATA_COLUMNS = ('_loaded_at', '_created_at', '_source_file', '_batch_id', '_upsert_hash')
+
+# ใช้แทน {} เมื่อประเภทไฟล์ไม่มี settings (object เดิมทุกครั้ง จึงใช้เป็น cache key ได้)
+EMPTY_SETTINGS: Mapping[str, Any] = MappingProxyType({})
+
+
+def normalize_column_name(col) -> str:
+    """Normalize column name for matching (lowercase, no invisible characters, single spaces)"""
+    if pd.isna(col):
+        return ""
+
+    normalized = str(col).strip()
+
+    # ลบ zero-width characters และ invisible characters
+    normalized = normalized.replace('\u200b', '')  # Zero Width Space
+    normalized = normalized.replace('\u200c', '')  # Zero Width Non-Joiner
+    normalized = normalized.replace('\u200d', '')  # Zero Width Joiner
+    normalized = normalized.replace('\ufeff', '')  # Byte Order Mark
+
+    # lowercase และยุบช่องว่างซ้ำเหลือช่องว่างเดียว
+    return ' '.join(normalized.lower().split())
+
+
+def varchar_length(dtype_str: str) -> int:
+    """Extract length from NVARCHAR(n)"""
+    try:
+        if 'MAX' in dtype_str:
+            return 999999
+        return int(dtype_str.split('(')[1].split(')')[0])
+    except Exception:
+        return 255
+
+
+_sqlalchemy_types: Dict[str, Any] = {}
+
+
+def sqlalchemy_type(dtype_str):
+    """Convert a dtype string from the settings to a SQLAlchemy type object (shared per string)"""
+    if not isinstance(dtype_str, str):
+        return Text()
+
+    key = dtype_str.upper()
+    result = _sqlalchemy_types.get(key)
+    if result is not None:
+        return result
+
+    if key.startswith('NVARCHAR'):
+        # NVARCHAR(n) ที่ไม่เกิน 4000 ใช้ชนิดแบบมีความยาว (in-row, index ได้)
+        # นอกนั้น (MAX / ไม่ระบุ / ยาวเกิน) ใช้ Text() ซึ่ง map เป็น NVARCHAR(MAX)
+        length = varchar_length(key)
+        if 0 < length <= DatabaseConstants.NVARCHAR_MAX_INLINE_LENGTH and '(' in key:
+            result = NVARCHAR(length)
+        else:
+            result = Text()
+    elif key == 'INT':
+        result = Integer()
+    elif key == 'FLOAT':
+        result = Float()
+    elif key == 'DATE':
+        result = DATE()
+    elif key == 'DATETIME':
+        result = DateTime()
+    else:
+        result = Text()
+    return _sqlalchemy_types.setdefault(key, result)
+
+
+class ColumnGroups(NamedTuple):
+    """คอลัมน์ (ไม่รวม metadata) แยกตามชนิดที่ต้องตรวจสอบ"""
+    numeric: Tuple[str, ...]
+    date: Tuple[str, ...]
+    sized_string: Tuple[Tuple[str, int], ...]  # (column, max length) ของ NVARCHAR(n)
+
+
+def group_columns(required_cols: Mapping[str, Any]) -> ColumnGroups:
+    """แยกคอลัมน์ตามชนิด SQLAlchemy (ใช้ทั้งการตรวจสอบฝั่ง client และใน staging)"""
+    numeric, date, sized = [], [], []
+    for col, sa_type in required_cols.items():
+        if col in METADATA_COLUMNS:
+            continue
+        if isinstance(sa_type, (Integer, Float)):
+            numeric.append(col)
+        elif isinstance(sa_type, (DATE, DateTime)):
+            date.append(col)
+        elif isinstance(sa_type, NVARCHAR):
+            length = getattr(sa_type, 'length', None)
+            if isinstance(length, int) and 0 < length <= DatabaseConstants.NVARCHAR_MAX_INLINE_LENGTH:
+                sized.append((col, length))
+    return ColumnGroups(tuple(numeric), tuple(date), tuple(sized))
+
+
+class FileTypePlan:
+    """
+    Settings ที่ compile แล้วของประเภทไฟล์หนึ่ง (immutable, ใช้ร่วมกันข้าม threads)
+
+    ใช้ `FileTypePlan.get(...)` เพื่อรับ plan จาก cache แทนการสร้างใหม่
+    """
+
+    _plans: "OrderedDict[tuple, FileTypePlan]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, logic_type: str, columns: Mapping[str, str],
+                 dtypes: Mapping[str, Any] = EMPTY_SETTINGS) -> None:
+        self.logic_type = logic_type
+        # dict ต้นทาง (อ่านอย่างเดียว) ใช้ตรวจว่า plan ใน cache ยังตรงกับ settings
+        self.columns = columns
+        self.dtypes = dtypes
+
+        # ===== Mapping =====
+        self.keys_to_original = {normalize_column_name(k): k for k in columns.keys() if k}
+        self.vals_to_original = {normalize_column_name(v): v for v in columns.values() if v}
+        self.normalized_keys = frozenset(self.keys_to_original)
+        self.normalized_vals = frozenset(self.vals_to_original)
+        self.is_identity = self.normalized_keys == self.normalized_vals
+        # identity mapping: ชื่อใน config ตัวแรกของแต่ละชื่อที่ normalize แล้ว
+        self.identity_names: Dict[str, str] = {}
+        for key in columns.keys():
+            self.identity_names.setdefault(normalize_column_name(key), key)
+        self.inverted = {v: k for k, v in columns.items() if k and v}
+        self.target_columns = frozenset(columns.values())
+
+        # ===== Types =====
+        self.required_dtypes: Mapping[str, Any] = MappingProxyType({
+            new_col: sqlalchemy_type(dtypes.get(new_col, 'NVARCHAR(MAX)'))
+            for new_col in columns.values()
+        })
+        self.groups = group_columns(self.required_dtypes)
+
+        # ===== Strategy =====
+        self.update_strategy: str = dtypes.get('_update_strategy', 'replace')
+        self.upsert_keys: Tuple[str, ...] = tuple(dtypes.get('_upsert_keys', []) or [])
+        self.date_format: str = dtypes.get('_date_format', 'UK')
+        self.dedup_mode: str = dtypes.get('_dedup_mode', ProcessingConstants.DEDUP_MODE_OFF)
+        table_name = columns.get('__table_name__')
+        self.table_name: str = table_name or logic_type
+
+        self._mapping_digest = None
+
+    @property
+    def mapping_digest(self) -> str:
+        """Digest ของ column mapping (key ของ header memo, คำนวณครั้งเดียวต่อ plan)"""
+        if self._mapping_digest is None:
+            from services.file.header_memo import settings_version
+            self._mapping_digest = settings_version(dict(self.columns))
+        return self._mapping_digest
+
+    @classmethod
+    def get(cls, logic_type: str, columns: Mapping[str, str],
+            dtypes: Mapping[str, Any] = EMPTY_SETTINGS) -> 'FileTypePlan':
+        """คืน plan จาก cache (compile ใหม่เมื่อ settings dict เป็น object ใหม่)"""
+        # plan ถือ reference ของ dict ต้นทางไว้ id จึงไม่ถูกใช้ซ้ำระหว่างที่อยู่ใน cache
+        key = (logic_type, id(columns), id(dtypes))
+        with cls._lock:
+            plan = cls._plans.get(key)
+            if plan is not None and plan.columns is columns and plan.dtypes is dtypes:
+                cls._plans.move_to_end(key)
+                return plan
+
+        plan = cls(logic_type, columns, dtypes)
+        with cls._lock:
+            cls._plans[key] = plan
+            while len(cls._plans) > FileConstants.FILE_TYPE_PLAN_CACHE_SIZE:
+                cls._plans.popitem(last=False)
+        return plan
+
+    # ===== Mapping =====
+    def match_score(self, header_row: set, match_threshold) -> float:
+        """
+        Score ของ header row (ชื่อที่ normalize แล้ว) กับ mapping นี้
+
+        Args:
+            header_row: set ของชื่อคอลัมน์ที่ normalize แล้ว
+            match_threshold: callable(total_columns) -> score ขั้นต่ำ
+
+        Returns:
+            float: score (0.0 ถ้าไม่ถึงเกณฑ์)
+        """
+        if not self.columns:
+            return 0.0
+
+        if self.is_identity:
+            # สำหรับ identity mapping ใช้การจับคู่แบบตรง
+            total = len(self.normalized_keys)
+            score = len(header_row & self.normalized_keys) / total if total else 0
+        else:
+            # สำหรับ mapping ปกติ เลือกทิศทางที่มี match มากกว่า
+            keys_match = len(header_row & self.normalized_keys)
+            vals_match = len(header_row & self.normalized_vals)
+            required = self.normalized_keys if keys_match > vals_match else self.normalized_vals
+            total = len(required)
+            score = max(keys_match, vals_match) / total if total else 0
+
+        if total > 0 and score >= match_threshold(total):
+            return score
+        return 0.0
+
+    def rename_mapping(self, df_columns: List) -> Dict[Any, str]:
+        """mapping สำหรับ df.rename(columns=...) ของคอลัมน์ชุดนี้ (ทิศทาง mapping ตรวจให้อัตโนมัติ)"""
+        df_cols_normalized = {normalize_column_name(c): c for c in df_columns}
+        result_mapping = {}
+
+        if self.is_identity:
+            # identity mapping ไม่ต้อง rename แต่ใช้ชื่อจาก config เพื่อ standardize
+            for norm_col, original_df_col in df_cols_normalized.items():
+                if norm_col in self.normalized_keys:
+                    orig_key = self.identity_names[norm_col]
+                    if original_df_col != orig_key:
+                        result_mapping[original_df_col] = orig_key
+            return result_mapping
+
+        keys_matches = df_cols_normalized.keys() & self.normalized_keys
+        vals_matches = df_cols_normalized.keys() & self.normalized_vals
+
+        if len(keys_matches) >= len(vals_matches):
+            # DataFrame columns ตรงกับ keys มากกว่า -> mapping คือ old->new
+            for norm_col, original_df_col in df_cols_normalized.items():
+                if norm_col in self.keys_to_original:
+                    new_value = self.columns.get(self.keys_to_original[norm_col])
+                    if new_value and original_df_col != new_value:
+                        result_mapping[original_df_col] = new_value
+        else:
+            # DataFrame columns ตรงกับ values มากกว่า -> mapping ถูกใส่กลับด้าน
+            for norm_col, original_df_col in df_cols_normalized.items():
+                if norm_col in self.vals_to_original:
+                    new_value = self.inverted.get(self.vals_to_original[norm_col])
+                    if new_value and original_df_col != new_value:
+                        result_mapping[original_df_col] = new_value
+        return result_mapping
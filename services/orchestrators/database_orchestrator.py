@@ -132,7 +132,7 @@ class DatabaseOrchestrator:
         """Check and create schemas as specified if they don't exist"""
         return self.schema_service.ensure_schemas_exist(schema_names)
 
-    def upload_data(self, df, logic_type, required_cols, schema_name='bronze', log_func=None, force_recreate=False, clear_existing=True, batch_id=None):
+    def upload_data(self, df, logic_type, required_cols, schema_name='bronze', log_func=None, force_recreate=False, clear_existing=True, batch_id=None, profile=None):
         """
         อัปโหลดข้อมูลไปยังฐานข้อมูล: สร้างตารางใหม่ตาม config, insert เฉพาะคอลัมน์ที่ตั้งค่าไว้, ถ้า schema DB ไม่ตรงให้ drop และสร้างตารางใหม่
         
@@ -145,14 +145,16 @@ class DatabaseOrchestrator:
             force_recreate: บังคับสร้างตารางใหม่ (ใช้เมื่อมีการปรับปรุงชนิดข้อมูลอัตโนมัติ)
             clear_existing: ล้างข้อมูลเดิมหรือไม่ (default True เพื่อความเข้ากันได้แบบเดิม)
             batch_id: ID ของ batch สำหรับ tracking การ upload
+            profile: DataProfile ฝั่ง client (ถ้ามี ใช้กำหนดขนาด staging และข้ามการตรวจสอบที่รู้ผลแล้ว)
         """
         return self.upload_service.upload_data(
-            df, logic_type, required_cols, schema_name, log_func, force_recreate, clear_existing, batch_id=batch_id
+            df, logic_type, required_cols, schema_name, log_func, force_recreate, clear_existing,
+            batch_id=batch_id, profile=profile
         )
 
     def validate_data_in_staging(self, staging_table, logic_type, required_cols, 
                                schema_name='bronze', log_func=None, progress_callback=None, 
-                               date_format='UK'):
+                               date_format='UK', profile=None):
         """
         ตรวจสอบความถูกต้องของข้อมูลใน staging table ด้วย SQL
         
@@ -164,11 +166,12 @@ class DatabaseOrchestrator:
             log_func: ฟังก์ชันสำหรับ log
             progress_callback: ฟังก์ชันสำหรับรับ progress updates
             date_format: รูปแบบวันที่ ('UK' สำหรับ DD-MM หรือ 'US' สำหรับ MM-DD)
+            profile: DataProfile ฝั่ง client (ข้ามการตรวจสอบที่รู้ผลแล้ว)
             
         Returns:
             Dict: ผลการตรวจสอบ {'is_valid': bool, 'issues': [...], 'summary': str}
         """
         return self.validation_service.validate_data_in_staging(
             staging_table, logic_type, required_cols, schema_name, log_func, 
-            progress_callback, date_format
+            progress_callback, date_format, profile=profile
         )
\ No newline at end of file
@@ -23,6 +23,7 @@ Usage examples:
 
 from typing import Optional, Tuple
 import logging
+import os
 
 from services.file import (
     FileReaderService,
@@ -31,6 +32,7 @@ from services.file import (
 )
 from performance_optimizations import PerformanceOptimizer
 from services.settings_manager import settings_manager
+from utils.phase_timer import timed_phase
 
 
 class FileOrchestrator:
@@ -58,28 +60,15 @@ class FileOrchestrator:
         self.data_processor = DataProcessorService(self.log_callback)
         self.file_manager = FileManagementService(search_path)
 
-        # Load all file types from settings_manager
-        # Build legacy-style dictionaries for services that expect them
-        column_settings = {}
-        dtype_settings = {}
-
-        file_types = settings_manager.list_file_types()
-        for file_type in file_types:
-            column_settings[file_type] = settings_manager.get_column_settings(file_type)
-            dtype_settings[file_type] = settings_manager.get_dtype_settings(file_type)
-
-        self.file_reader.column_settings = column_settings
-        self.file_reader.dtype_settings = dtype_settings
-
-        self.data_processor.column_settings = column_settings
-        self.data_processor.dtype_settings = dtype_settings
+        # Load all file types from settings_manager (one shared snapshot)
+        self._settings_version = None
+        self._apply_settings_snapshot(settings_manager.snapshot())
 
         # สร้าง performance optimizer
         self.performance_optimizer = PerformanceOptimizer(self.log_callback)
 
         # เก็บ reference สำหรับ backward compatibility
         self.search_path = self.file_reader.search_path
-        self.column_settings = column_settings
 
     # ========================
     # Main Interface Methods
@@ -166,21 +155,24 @@ class FileOrchestrator:
             else:
                 file_type = 'excel'
             
-            success, df = self.performance_optimizer.read_large_file_chunked(file_path, file_type)
-            if not success:
-                return False, "Unable to read file"
+            with timed_phase('read', nbytes=os.path.getsize(file_path)) as measure:
+                success, df = self.performance_optimizer.read_large_file_chunked(file_path, file_type)
+                if not success:
+                    return False, "Unable to read file"
+                measure.rows = len(df)
             
             # Apply column mapping (พิจารณาทิศทาง mapping ให้ตรงกับ header ของไฟล์)
-            col_map = self.file_reader.build_rename_mapping_for_dataframe(df.columns, logic_type)
-            if col_map:
-                self.log_callback(f"Renamed columns by mapping ({len(col_map)} columns)")
-                df.rename(columns=col_map, inplace=True)
+            with timed_phase('rename', rows=len(df)):
+                col_map = self.file_reader.build_rename_mapping_for_dataframe(df.columns, logic_type)
+                if col_map:
+                    self.log_callback(f"Renamed columns by mapping ({len(col_map)} columns)")
+                    df.rename(columns=col_map, inplace=True)
             
             # ปรับปรุง memory usage
             df = self.performance_optimizer.optimize_memory_usage(df)
             
             # หมายเหตุ: การตรวจสอบข้อมูลจะทำใน staging table ด้วย SQL แทน pandas
-            self.log_callback(f"Ingest as NVARCHAR(MAX) first, then validate/convert using SQL")
+            self.log_callback(f"Ingest into staging (NVARCHAR sized from data) first, then validate/convert using SQL")
             
             # ทำความสะอาด memory
             self.performance_optimizer.cleanup_memory()
@@ -210,6 +202,10 @@ class FileOrchestrator:
         """Detect file type"""
         return self.file_reader.detect_file_type(file_path)
 
+    def flush_header_memo(self):
+        """Write header memo entries learned during a scan or batch"""
+        return self.file_reader.flush_header_memo()
+
     def get_column_name_mapping(self, file_type):
         """Get column name mapping by file type"""
         return self.file_reader.get_column_name_mapping(file_type)
@@ -222,6 +218,14 @@ class FileOrchestrator:
         """Validate required columns"""
         return self.data_processor.validate_columns(df, logic_type)
 
+    def deduplicate_batch(self, df, logic_type):
+        """Drop duplicate rows across files combined in one Replace batch"""
+        return self.data_processor.deduplicate_batch(df, logic_type)
+
+    def profile_dataframe(self, df, logic_type, source=None):
+        """Build a client-side column profile (reused by staging DDL and validation)"""
+        return self.data_processor.profile_dataframe(df, logic_type, source)
+
     def comprehensive_data_validation(self, df, logic_type):
         """Comprehensive data validation before processing"""
         return self.data_processor.comprehensive_data_validation(df, logic_type)
@@ -238,9 +242,27 @@ class FileOrchestrator:
         """Convert data types according to settings"""
         return self.data_processor.apply_dtypes(df, file_type)
 
-    def move_uploaded_files(self, file_paths, logic_types=None):
+    def move_uploaded_files(self, file_paths, logic_types=None, batch_id=None):
         """Move uploaded files to Uploaded_Files folder"""
-        return self.file_manager.move_uploaded_files(file_paths, logic_types, self.search_path)
+        return self.file_manager.move_uploaded_files(file_paths, logic_types, self.search_path, batch_id)
+
+    def queue_uploaded_files(self, file_paths, logic_types=None, callback=None, batch_id=None):
+        """Queue uploaded files for the background mover (see FileManagementService.queue_uploaded_files)"""
+        return self.file_manager.queue_uploaded_files(
+            file_paths, logic_types, self.search_path, callback=callback, batch_id=batch_id
+        )
+
+    def wait_for_moves(self, timeout=None):
+        """Wait for queued moves and return their latency stats"""
+        return self.file_manager.wait_for_moves(timeout)
+
+    def find_archived_files(self, name=None, day=None, logic_type=None, batch_id=None):
+        """Search the daily archive index (archive_mode: "zip")"""
+        return self.file_manager.find_archived_files(name, day, logic_type, batch_id, self.search_path)
+
+    def extract_archived_file(self, entry, destination_folder):
+        """Stream one archived file back out for reprocessing"""
+        return self.file_manager.extract_archived_file(entry, destination_folder, self.search_path)
 
     # ========================
     # Legacy Methods (เก็บไว้เพื่อ backward compatibility)
@@ -260,27 +282,24 @@ class FileOrchestrator:
 
     def load_settings(self):
         """Load new settings from settings_manager"""
-        # โหลดการตั้งค่าใหม่จาก settings_manager
-        # Build legacy-style dictionaries for services that expect them
-        column_settings = {}
-        dtype_settings = {}
-
-        file_types = settings_manager.list_file_types()
-        for file_type in file_types:
-            column_settings[file_type] = settings_manager.get_column_settings(file_type)
-            dtype_settings[file_type] = settings_manager.get_dtype_settings(file_type)
-
-        # อัปเดตข้อมูลใน file_reader และ data_processor
-        self.file_reader.column_settings = column_settings
-        self.file_reader.dtype_settings = dtype_settings
+        snapshot = settings_manager.snapshot()
+        # settings ไม่เปลี่ยนตั้งแต่ครั้งก่อน: ใช้ dict เดิมต่อ
+        if snapshot.version != self._settings_version:
+            self._apply_settings_snapshot(snapshot)
         self.file_reader._settings_loaded = True
-
-        self.data_processor.column_settings = column_settings
-        self.data_processor.dtype_settings = dtype_settings
         self.data_processor._settings_loaded = True
 
+    def _apply_settings_snapshot(self, snapshot):
+        """Give file_reader and data_processor the settings of a SettingsSnapshot"""
+        # Build legacy-style dictionaries for services that expect them
+        self.file_reader.apply_settings_snapshot(snapshot)
+
+        self.data_processor.column_settings = self.file_reader.column_settings
+        self.data_processor.dtype_settings = self.file_reader.dtype_settings
+
         # อัปเดต reference ใน FileService
-        self.column_settings = column_settings
+        self.column_settings = self.file_reader.column_settings
+        self._settings_version = snapshot.version
 
     def _process_dataframe_in_chunks(self, df, process_func, logic_type, chunk_size=5000):
         """Process DataFrame in chunks (legacy wrapper)"""
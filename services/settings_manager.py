@@ -4,24 +4,75 @@ Settings Manager Service
 Centralizes settings loading, caching, and reloading logic with support for new file type structure
 """
 
-import json
+import copy
 import os
 import threading
-from typing import Dict, Any, Optional, List
-from constants import PathConstants
+import time
+import weakref
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Optional, List, Mapping, Tuple
+from constants import FileConstants, PathConstants
 from config.json_manager import json_manager
 
 
+class SettingsSnapshot:
+    """
+    Immutable view of all file type configs at one settings version
+
+    Snapshots are never modified after creation, so readers share them without locking.
+    The inner column/dtype dicts are shared too: treat them as read-only and use
+    editable_column_settings() / editable_dtype_settings() for copies that may be edited.
+    """
+
+    __slots__ = ('version', 'file_types', 'configs', 'column_settings', 'dtype_settings', '_column_digest')
+
+    def __init__(self, version: int, configs: Dict[str, Dict[str, Any]]) -> None:
+        self.version = version
+        self.file_types: Tuple[str, ...] = tuple(sorted(configs))
+        self.configs: Mapping[str, Dict[str, Any]] = MappingProxyType(dict(configs))
+        self.column_settings: Mapping[str, Dict[str, Any]] = MappingProxyType(
+            {file_type: configs[file_type]['columns'] for file_type in self.file_types}
+        )
+        self.dtype_settings: Mapping[str, Dict[str, Any]] = MappingProxyType(
+            {file_type: configs[file_type]['dtypes'] for file_type in self.file_types}
+        )
+        self._column_digest: Optional[str] = None
+
+    @property
+    def column_digest(self) -> str:
+        """Digest ของ column settings ทั้งหมด (คำนวณครั้งเดียวต่อ snapshot, คงที่ข้าม process)"""
+        if self._column_digest is None:
+            from services.file.header_memo import settings_version
+            self._column_digest = settings_version(dict(self.column_settings))
+        return self._column_digest
+
+    def plan(self, file_type: str):
+        """FileTypePlan ของ file type นี้ (compile ครั้งเดียวต่อ snapshot)"""
+        from services.file_type_plan import EMPTY_SETTINGS, FileTypePlan
+        return FileTypePlan.get(
+            file_type,
+            self.column_settings.get(file_type, EMPTY_SETTINGS),
+            self.dtype_settings.get(file_type, EMPTY_SETTINGS),
+        )
+
+    def editable_column_settings(self) -> Dict[str, Dict[str, Any]]:
+        """สำเนา column settings ที่แก้ไขได้โดยไม่กระทบ snapshot"""
+        return copy.deepcopy(dict(self.column_settings))
+
+    def editable_dtype_settings(self) -> Dict[str, Dict[str, Any]]:
+        """สำเนา dtype settings ที่แก้ไขได้โดยไม่กระทบ snapshot"""
+        return copy.deepcopy(dict(self.dtype_settings))
+
+
 class SettingsManager:
     """
     Centralized settings management with file watching and caching
 
     Responsibilities:
     - Load column and dtype settings from file type configs
-    - Support both legacy (single file) and new (per-type files) structures
-    - Cache settings with timestamp-based invalidation
-    - Thread-safe settings access
-    - Automatic reload when files change
+    - Keep a versioned SettingsSnapshot of all file types (one directory scan)
+    - Reload only the file type configs whose mtime/size changed
+    - Thread-safe settings access (readers share snapshots lock-free)
     """
 
     _instance = None
@@ -44,49 +95,139 @@ class SettingsManager:
         self._initialized = True
         self._settings_lock = threading.Lock()
 
-        # Cache for file type configurations
-        self._file_type_cache: Dict[str, Dict[str, Any]] = {}
-        self._file_type_timestamps: Dict[str, float] = {}
+        # Snapshot ปัจจุบัน + ข้อมูลสำหรับตรวจการเปลี่ยนแปลง
+        self._snapshot = SettingsSnapshot(0, {})
+        self._dir_mtime_ns: Optional[int] = None
+        self._file_stats: Dict[str, Tuple[int, int]] = {}  # file_type -> (mtime_ns, size)
+        self._last_file_check = 0.0
 
-    def reload_all(self, force: bool = False) -> None:
-        """
-        Reload all settings from disk
+        # Listeners ของ file type ที่ถูกโหลดใหม่/เปลี่ยน (เรียกหลังปล่อย lock)
+        self._listeners: List[Any] = []
+        self._changed_file_types: Dict[str, Dict[str, Any]] = {}
 
-        Args:
-            force: Force reload even if files haven't changed
+    def add_file_type_listener(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        Register a callback(file_type, config) called when a file type config is first
+        loaded, changed on disk or saved (bound methods are held weakly)
         """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else (lambda: callback)
         with self._settings_lock:
-            self._file_type_cache.clear()
-            self._file_type_timestamps.clear()
+            self._listeners.append(ref)
 
-    def _get_file_type_config(self, file_type: str, reload: bool = True) -> Dict[str, Any]:
+    def _notify_listeners(self) -> None:
+        """Deliver pending file type changes (call without holding _settings_lock)"""
+        with self._settings_lock:
+            changed, self._changed_file_types = self._changed_file_types, {}
+            self._listeners = [ref for ref in self._listeners if ref() is not None]
+            callbacks = [ref() for ref in self._listeners]
+        for file_type, config in changed.items():
+            for callback in callbacks:
+                if callback is None:
+                    continue
+                try:
+                    callback(file_type, config)
+                except Exception:
+                    pass
+
+    # ===== Snapshot =====
+    def snapshot(self) -> SettingsSnapshot:
         """
-        Get file type configuration from new structure
+        Current SettingsSnapshot of all file types
 
-        Args:
-            file_type: Name of file type
-            reload: Whether to check for file changes
-
-        Returns:
-            Dict with 'columns' and 'dtypes' keys
+        The fast path is one stat of the file types directory. The per-file scan runs only
+        when the directory changed or FileConstants.SETTINGS_RECHECK_SECONDS passed (files
+        rewritten in place do not change the directory mtime). The version only increases
+        when a config was added, changed or removed.
         """
-        file_path = os.path.join(PathConstants.FILE_TYPES_DIR, f"{file_type}.json")
+        snapshot = self._snapshot
+        dir_mtime_ns = self._stat_dir()
+        if (dir_mtime_ns == self._dir_mtime_ns
+                and time.monotonic() - self._last_file_check < FileConstants.SETTINGS_RECHECK_SECONDS):
+            return snapshot
 
-        if not os.path.exists(file_path):
-            return {"columns": {}, "dtypes": {}}
-
-        if reload:
-            current_mtime = os.path.getmtime(file_path)
-            cached_mtime = self._file_type_timestamps.get(file_type, 0)
+        with self._settings_lock:
+            snapshot = self._rescan(dir_mtime_ns)
+        if self._changed_file_types:
+            self._notify_listeners()
+        return snapshot
+
+    @staticmethod
+    def _stat_dir() -> Optional[int]:
+        try:
+            return os.stat(PathConstants.FILE_TYPES_DIR).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan_file_stats(self) -> Dict[str, Tuple[int, int]]:
+        """(mtime_ns, size) ของทุกไฟล์ file type (ชื่อแบบเดียวกับ json_manager.list_file_types)"""
+        stats = {}
+        try:
+            with os.scandir(PathConstants.FILE_TYPES_DIR) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json') and not entry.name.startswith('.') and entry.is_file():
+                        stat = entry.stat()
+                        stats[entry.name.replace('.json', '')] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return stats
+
+    def _rescan(self, dir_mtime_ns: Optional[int]) -> SettingsSnapshot:
+        """เรียกขณะถือ _settings_lock: โหลดเฉพาะไฟล์ที่เปลี่ยน แล้วสร้าง snapshot ใหม่ถ้ามีการเปลี่ยนแปลง"""
+        stats = self._scan_file_stats()
+        configs = dict(self._snapshot.configs)
+        changed = False
+
+        for file_type in list(configs):
+            if file_type not in stats:
+                del configs[file_type]
+                changed = True
+        for file_type, stat in stats.items():
+            if file_type in configs and self._file_stats.get(file_type) == stat:
+                continue
+            config = json_manager.load_file_type(file_type)
+            configs[file_type] = config
+            changed = True
+            if self._listeners:
+                self._changed_file_types[file_type] = config
+
+        self._file_stats = stats
+        self._dir_mtime_ns = dir_mtime_ns
+        self._last_file_check = time.monotonic()
+        if changed:
+            self._snapshot = SettingsSnapshot(self._snapshot.version + 1, configs)
+        return self._snapshot
+
+    def _replace_config(self, file_type: str, config: Optional[Dict[str, Any]]) -> None:
+        """เรียกขณะถือ _settings_lock: snapshot ใหม่ที่แทน/ลบ config ของ file type เดียว"""
+        configs = dict(self._snapshot.configs)
+        stats = dict(self._file_stats)
+        if config is None:
+            configs.pop(file_type, None)
+            stats.pop(file_type, None)
+        else:
+            configs[file_type] = config
+            try:
+                stat = os.stat(os.path.join(PathConstants.FILE_TYPES_DIR, f"{file_type}.json"))
+                stats[file_type] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stats.pop(file_type, None)
+        self._file_stats = stats
+        self._snapshot = SettingsSnapshot(self._snapshot.version + 1, configs)
+        # การเขียน/ลบไฟล์ของเราเองเปลี่ยน mtime ของ directory ด้วย
+        self._dir_mtime_ns = self._stat_dir()
 
-            if file_type not in self._file_type_cache or current_mtime > cached_mtime:
-                # Load from file
-                config = json_manager.load_file_type(file_type)
-                self._file_type_cache[file_type] = config
-                self._file_type_timestamps[file_type] = current_mtime
-                return config
+    def reload_all(self, force: bool = False) -> None:
+        """
+        Reload all settings from disk
 
-        return self._file_type_cache.get(file_type, {"columns": {}, "dtypes": {}})
+        Args:
+            force: Force reload even if files haven't changed
+        """
+        with self._settings_lock:
+            if force:
+                # โหลดทุกไฟล์ใหม่ในการเรียก snapshot() ครั้งถัดไป
+                self._file_stats = {}
+            self._dir_mtime_ns = None
 
     def get_column_settings(self, file_type: str) -> Dict[str, Any]:
         """
@@ -98,9 +239,7 @@ class SettingsManager:
         Returns:
             Column settings dictionary
         """
-        with self._settings_lock:
-            config = self._get_file_type_config(file_type)
-            return config['columns']
+        return self.snapshot().column_settings.get(file_type, {})
 
     def get_dtype_settings(self, file_type: str) -> Dict[str, Any]:
         """
@@ -112,9 +251,7 @@ class SettingsManager:
         Returns:
             Dtype settings dictionary
         """
-        with self._settings_lock:
-            config = self._get_file_type_config(file_type)
-            return config['dtypes']
+        return self.snapshot().dtype_settings.get(file_type, {})
 
     def save_file_type(self, file_type: str, columns: Dict[str, str], dtypes: Dict[str, str]) -> bool:
         """
@@ -130,12 +267,13 @@ class SettingsManager:
         """
         success = json_manager.save_file_type(file_type, columns, dtypes)
         if success:
-            # Update cache
+            # snapshot เก็บสำเนา (ผู้เรียกอาจแก้ dict ของตัวเองต่อ)
+            config = {"columns": copy.deepcopy(columns), "dtypes": copy.deepcopy(dtypes)}
             with self._settings_lock:
-                self._file_type_cache[file_type] = {"columns": columns, "dtypes": dtypes}
-                file_path = os.path.join(PathConstants.FILE_TYPES_DIR, f"{file_type}.json")
-                if os.path.exists(file_path):
-                    self._file_type_timestamps[file_type] = os.path.getmtime(file_path)
+                self._replace_config(file_type, config)
+                if self._listeners:
+                    self._changed_file_types[file_type] = config
+            self._notify_listeners()
         return success
 
     def list_file_types(self) -> List[str]:
@@ -145,7 +283,7 @@ class SettingsManager:
         Returns:
             List of file type names
         """
-        return json_manager.list_file_types()
+        return list(self.snapshot().file_types)
 
     def delete_file_type(self, file_type: str) -> bool:
         """
@@ -160,15 +298,12 @@ class SettingsManager:
         success = json_manager.delete_file_type(file_type)
         if success:
             with self._settings_lock:
-                self._file_type_cache.pop(file_type, None)
-                self._file_type_timestamps.pop(file_type, None)
+                self._replace_config(file_type, None)
         return success
 
     def clear_cache(self) -> None:
         """Clear all cached settings (will reload on next access)"""
-        with self._settings_lock:
-            self._file_type_cache.clear()
-            self._file_type_timestamps.clear()
+        self.reload_all(force=True)
 
 
 # Global instance
@@ -4,10 +4,17 @@ Permission Checker Service for PIPELINE_SQLSERVER
 Checks SQL Server permissions required for application operation
 """
 
+import getpass
 import logging
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy import text
 
+from config.json_manager import json_manager
+from constants import DatabaseConstants
+
 
 class PermissionCheckerService:
     """
@@ -87,12 +94,54 @@ class PermissionCheckerService:
             }
         ]
     
-    def check_all_permissions(self, schema_name: str = 'bronze') -> Dict:
+    # สิทธิ์แต่ละตัวตรวจจากผลของ HAS_PERMS_BY_NAME (คอลัมน์ใน _PERMISSION_QUERY)
+    # ถ้ามีหลายคอลัมน์ ต้องได้สิทธิ์ครบทุกคอลัมน์
+    _CATALOG_CHECKS = {
+        'CREATE SCHEMA': ['can_create_schema'],
+        'CREATE TABLE': ['can_create_table', 'can_alter_schema'],
+        'DROP TABLE': ['can_alter_schema'],
+        'INSERT': ['can_insert'],
+        'UPDATE': ['can_update'],
+        'DELETE': ['can_delete'],
+        'ALTER TABLE': ['can_alter_schema'],
+        'TRUNCATE TABLE': ['can_alter_schema'],
+    }
+
+    # ข้อมูลผู้ใช้ + effective permissions ทั้งหมดใน round trip เดียว
+    # HAS_PERMS_BY_NAME คืน NULL เมื่อ securable ไม่มีอยู่ (เช่น schema ยังไม่ถูกสร้าง) -> ต้อง probe
+    _PERMISSION_QUERY = """
+        SELECT
+            SYSTEM_USER AS login_name,
+            USER_NAME() AS user_name,
+            DB_NAME() AS database_name,
+            IS_SRVROLEMEMBER('sysadmin') AS is_sysadmin,
+            IS_SRVROLEMEMBER('dbcreator') AS is_dbcreator,
+            IS_MEMBER('db_owner') AS is_db_owner,
+            IS_MEMBER('db_ddladmin') AS is_db_ddladmin,
+            IS_MEMBER('db_datawriter') AS is_db_datawriter,
+            IS_MEMBER('db_datareader') AS is_db_datareader,
+            HAS_PERMS_BY_NAME(DB_NAME(), 'DATABASE', 'CREATE SCHEMA') AS can_create_schema,
+            HAS_PERMS_BY_NAME(DB_NAME(), 'DATABASE', 'CREATE TABLE') AS can_create_table,
+            HAS_PERMS_BY_NAME(:schema_name, 'SCHEMA', 'ALTER') AS can_alter_schema,
+            HAS_PERMS_BY_NAME(:schema_name, 'SCHEMA', 'INSERT') AS can_insert,
+            HAS_PERMS_BY_NAME(:schema_name, 'SCHEMA', 'UPDATE') AS can_update,
+            HAS_PERMS_BY_NAME(:schema_name, 'SCHEMA', 'DELETE') AS can_delete
+    """
+
+    _cache_lock = threading.Lock()
+
+    def check_all_permissions(self, schema_name: str = 'bronze', use_cache: bool = True) -> Dict:
         """
         ตรวจสอบสิทธิ์ทั้งหมดที่จำเป็น
+
+        ลำดับการตรวจ:
+        1. ผลที่ผ่านการตรวจแล้วใน cache (ตาม server/database/login/schema และยังไม่หมด TTL)
+        2. HAS_PERMS_BY_NAME ทุกสิทธิ์ใน query เดียว
+        3. Probe ด้วย DDL จริง (แบบขนาน) เฉพาะสิทธิ์ที่ตอบไม่ได้จากข้อ 2
         
         Args:
             schema_name: ชื่อ schema ที่ต้องการตรวจสอบ
+            use_cache: ใช้ผลที่ cache ไว้ถ้ายังไม่หมดอายุ
             
         Returns:
             Dict: ผลการตรวจสอบสิทธิ์
@@ -106,8 +155,11 @@ class PermissionCheckerService:
                 'missing_optional': []
             }
         
-        # ไม่แสดงข้อความ "Starting SQL Server permission check" ใน GUI
-        # self.log_callback("Starting SQL Server permission check...")
+        cache_key = self._get_cache_key(schema_name)
+        if use_cache:
+            cached = self._load_cached_result(cache_key)
+            if cached is not None:
+                return cached
 
         results = {
             'success': True,
@@ -119,50 +171,44 @@ class PermissionCheckerService:
         }
 
         try:
-            # ตรวจสอบข้อมูลผู้ใช้
-            results['user_info'] = self._get_user_info()
+            # ตรวจสอบข้อมูลผู้ใช้และสิทธิ์จาก catalog ใน round trip เดียว
+            results['user_info'], catalog_flags = self._query_effective_permissions(schema_name)
 
-            # ตรวจสอบแต่ละสิทธิ์ (ไม่แสดงข้อความแต่ละสิทธิ์ใน GUI)
+            granted_by_name = {}
+            ambiguous = []
             for permission in self.required_permissions:
-                try:
-                    has_permission = permission['test_query'](schema_name)
-
-                    permission_result = {
-                        'name': permission['name'],
-                        'description': permission['description'],
-                        'granted': has_permission,
-                        'critical': permission['critical']
-                    }
-
-                    results['permissions'].append(permission_result)
+                granted = self._resolve_catalog_permission(permission['name'], catalog_flags)
+                if granted is None:
+                    ambiguous.append(permission)
+                else:
+                    granted_by_name[permission['name']] = (granted, 'catalog')
 
-                    if not has_permission:
-                        if permission['critical']:
-                            results['missing_critical'].append(permission['name'])
-                        else:
-                            results['missing_optional'].append(permission['name'])
+            # Probe เฉพาะสิทธิ์ที่ไม่ชัดเจน
+            if ambiguous:
+                granted_by_name.update(self._run_probes(ambiguous, schema_name))
 
-                    # ไม่แสดงข้อความแต่ละสิทธิ์ใน GUI
-                    # status = "" if has_permission else ("Error: " if permission['critical'] else "Warning: ")
-                    # self.log_callback(f"  {status} {permission['name']}: {permission['description']}")
+            for permission in self.required_permissions:
+                has_permission, source = granted_by_name.get(permission['name'], (False, 'error'))
+                results['permissions'].append({
+                    'name': permission['name'],
+                    'description': permission['description'],
+                    'granted': has_permission,
+                    'critical': permission['critical'],
+                    'source': source
+                })
 
-                except Exception as e:
-                    self.logger.error(f"Error testing {permission['name']}: {e}")
-                    results['missing_critical'].append(permission['name'])
-                    # ไม่แสดง error ใน GUI
-                    # self.log_callback(f"  {permission['name']}: Cannot test - {e}")
-
-            # ไม่แสดงสรุปผลใน GUI
-            # if results['missing_critical']:
-            #     results['success'] = False
-            #     results['recommendations'] = self._generate_recommendations(results)
-            # else:
-            #     if results['missing_optional']:
-            #         pass
+                if not has_permission:
+                    if permission['critical'] or source == 'error':
+                        results['missing_critical'].append(permission['name'])
+                    else:
+                        results['missing_optional'].append(permission['name'])
 
             if results['missing_critical']:
                 results['success'] = False
                 results['recommendations'] = self._generate_recommendations(results)
+            else:
+                # เก็บเฉพาะผลที่ผ่าน เพื่อให้การแก้สิทธิ์มีผลทันทีในการรันครั้งถัดไป
+                self._save_cached_result(cache_key, results)
             
         except Exception as e:
             results['success'] = False
@@ -170,6 +216,115 @@ class PermissionCheckerService:
             self.logger.error(f"Permission check failed: {e}")
         
         return results
+
+    def _query_effective_permissions(self, schema_name: str) -> Tuple[Dict, Dict]:
+        """ดึงข้อมูลผู้ใช้และ effective permissions (HAS_PERMS_BY_NAME) ใน query เดียว"""
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(text(self._PERMISSION_QUERY), {'schema_name': schema_name}).mappings().fetchone()
+        except Exception as e:
+            # Server ที่ไม่รองรับ query นี้ -> ใช้ probe ทั้งหมดแบบเดิม
+            self.logger.warning(f"Effective permission query failed, falling back to probes: {e}")
+            return self._get_user_info(), {}
+
+        user_info = {
+            'login_name': row['login_name'],
+            'user_name': row['user_name'],
+            'database_name': row['database_name'],
+            'is_sysadmin': bool(row['is_sysadmin']),
+            'is_dbcreator': bool(row['is_dbcreator']),
+            'is_db_owner': bool(row['is_db_owner']),
+            'is_db_ddladmin': bool(row['is_db_ddladmin']),
+            'is_db_datawriter': bool(row['is_db_datawriter']),
+            'is_db_datareader': bool(row['is_db_datareader'])
+        }
+        flags = {
+            key: (None if row[key] is None else bool(row[key]))
+            for columns in self._CATALOG_CHECKS.values() for key in columns
+        }
+        return user_info, flags
+
+    def _resolve_catalog_permission(self, permission_name: str, catalog_flags: Dict) -> Optional[bool]:
+        """แปลงผลจาก catalog เป็น True/False หรือ None (ไม่ชัดเจน ต้อง probe)"""
+        columns = self._CATALOG_CHECKS.get(permission_name)
+        if not columns or not catalog_flags:
+            return None
+        values = [catalog_flags.get(column) for column in columns]
+        if any(value is False for value in values):
+            return False
+        if any(value is None for value in values):
+            return None
+        return True
+
+    def _run_probes(self, permissions: List[Dict], schema_name: str) -> Dict[str, Tuple[bool, str]]:
+        """รัน probe DDL แบบขนาน (แต่ละ probe ใช้ตารางทดสอบชื่อไม่ซ้ำกัน)"""
+        # สร้าง schema ครั้งเดียวก่อน ไม่ให้ probe แต่ละตัวแข่งกันสร้าง
+        self._ensure_test_schema_exists(schema_name)
+
+        probe_results = {}
+        max_workers = max(1, min(DatabaseConstants.PERMISSION_PROBE_WORKERS, len(permissions)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_name = {
+                executor.submit(permission['test_query'], schema_name): permission['name']
+                for permission in permissions
+            }
+            for future in as_completed(future_to_name):
+                name = future_to_name[future]
+                try:
+                    probe_results[name] = (bool(future.result()), 'probe')
+                except Exception as e:
+                    self.logger.error(f"Error testing {name}: {e}")
+                    probe_results[name] = (False, 'error')
+        return probe_results
+
+    def _get_cache_key(self, schema_name: str) -> str:
+        """สร้าง key ของ cache จาก server/database/login/schema (ไม่ต้อง query)"""
+        try:
+            url = self.engine.url
+            server = url.host or ''
+            database = url.database or ''
+            login = url.username or f"windows:{getpass.getuser()}"
+        except Exception:
+            server, database, login = '', '', ''
+        return f"{server}|{database}|{login}|{schema_name}".lower()
+
+    def _load_cached_result(self, cache_key: str) -> Optional[Dict]:
+        """โหลดผลการตรวจสอบที่ยังไม่หมดอายุ"""
+        try:
+            with self._cache_lock:
+                entries = json_manager.load('permission_cache').get('entries', {})
+            entry = entries.get(cache_key)
+            if not entry:
+                return None
+            if time.time() - entry.get('checked_at', 0) > DatabaseConstants.PERMISSION_CACHE_TTL_SECONDS:
+                return None
+            cached = dict(entry.get('results', {}))
+            cached['from_cache'] = True
+            return cached
+        except Exception as e:
+            self.logger.warning(f"Failed to read permission cache: {e}")
+            return None
+
+    def _save_cached_result(self, cache_key: str, results: Dict) -> None:
+        """บันทึกผลที่ผ่านการตรวจสอบแล้ว (ลบรายการที่หมดอายุออกด้วย)"""
+        try:
+            now = time.time()
+            with self._cache_lock:
+                content = json_manager.load('permission_cache')
+                entries = {
+                    key: entry for key, entry in content.get('entries', {}).items()
+                    if now - entry.get('checked_at', 0) <= DatabaseConstants.PERMISSION_CACHE_TTL_SECONDS
+                }
+                entries[cache_key] = {'checked_at': now, 'results': results}
+                json_manager.save('permission_cache', {'entries': entries})
+        except Exception as e:
+            self.logger.warning(f"Failed to save permission cache: {e}")
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """ล้าง cache ผลการตรวจสอบสิทธิ์ทั้งหมด"""
+        with cls._cache_lock:
+            json_manager.save('permission_cache', {'entries': {}})
     
     def _get_user_info(self) -> Dict:
         """ดึงข้อมูลผู้ใช้ปัจจุบัน"""
@@ -180,6 +335,7 @@ class PermissionCheckerService:
                     SELECT 
                         SYSTEM_USER as login_name,
                         USER_NAME() as user_name,
+                        DB_NAME() as database_name,
                         IS_SRVROLEMEMBER('sysadmin') as is_sysadmin,
                         IS_SRVROLEMEMBER('dbcreator') as is_dbcreator,
                         IS_MEMBER('db_owner') as is_db_owner,
@@ -193,12 +349,13 @@ class PermissionCheckerService:
                 return {
                     'login_name': result[0],
                     'user_name': result[1],
-                    'is_sysadmin': bool(result[2]),
-                    'is_dbcreator': bool(result[3]),
-                    'is_db_owner': bool(result[4]),
-                    'is_db_ddladmin': bool(result[5]),
-                    'is_db_datawriter': bool(result[6]),
-                    'is_db_datareader': bool(result[7])
+                    'database_name': result[2],
+                    'is_sysadmin': bool(result[3]),
+                    'is_dbcreator': bool(result[4]),
+                    'is_db_owner': bool(result[5]),
+                    'is_db_ddladmin': bool(result[6]),
+                    'is_db_datawriter': bool(result[7]),
+                    'is_db_datareader': bool(result[8])
                 }
         except Exception as e:
             self.logger.error(f"Failed to get user info: {e}")
@@ -448,8 +605,8 @@ class PermissionCheckerService:
         return recommendations
     
     def generate_permission_report(self, schema_name: str = 'bronze') -> str:
-        """สร้างรายงานสิทธิ์แบบละเอียด"""
-        results = self.check_all_permissions(schema_name)
+        """สร้างรายงานสิทธิ์แบบละเอียด (ตรวจใหม่เสมอ ไม่ใช้ cache)"""
+        results = self.check_all_permissions(schema_name, use_cache=False)
         
         report = []
         report.append("=" * 70)
@@ -27,19 +27,16 @@ class PreloadService:
             if progress_callback:
                 progress_callback("Loading column settings...")
 
-            # โหลดการตั้งค่าคอลัมน์ทั้งหมดจาก settings_manager
-            column_settings = {}
-            file_types = settings_manager.list_file_types()
-            for file_type in file_types:
-                column_settings[file_type] = settings_manager.get_column_settings(file_type)
+            # โหลดการตั้งค่าทั้งหมดจาก settings_manager (snapshot เดียว)
+            # UI แก้ไข dict เหล่านี้ได้ จึงใช้สำเนาแทน dict ที่ snapshot ใช้ร่วมกัน
+            snapshot = settings_manager.snapshot()
+            column_settings = snapshot.editable_column_settings()
 
             if progress_callback:
                 progress_callback("Loading data type settings...")
 
             # โหลดการตั้งค่าประเภทข้อมูลทั้งหมด
-            dtype_settings = {}
-            for file_type in file_types:
-                dtype_settings[file_type] = settings_manager.get_dtype_settings(file_type)
+            dtype_settings = snapshot.editable_dtype_settings()
             
             if progress_callback:
                 progress_callback("Loading input folder path...")
@@ -0,0 +1,25 @@
+"""
+Shared pytest setup: the repo root on sys.path and config files in a temporary folder
+
+config.json_manager creates its config files on import, so PathConstants is pointed at a
+temporary folder before any test module imports it.
+"""
+
+import os
+import sys
+import tempfile
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_ROOT not in sys.path:
+    sys.path.insert(0, APP_ROOT)
+
+from constants import PathConstants  # noqa: E402
+
+SANDBOX_DIR = tempfile.mkdtemp(prefix="pipeline_tests_")
+PathConstants.CONFIG_DIR = os.path.join(SANDBOX_DIR, "config")
+PathConstants.FILE_TYPES_DIR = os.path.join(PathConstants.CONFIG_DIR, "file_types")
+PathConstants.PROFILES_DIR = os.path.join(SANDBOX_DIR, "profiles")
+PathConstants.QUERY_PROFILES_DIR = os.path.join(PathConstants.PROFILES_DIR, "queries")
+PathConstants.CACHE_DIR = os.path.join(SANDBOX_DIR, "cache")
+PathConstants.EMBEDDING_CACHE_DIR = os.path.join(PathConstants.CACHE_DIR, "embeddings")
+os.makedirs(PathConstants.FILE_TYPES_DIR, exist_ok=True)
@@ -0,0 +1,126 @@
+"""Crash-safe zip archive of processed files (user-050)"""
+
+import os
+import zipfile
+
+import pytest
+
+from services.file import archive_store
+from services.file.archive_store import ArchiveStore
+
+
+def _source(folder, name, content: bytes) -> str:
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def test_batches_of_one_day_share_one_verified_zip(tmp_path):
+    store = ArchiveStore(str(tmp_path / 'out'))
+    first = store.add_files([_source(tmp_path, 'a.csv', b'1,2\n' * 1000)], ['sales'], ['b1'], day='2026-10-18')
+    second = store.add_files([_source(tmp_path, 'a.csv', b'3,4\n'), _source(tmp_path, 'b.xlsx', b'xlsx')],
+                             ['sales', 'stock'], ['b2', 'b2'], day='2026-10-18')
+
+    assert first[0][1]['archive'] == second[0][1]['archive'] == 'processed_2026-10-18.zip'
+    assert [entry['member'] for _, entry in second] == ['a_1.csv', 'b.xlsx']
+    assert sorted(os.listdir(store.folder)) == ['.lock', 'processed_2026-10-18.index.jsonl', 'processed_2026-10-18.zip']
+    entries = store.find(day='2026-10-18')
+    assert [(e['name'], e['batch_id']) for e in entries] == [('a.csv', 'b1'), ('a.csv', 'b2'), ('b.xlsx', 'b2')]
+    assert b''.join(store.iter_file(entries[0])) == b'1,2\n' * 1000
+    assert b''.join(store.iter_file(store.find(batch_id='b2', logic_type='stock')[0])) == b'xlsx'
+    with zipfile.ZipFile(store.archive_path('2026-10-18')) as archive:
+        assert archive.testzip() is None
+
+
+def test_duplicate_names_in_one_batch(tmp_path):
+    (tmp_path / 'x').mkdir()
+    store = ArchiveStore(str(tmp_path / 'out'))
+    archived = store.add_files([_source(tmp_path, 'a.csv', b'one'), _source(tmp_path / 'x', 'a.csv', b'two')])
+    assert [entry['member'] for _, entry in archived] == ['a.csv', 'a_1.csv']
+    assert [b''.join(store.iter_file(entry)) for _, entry in archived] == [b'one', b'two']
+
+
+def test_failed_verification_keeps_the_previous_zip_and_index(tmp_path, monkeypatch):
+    store = ArchiveStore(str(tmp_path / 'out'))
+    kept = store.add_files([_source(tmp_path, 'old.csv', b'old')], day='2026-10-18')
+
+    def broken_verify(self, path, written):
+        raise ValueError("Archive verification failed")
+
+    monkeypatch.setattr(ArchiveStore, '_verify_zip', broken_verify)
+    source = _source(tmp_path, 'new.csv', b'new')
+    with pytest.raises(ValueError):
+        store.add_files([source], day='2026-10-18')
+
+    # zip ของวันและ index ไม่ถูกแตะ, ไม่มี .part ค้าง
+    assert sorted(n for n in os.listdir(store.folder) if n.endswith('.zip')) == [kept[0][1]['archive']]
+    assert not [n for n in os.listdir(store.folder) if n.endswith('.part')]
+    assert [e['name'] for e in store.find(day='2026-10-18')] == ['old.csv']
+    with zipfile.ZipFile(os.path.join(store.folder, kept[0][1]['archive'])) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ['old.csv']
+
+
+def test_unreadable_source_is_skipped(tmp_path):
+    store = ArchiveStore(str(tmp_path / 'out'))
+    archived = store.add_files([str(tmp_path / 'missing.csv'), _source(tmp_path, 'ok.csv', b'ok')])
+    assert [entry['name'] for _, entry in archived] == ['ok.csv']
+
+
+def test_legacy_daily_zip_entries_still_read(tmp_path):
+    store = ArchiveStore(str(tmp_path / 'out'))
+    os.makedirs(store.folder)
+    with zipfile.ZipFile(store.archive_path('2026-01-02'), 'w') as archive:
+        archive.writestr('old.csv', b'legacy')
+    entry = {'name': 'old.csv', 'member': 'old.csv', 'day': '2026-01-02'}
+    assert b''.join(store.iter_file(entry)) == b'legacy'
+    assert archive_store.ARCHIVE_FOLDER in store.entry_archive_path(entry)
+
+
+def test_service_deletes_sources_only_after_the_zip_is_stored(tmp_path, monkeypatch):
+    from services.file.file_management_service import FileManagementService
+
+    service = FileManagementService(str(tmp_path))
+    sources = [_source(tmp_path, 'a.csv', b'a'), _source(tmp_path, 'b.csv', b'b')]
+    settings = {'archive_mode': 'zip'}
+
+    def broken_verify(self, path, written):
+        raise OSError("disk error")
+
+    monkeypatch.setattr(ArchiveStore, '_verify_zip', broken_verify)
+    success, _ = service._archive_uploaded_files(sources, settings=settings)
+    assert not success and all(os.path.exists(path) for path in sources)
+
+    monkeypatch.undo()
+    success, archived = service._archive_uploaded_files(sources, ['sales', 'sales'], batch_id='b1', settings=settings)
+    assert success and len(archived) == 2
+    assert not any(os.path.exists(path) for path in sources)
+    assert [e['name'] for e in service.find_archived_files(batch_id='b1', search_path=str(tmp_path))] == ['a.csv', 'b.csv']
+
+
+def test_single_file_jobs_are_packed_into_one_zip_per_day(tmp_path, monkeypatch):
+    from services.file.file_management_service import FileManagementService
+
+    service = FileManagementService(str(tmp_path))
+    monkeypatch.setattr(FileManagementService, 'load_settings', lambda self: {'archive_mode': 'zip'})
+    (tmp_path / 'in').mkdir()
+    sources = [_source(tmp_path / 'in', f'f{i}.csv', f'{i}\n'.encode()) for i in range(5)]
+    results = []
+
+    for i, source in enumerate(sources):
+        service.queue_uploaded_files([source], ['sales'], str(tmp_path), batch_id=f'b{i}',
+                                     callback=lambda success, result: results.append((success, result)))
+    stats = service.wait_for_moves()
+
+    archive_folder = tmp_path / archive_store.ARCHIVE_FOLDER
+    zips = [n for n in os.listdir(archive_folder) if n.endswith('.zip')]
+    assert len(zips) == 1 and not [n for n in os.listdir(archive_folder) if n.endswith('.part')]
+    assert stats['jobs'] == 1 and stats['moved_files'] == 5
+    assert not any(os.path.exists(path) for path in sources)
+    assert [len(result) for success, result in results if success] == [1] * 5
+    entries = service.find_archived_files(search_path=str(tmp_path))
+    assert [e['batch_id'] for e in entries] == [f'b{i}' for i in range(5)]
+    assert [b''.join(service.get_archive_store(str(tmp_path)).iter_file(e)) for e in entries] == [
+        f'{i}\n'.encode() for i in range(5)
+    ]
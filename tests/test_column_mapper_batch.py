@@ -0,0 +1,108 @@
+"""Batched column similarity search matches the pairwise scores (user-041)"""
+
+import hashlib
+import logging
+
+import numpy as np
+import pytest
+
+from addons.column_mapper.services import ml_column_mapper
+from addons.column_mapper.services.ml_column_mapper import MLColumnMapper
+
+SOURCES = [
+    'หมายเลขคำสั่งซื้อ', 'Order ID', 'ชื่อสินค้า', 'Product Name', 'ราคาสินค้า', 'Total Price',
+    'วันที่สั่งซื้อ', 'Created Time', 'ชื่อผู้ซื้อ', 'Buyer Username', 'Shopee Voucher', 'qty',
+]
+TARGETS = {
+    'order_no', 'order_id', 'product_name', 'product_sku', 'price', 'total_amount', 'order_date',
+    'created_at', 'buyer_name', 'customer_id', 'shopee_voucher', 'quantity', 'tracking_number',
+    'หมายเลขพัสดุ', 'ชื่อลูกค้า', 'ยอดรวม',
+}
+
+
+class HashingEncoder:
+    """Deterministic stub encoder: bag of hashed character trigrams (no model, no disk cache)"""
+
+    dim = 64
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f"  {text.lower()} "
+            for k in range(len(padded) - 2):
+                bucket = int(hashlib.md5(padded[k:k + 3].encode('utf-8')).hexdigest(), 16) % self.dim
+                vectors[row, bucket] += 1.0
+        return vectors
+
+
+@pytest.fixture
+def mapper(tmp_path, monkeypatch):
+    def sandbox_logging(self):
+        # log ลง tmp_path แทน addons/column_mapper/column_mapper.log ใน source tree
+        self.file_logger = logging.getLogger('MLColumnMapper')
+        self.file_logger.handlers.clear()
+        self.file_logger.addHandler(logging.FileHandler(tmp_path / 'column_mapper.log', encoding='utf-8'))
+
+    monkeypatch.setattr(MLColumnMapper, 'setup_logging', sandbox_logging)
+    mapper = MLColumnMapper(log_callback=lambda message: None, encoder=HashingEncoder(), use_embedding_cache=False)
+    yield mapper
+    for handler in mapper.file_logger.handlers:
+        handler.close()
+    mapper.file_logger.handlers.clear()
+
+
+def _semantic(mapper, source, target):
+    """Expected semantic score straight from the stub encoder: cosine of the cleaned names, clipped at 0"""
+    vectors = HashingEncoder().encode([mapper._clean_column_name(source), mapper._clean_column_name(target)])
+    a, b = (vector / (np.linalg.norm(vector) or 1) for vector in vectors)
+    return max(float(a @ b), 0.0)
+
+
+def _pairwise(mapper, source, targets, file_type):
+    """Reference result: stub-encoder cosine plus the per-pair string/context scores"""
+    scored = []
+    for target in targets:
+        semantic = _semantic(mapper, source, target)
+        string = mapper._calculate_string_similarity(source, target)
+        context = mapper._calculate_context_similarity(source, target, file_type)
+        combined = (semantic * ml_column_mapper.SEMANTIC_WEIGHT + string * ml_column_mapper.STRING_WEIGHT
+                    + context * ml_column_mapper.CONTEXT_WEIGHT)
+        if combined > ml_column_mapper.MIN_COMBINED_SCORE:
+            scored.append((combined, target, semantic, string, context))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return scored[:ml_column_mapper.MAX_SUGGESTIONS]
+
+
+def _combined(mapper, source, target, file_type):
+    return (_semantic(mapper, source, target) * ml_column_mapper.SEMANTIC_WEIGHT
+            + mapper._calculate_string_similarity(source, target) * ml_column_mapper.STRING_WEIGHT
+            + mapper._calculate_context_similarity(source, target, file_type) * ml_column_mapper.CONTEXT_WEIGHT)
+
+
+@pytest.mark.parametrize('file_type', [None, 'shopee_orders', 'jst_orders'])
+def test_batch_matches_pairwise(mapper, file_type):
+    batch = mapper._find_similar_columns_batch(SOURCES, TARGETS, file_type)
+    for source in SOURCES:
+        expected = _pairwise(mapper, source, sorted(TARGETS), file_type)
+        actual = batch.get(source, [])
+        # คะแนนที่เท่ากัน (float32) สลับลำดับกันได้: เทียบคะแนนทีละอันดับ และคะแนนของแต่ละ target ที่เลือก
+        assert len(actual) == len(expected), source
+        for suggestion, (combined, _, _, _, _) in zip(actual, expected):
+            assert suggestion['confidence'] == pytest.approx(combined * 100, abs=0.11), source
+            target = suggestion['target_column']
+            assert suggestion['semantic_score'] == pytest.approx(
+                _semantic(mapper, source, target) * 100, abs=0.11)
+            assert suggestion['string_score'] == pytest.approx(
+                mapper._calculate_string_similarity(source, target) * 100, abs=0.11)
+            assert suggestion['context_score'] == pytest.approx(
+                mapper._calculate_context_similarity(source, target, file_type) * 100, abs=0.11)
+            assert suggestion['confidence'] == pytest.approx(_combined(mapper, source, target, file_type) * 100,
+                                                             abs=0.11)
+
+
+def test_single_source_uses_the_same_path(mapper):
+    batch = mapper._find_similar_columns_batch(SOURCES, TARGETS)
+    for source in SOURCES:
+        single = mapper._find_similar_columns(source, TARGETS)
+        expected = batch.get(source, [])
+        assert [s['confidence'] for s in single] == pytest.approx([s['confidence'] for s in expected], abs=0.11)
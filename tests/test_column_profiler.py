@@ -0,0 +1,42 @@
+"""Client-side column profile checks (user-032)"""
+
+import pandas as pd
+
+from services.file.column_profiler import KIND_NUMERIC, KIND_STRING, ColumnProfile, DataProfile
+from utils.helpers import nvarchar_lengths
+
+
+def _numeric_failures(values) -> int:
+    profile = ColumnProfile('amount', KIND_NUMERIC)
+    profile.update(pd.Series(values, dtype=object))
+    return profile.numeric_fail_count
+
+
+def test_ascii_numbers_are_clean():
+    assert _numeric_failures(['123', '-4.5', '1,234.50', '"7"', '.5', '1e10', '-', '', None]) == 0
+
+
+def test_non_ascii_digits_are_not_numeric_clean():
+    # เลขไทย / Arabic-Indic / full-width: TRY_CAST(... AS FLOAT) ให้ NULL จึงต้องนับเป็น failure
+    assert _numeric_failures(['๑๒๓', '١٢٣', '１２３', '12๓', '1.๕']) == 5
+
+
+def test_mixed_column_counts_only_non_ascii():
+    assert _numeric_failures(['10', '๒๐', '30']) == 1
+
+
+def test_max_length_counts_utf16_code_units():
+    # emoji อยู่นอก BMP: Python นับ 1 แต่ NVARCHAR/LEN นับ 2 (surrogate pair)
+    profile = ColumnProfile('note', KIND_STRING)
+    profile.update(pd.Series(['abcd\U0001F600', 'ไทย'], dtype=object))
+    assert profile.max_length == 6
+
+    data_profile = DataProfile('notes')
+    data_profile.columns['note'] = profile
+    assert not data_profile.fits_length('note', 5)
+    assert data_profile.fits_length('note', 6)
+
+
+def test_nvarchar_lengths():
+    values = pd.Series(['', 'abc', '\U0001F600\U0001F600', 'é', '𠀀x'])
+    assert nvarchar_lengths(values).tolist() == [0, 3, 4, 1, 3]
@@ -0,0 +1,43 @@
+"""Staging cleaning / conversion SQL of the conversion plan (user-038)"""
+
+import pandas as pd
+from sqlalchemy.types import DateTime, Float, Integer, NVARCHAR
+
+from services.database.conversion_plan import ConversionPlan
+from services.file.column_profiler import KIND_NUMERIC, ColumnProfile
+from utils.sql_utils import get_date_cleaning_expression, get_numeric_cleaning_expression
+
+REQUIRED_COLS = {'qty': Integer(), 'amount': Float(), 'doc_date': DateTime(), 'note': NVARCHAR(50)}
+
+
+def _plan(persisted_clean: bool = False) -> ConversionPlan:
+    return ConversionPlan('sales', REQUIRED_COLS, 'UK', persisted_clean=persisted_clean)
+
+
+def test_cleaning_turns_blank_cells_into_null():
+    # ช่องว่าง/tab/NBSP ถูกตัดเหลือ '' ต้องกลายเป็น NULL ไม่ใช่ 1900-01-01 หรือ 0
+    for expression in (get_numeric_cleaning_expression('c'), get_date_cleaning_expression('c')):
+        assert expression.startswith('NULLIF(NULLIF(')
+        assert expression.endswith(", '-'), '')")
+
+
+def test_int_transfer_and_validation_use_the_same_conversion():
+    plan = _plan()
+    qty = plan.columns['qty']
+    assert 'FLOOR(' in qty.convert_sql and qty.convert_sql.startswith('TRY_CONVERT(INT,')
+    # validation = "มีค่าแต่แปลงไม่ได้" ด้วย expression เดียวกับที่ transfer ใช้
+    assert qty.convert_sql in qty.error_condition
+    amount = plan.columns['amount']
+    assert amount.convert_sql.startswith('TRY_CONVERT(FLOAT,') and amount.convert_sql in amount.error_condition
+
+
+def test_persisted_plan_references_clean_columns():
+    qty = _plan(persisted_clean=True).columns['qty']
+    assert '[qty__clean]' in qty.convert_sql and 'REPLACE(' not in qty.convert_sql
+
+
+def test_integer_profile_rejects_fractions_and_overflow():
+    profile = ColumnProfile('qty', KIND_NUMERIC, integer=True)
+    profile.update(pd.Series(['1', '1.0', '1,000', '-', '1.5', '3000000000', 'abc'], dtype=object))
+    assert profile.numeric_fail_count == 3
+    assert ColumnProfile.from_dict(profile.to_dict()).integer
@@ -0,0 +1,32 @@
+"""Learned date styles stay within the date format family (user-039)"""
+
+import pandas as pd
+
+from services.database.date_styles import infer_date_style
+from services.file.column_profiler import KIND_DATE, ColumnProfile
+from utils.sql_utils import get_date_conversion_expression, get_date_styles
+
+
+def _profile(values) -> ColumnProfile:
+    profile = ColumnProfile('doc_date', KIND_DATE)
+    profile.update(pd.Series(values, dtype=object))
+    return profile
+
+
+def test_uk_type_does_not_learn_month_first_style():
+    # ทุกค่าตรง %m/%d/%Y (และค่ากำกวมตรง %d/%m/%Y ด้วย) แต่ UK ต้องไม่เรียนรู้ 101
+    profile = _profile(['12/25/2024', '11/30/2024', '01/02/2024', '03/04/2024'])
+    assert infer_date_style(profile, 'UK') != 101
+    assert infer_date_style(profile, 'US') == 101
+
+
+def test_uk_type_learns_its_own_styles():
+    assert infer_date_style(_profile(['25.12.2024', '30.11.2024']), 'UK') == 104
+    assert infer_date_style(_profile(['2024-12-25', '2024-11-30']), 'UK') == 121
+
+
+def test_foreign_preferred_style_keeps_the_preference_order():
+    assert get_date_styles('UK', 101) == get_date_styles('UK')
+    assert get_date_conversion_expression('x', 'UK', 101).startswith('COALESCE(TRY_CONVERT(DATETIME, x, 103)')
+    assert get_date_styles('UK', 105)[0] == 105
+    assert set(get_date_styles('UK', 105)) == set(get_date_styles('UK'))
@@ -0,0 +1,47 @@
+"""Embedding store rows stay aligned with the index (user-042)"""
+
+import numpy as np
+
+from addons.column_mapper.services.embedding_store import EmbeddingStore
+
+
+def _vectors(*values):
+    return np.array([[value] * 4 for value in values], dtype=np.float32)
+
+
+def test_stray_rows_are_not_mapped_to_new_names(tmp_path):
+    store = EmbeddingStore('stub', str(tmp_path))
+    assert store.add(['a', 'b'], _vectors(1, 2))
+    # row ที่เขียนค้าง (process ล้มก่อนเขียน index)
+    with open(store.data_path, 'ab') as f:
+        f.write(_vectors(99).tobytes())
+
+    assert EmbeddingStore('stub', str(tmp_path)).add(['c'], _vectors(3))
+
+    found, missing = EmbeddingStore('stub', str(tmp_path)).get_many(['a', 'b', 'c'])
+    assert missing == []
+    assert [float(found[name][0]) for name in ('a', 'b', 'c')] == [1.0, 2.0, 3.0]
+
+
+def test_stale_stores_append_after_each_other(tmp_path):
+    first = EmbeddingStore('stub', str(tmp_path))
+    second = EmbeddingStore('stub', str(tmp_path))
+    assert first.add(['a'], _vectors(1))
+    # second โหลด index ก่อน first เขียน: ต้องไม่เขียนทับ row ของ 'a'
+    assert second.add(['b'], _vectors(2))
+
+    found, _ = EmbeddingStore('stub', str(tmp_path)).get_many(['a', 'b'])
+    assert float(found['a'][0]) == 1.0 and float(found['b'][0]) == 2.0
+
+
+def test_short_data_file_restarts_the_cache(tmp_path):
+    store = EmbeddingStore('stub', str(tmp_path))
+    assert store.add(['a', 'b'], _vectors(1, 2))
+    with open(store.data_path, 'r+b') as f:
+        f.truncate(20)  # ไม่ครบ 2 rows และไม่ลงตัวกับขนาด row
+
+    reopened = EmbeddingStore('stub', str(tmp_path))
+    assert len(reopened) == 0
+    assert reopened.add(['c'], _vectors(3))
+    found, missing = EmbeddingStore('stub', str(tmp_path)).get_many(['a', 'c'])
+    assert missing == ['a'] and float(found['c'][0]) == 3.0
@@ -0,0 +1,36 @@
+"""Cross-process file lock (user-042)"""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import APP_ROOT
+from utils.file_lock import file_lock
+
+HOLDER = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+from utils.file_lock import file_lock
+with file_lock(sys.argv[2]):
+    print('locked', flush=True)
+    time.sleep(float(sys.argv[3]))
+"""
+
+
+def test_lock_held_by_another_process_blocks(tmp_path):
+    lock_path = str(tmp_path / 'store.lock')
+    holder = subprocess.Popen([sys.executable, '-c', HOLDER, APP_ROOT, lock_path, '1.5'],
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == 'locked'
+        with pytest.raises(TimeoutError):
+            with file_lock(lock_path, timeout=0.2):
+                pass
+        started = time.monotonic()
+        with file_lock(lock_path, timeout=10):
+            # ได้ lock หลัง process แรกปล่อย
+            assert time.monotonic() - started > 0.3
+    finally:
+        holder.wait(timeout=10)
@@ -0,0 +1,43 @@
+"""Header memo writes once per scan / batch (user-046)"""
+
+import pytest
+
+from config.json_manager import json_manager
+from services.file.header_memo import HeaderMemo
+
+
+@pytest.fixture
+def saves(monkeypatch):
+    HeaderMemo.clear()
+    calls = []
+    original_save = json_manager.save
+
+    def recording_save(name, data):
+        calls.append((name, len(data.get('entries', {}))))
+        return original_save(name, data)
+
+    monkeypatch.setattr(json_manager, 'save', recording_save)
+    yield calls
+    HeaderMemo.clear()
+
+
+def test_new_layouts_are_written_once_per_flush(saves):
+    for i in range(50):
+        HeaderMemo.put(HeaderMemo.make_key('detect', (('col', str(i)),), 'v1'), {'logic_type': 'sales'})
+    assert saves == []
+
+    assert HeaderMemo.flush()
+    assert saves == [('header_memo', 50)]
+    # ไม่มีรายการใหม่ = ไม่เขียนซ้ำ (get อย่างเดียวไม่ทำให้ dirty)
+    assert HeaderMemo.get(HeaderMemo.make_key('detect', (('col', '0'),), 'v1')) == {'logic_type': 'sales'}
+    assert HeaderMemo.flush()
+    assert len(saves) == 1
+
+
+def test_flushed_entries_survive_a_reload(saves):
+    key = HeaderMemo.make_key('rename', ('a', 'b'), 'digest', 'sales')
+    HeaderMemo.put(key, {'mapping': {'a': 'A'}})
+    HeaderMemo.flush()
+
+    HeaderMemo._entries = None  # เหมือนเปิดโปรแกรมใหม่
+    assert HeaderMemo.get(key) == {'mapping': {'a': 'A'}}
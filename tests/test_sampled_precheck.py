@@ -0,0 +1,39 @@
+"""Sampled pre-check of two-stage validation (user-033)"""
+
+from constants import ProcessingConstants
+from services.database.validation.main_validator import MainValidator
+
+
+class _RecordingConnection:
+    """คืนผลที่กำหนดไว้และเก็บ SQL ที่ถูกส่งมา"""
+
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        return self
+
+    def fetchone(self):
+        return self.row
+
+
+def test_sample_is_an_iid_row_sample():
+    validator = MainValidator(engine=None)
+    sample_rows = ProcessingConstants.VALIDATION_SAMPLE_ROWS
+    conn = _RecordingConnection((sample_rows, 5, 0))
+
+    result = validator._query_sample_errors(conn, 'stg', 'bronze', ['a IS NULL', 'b IS NULL'], sample_rows * 10)
+
+    assert result == (sample_rows, [5, 0])
+    sql = conn.statements[0].upper()
+    assert 'ABS(CHECKSUM(NEWID()) % 10) = 0' in sql
+    assert 'TABLESAMPLE' not in sql and 'TOP' not in sql
+
+
+def test_too_small_sample_falls_back_to_full_scan():
+    validator = MainValidator(engine=None)
+    conn = _RecordingConnection((10, 10))
+
+    assert validator._query_sample_errors(conn, 'stg', 'bronze', ['a IS NULL'], 1_000_000) == (0, [0])
@@ -0,0 +1,74 @@
+"""Cold-start regression checks for the entry points (user-029)"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import APP_ROOT
+
+# โหลดช้า: ต้องไม่ถูก import ตอนโหลด auto_process_cli (โหลดเมื่อสร้าง AutoProcessCLI เท่านั้น)
+HEAVY_MODULES = ('pandas', 'numpy', 'sqlalchemy', 'pyodbc', 'tkinter', 'customtkinter')
+
+
+def _loaded_after_import(module: str, tmp_path) -> list:
+    """import module ใน interpreter ใหม่ (config ชี้ไปที่ tmp_path) แล้วคืน heavy modules ที่ถูกโหลด"""
+    code = (
+        "import json, os, sys\n"
+        "from constants import PathConstants\n"
+        f"PathConstants.CONFIG_DIR = {str(tmp_path / 'config')!r}\n"
+        "PathConstants.FILE_TYPES_DIR = os.path.join(PathConstants.CONFIG_DIR, 'file_types')\n"
+        f"import {module}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=APP_ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_cli_import_does_not_load_heavy_modules(tmp_path):
+    assert _loaded_after_import('auto_process_cli', tmp_path) == []
+
+
+def test_gui_entry_import_does_not_load_heavy_modules(tmp_path):
+    assert _loaded_after_import('pipeline_gui_app', tmp_path) == []
+
+
+def test_profile_startup_does_not_take_folder_path():
+    from auto_process_cli import build_parser
+
+    args = build_parser().parse_args(['--profile-startup', os.path.join('data', 'in')])
+    assert args.profile_startup is True
+    assert args.folder_path == os.path.join('data', 'in')
+    assert args.profile_output is None
+
+    args = build_parser().parse_args(['--profile-startup', '--profile-output', 'profile.json', 'in'])
+    assert (args.profile_output, args.folder_path) == ('profile.json', 'in')
+
+
+def test_no_folder_and_no_saved_input_folder_prints_usage(monkeypatch, capsys):
+    import auto_process_cli
+
+    class _NoInputFolder:
+        def load_input_folder(self):
+            return None
+
+    class _StubCLI:
+        settings_handler = _NoInputFolder()
+
+        def log(self, message):
+            print(message)
+
+    monkeypatch.setattr(auto_process_cli, 'AutoProcessCLI', _StubCLI)
+    monkeypatch.setattr(auto_process_cli, 'setup_logging', lambda level=None: None)
+    monkeypatch.setattr(sys, 'argv', ['auto_process_cli.py'])
+
+    with pytest.raises(SystemExit) as exit_info:
+        auto_process_cli.main()
+    assert exit_info.value.code == 1
+    output = capsys.readouterr().out
+    assert 'No source folder specified' in output and 'usage:' in output
@@ -0,0 +1,85 @@
+"""Over-long NVARCHAR(n) values reject the load instead of being truncated (user-031)"""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.types import NVARCHAR
+
+from constants import ProcessingConstants
+from services.database.validation.main_validator import MainValidator
+
+ROWS = 200
+
+
+@pytest.fixture
+def engine():
+    # SQLite แทน SQL Server: schema bronze = attached database, LEN = ความยาวแบบ UTF-16 ของ NVARCHAR
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+
+    @event.listens_for(engine, 'connect')
+    def _setup(dbapi_conn, _):
+        dbapi_conn.execute("ATTACH DATABASE ':memory:' AS bronze")
+        dbapi_conn.create_function(
+            'LEN', 1, lambda value: None if value is None else len(value.rstrip(' ').encode('utf-16-le')) // 2
+        )
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE bronze.stg (code TEXT)"))
+        conn.execute(text("INSERT INTO bronze.stg (code) VALUES (:code)"), [{'code': f"C{i:04d}"} for i in range(ROWS)])
+    return engine
+
+
+def _validate(engine, monkeypatch):
+    validator = MainValidator(engine)
+    monkeypatch.setattr(validator.index_manager, 'create_temp_indexes', lambda *args, **kwargs: 0)
+    monkeypatch.setattr(validator.index_manager, 'drop_temp_indexes', lambda *args, **kwargs: None)
+    monkeypatch.setattr(validator.schema_validator, 'validate_schema_compatibility', lambda *args, **kwargs: [])
+    monkeypatch.setattr(validator.scheduler, 'resolve_parallelism', lambda: 1)
+    return validator.validate_data_in_staging('stg', 'sales', {'code': NVARCHAR(10)})
+
+
+def test_values_that_fit_pass(engine, monkeypatch):
+    assert _validate(engine, monkeypatch)['is_valid']
+
+
+def test_single_over_long_value_rejects_the_load(engine, monkeypatch):
+    # 1 แถวจาก 200 (0.5%) ต่ำกว่าเกณฑ์ warning แต่ต้องไม่ผ่าน เพราะ transfer จะตัดข้อความ
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE bronze.stg SET code = 'C0000-TOO-LONG' WHERE code = 'C0000'"))
+    result = _validate(engine, monkeypatch)
+    assert not result['is_valid']
+    assert [(i['validation_type'], i['column'], i['error_count']) for i in result['issues']] == [
+        ('string_length_validation', 'code', 1)
+    ]
+
+
+class _CleanSampleEngine:
+    """engine ที่ sample query คืน 'ไม่มีแถวผิด' (ถ้าถูกเรียก pre-check จะข้าม full scan)"""
+
+    def __init__(self):
+        self.statements = []
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        return self
+
+    def fetchone(self):
+        return (ProcessingConstants.VALIDATION_SAMPLE_ROWS, 0)
+
+
+def test_sampled_precheck_never_skips_length_checks():
+    engine = _CleanSampleEngine()
+    validator = MainValidator(engine)
+    phases, _ = validator._build_validation_phases({'code': NVARCHAR(10)}, 'UK')
+    failing, remaining = validator._run_sampled_precheck('stg', 'bronze', phases, 10_000_000, 'UK')
+    assert failing == [] and remaining == phases
+    assert engine.statements == []
@@ -5,9 +5,19 @@ User Interface module สำหรับ PIPELINE_SQLSERVER
 - MainWindow: หน้าต่างหลักของแอปพลิเคชัน GUI
 - Components: ส่วนประกอบ UI ต่างๆ เช่น file list, progress bar, status bar
 - LoginWindow: หน้าต่างสำหรับตั้งค่าการเชื่อมต่อฐานข้อมูล
+
+หน้าต่างถูก import แบบ lazy เพื่อไม่ให้ `import ui.handlers...` (เช่นจาก CLI)
+ต้องโหลด customtkinter และ service ทั้งหมด
 """
 
-from .main_window import MainWindow
-from .login_window import LoginWindow
+__all__ = ['MainWindow', 'LoginWindow']
+
 
-__all__ = ['MainWindow', 'LoginWindow']
\ No newline at end of file
+def __getattr__(name):
+    if name == 'MainWindow':
+        from .main_window import MainWindow
+        return MainWindow
+    if name == 'LoginWindow':
+        from .login_window import LoginWindow
+        return LoginWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
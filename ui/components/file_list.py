@@ -1,117 +1,409 @@
 import os
+import threading
 import customtkinter as ctk
-from tkinter import ttk
+from dataclasses import dataclass
 from datetime import datetime
+from typing import List, Optional
 import logging
 from constants import UIConstants
 
-class FileList(ctk.CTkScrollableFrame):
-    def __init__(self, master, **kwargs):
-        super().__init__(master, **kwargs)
-        self.file_checkboxes = []
-        self.select_all_var = ctk.BooleanVar(value=False)
 
-    def clear(self):
-        """Clear all checkbox items"""
-        for widget in self.winfo_children():
-            widget.destroy()
-        self.file_checkboxes.clear()
+@dataclass(eq=False)
+class FileListEntry:
+    """แถวข้อมูลของไฟล์ 1 ไฟล์ (ใช้เป็น handle แทน checkbox widget ที่ส่งให้ handlers)"""
+    file_path: str
+    logic_type: str
+    created_time: Optional[float] = None
+    selected: bool = False
+    disabled: bool = False
+    uploaded: bool = False
 
-    def add_file(self, file_path, logic_type):
-        """Add checkbox for found file"""
-        # ดึงเวลาที่ไฟล์ถูกสร้าง
-        created_time = datetime.fromtimestamp(os.path.getctime(file_path))
-        created_time_str = created_time.strftime("%Y-%m-%d %H:%M:%S")
-        
-        # สร้าง frame สำหรับจัดวาง
-        frame = ctk.CTkFrame(self, fg_color="transparent")
-        frame.pack(fill="x", pady=6, padx=4)
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.file_path)
+
+    @property
+    def created_time_str(self) -> str:
+        if self.created_time is None:
+            return "-"
+        return datetime.fromtimestamp(self.created_time).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class FileListModel:
+    """Backing model ของ FileList: เก็บรายการไฟล์, สถานะการเลือก, การเรียงและการกรอง"""
+
+    ALL_TYPES = "All types"
+    SORT_OPTIONS = {
+        "Date (oldest first)": (lambda e: (e.created_time or 0, e.filename.lower()), False),
+        "Date (newest first)": (lambda e: (e.created_time or 0, e.filename.lower()), True),
+        "Type": (lambda e: (e.logic_type.lower(), e.filename.lower()), False),
+        "File name": (lambda e: e.filename.lower(), False),
+    }
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: List[FileListEntry] = []
+        self._pending: List[FileListEntry] = []
+        self._by_path = {}
+        self.sort_option = "Date (oldest first)"
+        self.type_filter = self.ALL_TYPES
+        self._view: Optional[List[FileListEntry]] = None
+
+    def add_pending(self, entry: FileListEntry) -> None:
+        """เพิ่มแถวเข้าคิว (เรียกได้จาก scanner thread)"""
+        with self._lock:
+            self._pending.append(entry)
+
+    def merge_pending(self) -> int:
+        """รวมแถวที่ค้างอยู่เข้า model ในครั้งเดียว"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, []
+            for entry in pending:
+                self._entries.append(entry)
+                self._by_path[entry.file_path] = entry
+            self._view = None
+            return len(pending)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = []
+            self._pending = []
+            self._by_path = {}
+            self._view = None
+
+    def set_sort(self, sort_option: str) -> None:
+        if sort_option in self.SORT_OPTIONS:
+            self.sort_option = sort_option
+            self._view = None
+
+    def set_type_filter(self, type_filter: str) -> None:
+        self.type_filter = type_filter or self.ALL_TYPES
+        self._view = None
+
+    def logic_types(self) -> List[str]:
+        return sorted({entry.logic_type for entry in self._entries})
+
+    def visible_entries(self) -> List[FileListEntry]:
+        """แถวที่ผ่านตัวกรองและเรียงแล้ว (cache ไว้จนกว่า model จะเปลี่ยน)"""
+        if self._view is None:
+            entries = self._entries
+            if self.type_filter != self.ALL_TYPES:
+                entries = [e for e in entries if e.logic_type == self.type_filter]
+            key_func, reverse = self.SORT_OPTIONS[self.sort_option]
+            self._view = sorted(entries, key=key_func, reverse=reverse)
+        return self._view
+
+    def all_entries(self) -> List[FileListEntry]:
+        return list(self._entries)
+
+    def total_count(self) -> int:
+        return len(self._entries)
+
+    def find(self, file_path: str) -> Optional[FileListEntry]:
+        """หาแถวจาก path (ตรงตัวก่อน แล้วค่อยเทียบชื่อไฟล์)"""
+        entry = self._by_path.get(file_path)
+        if entry is not None:
+            return entry
+        basename = os.path.basename(file_path)
+        for entry in self._entries:
+            if entry.filename == basename:
+                return entry
+        return None
+
+
+class FileList(ctk.CTkFrame):
+    """
+    รายการไฟล์แบบ virtualised: สร้าง row widgets เท่าที่มองเห็นแล้วผูกกับข้อมูลใน model ใหม่ทุกครั้งที่เลื่อน
+
+    handlers ได้รับ FileListEntry เป็น "chk" ใน get_selected_files() และส่งกลับมาที่ disable_checkbox()
+    """
+
+    ROW_HEIGHT = 36
+    TOOLBAR_HEIGHT = 40
+    RENDER_DELAY_MS = 50
+
+    def __init__(self, master, width=860, height=360, **kwargs):
+        super().__init__(master, width=width, height=height, **kwargs)
+        self.pack_propagate(False)
+        self.grid_propagate(False)
+
+        self.model = FileListModel()
+        self._controls_locked = False
+        self._top_index = 0
+        self._render_scheduled = False
+        self._visible_rows = max(1, (height - self.TOOLBAR_HEIGHT) // self.ROW_HEIGHT)
+
+        self._create_toolbar()
+        self._create_rows()
+
+    # ===== UI construction =====
+    def _create_toolbar(self):
+        """แถบเครื่องมือสำหรับกรองและเรียงรายการ"""
+        toolbar = ctk.CTkFrame(self, fg_color="transparent", height=self.TOOLBAR_HEIGHT)
+        toolbar.pack(fill="x", padx=4, pady=(4, 0))
+
+        self.count_label = ctk.CTkLabel(toolbar, text="0 files", text_color=UIConstants.COLOR_SECONDARY_GRAY)
+        self.count_label.pack(side="left", padx=6)
+
+        self.sort_menu = ctk.CTkOptionMenu(
+            toolbar,
+            values=list(FileListModel.SORT_OPTIONS.keys()),
+            width=170,
+            command=self._on_sort_changed
+        )
+        self.sort_menu.set(self.model.sort_option)
+        self.sort_menu.pack(side="right", padx=4)
+
+        self.type_filter_menu = ctk.CTkOptionMenu(
+            toolbar,
+            values=[FileListModel.ALL_TYPES],
+            width=170,
+            command=self._on_type_filter_changed
+        )
+        self.type_filter_menu.set(FileListModel.ALL_TYPES)
+        self.type_filter_menu.pack(side="right", padx=4)
+
+    def _create_rows(self):
+        """สร้าง row widgets จำนวนคงที่ตามพื้นที่ที่มองเห็น"""
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=4, pady=4)
+
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.rows_frame = ctk.CTkFrame(body, fg_color="transparent")
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+
+        self._rows = []
+        for _ in range(self._visible_rows):
+            self._rows.append(self._create_row_widgets())
+
+        for widget in [self.rows_frame] + [w for row in self._rows for w in row['widgets']]:
+            widget.bind("<MouseWheel>", self._on_mousewheel, add="+")
+            widget.bind("<Button-4>", lambda e: self._scroll_by(-1), add="+")
+            widget.bind("<Button-5>", lambda e: self._scroll_by(1), add="+")
+
+    def _create_row_widgets(self):
+        frame = ctk.CTkFrame(self.rows_frame, fg_color="transparent", height=self.ROW_HEIGHT)
         frame.grid_columnconfigure(2, weight=1)  # ให้คอลัมน์ชื่อไฟล์ยืดหยุ่น
-        
-        # checkbox
+
+        row = {'frame': frame, 'entry': None}
         var = ctk.IntVar()
         chk = ctk.CTkCheckBox(
             frame,
             text="",
             variable=var,
-            width=28
+            width=28,
+            command=lambda r=row: self._on_row_toggled(r)
         )
         chk.grid(row=0, column=0, padx=(5, 10))
-        
-        # ประเภทไฟล์ (สีฟ้า ตัวใหญ่ ตัวหนา)
-        type_label = ctk.CTkLabel(
-            frame,
-            text=logic_type.upper(),
-            text_color=UIConstants.COLOR_PRIMARY_BLUE,
-        )
+
+        # ประเภทไฟล์ (สีฟ้า)
+        type_label = ctk.CTkLabel(frame, text="", text_color=UIConstants.COLOR_PRIMARY_BLUE)
         type_label.grid(row=0, column=1, padx=(0, 20), sticky="w")
-        
+
         # ชื่อไฟล์ (ตรงกลาง)
-        filename_label = ctk.CTkLabel(
-            frame,
-            text=os.path.basename(file_path),
-        )
+        filename_label = ctk.CTkLabel(frame, text="")
         filename_label.grid(row=0, column=2, sticky="w")
-        
+
         # เวลาที่สร้างไฟล์
-        time_label = ctk.CTkLabel(
-            frame,
-            text=f"Created at: {created_time_str}",
-            text_color=UIConstants.COLOR_SECONDARY_GRAY,
-        )
+        time_label = ctk.CTkLabel(frame, text="", text_color=UIConstants.COLOR_SECONDARY_GRAY)
         time_label.grid(row=0, column=3, padx=(10, 5), sticky="e")
 
-        # เก็บ reference ทั้ง checkbox, type_label และ filename_label
-        self.file_checkboxes.append((var, (file_path, logic_type), chk, type_label, filename_label))
+        self._default_text_color = filename_label.cget("text_color")
+
+        row.update({
+            'var': var,
+            'chk': chk,
+            'type_label': type_label,
+            'filename_label': filename_label,
+            'time_label': time_label,
+            'widgets': [frame, chk, type_label, filename_label, time_label],
+        })
+        return row
+
+    # ===== Rendering =====
+    def _schedule_render(self):
+        """รวมการ render หลายครั้งให้เหลือครั้งเดียว (เรียกได้จาก thread อื่น)"""
+        if self._render_scheduled:
+            return
+        self._render_scheduled = True
+        try:
+            self.after(self.RENDER_DELAY_MS, self._render)
+        except Exception:
+            self._render_scheduled = False
+
+    def _render(self):
+        """ผูก row widgets กับแถวที่มองเห็นใน model"""
+        self._render_scheduled = False
+        try:
+            if self.model.merge_pending():
+                self._refresh_type_filter_values()
+
+            entries = self.model.visible_entries()
+            max_top = max(0, len(entries) - self._visible_rows)
+            self._top_index = min(max(0, self._top_index), max_top)
+
+            for offset, row in enumerate(self._rows):
+                index = self._top_index + offset
+                if index < len(entries):
+                    self._bind_row(row, entries[index])
+                    row['frame'].pack(fill="x", pady=2, padx=4)
+                else:
+                    row['entry'] = None
+                    row['frame'].pack_forget()
+
+            self._update_scrollbar(len(entries))
+            total = self.model.total_count()
+            if len(entries) == total:
+                self.count_label.configure(text=f"{total:,} files")
+            else:
+                self.count_label.configure(text=f"Showing {len(entries):,} of {total:,} files")
+        except Exception as e:
+            logging.error(f"Error rendering file list: {e}")
+
+    def _bind_row(self, row, entry):
+        row['entry'] = entry
+        row['var'].set(1 if entry.selected else 0)
+        row['chk'].configure(state="disabled" if (entry.disabled or self._controls_locked) else "normal")
+        type_color = UIConstants.COLOR_TEXT_LIGHT if entry.uploaded else UIConstants.COLOR_PRIMARY_BLUE
+        name_color = UIConstants.COLOR_TEXT_LIGHT if entry.uploaded else self._default_text_color
+        row['type_label'].configure(text=entry.logic_type.upper(), text_color=type_color)
+        row['filename_label'].configure(text=entry.filename, text_color=name_color)
+        row['time_label'].configure(text=f"Created at: {entry.created_time_str}")
+
+    def _update_scrollbar(self, total_rows):
+        if total_rows <= 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self._top_index / total_rows
+        last = min(1.0, (self._top_index + self._visible_rows) / total_rows)
+        self.scrollbar.set(first, last)
+
+    def _refresh_type_filter_values(self):
+        values = [FileListModel.ALL_TYPES] + self.model.logic_types()
+        self.type_filter_menu.configure(values=values)
+        if self.model.type_filter not in values:
+            self.model.set_type_filter(FileListModel.ALL_TYPES)
+            self.type_filter_menu.set(FileListModel.ALL_TYPES)
+
+    # ===== Events =====
+    def _on_row_toggled(self, row):
+        entry = row['entry']
+        if entry is not None and not entry.disabled:
+            entry.selected = row['var'].get() == 1
+
+    def _on_sort_changed(self, sort_option):
+        self.model.set_sort(sort_option)
+        self._top_index = 0
+        self._render()
+
+    def _on_type_filter_changed(self, type_filter):
+        self.model.set_type_filter(type_filter)
+        self._top_index = 0
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        total_rows = len(self.model.visible_entries())
+        if not args or total_rows == 0:
+            return
+        if args[0] == "moveto":
+            self._top_index = int(float(args[1]) * total_rows)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= self._visible_rows
+            self._top_index += step
+        self._render()
+
+    def _on_mousewheel(self, event):
+        # Windows ส่ง delta ทีละ 120, macOS ส่งค่าเล็กกว่า
+        delta = event.delta if abs(event.delta) < 120 else event.delta // 120
+        self._scroll_by(-delta * 3)
+
+    def _scroll_by(self, rows):
+        self._top_index += rows
+        self._render()
+
+    # ===== Public API (ใช้ผ่าน ui_callbacks) =====
+    def clear(self):
+        """ล้างรายการไฟล์ทั้งหมด"""
+        self.model.clear()
+        self._top_index = 0
+        self._schedule_render()
+
+    def add_file(self, file_path, logic_type):
+        """เพิ่มไฟล์ที่พบ (เข้าคิวไว้แล้ว render เป็น batch)"""
+        try:
+            created_time = os.path.getctime(file_path)
+        except OSError:
+            created_time = None
+        self.model.add_pending(FileListEntry(file_path, logic_type, created_time))
+        self._schedule_render()
+
+    def add_files(self, files):
+        """เพิ่มหลายไฟล์พร้อมกัน: files = [(file_path, logic_type), ...]"""
+        for file_path, logic_type in files:
+            try:
+                created_time = os.path.getctime(file_path)
+            except OSError:
+                created_time = None
+            self.model.add_pending(FileListEntry(file_path, logic_type, created_time))
+        self._schedule_render()
 
     def get_selected_files(self):
-        """ดึงรายการไฟล์ที่ถูกเลือก"""
-        return [(entry, chk) for var, entry, chk, *_ in self.file_checkboxes if var.get() == 1]
+        """ดึงรายการไฟล์ที่ถูกเลือก: [((file_path, logic_type), entry), ...]"""
+        self.model.merge_pending()
+        return [
+            ((entry.file_path, entry.logic_type), entry)
+            for entry in self.model.all_entries()
+            if entry.selected and not entry.disabled
+        ]
 
     def select_all(self):
-        """เลือกไฟล์ทั้งหมด"""
-        for var, entry, chk, *_ in self.file_checkboxes:
-            if chk.winfo_exists() and chk.cget("state") != "disabled":
-                var.set(1)
+        """เลือกไฟล์ทั้งหมด (ตามตัวกรองที่ใช้อยู่)"""
+        self.model.merge_pending()
+        for entry in self.model.visible_entries():
+            if not entry.disabled:
+                entry.selected = True
+        self._schedule_render()
 
     def deselect_all(self):
         """ยกเลิกการเลือกไฟล์ทั้งหมด"""
-        for var, entry, chk, *_ in self.file_checkboxes:
-            if chk.winfo_exists() and chk.cget("state") != "disabled":
-                var.set(0)
+        self.model.merge_pending()
+        for entry in self.model.all_entries():
+            if not entry.disabled:
+                entry.selected = False
+        self._schedule_render()
 
-    def disable_checkbox(self, chk_widget):
+    def disable_checkbox(self, entry):
         """ปิดการใช้งานช่องติ๊ก"""
         try:
-            if chk_widget and chk_widget.winfo_exists():
-                chk_widget.configure(state="disabled", text_color="gray")
-                for v, entry, chk, *_ in self.file_checkboxes:
-                    if chk == chk_widget:
-                        v.set(0)
-                        break
+            if isinstance(entry, FileListEntry):
+                entry.disabled = True
+                entry.selected = False
+                self._schedule_render()
         except Exception as e:
             logging.error(f"Error disabling checkbox: {e}")
 
     def set_file_uploaded(self, file_path):
-        """เปลี่ยน type_label และชื่อไฟล์เป็นสีเทาเมื่ออัปโหลดแล้ว"""
-        for var, (fpath, logic_type), chk, type_label, filename_label in self.file_checkboxes:
-            if os.path.basename(fpath) == os.path.basename(file_path):
-                # เปลี่ยนสี type_label และ filename_label เป็นสีเทา
-                type_label.configure(text_color=UIConstants.COLOR_TEXT_LIGHT)
-                filename_label.configure(text_color=UIConstants.COLOR_TEXT_LIGHT)
-                break
+        """เปลี่ยน type และชื่อไฟล์เป็นสีเทาเมื่ออัปโหลดแล้ว"""
+        entry = self.model.find(file_path)
+        if entry is not None:
+            entry.uploaded = True
+            self._schedule_render()
 
     def disable_all_checkboxes(self):
         """ปิดการใช้งานช่องติ๊กทั้งหมดชั่วคราว"""
-        for var, entry, chk, *_ in self.file_checkboxes:
-            if chk.winfo_exists() and chk.cget("state") != "disabled":
-                chk.configure(state="disabled")
+        self._controls_locked = True
+        self._schedule_render()
 
     def enable_all_checkboxes(self):
         """เปิดการใช้งานช่องติ๊กทั้งหมด (ยกเว้นไฟล์ที่อัปโหลดแล้ว)"""
-        for var, _, chk, _, filename_label in self.file_checkboxes:
-            if chk.winfo_exists() and chk.cget("state") == "disabled":
-                # เปิดเฉพาะไฟล์ที่ยังไม่ถูกอัปโหลด (เช็คจากสีของ filename_label)
-                is_uploaded = filename_label.cget("text_color") == UIConstants.COLOR_TEXT_LIGHT
-                if not is_uploaded:
-                    chk.configure(state="normal")
\ No newline at end of file
+        self._controls_locked = False
+        for entry in self.model.all_entries():
+            if entry.disabled and not entry.uploaded:
+                entry.disabled = False
+        self._schedule_render()
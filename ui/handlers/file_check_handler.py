@@ -1,7 +1,7 @@
 """File Checking and Scanning Handler"""
 import os
 import threading
-from tkinter import messagebox, filedialog
+from utils.dialogs import messagebox
 from typing import Callable, Any
 
 
@@ -26,6 +26,7 @@ class FileCheckHandler:
 
     def browse_excel_path(self, save_callback):
         """Select folder for file search"""
+        from tkinter import filedialog
         folder = filedialog.askdirectory()
         if folder:
             self.file_service.set_search_path(folder)
@@ -103,6 +104,8 @@ class FileCheckHandler:
         except Exception as e:
             self.log(f"Error: An error occurred while scanning files: {e}")
         finally:
+            # ผล detection ของไฟล์ใหม่ทั้งหมดเขียนลง header memo ครั้งเดียวต่อ scan
+            self.file_service.flush_header_memo()
             # เปิดปุ่มกลับมาเมื่อเสร็จสิ้น
             ui_callbacks['enable_controls']()
             # ปล่อย flag
@@ -6,6 +6,7 @@ from ui.handlers.file_check_handler import FileCheckHandler
 from ui.handlers.file_upload_handler import FileUploadHandler
 from ui.handlers.file_process_handler import FileProcessHandler
 from ui.handlers.file_report_handler import FileReportHandler
+from utils.dialogs import messagebox
 
 
 class FileHandler:
@@ -116,14 +117,12 @@ class FileHandler:
             self.log("==== Auto processing completed ======")
             ui_callbacks['update_progress'](1.0, "Auto processing completed", "All steps completed successfully")
 
-            from tkinter import messagebox
             messagebox.showinfo("Success", "Auto processing completed successfully")
 
             return process_stats, total_files
 
         except Exception as e:
             self.log(f"Error: An error occurred during auto processing: {e}")
-            from tkinter import messagebox
             messagebox.showerror("Error", f"An error occurred: {e}")
             return None, 0
         finally:
@@ -1,8 +1,9 @@
 """File Auto-Processing Handler"""
 import os
 import time
-from tkinter import messagebox
-from typing import Callable, Dict, Any
+from utils.dialogs import messagebox
+from typing import Callable, Dict, Any, Optional
+from utils.phase_timer import PhaseTimer, collect, timed_phase
 
 
 class FileProcessHandler:
@@ -127,9 +128,18 @@ class FileProcessHandler:
             'errors': [],
             'individual_processing_time': 0,
             'successful_file_list': [],
-            'failed_file_list': []
+            'failed_file_list': [],
+            'phase_timer': PhaseTimer(),
+            'file_phase_timers': {}
         }
 
+    def _record_phase_timer(self, type_stats: Dict[str, Any], filename: str, timer: Optional[PhaseTimer]):
+        """เก็บเวลาแต่ละ phase ของไฟล์ และรวมเข้ากับเวลาของประเภทไฟล์"""
+        if timer is None:
+            return
+        type_stats['file_phase_timers'][filename] = timer
+        type_stats['phase_timer'].merge(timer)
+
     def _record_file_error(self, process_stats, logic_type, file_path, error_msg, file_start_time):
         """บันทึก error และเวลาที่ใช้สำหรับไฟล์ที่ล้มเหลว"""
         basename = os.path.basename(file_path)
@@ -174,7 +184,8 @@ class FileProcessHandler:
         self.log(f"Processing file: {basename}")
 
         # ตรวจสอบคอลัมน์ก่อน
-        success, result, _ = self.file_service.preview_file_columns(file_path, logic_type)
+        with timed_phase('read'):
+            success, result, _ = self.file_service.preview_file_columns(file_path, logic_type)
         if not success:
             self._record_file_error(process_stats, logic_type, file_path, f"Column check failed: {result}", file_start_time)
             return False
@@ -198,34 +209,44 @@ class FileProcessHandler:
             self._record_file_error(process_stats, logic_type, file_path, f"No data type configuration found for {logic_type}", file_start_time)
             return False
 
+        # Column profile ฝั่ง client (ใช้กำหนดขนาด staging และข้ามการตรวจสอบใน SQL)
+        profile = self.file_service.profile_dataframe(df, logic_type, basename)
+
         # อัปโหลดข้อมูล
         self.log(f"Uploading {len(df)} rows for type {logic_type}")
-        success, message = self.db_service.upload_data(df, logic_type, required_cols, schema_name=os.getenv('DB_SCHEMA', 'bronze'), log_func=self.log, clear_existing=True)
+        success, message = self.db_service.upload_data(
+            df, logic_type, required_cols, schema_name=os.getenv('DB_SCHEMA', 'bronze'),
+            log_func=self.log, clear_existing=True, profile=profile
+        )
 
         if success:
             self.log(f"Upload successful: {message}")
             self._record_file_success(process_stats, logic_type, file_path, file_start_time)
 
-            # ย้ายไฟล์หลังอัปโหลดสำเร็จ
-            self._move_uploaded_file(file_path, logic_type)
+            # ส่งไฟล์เข้าคิวย้ายแบบ background (ย้ายไปพร้อมกับการประมวลผลไฟล์ถัดไป)
+            self._move_uploaded_file(file_path, logic_type, process_stats['by_type'][logic_type]['phase_timer'])
             return True
         else:
             # จัดการ upload failure
             self._handle_upload_failure(process_stats, logic_type, file_path, message, file_start_time)
             return False
 
-    def _move_uploaded_file(self, file_path, logic_type):
-        """ย้ายไฟล์ที่อัปโหลดสำเร็จแล้ว"""
+    def _move_uploaded_file(self, file_path, logic_type, type_timer: Optional[PhaseTimer] = None):
+        """ส่งไฟล์ที่อัปโหลดสำเร็จแล้วเข้าคิวย้าย (เวลา move บันทึกใน timer ของประเภทไฟล์)"""
         try:
-            move_success, move_result = self.file_service.move_uploaded_files([file_path], [logic_type])
-            if move_success:
-                for original_path, new_path in move_result:
-                    self.log(f"Moved file to: {new_path}")
-            else:
-                self.log(f"Error: Could not move file: {move_result}")
+            with collect(type_timer):
+                self.file_service.queue_uploaded_files([file_path], [logic_type], callback=self._log_move_result)
         except Exception as move_error:
             self.log(f"Error: An error occurred while moving file: {move_error}")
 
+    def _log_move_result(self, move_success, move_result):
+        """Callback ของคิวย้ายไฟล์ (เรียกจาก mover thread)"""
+        if move_success:
+            for original_path, new_path in move_result:
+                self.log(f"Moved file to: {new_path}")
+        else:
+            self.log(f"Error: Could not move file: {move_result}")
+
     def _handle_upload_failure(self, process_stats, logic_type, file_path, message, file_start_time):
         """จัดการกรณี upload ล้มเหลว"""
         basename = os.path.basename(file_path)
@@ -296,8 +317,15 @@ class FileProcessHandler:
                     process_stats['by_type'][logic_type]['files_count'] += 1
                     self.log(f"Identified file type: {logic_type}")
 
-                    # ประมวลผลไฟล์โดยใช้ helper method
-                    self._process_single_file(file_path, logic_type, process_stats, ui_callbacks, file_index, total_files)
+                    # ประมวลผลไฟล์โดยใช้ helper method (จับเวลาแต่ละ phase ของไฟล์นี้)
+                    file_timer = PhaseTimer()
+                    try:
+                        with collect(file_timer):
+                            self._process_single_file(file_path, logic_type, process_stats, ui_callbacks, file_index, total_files)
+                    finally:
+                        self._record_phase_timer(
+                            process_stats['by_type'][logic_type], os.path.basename(file_path), file_timer
+                        )
 
                 except Exception as e:
                     error_msg = f"An error occurred while processing {os.path.basename(file_path)}: {e}"
@@ -307,6 +335,13 @@ class FileProcessHandler:
                         process_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {str(e)}")
                     process_stats['failed_files'] += 1
 
+            # รอไฟล์ที่ยังย้ายไม่เสร็จก่อนสรุปผล
+            try:
+                process_stats['move_stats'] = self.file_service.wait_for_moves()
+            except Exception as e:
+                self.log(f"Warning: Could not wait for file moves: {e}")
+            self.file_service.flush_header_memo()
+
             # ใช้เวลารวมที่คำนวณแยกสำหรับแต่ละประเภท
             for logic_type in process_stats['by_type']:
                 if 'individual_processing_time' in process_stats['by_type'][logic_type]:
@@ -1,8 +1,12 @@
 """File Processing Report and Summary Handler"""
-from typing import Callable, Dict, Any
+from typing import Any, Callable, Dict, Optional
 from utils.ui_helpers import format_elapsed_time
 from utils.logger import setup_file_logging, cleanup_old_log_files
 from config.json_manager import json_manager, get_log_folder
+from utils.phase_timer import PhaseTimer
+from datetime import datetime
+import json
+import logging
 import os
 
 
@@ -31,7 +35,7 @@ class FileReportHandler:
         self.log(f"{separator[:9]} {operation_type} Summary Report {separator[:9]}")
 
         # เรียกใช้ระบบส่งออก log อัตโนมัติ
-        self._auto_export_logs()
+        log_file_path = self._auto_export_logs()
 
         # เวลารวม
         total_time = stats.get('total_time', 0)
@@ -53,11 +57,19 @@ class FileReportHandler:
         if stats.get('by_type'):
             self._display_file_type_details(stats, operation_type)
 
+        # เวลาแต่ละ phase รวมทุกประเภทไฟล์
+        self._display_phase_timing(self._combine_phase_timers(stats), "Phase Timing (all types):")
+        self._display_move_stats(stats.get('move_stats'))
+
         # สรุปสำคัญ
         self._display_final_summary(stats, total_files, operation_type)
 
         self.log("=" * 42)
 
+        # บันทึกเวลาแต่ละ phase เป็น JSON ไว้ข้างไฟล์ log ที่ export
+        if log_file_path:
+            self._export_phase_report(stats, total_files, operation_type, log_file_path)
+
     def _display_file_type_details(self, stats: Dict[str, Any], operation_type: str):
         """แสดงรายละเอียดแต่ละประเภทไฟล์"""
         self.log("")
@@ -72,6 +84,7 @@ class FileReportHandler:
             self.log(f"Occupation: {file_type}")
             self.log(f"   Processing Time: {type_time_str}")
             self.log(f"   Total Files: {type_stats.get('files_count', 0)}")
+            self._display_phase_timing(type_stats.get('phase_timer'), "   Phase Timing:")
 
             # แสดงผลสำเร็จ
             self._display_successful_files(type_stats, operation_type)
@@ -81,6 +94,86 @@ class FileReportHandler:
 
             self.log("")
 
+    def _combine_phase_timers(self, stats: Dict[str, Any]) -> PhaseTimer:
+        """รวมเวลาแต่ละ phase ของทุกประเภทไฟล์"""
+        combined = PhaseTimer()
+        for type_stats in stats.get('by_type', {}).values():
+            combined.merge(type_stats.get('phase_timer'))
+        return combined
+
+    def _display_phase_timing(self, timer: Optional[PhaseTimer], title: str):
+        """แสดงเวลา, rows/sec และ MB/sec ของแต่ละ phase"""
+        if timer is None:
+            return
+        phases = timer.to_dict()
+        if not phases:
+            return
+        indent = " " * (len(title) - len(title.lstrip()) + 3)
+        self.log(title)
+        for phase, entry in phases.items():
+            line = f"{indent}{phase:<9} {entry['seconds']:>8.2f}s"
+            if entry['rows_per_sec']:
+                line += f" | {entry['rows_per_sec']:,.0f} rows/s"
+            if entry['mb_per_sec']:
+                line += f" | {entry['mb_per_sec']:,.2f} MB/s"
+            self.log(line)
+
+    def _display_move_stats(self, move_stats: Optional[Dict[str, Any]]):
+        """แสดงเวลาของคิวย้ายไฟล์ (ทำงานเบื้องหลัง แยกจากเวลาอัปโหลด)"""
+        if not move_stats or not move_stats.get('jobs'):
+            return
+        self.log("Background File Moves:")
+        self.log(f"   Files moved: {move_stats.get('moved_files', 0)}"
+                 + (f" | Failed: {move_stats['failed_jobs']}" if move_stats.get('failed_jobs') else ""))
+        self.log(f"   Move time {move_stats.get('move_seconds', 0):.2f}s"
+                 f" | Queued {move_stats.get('queue_seconds', 0):.2f}s"
+                 f" | Waited after upload {move_stats.get('wait_seconds', 0):.2f}s")
+        if move_stats.get('pending_jobs'):
+            self.log(f"   Warning: {move_stats['pending_jobs']} moves still pending")
+
+    def _build_phase_report(self, stats: Dict[str, Any], total_files: int, operation_type: str) -> Dict[str, Any]:
+        """สร้างรายงานเวลาแต่ละ phase (ต่อไฟล์, ต่อประเภทไฟล์ และรวม) สำหรับบันทึกเป็น JSON"""
+        by_type = {}
+        for file_type, type_stats in stats.get('by_type', {}).items():
+            timer = type_stats.get('phase_timer')
+            by_type[file_type] = {
+                'processing_time': round(type_stats.get('processing_time', 0) or 0, 4),
+                'successful_files': type_stats.get('successful_files', 0),
+                'failed_files': type_stats.get('failed_files', 0),
+                'phases': timer.to_dict() if timer is not None else {},
+                'files': {
+                    filename: file_timer.to_dict()
+                    for filename, file_timer in type_stats.get('file_phase_timers', {}).items()
+                },
+            }
+        return {
+            'operation': operation_type,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'total_time': round(stats.get('total_time', 0) or 0, 4),
+            'total_files': total_files,
+            'successful_files': stats.get('successful_files', 0),
+            'failed_files': stats.get('failed_files', 0),
+            'phases': self._combine_phase_timers(stats).to_dict(),
+            'move_stats': {
+                key: round(value, 4) if isinstance(value, float) else value
+                for key, value in (stats.get('move_stats') or {}).items()
+            },
+            'by_type': by_type,
+        }
+
+    def _export_phase_report(self, stats: Dict[str, Any], total_files: int, operation_type: str,
+                             log_file_path: str):
+        """บันทึก phase report เป็น log_pipeline_<date>_<time>_phases.json ในโฟลเดอร์ log"""
+        try:
+            report = self._build_phase_report(stats, total_files, operation_type)
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+            report_path = os.path.join(os.path.dirname(log_file_path), f"log_pipeline_{timestamp}_phases.json")
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            logging.info(f"Phase timing report exported to: {report_path}")
+        except Exception as e:
+            self.log(f"Warning: Failed to export phase timing report: {e}")
+
     def _display_successful_files(self, type_stats: Dict[str, Any], operation_type: str):
         """แสดงรายละเอียดไฟล์ที่สำเร็จ"""
         successful = type_stats.get('successful_files', 0)
@@ -95,6 +188,13 @@ class FileReportHandler:
             self.log(f"   Upload Summary:")
             self.log(f"      {summary_message}")
 
+        # แสดงจำนวนแถวซ้ำที่ถูกตัดออกใน Replace batch
+        duplicates_removed = type_stats.get('duplicates_removed', 0)
+        if duplicates_removed > 0:
+            self.log(f"   Duplicate Rows Removed: {duplicates_removed:,}")
+            for filename, dropped in type_stats.get('duplicates_by_file', {}).items():
+                self.log(f"         • {filename}: {dropped:,}")
+
         # แสดงรายชื่อไฟล์ที่สำเร็จ
         successful_file_list = type_stats.get('successful_file_list', [])
         if successful_file_list:
@@ -188,8 +288,8 @@ class FileReportHandler:
         except Exception:
             return None
 
-    def _auto_export_logs(self):
-        """ส่งออก log อัตโนมัติไปยังโฟลเดอร์ log_pipeline และจัดการไฟล์เก่า"""
+    def _auto_export_logs(self) -> Optional[str]:
+        """ส่งออก log อัตโนมัติไปยังโฟลเดอร์ log_pipeline และจัดการไฟล์เก่า (คืน path ของไฟล์ log)"""
         try:
             # โหลดการตั้งค่า
             app_settings = json_manager.load('app_settings')
@@ -217,8 +317,10 @@ class FileReportHandler:
                 # แสดงผลการ cleanup เฉพาะเมื่อมีการลบไฟล์
                 if deleted_count > 0:
                     self.log(f"Cleaned up {deleted_count} old log files (older than {retention_days} days)")
+                return log_file_path
             else:
                 self.log("Warning: Failed to export log file")
 
         except Exception as e:
             self.log(f"Error: Error during auto export logs: {e}")
+        return None
@@ -4,11 +4,13 @@ import time
 import threading
 import uuid
 from datetime import datetime
-from tkinter import messagebox
+from utils.dialogs import messagebox
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Tuple, Callable, Optional, Any
 import pandas as pd
 from performance_optimizations import PerformanceOptimizer
+from services.file.column_profiler import DataProfile
+from utils.phase_timer import PhaseTimer, collect, timed_phase
 
 
 class FileUploadHandler:
@@ -130,9 +132,37 @@ class FileUploadHandler:
             'errors': [],
             'individual_processing_time': 0,
             'successful_file_list': [],
-            'failed_file_list': []
+            'failed_file_list': [],
+            'duplicates_removed': 0,
+            'duplicates_by_file': {},
+            'phase_timer': PhaseTimer(),
+            'file_phase_timers': {}
         }
 
+    def _record_phase_timer(self, type_stats: Dict[str, Any], filename: str, timer: Optional[PhaseTimer]):
+        """เก็บเวลาแต่ละ phase ของไฟล์ และรวมเข้ากับเวลาของประเภทไฟล์"""
+        if timer is None:
+            return
+        type_stats['file_phase_timers'][filename] = timer
+        type_stats['phase_timer'].merge(timer)
+
+    def _log_move_result(self, move_success, move_result):
+        """Callback ของคิวย้ายไฟล์ (เรียกจาก mover thread)"""
+        if move_success:
+            for original_path, new_path in move_result:
+                self.log(f"Moved file to: {new_path}")
+        else:
+            self.log(f"Error: Could not move file: {move_result}")
+
+    def _wait_for_moves(self, ui_callbacks) -> Dict[str, Any]:
+        """รองานในคิวย้ายไฟล์ให้เสร็จ (คิวใช้ร่วมกันทั้ง process จึง drain ครั้งเดียวพอ)"""
+        ui_callbacks['set_progress_status']("Finishing file moves", "Waiting for files still being moved")
+        try:
+            return self.file_mgmt_service.wait_for_moves()
+        except Exception as e:
+            self.log(f"Warning: Could not wait for file moves: {e}")
+            return {}
+
     def _validate_single_file(self, file_info):
         """
         Validate a single file (helper function for parallel processing)
@@ -141,14 +171,23 @@ class FileUploadHandler:
             file_info: Tuple of (file_path, logic_type)
 
         Returns:
-            Dict with validation results
+            Dict with validation results (including a per-file 'phase_timer')
         """
+        timer = PhaseTimer()
+        with collect(timer):
+            result = self._read_and_profile_file(file_info)
+        result['phase_timer'] = timer
+        return result
+
+    def _read_and_profile_file(self, file_info):
+        """Read, rename and profile one file (phases are timed by the active PhaseTimer)"""
         file_path, logic_type = file_info
         result = {
             'file_path': file_path,
             'logic_type': logic_type,
             'success': False,
             'df': None,
+            'profile': None,
             'error': None
         }
 
@@ -171,14 +210,17 @@ class FileUploadHandler:
                 else:
                     file_type = 'excel'
 
-                success, df = self.perf_optimizer.read_large_file_chunked(file_path, file_type)
-                if not success:
-                    result['error'] = "Failed to read large file"
-                    return result
+                with timed_phase('read', nbytes=file_size) as measure:
+                    success, df = self.perf_optimizer.read_large_file_chunked(file_path, file_type)
+                    if not success:
+                        result['error'] = "Failed to read large file"
+                        return result
+                    measure.rows = len(df)
             else:
                 # Standard reading for smaller files
                 # First check columns
-                success, preview_result, columns_info = self.file_service.preview_file_columns(file_path, logic_type)
+                with timed_phase('read'):
+                    success, preview_result, columns_info = self.file_service.preview_file_columns(file_path, logic_type)
                 if not success:
                     result['error'] = f"Column check failed: {preview_result}"
                     return result
@@ -194,6 +236,9 @@ class FileUploadHandler:
             # Add source file tracking to each row
             df['_source_file'] = os.path.basename(file_path)
 
+            # Column profile ฝั่ง client (ใช้กำหนดขนาด staging และข้ามการตรวจสอบใน SQL)
+            result['profile'] = self.file_service.profile_dataframe(df, logic_type, os.path.basename(file_path))
+
             # Successful validation
             result['success'] = True
             result['df'] = df
@@ -288,6 +333,12 @@ class FileUploadHandler:
 
         return files_with_metadata
 
+    def _merge_profiles(self, profiles):
+        """รวม column profile ของหลายไฟล์ (None ถ้ามีไฟล์ใดไม่มี profile เพราะผลจะไม่ครอบคลุมทุกแถว)"""
+        if not profiles or any(profile is None for profile in profiles):
+            return None
+        return DataProfile.merge_all(profiles)
+
     def _sort_files_by_modification_time(self, files_with_metadata):
         """
         เรียงไฟล์ตามเวลา modified (น้อยสุดก่อน)
@@ -327,6 +378,7 @@ class FileUploadHandler:
 
         self.log(f"[{file_index}/{total_files}] Processing: {filename} (Modified: {mod_time_str})")
 
+        file_timer = None
         try:
             # Phase 1: Validation
             progress = (file_index - 1) / total_files
@@ -337,6 +389,7 @@ class FileUploadHandler:
             )
 
             validation_result = self._validate_single_file((file_path, logic_type))
+            file_timer = validation_result.get('phase_timer')
 
             if not validation_result['success']:
                 error = validation_result['error']
@@ -367,13 +420,15 @@ class FileUploadHandler:
                 upload_stats['failed_files'] += 1
                 return False
 
-            success, message = self.db_service.upload_data(
-                df, logic_type, required_cols,
-                schema_name=os.getenv('DB_SCHEMA', 'bronze'),
-                log_func=self.log,
-                clear_existing=True,
-                batch_id=batch_id
-            )
+            with collect(file_timer):
+                success, message = self.db_service.upload_data(
+                    df, logic_type, required_cols,
+                    schema_name=os.getenv('DB_SCHEMA', 'bronze'),
+                    log_func=self.log,
+                    clear_existing=True,
+                    batch_id=batch_id,
+                    profile=validation_result.get('profile')
+                )
 
             if not success:
                 # Handle upload failure
@@ -390,12 +445,11 @@ class FileUploadHandler:
                 upload_stats['failed_files'] += 1
                 return False
 
-            # Phase 3: Move file immediately on success
+            # Phase 3: ส่งไฟล์เข้าคิวย้ายแบบ background (ย้ายไปพร้อมกับการอัปโหลดไฟล์ถัดไป)
             self.log(f"[{file_index}/{total_files}] Success: {message}")
             upload_stats['by_type'][logic_type]['summary_message'] = message
 
-            try:
-                move_success, move_result = self.file_mgmt_service.move_uploaded_files([file_path], [logic_type])
+            def on_moved(move_success, move_result):
                 if move_success:
                     for original_path, new_path in move_result:
                         self.log(f"[{file_index}/{total_files}] Moved to: {new_path}")
@@ -403,6 +457,13 @@ class FileUploadHandler:
                     ui_callbacks['set_file_uploaded'](file_path)
                 else:
                     self.log(f"[{file_index}/{total_files}] Warning: Upload succeeded but move failed: {move_result}")
+
+            try:
+                # เวลา move บันทึกในเวลารวมของประเภทไฟล์ ไม่ใช่ของไฟล์นี้ (ไม่อยู่บนเส้นทางอัปโหลดแล้ว)
+                with collect(upload_stats['by_type'][logic_type]['phase_timer']):
+                    self.file_mgmt_service.queue_uploaded_files(
+                        [file_path], [logic_type], callback=on_moved, batch_id=batch_id
+                    )
             except Exception as move_error:
                 self.log(f"[{file_index}/{total_files}] Warning: Upload succeeded but move error: {move_error}")
 
@@ -429,6 +490,8 @@ class FileUploadHandler:
             upload_stats['by_type'][logic_type]['errors'].append(f"{filename}: {str(e)}")
             upload_stats['failed_files'] += 1
             return False
+        finally:
+            self._record_phase_timer(upload_stats['by_type'][logic_type], filename, file_timer)
 
     def _upload_files_sequentially_upsert(self, sorted_files, batch_id, ui_callbacks, upload_stats):
         """
@@ -511,6 +574,10 @@ class FileUploadHandler:
         if replace_files:
             self._upload_replace_files_batch(replace_files, batch_id, ui_callbacks, upload_stats)
 
+        # รอไฟล์ที่ยังย้ายไม่เสร็จก่อนสรุปผล
+        upload_stats['move_stats'] = self._wait_for_moves(ui_callbacks)
+        self.file_service.flush_header_memo()
+
         # คำนวณเวลารวม
         total_upload_time = time.time() - upload_start_time
         upload_stats['total_time'] = total_upload_time
@@ -544,7 +611,7 @@ class FileUploadHandler:
         # Phase 1: Read and validate Replace files with PARALLEL PROCESSING
         self.log("Phase 1: Reading and validating Replace files in parallel...")
         self.log(f"Using {self.max_workers} parallel workers for optimal performance")
-        all_validated_data = {}  # {logic_type: (combined_df, files_info, required_cols)}
+        all_validated_data = {}  # {logic_type: (combined_df, files_info, required_cols, profile)}
 
         completed_types = 0
         processed_files = 0
@@ -562,7 +629,8 @@ class FileUploadHandler:
                 ui_callbacks['update_progress'](progress, f"Validating type {logic_type}", f"Type {completed_types + 1} of {total_types}")
 
                 # รวมข้อมูลจากทุกไฟล์ในประเภทเดียวกัน
-                all_dfs = []
+                validated_dfs = {}  # {file_path: df}
+                validated_profiles = {}  # {file_path: DataProfile}
                 valid_files_info = []
 
                 # PARALLEL FILE VALIDATION using ThreadPoolExecutor
@@ -587,10 +655,15 @@ class FileUploadHandler:
 
                             # Get validation result
                             validation_result = future.result()
+                            self._record_phase_timer(
+                                upload_stats['by_type'][logic_type], os.path.basename(file_path),
+                                validation_result.get('phase_timer')
+                            )
 
                             if validation_result['success']:
                                 df = validation_result['df']
-                                all_dfs.append(df)
+                                validated_dfs[file_path] = df
+                                validated_profiles[file_path] = validation_result.get('profile')
                                 valid_files_info.append((file_path, file_chks[file_path]))
                                 upload_stats['by_type'][logic_type]['successful_files'] += 1
                                 upload_stats['by_type'][logic_type]['successful_file_list'].append(os.path.basename(file_path))
@@ -626,17 +699,39 @@ class FileUploadHandler:
                 # Calculate processing time for this type
                 upload_stats['by_type'][logic_type]['individual_processing_time'] = time.time() - type_start_time
 
-                if not all_dfs:
+                if not validated_dfs:
                     self.log(f"Error: No valid data from files of type {logic_type}")
                     completed_types += 1
                     continue
 
-                # รวม DataFrame ทั้งหมด
+                # รวม DataFrame เรียงตามเวลา modified (เก่า -> ใหม่) เพื่อให้แถวซ้ำจากไฟล์ล่าสุดถูกเก็บไว้
+                ordered_files = self._sort_files_by_modification_time(
+                    self._get_files_with_metadata([((fp, logic_type), None) for fp in validated_dfs])
+                )
+                all_dfs = [validated_dfs[meta['file_path']] for meta in ordered_files]
                 combined_df = pd.concat(all_dfs, ignore_index=True)
+                validated_dfs.clear()
+
+                # รวม profile ของทุกไฟล์ (แถวที่ถูกตัดซ้ำด้านล่างทำให้ค่าใน profile เป็น upper bound ซึ่งยังใช้ได้)
+                combined_profile = self._merge_profiles(
+                    [validated_profiles.get(meta['file_path']) for meta in ordered_files]
+                )
+                validated_profiles.clear()
 
                 # แสดงสถานะการรวมข้อมูล
                 ui_callbacks['update_progress'](file_progress, f"Combining data for type {logic_type}", f"Combined {len(all_dfs)} files into {len(combined_df)} rows")
 
+                # ตัดแถวซ้ำข้ามไฟล์ (ตาม `_dedup_mode` ของประเภทไฟล์) ก่อนส่งขึ้น staging
+                combined_df, dropped_by_file = self.file_service.deduplicate_batch(combined_df, logic_type)
+                if dropped_by_file:
+                    dropped_total = sum(dropped_by_file.values())
+                    upload_stats['by_type'][logic_type]['duplicates_removed'] = dropped_total
+                    upload_stats['by_type'][logic_type]['duplicates_by_file'] = dropped_by_file
+                    self.log(f"Removed {dropped_total:,} duplicate rows across files of type {logic_type}")
+                    for source_file, dropped in dropped_by_file.items():
+                        self.log(f"   {source_file}: {dropped:,} rows dropped")
+                del all_dfs
+
                 # ใช้ dtype ที่ถูกต้อง
                 required_cols = self.file_service.get_required_dtypes(logic_type)
 
@@ -653,7 +748,7 @@ class FileUploadHandler:
                     continue
 
                 # เก็บข้อมูลที่ผ่านการตรวจสอบแล้ว
-                all_validated_data[logic_type] = (combined_df, valid_files_info, required_cols)
+                all_validated_data[logic_type] = (combined_df, valid_files_info, required_cols, combined_profile)
                 self.log(f"Prepared {len(combined_df)} rows for type {logic_type}")
 
                 completed_types += 1
@@ -670,7 +765,7 @@ class FileUploadHandler:
             upload_count = 0
             total_uploads = len(all_validated_data)
 
-            for logic_type, (combined_df, valid_files_info, required_cols) in all_validated_data.items():
+            for logic_type, (combined_df, valid_files_info, required_cols, combined_profile) in all_validated_data.items():
                 try:
                     # จับเวลาเริ่มต้น Phase 2 สำหรับประเภทไฟล์นี้
                     phase2_start_time = time.time()
@@ -681,11 +776,14 @@ class FileUploadHandler:
                     self.log(f"Uploading {len(combined_df)} rows for type {logic_type}")
 
                     # Clear existing data only for the first upload of each table
-                    success, message = self.db_service.upload_data(
-                        combined_df, logic_type, required_cols,
-                        schema_name=os.getenv('DB_SCHEMA', 'bronze'),
-                        log_func=self.log, clear_existing=True, batch_id=batch_id
-                    )
+                    type_timer = upload_stats['by_type'][logic_type]['phase_timer']
+                    with collect(type_timer):
+                        success, message = self.db_service.upload_data(
+                            combined_df, logic_type, required_cols,
+                            schema_name=os.getenv('DB_SCHEMA', 'bronze'),
+                            log_func=self.log, clear_existing=True, batch_id=batch_id,
+                            profile=combined_profile
+                        )
 
                     if success:
                         self.log(f"Success: {message}")
@@ -697,14 +795,13 @@ class FileUploadHandler:
                         for file_path, chk in valid_files_info:
                             ui_callbacks['disable_checkbox'](chk)
                             ui_callbacks['set_file_uploaded'](file_path)
-                            # ย้ายไฟล์ทันทีหลังอัปโหลดสำเร็จ
+                            # ส่งไฟล์เข้าคิวย้ายแบบ background ระหว่างอัปโหลดประเภทถัดไป
                             try:
-                                move_success, move_result = self.file_service.move_uploaded_files([file_path], [logic_type])
-                                if move_success:
-                                    for original_path, new_path in move_result:
-                                        self.log(f"Moved file to: {new_path}")
-                                else:
-                                    self.log(f"Error: Could not move file: {move_result}")
+                                with collect(type_timer):
+                                    self.file_service.queue_uploaded_files(
+                                        [file_path], [logic_type], callback=self._log_move_result,
+                                        batch_id=batch_id
+                                    )
                             except Exception as move_error:
                                 self.log(f"Error: An error occurred while moving file: {move_error}")
                     else:
@@ -28,12 +28,8 @@ class SettingsHandler:
     def load_column_settings(self):
         """Load all column settings from settings manager."""
         try:
-            # Build legacy-style dictionary from all file types
-            column_settings = {}
-            file_types = settings_manager.list_file_types()
-            for file_type in file_types:
-                column_settings[file_type] = settings_manager.get_column_settings(file_type)
-            return column_settings
+            # Editable copy of all file types (the UI edits these dicts in place)
+            return settings_manager.snapshot().editable_column_settings()
         except Exception as e:
             self.log(f"Cannot load column settings: {e}")
             return {}
@@ -54,12 +50,8 @@ class SettingsHandler:
     def load_dtype_settings(self):
         """Load all dtype settings from settings manager."""
         try:
-            # Build legacy-style dictionary from all file types
-            dtype_settings = {}
-            file_types = settings_manager.list_file_types()
-            for file_type in file_types:
-                dtype_settings[file_type] = settings_manager.get_dtype_settings(file_type)
-            return dtype_settings
+            # Editable copy of all file types (the UI edits these dicts in place)
+            return settings_manager.snapshot().editable_dtype_settings()
         except Exception as e:
             self.log(f"Cannot load data type settings: {e}")
             return {}
@@ -2,7 +2,6 @@ import customtkinter as ctk
 from tkinter import messagebox
 import os
 from services.orchestrators.database_orchestrator import DatabaseOrchestrator
-from ui.main_window import MainWindow
 from ui.loading_dialog import LoadingDialog
 from services.utilities.preload_service import PreloadService
 from constants import AppConstants
@@ -366,6 +365,9 @@ class LoginWindow(ctk.CTk):
             # Track completed steps
             self._completed_ui_steps = set()
 
+            # import MainWindow (และ service ทั้งหมด) เมื่อต้องใช้จริง หลังหน้า login แสดงแล้ว
+            from ui.main_window import MainWindow
+
             # สร้าง MainWindow พร้อม progress callback ที่มี step index
             # Steps: 0-2 = connection/permissions/settings, 3-6 = UI building, 7-9 = initialization
             def progress_callback(message):
@@ -24,8 +24,8 @@ from services.orchestrators.database_orchestrator import DatabaseOrchestrator
 from services.file import FileManagementService
 from config.database import DatabaseConfig
 from constants import AppConstants, DatabaseConstants
-from utils.logger import create_gui_log_handler, setup_file_logging
-from utils.ui_helpers import format_elapsed_time, set_window_icon
+from utils.logger import BatchedLogSink, create_gui_log_handler, setup_file_logging
+from utils.ui_helpers import format_elapsed_time, set_window_icon, trim_textbox_lines
 from ui.ui_callbacks import UICallbacks
 from typing import Optional, Dict, Any, Callable
 
@@ -73,7 +73,10 @@ class MainWindow(ctk.CTkToplevel):
         self.db_config = DatabaseConfig()
         self.sql_config = self.db_config.config
 
-        # ผูก logging เข้ากับ GUI
+        # ผูก logging เข้ากับ GUI (ข้อความเข้าคิวแล้ว flush เป็น batch จาก main loop)
+        self._log_sink = BatchedLogSink(self._write_log_batch)
+        self._log_sink.start(self)
+        self.bind("<Destroy>", self._on_destroy_stop_log_sink, add="+")
         self._attach_logging_to_gui()
 
         # Log environment variables status for debugging
@@ -408,17 +411,28 @@ class MainWindow(ctk.CTkToplevel):
             self._append_log_message(str(message))
 
     def _append_log_message(self, formatted_message: str) -> None:
-        """Add formatted message directly to GUI (called from logging handler)"""
-        if not formatted_message.endswith("\n"):
-            formatted_message += "\n"
-        self.after(0, self._update_textbox, formatted_message)
-        self.after(0, self._update_log_textbox, formatted_message)
-        
+        """Queue formatted message for the GUI (called from logging handler, any thread)"""
+        self._log_sink.enqueue(formatted_message)
+
+    def _write_log_batch(self, batch_text: str) -> None:
+        """Write a coalesced batch of log lines to both textboxes (runs on Tk main loop)"""
+        self._update_textbox(batch_text)
+        self._update_log_textbox(batch_text)
+
+    def _on_destroy_stop_log_sink(self, event) -> None:
+        """Stop the log flush timer when this window is destroyed"""
+        if event.widget is self:
+            self._log_sink.stop()
+
+    def get_log_sink_stats(self) -> Dict[str, int]:
+        """Get GUI log sink counters (enqueued/flushed/batches/coalesced/dropped/pending)"""
+        return self._log_sink.get_stats()
 
     def _update_textbox(self, message):
         """Update textbox in main tab"""
         if hasattr(self, 'textbox') and self.textbox:
             self.textbox.insert("end", message)
+            trim_textbox_lines(self.textbox, AppConstants.LOG_MAX_SUMMARY_LINES)
             self.textbox.see("end")
         
     def _update_log_textbox(self, message):
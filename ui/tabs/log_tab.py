@@ -2,7 +2,11 @@
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import datetime
+import os
+import tempfile
 from config.json_manager import get_log_folder, set_log_folder
+from constants import AppConstants
+from utils.ui_helpers import trim_textbox_lines
 
 
 class LogTab:
@@ -18,6 +22,11 @@ class LogTab:
         self.callbacks = callbacks
         self.log_folder_path = None
 
+        # Ring buffer: บรรทัดที่ถูกตัดออกจาก textbox จะถูกเขียนต่อท้ายไฟล์ spill
+        self.max_visible_lines = AppConstants.LOG_MAX_VISIBLE_LINES
+        self._spill_file_path = None
+        self.trimmed_lines = 0
+
         # Load saved log folder setting
         self._load_log_folder_setting()
 
@@ -44,10 +53,11 @@ class LogTab:
         # กล่องข้อความสำหรับแสดง Log
         self.log_textbox = ctk.CTkTextbox(self.parent)
         self.log_textbox.pack(pady=8, padx=10, fill="both", expand=True)
+        self.log_textbox.bind("<Destroy>", lambda e: self._remove_spill_file(), add="+")
     
     def _copy_log_to_clipboard(self):
         """Copy all log text to clipboard"""
-        log_text = self.log_textbox.get("1.0", "end").strip()
+        log_text = self._get_full_log_text()
         # Get the root window to access clipboard
         root = self.parent.winfo_toplevel()
         root.clipboard_clear()
@@ -66,7 +76,7 @@ class LogTab:
             self.callbacks['disable_controls']()
 
         try:
-            log_text = self.log_textbox.get("1.0", "end").strip()
+            log_text = self._get_full_log_text()
 
             if not log_text:
                 messagebox.showwarning("Warning", "No log content to export")
@@ -100,10 +110,47 @@ class LogTab:
                 self.callbacks['enable_controls']()
     
     def add_log(self, message):
-        """เพิ่มข้อความลงใน log textbox"""
+        """เพิ่มข้อความลงใน log textbox (รับได้ทั้งข้อความเดียวหรือหลายบรรทัดที่รวม batch มาแล้ว)"""
         self.log_textbox.insert("end", message)
+        removed = trim_textbox_lines(self.log_textbox, self.max_visible_lines)
+        if removed:
+            self._spill_to_file(removed)
         self.log_textbox.see("end")
 
+    def _spill_to_file(self, text):
+        """เขียนบรรทัดที่ถูกตัดออกจาก textbox ลงไฟล์ชั่วคราว เพื่อให้ Copy/Export ได้ log ครบ"""
+        try:
+            if not self._spill_file_path:
+                fd, self._spill_file_path = tempfile.mkstemp(prefix="log_pipeline_spill_", suffix=".log")
+                os.close(fd)
+            with open(self._spill_file_path, 'a', encoding='utf-8') as f:
+                f.write(text)
+            self.trimmed_lines += text.count("\n")
+        except OSError:
+            # ถ้าเขียนไฟล์ไม่ได้ log ส่วนที่ถูกตัดจะยังอยู่ในไฟล์ log_pipeline_*.log (ถ้าตั้งค่าไว้)
+            pass
+
+    def _get_full_log_text(self):
+        """รวม log ที่ถูก spill ลงไฟล์กับส่วนที่ยังแสดงอยู่"""
+        visible_text = self.log_textbox.get("1.0", "end")
+        spilled_text = ""
+        if self._spill_file_path and os.path.exists(self._spill_file_path):
+            try:
+                with open(self._spill_file_path, 'r', encoding='utf-8') as f:
+                    spilled_text = f.read()
+            except OSError:
+                spilled_text = ""
+        return (spilled_text + visible_text).strip()
+
+    def _remove_spill_file(self):
+        """ลบไฟล์ spill เมื่อปิดหน้าต่าง"""
+        if self._spill_file_path:
+            try:
+                os.remove(self._spill_file_path)
+            except OSError:
+                pass
+            self._spill_file_path = None
+
     def _load_log_folder_setting(self):
         """Load saved log folder setting using JSONManager"""
         try:
@@ -2,13 +2,20 @@
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import pandas as pd
-from constants import DatabaseConstants, FileConstants
+from constants import DatabaseConstants, FileConstants, ProcessingConstants
 from ui.icon_manager import get_icon
 from ui.components.input_dialog import InputDialog
 from utils.ui_helpers import set_window_icon
 
 
 class SettingsTab:
+    # ค่า `_dedup_mode` -> ข้อความใน dropdown
+    DEDUP_DISPLAY_NAMES = {
+        ProcessingConstants.DEDUP_MODE_OFF: "Off",
+        ProcessingConstants.DEDUP_MODE_FULL_ROW: "Full Row",
+        ProcessingConstants.DEDUP_MODE_KEYS: "By Upsert Keys",
+    }
+
     def __init__(self, parent, column_settings, dtype_settings, supported_dtypes, callbacks, ui_progress_callback=None, on_all_ui_built=None):
         """
         Initialize Settings Tab
@@ -32,6 +39,7 @@ class SettingsTab:
         # UI variables
         self.dtype_menus = {}
         self.date_format_menus = {}
+        self.dedup_menus = {}
         
         # แคช UI สำหรับแต่ละประเภทไฟล์
         self.ui_cache = {}
@@ -188,6 +196,7 @@ class SettingsTab:
             # ลบจาก menus ทั้งหมด
             self.dtype_menus.pop(file_type, None)
             self.date_format_menus.pop(file_type, None)
+            self.dedup_menus.pop(file_type, None)
             if hasattr(self, 'strategy_menus'):
                 self.strategy_menus.pop(file_type, None)
             if hasattr(self, 'settings_buttons'):
@@ -211,6 +220,10 @@ class SettingsTab:
             if file_type in self.date_format_menus:
                 val = self.dtype_settings.get(file_type, {}).get('_date_format', 'UK')
                 self.date_format_menus[file_type].set(val)
+            # อัปเดต dedup menu
+            if file_type in self.dedup_menus:
+                val = self.dtype_settings.get(file_type, {}).get('_dedup_mode', ProcessingConstants.DEDUP_MODE_OFF)
+                self.dedup_menus[file_type].set(self._dedup_display_name(val))
     
     def _add_file_type(self):
         """เพิ่มประเภทไฟล์ใหม่โดยเลือกไฟล์ตัวอย่าง - with double-click protection"""
@@ -428,6 +441,10 @@ class SettingsTab:
                 if "_upsert_keys" in self.dtype_settings.get(current_file_type, {}):
                     meta_dict["_upsert_keys"] = self.dtype_settings[current_file_type]["_upsert_keys"]
 
+                # 4. In-batch dedup mode (Replace batch)
+                if current_file_type in self.dedup_menus:
+                    meta_dict["_dedup_mode"] = self._dedup_mode_value(self.dedup_menus[current_file_type].get())
+
                 # ลบ meta fields เก่าออก
                 temp_dict = {k: v for k, v in self.dtype_settings[current_file_type].items()
                              if not k.startswith('_')}
@@ -526,6 +543,9 @@ class SettingsTab:
         # --- Update Strategy Section ---
         strategy_menu = self._create_update_strategy_section(scroll_frame, file_type)
 
+        # --- In-batch Dedup Section ---
+        dedup_menu = self._create_dedup_section(scroll_frame, file_type)
+
         # --- Column Settings ---
         column_menus = self._create_column_settings_section(scroll_frame, file_type)
 
@@ -534,6 +554,7 @@ class SettingsTab:
             'scroll_frame': scroll_frame,
             'date_format_menu': date_format_menu,
             'strategy_menu': strategy_menu,
+            'dedup_menu': dedup_menu,
             'column_menus': column_menus
         }
     
@@ -642,10 +663,76 @@ class SettingsTab:
 
         return strategy_menu
 
+    def _create_dedup_section(self, parent, file_type):
+        """สร้างส่วน In-batch Deduplication (ใช้กับ Replace batch ที่รวมหลายไฟล์)"""
+        dedup_outer_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        dedup_outer_frame.pack(fill="x", pady=10, padx=8)
+
+        dedup_frame = ctk.CTkFrame(dedup_outer_frame, corner_radius=8)
+        dedup_frame.pack(fill="x", pady=3, padx=3)
+
+        dedup_label = ctk.CTkLabel(
+            dedup_frame,
+            text="Remove Duplicate Rows Across Files (Replace)",
+            image=get_icon('remove', size=18),
+            compound="left",
+            width=400,
+            anchor="w"
+        )
+        dedup_label.pack(side="left", padx=(15, 10), pady=12, expand=True, fill="x")
+
+        dedup_menu = ctk.CTkOptionMenu(
+            dedup_frame,
+            values=list(self.DEDUP_DISPLAY_NAMES.values()),
+            width=220,
+            command=lambda v: self._on_dedup_mode_changed(file_type, v)
+        )
+        current_mode = self.dtype_settings.get(file_type, {}).get(
+            '_dedup_mode', ProcessingConstants.DEDUP_MODE_OFF
+        )
+        dedup_menu.set(self._dedup_display_name(current_mode))
+        dedup_menu.pack(side="right", padx=(0, 15), pady=12)
+
+        self.dedup_menus[file_type] = dedup_menu
+
+        # ปุ่มเลือก keys ต้องใช้งานได้เมื่อเลือก dedup แบบ keys ด้วย
+        self._update_settings_button_state(file_type)
+
+        return dedup_menu
+
+    def _dedup_display_name(self, mode_value):
+        """แปลงค่า `_dedup_mode` เป็นข้อความใน dropdown"""
+        return self.DEDUP_DISPLAY_NAMES.get(mode_value, self.DEDUP_DISPLAY_NAMES[ProcessingConstants.DEDUP_MODE_OFF])
+
+    def _dedup_mode_value(self, display_name):
+        """แปลงข้อความใน dropdown กลับเป็นค่า `_dedup_mode`"""
+        for mode_value, name in self.DEDUP_DISPLAY_NAMES.items():
+            if name == display_name:
+                return mode_value
+        return ProcessingConstants.DEDUP_MODE_OFF
+
+    def _on_dedup_mode_changed(self, file_type, dedup_display_name):
+        """เมื่อเปลี่ยน dedup mode"""
+        self._update_settings_button_state(file_type)
+
+    def _update_settings_button_state(self, file_type):
+        """เปิดปุ่มเลือก keys เมื่อใช้ Upsert หรือ dedup แบบ keys"""
+        if not hasattr(self, 'settings_buttons') or file_type not in self.settings_buttons:
+            return
+
+        strategy_menu = getattr(self, 'strategy_menus', {}).get(file_type)
+        if strategy_menu is not None:
+            self._on_strategy_changed(file_type, strategy_menu.get())
+
     def _on_strategy_changed(self, file_type, strategy_display_name):
         """เมื่อเปลี่ยน strategy"""
         strategy_value = "upsert" if "Upsert" in strategy_display_name else "replace"
 
+        # dedup แบบ keys ก็ต้องเลือก keys ได้แม้จะเป็น Replace
+        dedup_menu = self.dedup_menus.get(file_type)
+        if dedup_menu is not None and self._dedup_mode_value(dedup_menu.get()) == ProcessingConstants.DEDUP_MODE_KEYS:
+            strategy_value = "upsert"
+
         # Enable/disable settings button with visual feedback
         if file_type in self.settings_buttons:
             if strategy_value == "upsert":
@@ -2,27 +2,37 @@
 Utilities module สำหรับ PIPELINE_SQLSERVER
 
 ประกอบด้วยฟังก์ชัน helper ต่างๆ ที่ใช้ในหลายส่วนของแอปพลิเคชัน
+
+ฟังก์ชันถูก import แบบ lazy เพื่อให้ module เล็กๆ เช่น `utils.logger` โหลดได้โดยไม่ต้องโหลด pandas
 """
 
-from .helpers import (
-    normalize_column_name,
-    parse_date_safe,
-    parse_date_with_format,
-    clean_numeric_value,
-    format_error_message
-)
+import importlib
 
-from .validators import (
-    is_valid_sql_identifier,
-    is_supported_file_type,
-    validate_dataframe,
-    validate_database_config
-)
+_LAZY_EXPORTS = {
+    'normalize_column_name': '.helpers',
+    'parse_date_safe': '.helpers',
+    'parse_date_with_format': '.helpers',
+    'clean_numeric_value': '.helpers',
+    'nvarchar_lengths': '.helpers',
+    'format_error_message': '.helpers',
+    'is_valid_sql_identifier': '.validators',
+    'is_supported_file_type': '.validators',
+    'validate_dataframe': '.validators',
+    'validate_database_config': '.validators',
+}
 
 __all__ = [
     'normalize_column_name',
     'parse_date_safe',
     'parse_date_with_format',
     'clean_numeric_value',
+    'nvarchar_lengths',
     'format_error_message'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
@@ -0,0 +1,61 @@
+"""
+Message box proxy shared by GUI and CLI code paths
+
+Services and handlers import `messagebox` from here instead of `tkinter.messagebox`
+so the CLI never has to import tkinter. The GUI gets the real tkinter dialogs
+(imported on first use); the CLI calls `use_console_dialogs()` once at startup
+and every dialog is printed to the console instead.
+"""
+import logging
+
+
+class _ConsoleMessageBox:
+    """Console replacement for tkinter.messagebox (CLI / headless runs)"""
+
+    @staticmethod
+    def showinfo(title, message, **kwargs):
+        print(f"INFO: {message}")
+        return "ok"
+
+    @staticmethod
+    def showerror(title, message, **kwargs):
+        print(f"ERROR: {message}")
+        return "ok"
+
+    @staticmethod
+    def showwarning(title, message, **kwargs):
+        print(f"WARNING: {message}")
+        return "ok"
+
+    @staticmethod
+    def askyesno(title, message, **kwargs):
+        # For CLI, always return True for auto processing
+        logging.info(f"Auto-confirmed: {title}")
+        return True
+
+
+class _MessageBoxProxy:
+    """Forward calls to tkinter.messagebox (lazy import) or the console backend"""
+
+    def __init__(self):
+        self._backend = None
+
+    def set_backend(self, backend):
+        self._backend = backend
+
+    def _get_backend(self):
+        if self._backend is None:
+            from tkinter import messagebox as tk_messagebox
+            self._backend = tk_messagebox
+        return self._backend
+
+    def __getattr__(self, name):
+        return getattr(self._get_backend(), name)
+
+
+messagebox = _MessageBoxProxy()
+
+
+def use_console_dialogs() -> None:
+    """Route all message boxes to the console (call once from CLI entry points)"""
+    messagebox.set_backend(_ConsoleMessageBox)
@@ -0,0 +1,69 @@
+"""
+Cross-process file lock
+
+`threading.Lock` only serialises threads of one process, but the GUI and the CLI can
+write the same cache/archive files at the same time. `file_lock(path)` holds an OS lock
+on `path` (created if missing): `msvcrt.locking` on Windows, `fcntl.flock` elsewhere.
+The lock is released when the block exits or the process dies.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+_POLL_SECONDS = 0.05
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int) -> None:
+    if msvcrt is not None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path: str, timeout: Optional[float] = None) -> Iterator[None]:
+    """
+    ถือ lock ของไฟล์ `path` ข้าม process ระหว่าง block
+
+    Args:
+        path: ไฟล์ lock (สร้างให้ถ้ายังไม่มี และไม่ถูกลบ)
+        timeout: วินาทีที่รอได้สูงสุด (None = รอจนได้)
+
+    Raises:
+        TimeoutError: ได้ lock ไม่ทันภายใน timeout
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not _try_lock(fd):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for lock {path}")
+            time.sleep(_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            _unlock(fd)
+    finally:
+        os.close(fd)
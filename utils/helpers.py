@@ -145,6 +145,25 @@ def clean_numeric_value(value: Any) -> Optional[float]:
         return None
 
 
+# อักขระนอก BMP (emoji ฯลฯ) ใช้ 2 UTF-16 code units ใน NVARCHAR
+_SUPPLEMENTARY_CHARS = re.compile('[\U00010000-\U0010FFFF]')
+
+
+def nvarchar_lengths(values: pd.Series) -> pd.Series:
+    """
+    Length of each string as SQL Server NVARCHAR/LEN counts it (UTF-16 code units)
+
+    Python len() counts code points, so an emoji is 1 in Python but 2 in NVARCHAR(n).
+
+    Args:
+        values: Series of str
+
+    Returns:
+        pd.Series: UTF-16 length per value
+    """
+    return values.str.len() + values.str.count(_SUPPLEMENTARY_CHARS)
+
+
 def format_error_message(error: Exception, context: str = "") -> str:
     """
     Format error message
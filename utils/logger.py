@@ -3,6 +3,8 @@ import json
 import time
 import os
 import warnings
+import itertools
+from collections import deque
 from datetime import datetime
 from typing import Callable, Optional, Dict, Any
 
@@ -40,6 +42,115 @@ class _GuiLogHandler(logging.Handler):
             self.handleError(record)
 
 
+class BatchedLogSink:
+    """Queue log messages from any thread and flush them to the GUI in batches
+
+    `enqueue()` ไม่ใช้ lock (deque.append / itertools.count เป็น atomic ใน CPython)
+    จึงเรียกได้จาก worker threads โดยไม่บล็อค ส่วน `flush()` ถูกเรียกจาก Tk main loop
+    ผ่าน `after()` และส่งข้อความทั้งหมดที่ค้างอยู่ไปยัง flush_callback ในครั้งเดียว
+    """
+
+    def __init__(self, flush_callback: Callable[[str], None],
+                 max_pending: int = AppConstants.LOG_MAX_PENDING_MESSAGES,
+                 flush_interval_ms: int = AppConstants.LOG_FLUSH_INTERVAL_MS) -> None:
+        self._flush_callback = flush_callback
+        self._flush_interval_ms = flush_interval_ms
+        # deque(maxlen) ทิ้งข้อความเก่าสุดเองเมื่อคิวเต็ม
+        self._pending: deque = deque(maxlen=max_pending)
+        self._enqueued_counter = itertools.count(1)
+        self._enqueued = 0
+        self._widget = None
+        self._after_id = None
+
+        # ตัวนับ (อัปเดตเฉพาะใน main thread ระหว่าง flush)
+        self._flushed = 0
+        self._batches = 0
+        self._dropped = 0
+
+    def enqueue(self, message: str) -> None:
+        """เพิ่มข้อความเข้าคิว (thread-safe, non-blocking)"""
+        self._pending.append(message)
+        self._enqueued = next(self._enqueued_counter)
+
+    def start(self, widget: Any) -> None:
+        """เริ่ม flush ตามรอบเวลาจาก Tk main loop ของ widget"""
+        self._widget = widget
+        self._schedule()
+
+    def stop(self) -> None:
+        """หยุด timer และ flush ข้อความที่ค้างอยู่"""
+        if self._widget is not None and self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self.flush()
+        self._widget = None
+
+    def flush(self) -> int:
+        """ส่งข้อความที่ค้างอยู่ทั้งหมดไปยัง GUI ในครั้งเดียว
+
+        Returns:
+            Number of messages written
+        """
+        batch = []
+        while True:
+            try:
+                batch.append(self._pending.popleft())
+            except IndexError:
+                break
+
+        # ข้อความที่ถูกทิ้งเพราะคิวเต็ม = ที่เข้าคิวทั้งหมด - ที่เขียนแล้ว - ที่ยังค้าง
+        dropped_total = max(0, self._enqueued - self._flushed - len(batch) - len(self._pending))
+        newly_dropped = dropped_total - self._dropped
+        self._dropped = dropped_total
+
+        if not batch and newly_dropped <= 0:
+            return 0
+
+        lines = []
+        if newly_dropped > 0:
+            lines.append(f"Warning: {newly_dropped:,} log messages dropped (GUI log queue full)\n")
+        for message in batch:
+            lines.append(message if message.endswith("\n") else message + "\n")
+
+        self._flushed += len(batch)
+        self._batches += 1
+        try:
+            self._flush_callback("".join(lines))
+        except Exception:
+            # ไม่ให้ GUI log ทำให้แอปล้ม
+            pass
+        return len(batch)
+
+    def get_stats(self) -> Dict[str, int]:
+        """สถิติของ sink: จำนวนที่เข้าคิว, เขียนแล้ว, รวม batch, และถูกทิ้ง"""
+        return {
+            'enqueued': self._enqueued,
+            'flushed': self._flushed,
+            'batches': self._batches,
+            'coalesced': max(0, self._flushed - self._batches),
+            'dropped': self._dropped,
+            'pending': len(self._pending),
+        }
+
+    def _schedule(self) -> None:
+        if self._widget is None:
+            return
+        try:
+            self._after_id = self._widget.after(self._flush_interval_ms, self._tick)
+        except Exception:
+            # widget ถูกทำลายแล้ว
+            self._after_id = None
+            self._widget = None
+
+    def _tick(self) -> None:
+        self._after_id = None
+        self.flush()
+        self._schedule()
+
+
 def setup_logging(level: int = logging.INFO, force: bool = False) -> None:
     """Set up basic logging with standard app format
 
@@ -193,7 +304,7 @@ def cleanup_old_log_files(base_path: str, retention_days: int = 30) -> int:
         # ค้นหาไฟล์ log ที่เก่าเกิน retention period
         for filename in os.listdir(base_path):
             # ตรวจสอบว่าเป็นไฟล์ log ของระบบเท่านั้น (ป้องกันการลบไฟล์อื่น)
-            if filename.startswith('log_pipeline_') and filename.endswith('.log'):
+            if filename.startswith('log_pipeline_') and filename.endswith(('.log', '_phases.json')):
                 file_path = os.path.join(base_path, filename)
                 try:
                     # ตรวจสอบว่าเป็นไฟล์จริง (ไม่ใช่โฟลเดอร์)
@@ -0,0 +1,103 @@
+"""
+Per-phase wall-clock timers for file processing
+
+A `PhaseTimer` accumulates seconds, rows and bytes for each pipeline phase (read,
+rename, profile, stage, validate, transfer, index, move). The active timer is held
+in a context variable: handlers wrap work in `collect(timer)` and services mark
+phases with `timed_phase(...)`, which is a no-op when no timer is active. Worker
+threads must be submitted with `contextvars.copy_context().run` to see the timer.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+PHASES = ('read', 'rename', 'profile', 'stage', 'validate', 'transfer', 'index', 'move')
+
+_active: contextvars.ContextVar = contextvars.ContextVar('phase_timer', default=None)
+
+
+class PhaseMeasure:
+    """ค่าที่ผู้เรียกกำหนดได้ระหว่าง phase (เช่นจำนวนแถวที่รู้หลังอ่านไฟล์เสร็จ)"""
+
+    __slots__ = ('rows', 'nbytes')
+
+    def __init__(self, rows: int = 0, nbytes: int = 0) -> None:
+        self.rows = rows
+        self.nbytes = nbytes
+
+
+class PhaseTimer:
+    """Accumulate seconds/rows/bytes per phase (thread-safe)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    def add(self, phase: str, seconds: float, rows: int = 0, nbytes: int = 0) -> None:
+        with self._lock:
+            entry = self.phases.get(phase)
+            if entry is None:
+                entry = self.phases[phase] = {'count': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0}
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['rows'] += rows or 0
+            entry['bytes'] += nbytes or 0
+
+    def merge(self, other: Optional['PhaseTimer']) -> 'PhaseTimer':
+        if other is not None:
+            for phase, entry in other.to_raw().items():
+                with self._lock:
+                    mine = self.phases.setdefault(phase, {'count': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0})
+                    for key in mine:
+                        mine[key] += entry[key]
+        return self
+
+    def to_raw(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {phase: dict(entry) for phase, entry in self.phases.items()}
+
+    def total_seconds(self) -> float:
+        return sum(entry['seconds'] for entry in self.to_raw().values())
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """สรุปแต่ละ phase พร้อม rows/sec และ MB/sec (เรียงตามลำดับของ pipeline)"""
+        raw = self.to_raw()
+        ordered = [p for p in PHASES if p in raw] + sorted(p for p in raw if p not in PHASES)
+        result = {}
+        for phase in ordered:
+            entry = raw[phase]
+            seconds = entry['seconds']
+            result[phase] = {
+                'count': entry['count'],
+                'seconds': round(seconds, 4),
+                'rows': int(entry['rows']),
+                'bytes': int(entry['bytes']),
+                'rows_per_sec': round(entry['rows'] / seconds, 1) if seconds > 0 and entry['rows'] else None,
+                'mb_per_sec': round(entry['bytes'] / (1024 * 1024) / seconds, 2) if seconds > 0 and entry['bytes'] else None,
+            }
+        return result
+
+
+@contextmanager
+def collect(timer: Optional[PhaseTimer]):
+    """ให้ timed_phase ภายใน block นี้บันทึกลง timer"""
+    token = _active.set(timer)
+    try:
+        yield timer
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def timed_phase(phase: str, rows: int = 0, nbytes: int = 0):
+    """จับเวลา phase และบันทึกลง timer ที่ active อยู่ (ไม่ทำอะไรถ้าไม่มี)"""
+    measure = PhaseMeasure(rows, nbytes)
+    timer = _active.get()
+    started = time.perf_counter()
+    try:
+        yield measure
+    finally:
+        if timer is not None:
+            timer.add(phase, time.perf_counter() - started, measure.rows, measure.nbytes)
@@ -0,0 +1,201 @@
+"""
+SQL query profiler for PIPELINE_SQLSERVER
+
+Records every statement issued through an instrumented SQLAlchemy engine (category,
+duration, rows affected) plus the time spent opening new DBAPI connections, and
+aggregates them per upload batch and phase (stage, validate, transfer, index).
+Scope is carried in a context variable, so worker threads must be submitted with
+`contextvars.copy_context().run` to keep the batch/phase of their caller.
+"""
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from constants import PathConstants, ProcessingConstants
+
+UNSCOPED = '-'
+
+_scope: contextvars.ContextVar = contextvars.ContextVar('query_profiler_scope', default=(UNSCOPED, UNSCOPED))
+
+_DDL_KEYWORDS = {'CREATE', 'ALTER', 'DROP', 'TRUNCATE'}
+_LEADING_COMMENTS = re.compile(r'^\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*', re.S)
+
+
+def categorize_statement(statement: str, executemany: bool = False) -> str:
+    """จัดกลุ่ม SQL statement ตาม keyword แรก"""
+    body = _LEADING_COMMENTS.sub('', statement or '', count=1)
+    keyword = body.split(None, 1)[0].upper() if body.strip() else ''
+    if keyword in _DDL_KEYWORDS or (keyword == 'IF' and 'DROP ' in body.upper()):
+        return 'ddl'
+    if keyword == 'INSERT':
+        return 'insert_bulk' if executemany else 'insert'
+    if keyword in ('SELECT', 'WITH'):
+        return 'select'
+    if keyword in ('UPDATE', 'DELETE', 'MERGE'):
+        return keyword.lower()
+    return 'other'
+
+
+class QueryProfiler:
+    """Aggregate SQL timings per (batch, phase, category)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._instrumented = weakref.WeakSet()
+
+    # ===== Engine instrumentation =====
+    def instrument(self, engine) -> None:
+        """ผูก event listeners กับ engine (เรียกซ้ำได้ ผูกครั้งเดียวต่อ engine)"""
+        if engine is None or engine in self._instrumented:
+            return
+        from sqlalchemy import event
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('query_profiler_start', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get('query_profiler_start')
+            if not starts:
+                return
+            seconds = time.perf_counter() - starts.pop()
+            rows = getattr(cursor, 'rowcount', -1)
+            if (rows is None or rows < 0) and executemany and isinstance(parameters, (list, tuple)):
+                rows = len(parameters)
+            self.record(categorize_statement(statement, executemany), seconds, rows)
+
+        @event.listens_for(engine, 'do_connect')
+        def _do_connect(dialect, conn_rec, cargs, cparams):
+            self._local.connect_start = time.perf_counter()
+
+        @event.listens_for(engine.pool, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            started = getattr(self._local, 'connect_start', None)
+            if started is not None:
+                self._local.connect_start = None
+                self.record('connect_wait', time.perf_counter() - started, -1)
+
+        self._instrumented.add(engine)
+
+    # ===== Scope =====
+    @contextmanager
+    def batch(self, batch_id: str):
+        """กำหนด batch ของ statements ที่รันภายใน block นี้"""
+        token = _scope.set((batch_id or UNSCOPED, UNSCOPED))
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+
+    @contextmanager
+    def phase(self, name: str):
+        """กำหนด phase (stage/validate/transfer/index) ภายใน batch ปัจจุบัน"""
+        batch_id, _ = _scope.get()
+        token = _scope.set((batch_id, name))
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+
+    # ===== Recording =====
+    def record(self, category: str, seconds: float, rows: int = -1) -> None:
+        batch_id, phase = _scope.get()
+        key = (batch_id, phase, category)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0}
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            if rows is not None and rows > 0:
+                entry['rows'] += rows
+
+    def batch_rows(self, batch_id: str) -> List[Dict[str, Any]]:
+        """สถิติของ batch เรียงตาม phase แล้วตามเวลารวม"""
+        with self._lock:
+            items = [(k, dict(v)) for k, v in self._stats.items() if k[0] == batch_id]
+        rows = [
+            {
+                'phase': phase,
+                'category': category,
+                'count': v['count'],
+                'seconds': round(v['seconds'], 4),
+                'max_seconds': round(v['max_seconds'], 4),
+                'rows': v['rows'],
+            }
+            for (_, phase, category), v in items
+        ]
+        rows.sort(key=lambda r: (r['phase'], -r['seconds']))
+        return rows
+
+    def pop_batch(self, batch_id: str) -> List[Dict[str, Any]]:
+        """คืนสถิติของ batch แล้วลบออกจากหน่วยความจำ"""
+        rows = self.batch_rows(batch_id)
+        with self._lock:
+            for key in [k for k in self._stats if k[0] == batch_id]:
+                del self._stats[key]
+        return rows
+
+    # ===== Reporting =====
+    def report_batch(self, batch_id: str, log_func: Optional[Callable[[str], None]] = None,
+                     logic_type: str = None) -> Optional[str]:
+        """แสดงตาราง query profile ของ batch ใน log และบันทึกเป็น JSON (คืน path ที่บันทึก)"""
+        rows = self.pop_batch(batch_id)
+        if not rows:
+            return None
+        log = log_func or logging.info
+        total_seconds = sum(r['seconds'] for r in rows)
+        total_count = sum(r['count'] for r in rows if r['category'] != 'connect_wait')
+        log(f"SQL profile: {total_count} statements, {total_seconds:.2f} s")
+        log(f"   {'phase':<12}{'category':<14}{'count':>7}{'total s':>10}{'max s':>9}{'rows':>12}")
+        for r in rows:
+            log(f"   {r['phase']:<12}{r['category']:<14}{r['count']:>7}"
+                f"{r['seconds']:>10.2f}{r['max_seconds']:>9.2f}{r['rows']:>12,}")
+        return self.write_json(batch_id, rows, logic_type)
+
+    def write_json(self, batch_id: str, rows: List[Dict[str, Any]], logic_type: str = None,
+                   directory: str = None) -> Optional[str]:
+        directory = directory or PathConstants.QUERY_PROFILES_DIR
+        try:
+            os.makedirs(directory, exist_ok=True)
+            safe_type = re.sub(r'[^\w\-]+', '_', logic_type or 'unknown')
+            path = os.path.join(directory, f"{safe_type}_{batch_id}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'batch_id': batch_id,
+                    'logic_type': logic_type,
+                    'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'total_seconds': round(sum(r['seconds'] for r in rows), 4),
+                    'statements': rows,
+                }, f, ensure_ascii=False, indent=2)
+            self._cleanup_old_files(directory)
+            return path
+        except OSError as e:
+            logging.error(f"Failed to write query profile: {e}")
+            return None
+
+    @staticmethod
+    def _cleanup_old_files(directory: str) -> None:
+        files = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json')]
+        if len(files) <= ProcessingConstants.PROFILE_MAX_FILES:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - ProcessingConstants.PROFILE_MAX_FILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+query_profiler = QueryProfiler()
@@ -1,7 +1,35 @@
 """
 SQL utility functions for consistent data cleaning across the application
+
+Cleaning, conversion and error-condition expressions are built here only, so the
+validators, the staging -> final transfer and the conversion plan
+(services/database/conversion_plan.py) always agree on what counts as valid.
 """
 
+# TRY_CONVERT styles ที่ยอมรับสำหรับคอลัมน์วันที่ เรียงตามลำดับที่ลอง (style แรกที่แปลงได้ชนะ)
+DATE_STYLES = {
+    'UK': (103, 104, 105, 5, 3, 4, 121, 101),   # DD/MM/YYYY, DD.MM.YYYY, DD-MM-YYYY, DD-MM-YY, DD/MM/YY, DD.MM.YY, ISO, MM/DD/YYYY
+    'US': (101, 102, 110, 121, 103),            # MM/DD/YYYY, MM.DD.YYYY, MM-DD-YYYY, ISO, DD/MM/YYYY
+}
+
+# styles ที่เรียนรู้ได้ต่อคอลัมน์ (เฉพาะรูปแบบหลักของ date format นั้น): style ของอีกฝั่ง เช่น 101 ใน UK
+# เป็นแค่ fallback ท้ายรายการ ถ้าเลื่อนขึ้นหน้าสุดค่าที่กำกวมอย่าง 01/02/2024 จะถูกอ่านกลับวัน/เดือน
+LEARNABLE_DATE_STYLES = {
+    'UK': (103, 104, 105, 121),
+    'US': (101, 110, 121),
+}
+
+# strptime format (column profile) -> TRY_CONVERT style ที่แปลงค่ารูปแบบนั้นได้
+DATE_FORMAT_STYLES = {
+    '%d/%m/%Y': 103,
+    '%d.%m.%Y': 104,
+    '%d-%m-%Y': 105,
+    '%Y-%m-%d': 121,
+    '%Y-%m-%d %H:%M:%S': 121,
+    '%m/%d/%Y': 101,
+    '%m-%d-%Y': 110,
+}
+
 
 def get_numeric_cleaning_expression(col_name: str) -> str:
     """
@@ -17,7 +45,8 @@ def get_numeric_cleaning_expression(col_name: str) -> str:
         str: SQL expression that cleans the column data
     """
     safe_col = f"[{col_name}]"
-    return f"NULLIF(LTRIM(RTRIM(REPLACE(REPLACE(REPLACE({safe_col}, '\"', ''), ',', ''), ' ', ''))), '-')"
+    # ค่าว่าง (หรือมีแต่ช่องว่าง) เป็น NULL: TRY_CONVERT(INT/FLOAT, '') ให้ 0 ไม่ใช่ NULL
+    return f"NULLIF(NULLIF(LTRIM(RTRIM(REPLACE(REPLACE(REPLACE({safe_col}, '\"', ''), ',', ''), ' ', ''))), '-'), '')"
 
 
 def get_date_cleaning_expression(col_name: str) -> str:
@@ -31,7 +60,8 @@ def get_date_cleaning_expression(col_name: str) -> str:
         str: SQL expression that cleans the column data for dates
     """
     safe_col = f"[{col_name}]"
-    return f"""NULLIF(LTRIM(RTRIM(REPLACE(REPLACE(REPLACE(TRANSLATE({safe_col}, CHAR(9) + CHAR(10) + CHAR(13) + CHAR(160) + ',', '     '), NCHAR(65279), ''), NCHAR(8203), ''), NCHAR(8288), ''))), '-')"""
+    # ค่าที่มีแต่ช่องว่าง/tab/NBSP เป็น NULL: TRY_CONVERT(DATETIME, '', 103) ให้ 1900-01-01 ไม่ใช่ NULL
+    return f"""NULLIF(NULLIF(LTRIM(RTRIM(REPLACE(REPLACE(REPLACE(TRANSLATE({safe_col}, CHAR(9) + CHAR(10) + CHAR(13) + CHAR(160) + ',', '     '), NCHAR(65279), ''), NCHAR(8203), ''), NCHAR(8288), ''))), '-'), '')"""
 
 
 def get_basic_cleaning_expression(col_name: str) -> str:
@@ -66,4 +96,61 @@ def get_cleaning_expression(col_name: str, cleaning_type: str = 'basic') -> str:
     elif cleaning_type == 'date':
         return get_date_cleaning_expression(col_name)
     else:
-        raise ValueError(f"Unknown cleaning_type: {cleaning_type}")
\ No newline at end of file
+        raise ValueError(f"Unknown cleaning_type: {cleaning_type}")
+
+
+def get_date_styles(date_format: str = 'UK', preferred_style: int = None) -> tuple:
+    """
+    TRY_CONVERT styles ของ date format preference ('UK' หรือ 'US')
+
+    preferred_style (style ที่เรียนรู้ของคอลัมน์) ถูกย้ายมาไว้หน้าสุดเฉพาะเมื่ออยู่ใน
+    LEARNABLE_DATE_STYLES ของ date format นั้น ชุดค่าที่ยอมรับจึงเหมือนเดิม และค่าที่กำกวม
+    (วัน/เดือน สลับได้) ยังถูกอ่านตาม preference เดิม เปลี่ยนแค่ลำดับที่ลอง
+    """
+    key = 'UK' if date_format == 'UK' else 'US'
+    styles = DATE_STYLES[key]
+    if preferred_style in LEARNABLE_DATE_STYLES[key]:
+        return (preferred_style,) + tuple(s for s in styles if s != preferred_style)
+    return styles
+
+
+def get_date_conversion_expression(cleaned_expression: str, date_format: str = 'UK',
+                                   preferred_style: int = None) -> str:
+    """
+    Generate SQL expression converting a cleaned value to DATETIME
+
+    Tries each accepted style in order and returns the first successful conversion
+    (NULL when none matches). With a learned preferred_style the bulk of the rows is
+    converted by the first TRY_CONVERT; the remaining styles only run for residual rows.
+    """
+    converts = ", ".join(
+        f"TRY_CONVERT(DATETIME, {cleaned_expression}, {style})"
+        for style in get_date_styles(date_format, preferred_style)
+    )
+    return f"COALESCE({converts})"
+
+
+def get_date_error_condition(cleaned_expression: str, date_format: str = 'UK',
+                             preferred_style: int = None) -> str:
+    """WHERE condition for non-empty values that no accepted date style can convert"""
+    conversion = get_date_conversion_expression(cleaned_expression, date_format, preferred_style)
+    return f"{cleaned_expression} IS NOT NULL AND {conversion} IS NULL"
+
+
+def get_numeric_conversion_expression(cleaned_expression: str, target: str = 'FLOAT') -> str:
+    """
+    Generate SQL expression converting a cleaned value to INT or FLOAT
+
+    INT goes through FLOAT so values such as '1.0' or '1e3' convert; values with a
+    fractional part or outside the INT range give NULL (TRY_CONVERT(INT, '1.0') is NULL).
+    """
+    if target == 'INT':
+        as_float = f"TRY_CAST({cleaned_expression} AS FLOAT)"
+        return f"TRY_CONVERT(INT, CASE WHEN {as_float} = FLOOR({as_float}) THEN {as_float} END)"
+    return f"TRY_CONVERT({target}, {cleaned_expression})"
+
+
+def get_numeric_error_condition(cleaned_expression: str, target: str = 'FLOAT') -> str:
+    """WHERE condition for non-empty values that the transfer cannot convert to the target type"""
+    conversion = get_numeric_conversion_expression(cleaned_expression, target)
+    return f"NULLIF({cleaned_expression}, '') IS NOT NULL AND {conversion} IS NULL"
@@ -0,0 +1,117 @@
+"""
+Startup profiler for PIPELINE_SQLSERVER entry points
+
+Records how long each module takes to import (first import only, inclusive of its
+own imports) and how long each named startup phase takes. Enabled with the
+`--profile-startup` flag of `pipeline_gui_app.py` and `auto_process_cli.py`.
+"""
+import builtins
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+class StartupProfiler:
+    """Collect import times and phase timings during application startup"""
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self._original_import = None
+        self._local = threading.local()
+        self.import_times: List[Dict[str, Any]] = []
+        self.phases: List[Dict[str, Any]] = []
+
+    # ===== Import timing =====
+    def install_import_hook(self) -> None:
+        """เริ่มจับเวลาการ import (ห่อ builtins.__import__)"""
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        original_import = self._original_import
+        profiler = self
+
+        def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # จับเวลาเฉพาะ absolute import ครั้งแรกของ module นั้น
+            if level != 0 or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+
+            depth = getattr(profiler._local, 'depth', 0)
+            profiler._local.depth = depth + 1
+            started = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                profiler._local.depth = depth
+                profiler.import_times.append({
+                    'module': name,
+                    'depth': depth,
+                    'seconds': time.perf_counter() - started,
+                })
+
+        builtins.__import__ = _timed_import
+
+    def remove_import_hook(self) -> None:
+        """หยุดจับเวลาการ import"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    # ===== Phase timing =====
+    @contextmanager
+    def phase(self, name: str):
+        """จับเวลา phase ของการเริ่มโปรแกรม"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'phase': name,
+                'start_offset': started - self._start,
+                'seconds': time.perf_counter() - started,
+            })
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    # ===== Reporting =====
+    def to_dict(self, top_n: int = 25) -> Dict[str, Any]:
+        slowest = sorted(self.import_times, key=lambda x: x['seconds'], reverse=True)[:top_n]
+        return {
+            'total_seconds': round(self.elapsed(), 4),
+            'phases': [
+                {**p, 'start_offset': round(p['start_offset'], 4), 'seconds': round(p['seconds'], 4)}
+                for p in self.phases
+            ],
+            'modules_imported': len(self.import_times),
+            'slowest_imports': [
+                {**i, 'seconds': round(i['seconds'], 4)} for i in slowest
+            ],
+        }
+
+    def report(self, log_func: Optional[Callable[[str], None]] = None, top_n: int = 15) -> None:
+        """แสดงผลสรุป startup profile ผ่าน log_func"""
+        log = log_func or logging.info
+        data = self.to_dict(top_n=top_n)
+        log(f"Startup profile: total {data['total_seconds'] * 1000:.0f} ms, "
+            f"{data['modules_imported']} modules imported")
+        for p in data['phases']:
+            log(f"   Phase {p['phase']}: {p['seconds'] * 1000:.0f} ms")
+        if data['slowest_imports']:
+            log("   Slowest imports (inclusive):")
+            for i in data['slowest_imports']:
+                indent = "  " * i['depth']
+                log(f"      {indent}{i['module']}: {i['seconds'] * 1000:.0f} ms")
+
+    def write_json(self, output_path: str) -> bool:
+        """บันทึกผล profile เป็น JSON"""
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(top_n=100), f, ensure_ascii=False, indent=2)
+            return True
+        except OSError as e:
+            logging.error(f"Failed to write startup profile: {e}")
+            return False
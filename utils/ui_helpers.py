@@ -70,3 +70,27 @@ def format_elapsed_time(total_seconds: float) -> str:
         return f"{minutes}m {seconds}s"
     else:
         return f"{seconds}s"
+
+
+def trim_textbox_lines(textbox, max_lines: int) -> str:
+    """
+    Keep only the last max_lines lines in a Tk/CTk textbox (ring buffer)
+
+    Args:
+        textbox: Tkinter Text / CTkTextbox instance
+        max_lines: Maximum number of lines to keep visible
+
+    Returns:
+        Text that was removed from the top (empty string if nothing was trimmed)
+    """
+    if max_lines <= 0:
+        return ""
+    # 'end-1c' ชี้ไปที่ตัวอักษรสุดท้าย ไม่นับ newline ที่ Tk เติมให้เสมอ
+    last_line = int(textbox.index("end-1c").split(".")[0])
+    excess = last_line - max_lines
+    if excess <= 0:
+        return ""
+    cut_index = f"{excess + 1}.0"
+    removed = textbox.get("1.0", cut_index)
+    textbox.delete("1.0", cut_index)
+    return removed